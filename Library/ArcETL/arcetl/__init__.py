@@ -1,6 +1,12 @@
 """ETL framework library based on ArcGIS/ArcPy."""
+import os
 
 # pylint: disable=relative-beyond-top-level, unused-import
+# Install in-memory ArcPy stand-in first, if requested (e.g. for testing).
+if os.environ.get("ARCETL_FAKE_ARCPY"):
+    from arcetl.testing import fakearcpy
+
+    fakearcpy.install()
 from arcetl import arcobj
 from arcetl.arcobj import (
     ArcExtension,
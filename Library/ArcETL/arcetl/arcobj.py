@@ -23,6 +23,13 @@ if not hasattr(math, "isclose"):
 LOG = logging.getLogger(__name__)
 """logging.Logger: Module-level logger."""
 
+GEOMETRY_COMPARATOR = geometry.GeometryComparator()
+"""arcetl.geometry.GeometryComparator: Default comparator for geometry values.
+
+Fingerprints geometries at their spatial reference XY resolution, & rejects on
+extents differing beyond the XY tolerance.
+"""
+
 
 class ArcExtension(object):
     """Context manager for an ArcGIS extension.
@@ -671,20 +678,27 @@ def python_type(type_description):
     return instance[type_description.lower()]
 
 
-def same_feature(*features):
+def same_feature(*features, **kwargs):
     """Determine whether feature representations are the same.
 
     Args:
         *features (iter of iter): Collection of features to compare.
+        **kwargs: Arbitrary keyword arguments. See below.
+
+    Keyword Args:
+        geometry_comparator (arcetl.geometry.GeometryComparator): Comparator for
+            geometry values. Default is GEOMETRY_COMPARATOR.
 
     Returns:
         bool: True if same feature, False otherwise.
     """
-    same = all(same_value(*vals) for pair in pairwise(features) for vals in zip(*pair))
+    same = all(
+        same_value(*vals, **kwargs) for pair in pairwise(features) for vals in zip(*pair)
+    )
     return same
 
 
-def same_value(*values):
+def same_value(*values, **kwargs):
     """Determine whether values are the same.
 
     Notes:
@@ -700,8 +714,17 @@ def same_value(*values):
                 differences between sources when they are essentially the same. Avoid
                 comparisons between those.
 
+        Geometries are compared in two stages (see arcetl.geometry.GeometryComparator):
+            a cheap fingerprint settles most pairs, & `geometry.equals()` runs only
+            for the rest.
+
     Args:
         *values (iter of iter): Collection of values to compare.
+        **kwargs: Arbitrary keyword arguments. See below.
+
+    Keyword Args:
+        geometry_comparator (arcetl.geometry.GeometryComparator): Comparator for
+            geometry values. Default is GEOMETRY_COMPARATOR.
 
     Returns:
         bool: True if same value, False otherwise.
@@ -717,6 +740,9 @@ def same_value(*values):
     if all(isinstance(val, float) for val in values):
         same = all(math.isclose(val1, val2) for val1, val2 in pairwise(values))
     # Geometry equality has extra considerations.
+    elif all(isinstance(val, arcpy.Geometry) for val in values):
+        comparator = kwargs.get("geometry_comparator") or GEOMETRY_COMPARATOR
+        same = comparator.same(*values)
     elif all(isinstance(val, (arcpy.Geometry, arcpy.Point)) for val in values):
         same = all(val1.equals(val2) for val1, val2 in pairwise(values))
     return same
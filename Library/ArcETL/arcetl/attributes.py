@@ -20,6 +20,9 @@ from arcetl.arcobj import (
     spatial_reference_metadata,
 )
 from arcetl import dataset
+from arcetl.geometry import compactness_ratio
+from arcetl import projection
+from arcetl import pushdown
 from arcetl.helpers import (
     contain,
     leveled_logger,
@@ -58,6 +61,11 @@ GEOMETRY_PROPERTY_TRANSFORM = {
     "zmin": ["extent", "ZMin"],
 }
 """dict: Mapping of geometry property tag to cascade of geometry object properties."""
+GEOMETRY_PROPERTY_FUNCTION = {
+    "compactness-ratio": compactness_ratio,
+    "compactness_ratio": compactness_ratio,
+}
+"""dict: Mapping of geometry property tag to function deriving it from a geometry."""
 
 
 class FeatureMatcher(object):
@@ -118,6 +126,102 @@ class FeatureMatcher(object):
         return self.matched[tuple(contain(id_values))]
 
 
+def _geometry_property_getter(geometry_properties):
+    """Return function getting property value from a geometry.
+
+    Args:
+        geometry_properties: Geometry property tag, cascade of property names/tags in
+            object-access order, or function taking the geometry.
+
+    Returns:
+        function
+    """
+    if callable(geometry_properties):
+        function = geometry_properties
+    elif (
+        not isinstance(geometry_properties, (list, tuple))
+        and geometry_properties in GEOMETRY_PROPERTY_FUNCTION
+    ):
+        function = GEOMETRY_PROPERTY_FUNCTION[geometry_properties]
+    else:
+        properties = list(contain(geometry_properties))
+        return lambda geometry: property_value(
+            geometry, GEOMETRY_PROPERTY_TRANSFORM, *properties
+        )
+
+    return lambda geometry: function(geometry) if geometry is not None else None
+
+
+def _geometry_property_axis(geometry_properties):
+    """Return point coordinate axis ("x" or "y") the geometry properties get.
+
+    Args:
+        geometry_properties: Geometry property tag, cascade, or function.
+
+    Returns:
+        str: "x" or "y" if the properties get a point coordinate, None otherwise.
+    """
+    if callable(geometry_properties):
+        return None
+
+    properties = [
+        prop.lower() if hasattr(prop, "lower") else prop
+        for prop in contain(geometry_properties)
+    ]
+    if len(properties) == 2 and properties[0] in ("centroid", "firstpoint"):
+        properties = properties[1:]
+    if len(properties) == 1 and properties[0] in ("x", "x-coordinate"):
+        return "x"
+
+    if len(properties) == 1 and properties[0] in ("y", "y-coordinate"):
+        return "y"
+
+    return None
+
+
+def _geometry_property_values(geometries, getters):
+    """Generate (ID, values) for each geometry with values from the getters.
+
+    Args:
+        geometries (iter): Collection of (ID, geometry) pairs.
+        getters (list): Functions getting property values from a geometry.
+
+    Yields:
+        tuple: ID & list of property values, in getter order.
+    """
+    for id_value, geometry in geometries:
+        yield id_value, [getter(geometry) for getter in getters]
+
+
+def _pushdown_update(dataset_meta, field_name, spec, **kwargs):
+    """Return counts for update pushed down to SQL, or None if not pushed down.
+
+    Args:
+        dataset_meta (dict): Dataset metadata.
+        field_name (str): Name of the field to update.
+        spec (dict): Update spec (see arcetl.pushdown).
+        **kwargs: Keyword arguments of the calling update function.
+
+    Returns:
+        collections.Counter, None.
+    """
+    if not kwargs.get("sql_connection"):
+        return None
+
+    plan = pushdown.plan_update(
+        dataset_meta,
+        field_name,
+        spec,
+        dataset_where_sql=kwargs.get("dataset_where_sql"),
+        join_dataset_meta=kwargs.get("join_dataset_meta"),
+        dialect=kwargs.get("sql_dialect", "mssql"),
+    )
+    if not plan:
+        return None
+
+    return pushdown.execute_plan(kwargs["sql_connection"], plan)
+
+
 def _update_coordinate_node_map(coordinate_node, node_id_field_metadata):
     """Return updated coordinate/node info map."""
 
@@ -782,6 +886,161 @@ def update_by_geometry(dataset_path, field_name, geometry_properties, **kwargs):
     return update_action_count
 
 
+def update_by_geometry_properties(dataset_path, field_geometry_properties, **kwargs):
+    """Update attribute values in several fields from geometry properties in one pass.
+
+    Geometries are read once per spatial reference requested, & all fields are
+    written with a single update cursor.
+
+    Args:
+        dataset_path (str): Path of the dataset.
+        field_geometry_properties (dict): Mapping of field name to a pair of geometry
+            properties & spatial reference item. Geometry properties are a property
+            tag (e.g. "area", "xmin", "compactness_ratio"), a cascade of properties in
+            object-access order (e.g. ["centroid", "X"]), or a function taking the
+            geometry. If the spatial reference item is None, the dataset's spatial
+            reference is used.
+        **kwargs: Arbitrary keyword arguments. See below.
+
+    Keyword Args:
+        dataset_where_sql (str): SQL where-clause for dataset subselection.
+        use_projection_math (bool): For point datasets, project coordinates for x/y
+            properties in bulk with `arcetl.projection`, rather than projecting each
+            geometry, where both spatial references are supported. Default is False.
+        use_edit_session (bool): Updates are done in an edit session if True. Default is
+            False.
+        log_level (str): Level to log the function at. Default is "info".
+
+    Returns:
+        collections.Counter: Counts for each feature action.
+    """
+    kwargs.setdefault("dataset_where_sql")
+    kwargs.setdefault("use_projection_math", False)
+    kwargs.setdefault("use_edit_session", False)
+    log = leveled_logger(LOG, kwargs.setdefault("log_level", "info"))
+    log(
+        "Start: Update attributes in %s on %s by geometry properties.",
+        ", ".join(sorted(field_geometry_properties)),
+        dataset_path,
+    )
+    meta = {"dataset": dataset_metadata(dataset_path)}
+    keys = {"field": sorted(field_geometry_properties)}
+    # Group fields by spatial reference, so each is read once.
+    spatial_group = {}
+    for i, field_name in enumerate(keys["field"]):
+        properties, spatial_reference_item = field_geometry_properties[field_name]
+        if spatial_reference_item is None:
+            group_id = meta["dataset"]["spatial_reference_id"]
+            spatial_meta = None
+        else:
+            spatial_meta = spatial_reference_metadata(spatial_reference_item)
+            group_id = spatial_meta["spatial_reference_id"]
+        group = spatial_group.setdefault(
+            group_id, {"spatial": spatial_meta, "indexes": [], "getters": [], "axes": []}
+        )
+        if group["spatial"] is None:
+            group["spatial"] = spatial_meta
+        group["indexes"].append(i)
+        group["getters"].append(_geometry_property_getter(properties))
+        group["axes"].append(_geometry_property_axis(properties))
+    if kwargs["use_projection_math"] and meta["dataset"]["geometry_type"] == "Point":
+        # Update cursor reads native geometry, even if only projected coordinates
+        # are requested.
+        spatial_group.setdefault(
+            meta["dataset"]["spatial_reference_id"],
+            {"spatial": None, "indexes": [], "getters": [], "axes": []},
+        )
+    # Update cursor derives the native (or first) group; others read beforehand.
+    update_group_id = (
+        meta["dataset"]["spatial_reference_id"]
+        if meta["dataset"]["spatial_reference_id"] in spatial_group
+        else sorted(spatial_group, key=str)[0]
+    )
+    oid_values = {}
+    # Point coordinates projected in bulk, from one read of the native coordinates.
+    math_group_ids = [
+        group_id
+        for group_id, group in spatial_group.items()
+        if kwargs["use_projection_math"]
+        and group_id != update_group_id
+        and meta["dataset"]["geometry_type"] == "Point"
+        and projection.is_supported(meta["dataset"]["spatial_reference_id"], group_id)
+        and all(group["axes"])
+    ]
+    if math_group_ids:
+        cursor = arcpy.da.SearchCursor(
+            in_table=dataset_path,
+            field_names=["oid@", "shape@xy"],
+            where_clause=kwargs["dataset_where_sql"],
+        )
+        with cursor:
+            oids, coordinates = [], []
+            for oid, xy in cursor:
+                oids.append(oid)
+                coordinates.append(xy)
+        for group_id in math_group_ids:
+            group = spatial_group[group_id]
+            coordinates_axes = projection.transform(
+                [x for x, _ in coordinates],
+                [y for _, y in coordinates],
+                meta["dataset"]["spatial_reference_id"],
+                group_id,
+            )
+            axis_values = dict(zip(["x", "y"], coordinates_axes))
+            for j, oid in enumerate(oids):
+                feature_values = oid_values.setdefault(oid, [None] * len(keys["field"]))
+                for i, axis in zip(group["indexes"], group["axes"]):
+                    feature_values[i] = axis_values[axis][j]
+    for group_id, group in spatial_group.items():
+        if group_id == update_group_id or group_id in math_group_ids:
+            continue
+
+        cursor = arcpy.da.SearchCursor(
+            in_table=dataset_path,
+            field_names=["oid@", "shape@"],
+            where_clause=kwargs["dataset_where_sql"],
+            spatial_reference=group["spatial"]["object"],
+        )
+        with cursor:
+            for oid, values in _geometry_property_values(cursor, group["getters"]):
+                feature_values = oid_values.setdefault(oid, [None] * len(keys["field"]))
+                for i, value in zip(group["indexes"], values):
+                    feature_values[i] = value
+    group = spatial_group[update_group_id]
+    session = Editor(meta["dataset"]["workspace_path"], kwargs["use_edit_session"])
+    cursor = arcpy.da.UpdateCursor(
+        in_table=dataset_path,
+        field_names=["oid@", "shape@"] + keys["field"],
+        where_clause=kwargs["dataset_where_sql"],
+        spatial_reference=(
+            group["spatial"]["object"] if group["spatial"] is not None else None
+        ),
+    )
+    update_action_count = Counter()
+    with session, cursor:
+        for feature in cursor:
+            value = {
+                "old": feature[2:],
+                "new": oid_values.pop(feature[0], None) or [None] * len(keys["field"]),
+            }
+            for i, getter in zip(group["indexes"], group["getters"]):
+                value["new"][i] = getter(feature[1])
+            if all(same_value(old, new) for old, new in zip(value["old"], value["new"])):
+                update_action_count["unchanged"] += 1
+            else:
+                try:
+                    cursor.updateRow(feature[:2] + value["new"])
+                    update_action_count["altered"] += 1
+                except RuntimeError:
+                    LOG.error("Offending values are %s", value["new"])
+                    raise
+
+    for action, count in sorted(update_action_count.items()):
+        log("%s attributes %s.", count, action)
+    log("End: Update.")
+    return update_action_count
+
+
 def update_by_joined_value(
     dataset_path,
     field_name,
@@ -804,6 +1063,10 @@ def update_by_joined_value(
         dataset_where_sql (str): SQL where-clause for dataset subselection.
         use_edit_session (bool): Updates are done in an edit session if True. Default is
             False.
+        sql_connection: DB-API connection to the SQL database holding the dataset &
+            join-dataset. If given, the update runs as one SQL statement where
+            supported (see arcetl.pushdown). Default is None.
+        sql_dialect (str): SQL dialect of the database. Default is "mssql".
         log_level (str): Level to log the function at. Default is "info".
 
     Returns:
@@ -820,6 +1083,25 @@ def update_by_joined_value(
         join_dataset_path,
     )
     meta = {"dataset": dataset_metadata(dataset_path)}
+    if kwargs.get("sql_connection"):
+        meta["join_dataset"] = dataset_metadata(join_dataset_path)
+        update_action_count = _pushdown_update(
+            meta["dataset"],
+            field_name,
+            spec={
+                "join_table": meta["join_dataset"]["name"],
+                "join_field_name": join_field_name,
+                "on_field_pairs": on_field_pairs,
+            },
+            join_dataset_meta=meta["join_dataset"],
+            **kwargs
+        )
+        if update_action_count is not None:
+            for action, count in sorted(update_action_count.items()):
+                log("%s attributes %s.", count, action)
+            log("End: Update.")
+            return update_action_count
+
     keys = {
         "dataset_id": list(pair[0] for pair in on_field_pairs),
         "join_id": list(pair[1] for pair in on_field_pairs),
@@ -1200,6 +1482,10 @@ def update_by_value(dataset_path, field_name, value, **kwargs):
         dataset_where_sql (str): SQL where-clause for dataset subselection.
         use_edit_session (bool): Updates are done in an edit session if True. Default is
             False.
+        sql_connection: DB-API connection to the SQL database holding the dataset. If
+            given, the update runs as one SQL statement where supported (see
+            arcetl.pushdown). Default is None.
+        sql_dialect (str): SQL dialect of the database. Default is "mssql".
         log_level (str): Level to log the function at. Default is "info".
 
     Returns:
@@ -1212,6 +1498,15 @@ def update_by_value(dataset_path, field_name, value, **kwargs):
         "Start: Update attributes in %s on %s by given value.", field_name, dataset_path
     )
     meta = {"dataset": dataset_metadata(dataset_path)}
+    update_action_count = _pushdown_update(
+        meta["dataset"], field_name, spec={"value": value}, **kwargs
+    )
+    if update_action_count is not None:
+        for action, count in sorted(update_action_count.items()):
+            log("%s attributes %s.", count, action)
+        log("End: Update.")
+        return update_action_count
+
     session = Editor(meta["dataset"]["workspace_path"], kwargs["use_edit_session"])
     cursor = arcpy.da.UpdateCursor(
         in_table=dataset_path,
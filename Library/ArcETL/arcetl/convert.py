@@ -1,20 +1,168 @@
 """Conversion operations."""
-from collections import Sequence
+try:
+    from collections.abc import Sequence
+except ImportError:
+    from collections import Sequence
+import binascii
+from contextlib import contextmanager
 import csv
+import gzip
+import io
+import itertools
 import logging
+import os
+import sys
+import tempfile
 
 import arcpy
 
+try:
+    import zstandard
+except ImportError:
+    zstandard = None  # pylint: disable=invalid-name
+
 from arcetl.arcobj import DatasetView, dataset_metadata, spatial_reference_metadata
 from arcetl import attributes
 from arcetl import dataset
 from arcetl import features
-from arcetl.helpers import contain, leveled_logger, unique_name
+from arcetl.helpers import contain, leveled_logger, replace_file, unique_name
 
 
 LOG = logging.getLogger(__name__)
 """logging.Logger: Module-level logger."""
 
+CSV_COMPRESSION_EXTENSION = {"gzip": ".gz", "zstd": ".zst"}
+"""dict: Mapping of CSV-file compression type to its file extension."""
+CSV_VALUE_FORMATTER = {
+    "isoformat": lambda value: value.isoformat(),
+    "wkb_hex": lambda geometry: binascii.hexlify(bytes(geometry.WKB)).decode("ascii"),
+    "wkt": lambda geometry: geometry.WKT,
+}
+"""dict: Mapping of named CSV value formatter to its function."""
+
+
+@contextmanager
+def _csvfile(file_path, file_mode, compression=None, buffer_size=2 ** 20):
+    """Open file for CSV writing, with optional compression.
+
+    Yields:
+        file: Text stream (byte stream in Python 2) for a CSV writer.
+    """
+    streams = [io.open(file_path, mode=file_mode + "b", buffering=buffer_size)]
+    if compression == "gzip":
+        # Blank name & zero mtime keep the output the same for the same rows.
+        streams.append(
+            gzip.GzipFile(
+                filename="",
+                mode=file_mode + "b",
+                compresslevel=6,
+                fileobj=streams[0],
+                mtime=0,
+            )
+        )
+    elif compression == "zstd":
+        if zstandard is None:
+            raise ImportError("zstd compression requires the zstandard package.")
+
+        streams.append(zstandard.ZstdCompressor().stream_writer(streams[0]))
+    elif compression:
+        raise ValueError("Compression {!r} not supported.".format(compression))
+
+    if sys.version_info.major >= 3:
+        streams.append(io.TextIOWrapper(streams[-1], encoding="utf-8", newline=""))
+    try:
+        yield streams[-1]
+
+    finally:
+        for stream in reversed(streams):
+            stream.close()
+
+
+def _formatted_rows(rows, field_names, formatters=None):
+    """Generate rows as sequences of values, formatted for CSV output.
+
+    Args:
+        rows (iter): Collection of dictionaries or sequences representing rows.
+        field_names (list): Names of fields, in output order.
+        formatters (dict): Mapping of field name to formatter (function, name in
+            CSV_VALUE_FORMATTER, or format specification string).
+
+    Yields:
+        list or tuple: Values for a row.
+    """
+    rows = iter(rows)
+    try:
+        first_row = next(rows)
+    except StopIteration:
+        return
+
+    rows = itertools.chain([first_row], rows)
+    if isinstance(first_row, dict):
+        rows = ([row.get(name) for name in field_names] for row in rows)
+    elif not isinstance(first_row, Sequence):
+        raise TypeError("Rows must be dictionaries or sequences.")
+
+    if not formatters:
+        for row in rows:
+            yield row
+
+        return
+
+    index_function = []
+    for field_name, formatter in formatters.items():
+        if formatter in CSV_VALUE_FORMATTER:
+            function = CSV_VALUE_FORMATTER[formatter]
+        elif callable(formatter):
+            function = formatter
+        else:
+            function = lambda value, spec=formatter: format(value, spec)
+        index_function.append((field_names.index(field_name), function))
+    for row in rows:
+        row = list(row)
+        for index, function in index_function:
+            if row[index] is not None:
+                row[index] = function(row[index])
+        yield row
+
+
+def dataset_to_csvfile(dataset_path, output_path, field_names, **kwargs):
+    """Write dataset features to a CSV-file, straight from a cursor.
+
+    Args:
+        dataset_path (str): Path of the dataset.
+        output_path (str): Path of the output CSV-file.
+        field_names (iter): Collection of the field names, in the desired order of
+            output.
+        **kwargs: Arbitrary keyword arguments. See below.
+
+    Keyword Args:
+        dataset_where_sql (str): SQL where-clause for dataset subselection.
+        spatial_reference_item: Item from which the spatial reference of the output
+            geometry will be derived.
+        header (bool): Write a header in the CSV output if True. Default is True.
+        log_level (str): Level to log the function at. Default is "info".
+        Also accepts the keyword arguments of `rows_to_csvfile`.
+
+    Returns:
+        str: Path of the CSV-file.
+    """
+    kwargs.setdefault("dataset_where_sql")
+    kwargs.setdefault("spatial_reference_item")
+    kwargs.setdefault("header", True)
+    log = leveled_logger(LOG, kwargs.setdefault("log_level", "info"))
+    log("Start: Convert %s to CSVfile %s.", dataset_path, output_path)
+    field_names = list(contain(field_names))
+    rows = attributes.as_iters(
+        dataset_path,
+        field_names,
+        dataset_where_sql=kwargs.pop("dataset_where_sql"),
+        spatial_reference_item=kwargs.pop("spatial_reference_item"),
+    )
+    kwargs["log_level"] = None
+    rows_to_csvfile(rows, output_path, field_names, **kwargs)
+    log("End: Convert.")
+    return output_path
+
 
 def planarize(dataset_path, output_path, **kwargs):
     """Planarize feature geometry into lines.
@@ -195,6 +343,10 @@ def rows_to_csvfile(rows, output_path, field_names, header=False, **kwargs):
 
     Note: Rows can be represented by either dictionaries or sequences.
 
+    Rows are written in batches through a large write buffer. A new file is written
+    under a temporary name & moved into place once complete, so readers never see a
+    partial file.
+
     Args:
         rows (iter): Collection of dictionaries or sequences representing rows.
         output_path (str): Path of the output dataset.
@@ -204,31 +356,78 @@ def rows_to_csvfile(rows, output_path, field_names, header=False, **kwargs):
         **kwargs: Arbitrary keyword arguments. See below.
 
     Keyword Args:
-        file_mode (str): Code indicating the file mode for writing. Default is "wb".
+        file_mode (str): Code indicating the file mode for writing: "w" (write) or
+            "a" (append). Any binary/text code is ignored. Default is "w".
+        compression (str): Compression type: "gzip" or "zstd" (requires the
+            zstandard package). Default is inferred from the output path extension
+            (".gz" or ".zst"), else no compression.
+        dialect (str, csv.Dialect): CSV dialect to write. Default is "excel".
+        formatters (dict): Mapping of field name to value formatter: a function, a
+            name from CSV_VALUE_FORMATTER ("isoformat", "wkb_hex", "wkt"), or a
+            format specification (e.g. ".2f" for fixed-precision floats, "%Y-%m-%d"
+            for dates). None-values are not formatted. Default is no formatters.
+        batch_size (int): Number of rows to write at a time. Default is 10000.
+        buffer_size (int): Size of the file write buffer, in bytes. Default is
+            1048576.
         log_level (str): Level to log the function at. Default is "info".
 
     Returns:
         str: Path of the CSV-file.
     """
-    kwargs.setdefault("file_mode", "wb")
+    kwargs.setdefault("file_mode", "w")
+    kwargs.setdefault("dialect", "excel")
+    kwargs.setdefault("formatters", {})
+    kwargs.setdefault("batch_size", 10000)
+    kwargs.setdefault("buffer_size", 2 ** 20)
+    if "compression" not in kwargs:
+        kwargs["compression"] = next(
+            (
+                compression
+                for compression, extension in CSV_COMPRESSION_EXTENSION.items()
+                if output_path.lower().endswith(extension)
+            ),
+            None,
+        )
     log = leveled_logger(LOG, kwargs.setdefault("log_level", "info"))
     log("Start: Convert rows to CSVfile %s.", output_path)
     field_names = list(contain(field_names))
-    with open(output_path, kwargs["file_mode"]) as csvfile:
-        for index, row in enumerate(rows):
-            if index == 0:
-                if isinstance(row, dict):
-                    writer = csv.DictWriter(csvfile, field_names)
-                    if header:
-                        writer.writeheader()
-                elif isinstance(row, Sequence):
-                    writer = csv.writer(csvfile)
-                    if header:
-                        writer.writerow(field_names)
-                else:
-                    raise TypeError("Rows must be dictionaries or sequences.")
-
-            writer.writerow(row)
+    rows = _formatted_rows(rows, field_names, kwargs["formatters"])
+    append = "a" in kwargs["file_mode"]
+    if append:
+        write_path = output_path
+    else:
+        file_descriptor, write_path = tempfile.mkstemp(
+            suffix=".tmp",
+            prefix="." + os.path.basename(output_path) + ".",
+            dir=os.path.dirname(os.path.abspath(output_path)),
+        )
+        os.close(file_descriptor)
+    row_count = 0
+    try:
+        with _csvfile(
+            write_path,
+            file_mode="a" if append else "w",
+            compression=kwargs["compression"],
+            buffer_size=kwargs["buffer_size"],
+        ) as csvfile:
+            writer = csv.writer(csvfile, kwargs["dialect"])
+            if header:
+                writer.writerow(field_names)
+            while True:
+                batch = list(itertools.islice(rows, kwargs["batch_size"]))
+                if not batch:
+                    break
+
+                writer.writerows(batch)
+                row_count += len(batch)
+    except Exception:
+        if not append:
+            os.remove(write_path)
+        raise
+
+    if not append:
+        replace_file(write_path, output_path)
+    log("%s rows written.", row_count)
     log("End: Write.")
     return output_path
 
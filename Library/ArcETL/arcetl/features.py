@@ -1,14 +1,22 @@
 """Feature operations."""
-from collections import Counter
+from collections import Counter, defaultdict
+import datetime
+import hashlib
 import inspect
+import io
 from itertools import chain
 import logging
+import os
+import pickle
+import shutil
+import tempfile
 
 import arcpy
 
 from arcetl import arcobj
 from arcetl import attributes
 from arcetl import dataset
+from arcetl import geometry
 from arcetl.helpers import (
     contain, freeze_values, leveled_logger, unique_name, unique_path
 )
@@ -19,6 +27,259 @@ LOG = logging.getLogger(__name__)
 
 UPDATE_TYPES = ['deleted', 'inserted', 'altered', 'unchanged']
 """list of str: Types of feature updates commonly associated wtth update counters."""
+VERSION_UPDATE_TYPES = ['retired', 'altered', 'inserted', 'unchanged']
+"""list of str: Types of feature updates for versioned (type 2) updates."""
+
+
+def _dissolve_in_process(dataset_path, dissolve_field_names, multipart, **kwargs):
+    """Dissolve polygon features in-process, replacing them through one cursor pass.
+
+    Features are grouped by dissolve key (see `_grouped_values`), & each group's
+    geometry unioned by a polygon kernel. Each group's result overwrites one of its
+    features, the group's other features are deleted, & extra single parts (if not
+    multipart) are inserted. As with ArcPy's Dissolve, fields not dissolved on are
+    cleared.
+
+    Args:
+        dataset_path (str): Path of the dataset.
+        dissolve_field_names (list): Names of the fields to dissolve on.
+        multipart (bool): Flag to allow multipart features in output.
+        **kwargs: Arbitrary keyword arguments. See below.
+
+    Keyword Args:
+        dataset_where_sql (str): SQL where-clause for dataset subselection.
+        memory_limit (int): Approximate bytes of geometry to group in memory before
+            spilling groups to temporary files.
+        tolerance (float): Coordinate resolution for pure-Python geometry operations,
+            in dataset's units.
+        use_edit_session (bool): Flag to perform updates in an edit session.
+        use_shapely (bool): Flag to use shapely for geometry operations, if installed.
+
+    Returns:
+        collections.Counter: Counts for each feature action.
+
+    Raises:
+        ValueError: If dataset is not a polygon dataset.
+
+    """
+    meta = {'dataset': arcobj.dataset_metadata(dataset_path)}
+    if (meta['dataset']['geometry_type'] or '').lower() != 'polygon':
+        raise ValueError("In-process dissolve only supports polygon datasets.")
+
+    keys = {'dissolve': list(dissolve_field_names)}
+    dissolve_names = set(name.lower() for name in keys['dissolve'])
+    keys['other'] = [
+        field['name']
+        for field in meta['dataset']['user_fields']
+        if field['object'].editable
+        and field['type'] != 'geometry'
+        and field['name'].lower() not in dissolve_names
+    ]
+    kernel = geometry.polygon_kernel(
+        kwargs['tolerance'] or geometry.POLYGON_RESOLUTION, kwargs['use_shapely']
+    )
+    LOG.debug("Using %s polygon kernel.", kernel.name)
+    key_wkbs = {}
+    cursor = arcpy.da.SearchCursor(
+        in_table=dataset_path,
+        field_names=keys['dissolve'] + ['shape@wkb'],
+        where_clause=kwargs['dataset_where_sql'],
+    )
+    with cursor:
+        groups = _grouped_values(
+            ((tuple(row[:-1]), row[-1]) for row in cursor if row[-1]),
+            kwargs['memory_limit'],
+        )
+        for key, wkbs in groups:
+            # Kernel union is cascaded: pairs, then pairs of results, & so on.
+            union = kernel.union(kernel.from_wkb(wkb) for wkb in wkbs)
+            if kernel.is_empty(union):
+                continue
+
+            key_wkbs[key] = [
+                kernel.to_wkb(part)
+                for part in ([union] if multipart else kernel.parts(union))
+            ]
+    feature_count = Counter()
+    session = arcobj.Editor(
+        meta['dataset']['workspace_path'], kwargs['use_edit_session']
+    )
+    with session:
+        cursor = arcpy.da.UpdateCursor(
+            in_table=dataset_path,
+            field_names=keys['dissolve'] + keys['other'] + ['shape@wkb'],
+            where_clause=kwargs['dataset_where_sql'],
+        )
+        with cursor:
+            for row in cursor:
+                key = tuple(row[:len(keys['dissolve'])])
+                if key_wkbs.get(key):
+                    cursor.updateRow(
+                        list(key) + [None] * len(keys['other']) + [key_wkbs[key].pop()]
+                    )
+                    feature_count['altered'] += 1
+                else:
+                    cursor.deleteRow()
+                    feature_count['deleted'] += 1
+        cursor = arcpy.da.InsertCursor(
+            dataset_path, field_names=keys['dissolve'] + ['shape@wkb']
+        )
+        with cursor:
+            for key, wkbs in key_wkbs.items():
+                for wkb in wkbs:
+                    cursor.insertRow(list(key) + [wkb])
+                    feature_count['inserted'] += 1
+    return feature_count
+
+
+def _feature_digest(feature):
+    """Return digest of feature values, with geometries represented as WKB.
+
+    Args:
+        feature (iter): Feature values.
+
+    Returns:
+        str: Hex digest.
+    """
+    digest = hashlib.md5()
+    for value in freeze_values(*feature):
+        if hasattr(value, 'WKB'):
+            value = bytes(value.WKB)
+        digest.update(repr(value).encode('utf-8'))
+        digest.update(b'\x1f')
+    return digest.hexdigest()
+
+
+def _grouped_values(pairs, memory_limit=None, partition_count=16):
+    """Generate groups of values by key, from (key, value) pairs.
+
+    A streaming hash aggregation: values are collected by key in memory until their
+    total size passes the memory limit, then spilled to temporary partition files
+    (by key hash). Once all pairs are read, each partition is grouped in turn, so
+    only about one partition's values are in memory at a time.
+
+    Args:
+        pairs (iter): Collection of (key, value) pairs. Keys must be hashable, &
+            both must be picklable.
+        memory_limit (int): Approximate total size (as `len` of the values) to
+            hold in memory before spilling. Default is None (never spill).
+        partition_count (int): Number of partition files to spill to. Default is 16.
+
+    Yields:
+        tuple: Key & list of its values. Groups are in no particular order.
+
+    """
+    groups = defaultdict(list)
+    size = 0
+    spill_path = None
+    try:
+        for key, value in pairs:
+            groups[key].append(value)
+            size += len(value) if value else 0
+            if memory_limit is not None and size > memory_limit:
+                if spill_path is None:
+                    spill_path = tempfile.mkdtemp(prefix='arcetl_spill_')
+                    LOG.debug("Spilling groups to %s.", spill_path)
+                _spill_groups(groups, spill_path, partition_count)
+                groups.clear()
+                size = 0
+        if spill_path is None:
+            for key, values in groups.items():
+                yield key, values
+
+            return
+
+        _spill_groups(groups, spill_path, partition_count)
+        groups.clear()
+        for i in range(partition_count):
+            partition_path = os.path.join(spill_path, '{}.pickle'.format(i))
+            if not os.path.exists(partition_path):
+                continue
+
+            with io.open(partition_path, mode='rb') as partition_file:
+                while True:
+                    try:
+                        key, values = pickle.load(partition_file)
+                    except EOFError:
+                        break
+
+                    groups[key].extend(values)
+            for key, values in groups.items():
+                yield key, values
+
+            groups.clear()
+    finally:
+        if spill_path is not None:
+            shutil.rmtree(spill_path, ignore_errors=True)
+
+
+def _spill_groups(groups, spill_path, partition_count):
+    """Append groups of values to partition files by key hash."""
+    partition_files = {}
+    try:
+        for key, values in groups.items():
+            i = hash(key) % partition_count
+            if i not in partition_files:
+                partition_files[i] = io.open(
+                    os.path.join(spill_path, '{}.pickle'.format(i)), mode='ab'
+                )
+            pickle.dump((key, values), partition_files[i], protocol=2)
+    finally:
+        for partition_file in partition_files.values():
+            partition_file.close()
+
+
+def _version_actions(dataset_features, update_id_features, id_count, **kwargs):
+    """Generate actions merging update features into unexpired dataset features.
+
+    Each dataset feature's action is yielded before the next feature is read, so a
+    cursor can be both the source of dataset features & the target of the actions.
+    Inserts for update features not in the dataset are yielded last.
+
+    Args:
+        dataset_features (iter of iter): Collection of unexpired dataset features.
+            ID values come first, followed by the rest of the update field values;
+            any values after those (e.g. expiration) are ignored.
+        update_id_features (dict): Mapping of ID tuple to update feature tuple.
+        id_count (int): Number of ID values leading each feature.
+        **kwargs: Arbitrary keyword arguments. See below.
+
+    Keyword Args:
+        version_changes (bool): True if changed features should be retired & the
+            update inserted as a new version, False to alter them in place. Default
+            is False.
+
+    Yields:
+        tuple: Action ('retire', 'alter', 'unchanged', or 'insert'), the dataset
+            feature (None for inserts), & the update feature (None if retired or
+            unchanged). Changed features are a 'retire' with the update feature if
+            versioning changes.
+    """
+    id_digests = {}
+    seen_ids = set()
+    for feature in dataset_features:
+        _id = tuple(freeze_values(*feature[:id_count]))
+        seen_ids.add(_id)
+        if _id not in update_id_features:
+            yield 'retire', feature, None
+
+            continue
+
+        update_feature = update_id_features[_id]
+        if _id not in id_digests:
+            id_digests[_id] = _feature_digest(update_feature)
+        if _feature_digest(feature[:len(update_feature)]) == id_digests[_id]:
+            yield 'unchanged', feature, None
+
+        elif kwargs.get('version_changes', False):
+            yield 'retire', feature, update_feature
+
+        else:
+            yield 'alter', feature, update_feature
+
+    for _id, update_feature in update_id_features.items():
+        if _id not in seen_ids:
+            yield 'insert', None, update_feature
 
 
 def clip(dataset_path, clip_dataset_path, **kwargs):
@@ -207,6 +468,14 @@ def delete_by_id(dataset_path, delete_ids, id_field_names, **kwargs):
 def dissolve(dataset_path, dissolve_field_names=None, multipart=True, **kwargs):
     """Dissolve geometry of features that share values in given fields.
 
+    Note:
+        With in_process, polygon features are dissolved without ArcPy's Dissolve
+        tool: features are grouped by key in a streaming hash aggregation (spilling
+        to temporary files past the memory limit), each group's geometry unioned
+        (with shapely if installed & use_shapely is True, else the pure-Python
+        kernel in `arcetl.geometry`), & the results written back through one
+        update cursor pass, rather than through a temporary output dataset.
+
     Args:
         dataset_path (str): Path of the dataset.
         dissolve_field_names (iter): Iterable of field names to dissolve on.
@@ -217,7 +486,16 @@ def dissolve(dataset_path, dissolve_field_names=None, multipart=True, **kwargs):
         unsplit_lines (bool): Flag to merge line features when endpoints meet without
             crossing features. Default is False.
         dataset_where_sql (str): SQL where-clause for dataset subselection.
-        tolerance (float): Tolerance for coincidence, in dataset's units.
+        tolerance (float): Tolerance for coincidence, in dataset's units. In-process,
+            only the coordinate resolution for pure-Python geometry operations
+            (default is 0.0001; ignored with shapely): not a cluster tolerance, so
+            slivers & gaps are not closed. Use ArcPy's Dissolve where they must be.
+        in_process (bool): Flag to dissolve in-process (polygon datasets only).
+            Default is False.
+        memory_limit (int): Approximate bytes of geometry to group in memory before
+            spilling, in-process. Default is 268435456 (256 MiB).
+        use_shapely (bool): Flag to use shapely for in-process geometry operations, if
+            installed. Default is True.
         use_edit_session (bool): Flag to perform updates in an edit session. Default is
             False.
         log_level (str): Level to log the function at. Default is 'info'.
@@ -228,6 +506,9 @@ def dissolve(dataset_path, dissolve_field_names=None, multipart=True, **kwargs):
     """
     kwargs.setdefault('unsplit_lines', False)
     kwargs.setdefault('dataset_where_sql')
+    kwargs.setdefault('in_process', False)
+    kwargs.setdefault('memory_limit', 2 ** 28)
+    kwargs.setdefault('use_shapely', True)
     kwargs.setdefault('use_edit_session', False)
     log = leveled_logger(LOG, kwargs.setdefault('log_level', 'info'))
     log(
@@ -235,6 +516,22 @@ def dissolve(dataset_path, dissolve_field_names=None, multipart=True, **kwargs):
         dataset_path,
         dissolve_field_names,
     )
+    if kwargs['in_process']:
+        feature_count = _dissolve_in_process(
+            dataset_path,
+            list(contain(dissolve_field_names)),
+            multipart,
+            dataset_where_sql=kwargs['dataset_where_sql'],
+            memory_limit=kwargs['memory_limit'],
+            tolerance=kwargs.get('tolerance'),
+            use_edit_session=kwargs['use_edit_session'],
+            use_shapely=kwargs['use_shapely'],
+        )
+        for key in ['altered', 'deleted', 'inserted']:
+            log("%s features %s.", feature_count[key], key)
+        log("End: Dissolve.")
+        return dataset_path
+
     meta = {
         'dataset': arcobj.dataset_metadata(dataset_path),
         'orig_tolerance': arcpy.env.XYTolerance,
@@ -850,3 +1147,154 @@ def update_from_path(
         log("%s features %s.", feature_count[key], key)
     log("End: Update.")
     return feature_count
+
+
+def update_versioned(
+    dataset_path, update_features, id_field_names, field_names, **kwargs
+):
+    """Update slowly-changing (type 2) versioned features in dataset from iterables.
+
+    Unexpired features (null expiration) missing from the update features are
+    retired by setting their expiration; changed features are altered in place or
+    retired & re-inserted as a new version; new features are inserted. Features are
+    compared by a digest of their values (geometry as WKB), & the dataset is read
+    in a single update cursor pass.
+
+    Note:
+        Use ArcPy cursor token names for object IDs and geometry objects/properties.
+
+    Args:
+        dataset_path (str): Path of the dataset.
+        update_features (iter of iter): Collection of iterables representing the
+            current features.
+        id_field_names (iter, str): Name(s) of the ID field/key(s). *All* ID fields
+            must also be in field_names.
+        field_names (iter): Collection of field names/keys to check & update.
+        **kwargs: Arbitrary keyword arguments. See below.
+
+    Keyword Args:
+        expiration_field_name (str): Name of the expiration field. Default is
+            'expiration_date'.
+        effective_field_name (str): Name of the effective field, in field_names.
+            Default is 'effective_date'.
+        expiration_value (object): Value to set for the expiration of features
+            missing from the update. Default is the latest effective value of the
+            update features. Versioned changes always expire at the new version's
+            effective value, if there is an effective field.
+        version_changes (bool): True if changed features should be retired & the
+            change inserted as a new version, False to alter them in place. Default
+            is False.
+        max_change_ratio (float): Maximum change in number of unexpired features, as a
+            ratio of the current number, before refusing to update. Default is None
+            (no maximum).
+        use_edit_session (bool): Flag to perform updates in an edit session. Default is
+            True.
+        log_level (str): Level to log the function at. Default is 'info'.
+
+    Returns:
+        collections.Counter: Counts for each feature action.
+
+    Raises:
+        ValueError: If the number of unexpired features would change by more than
+            max_change_ratio.
+
+    """
+    kwargs.setdefault('expiration_field_name', 'expiration_date')
+    kwargs.setdefault('effective_field_name', 'effective_date')
+    kwargs.setdefault('version_changes', False)
+    kwargs.setdefault('max_change_ratio')
+    kwargs.setdefault('use_edit_session', True)
+    log = leveled_logger(LOG, kwargs.setdefault('log_level', 'info'))
+    log("Start: Update versioned features in %s from iterables.", dataset_path)
+    meta = {'dataset': arcobj.dataset_metadata(dataset_path)}
+    keys = {'id': list(contain(id_field_names)), 'feat': list(contain(field_names))}
+    if not set(keys['id']).issubset(keys['feat']):
+        raise ValueError("id_field_names must be a subset of field_names.")
+
+    # Move ID fields to the front, as the version actions expect.
+    keys['update'] = keys['feat']
+    keys['feat'] = keys['id'] + [key for key in keys['feat'] if key not in keys['id']]
+    unexpired_where_sql = "{} is null".format(kwargs['expiration_field_name'])
+    if inspect.isgeneratorfunction(update_features):
+        update_features = update_features()
+    feats = {'id_update': {}}
+    for feat in update_features:
+        feat = dict(zip(keys['update'], freeze_values(*feat)))
+        feat = tuple(feat[key] for key in keys['feat'])
+        feats['id_update'][feat[:len(keys['id'])]] = feat
+    if kwargs['max_change_ratio'] is not None:
+        unexpired_count = dataset.feature_count(
+            dataset_path, dataset_where_sql=unexpired_where_sql
+        )
+        if (
+            abs(len(feats['id_update']) - unexpired_count)
+            > unexpired_count * kwargs['max_change_ratio']
+        ):
+            raise ValueError(
+                "Significant change in feature counts ({} unexpired, {} current).".format(
+                    unexpired_count, len(feats['id_update'])
+                )
+            )
+
+    if kwargs['effective_field_name'] in keys['feat']:
+        effective_index = keys['feat'].index(kwargs['effective_field_name'])
+    else:
+        effective_index = None
+    if 'expiration_value' in kwargs:
+        expiration_value = kwargs['expiration_value']
+    elif effective_index is not None and feats['id_update']:
+        expiration_value = max(
+            feat[effective_index] for feat in feats['id_update'].values()
+        )
+    else:
+        expiration_value = datetime.datetime.now()
+    feature_count = Counter()
+    feats['insert'] = []
+    session = arcobj.Editor(
+        meta['dataset']['workspace_path'], kwargs['use_edit_session']
+    )
+    cursor = arcpy.da.UpdateCursor(
+        dataset_path,
+        field_names=keys['feat'] + [kwargs['expiration_field_name']],
+        where_clause=unexpired_where_sql,
+    )
+    with session, cursor:
+        actions = _version_actions(
+            cursor,
+            feats['id_update'],
+            id_count=len(keys['id']),
+            version_changes=kwargs['version_changes'],
+        )
+        for action, feat, update_feat in actions:
+            if action == 'retire':
+                if update_feat is None:
+                    cursor.updateRow(tuple(feat[:-1]) + (expiration_value,))
+                    feature_count['retired'] += 1
+                else:
+                    cursor.updateRow(
+                        tuple(feat[:-1])
+                        + (
+                            update_feat[effective_index]
+                            if effective_index is not None
+                            else expiration_value,
+                        )
+                    )
+                    feats['insert'].append(update_feat)
+                    feature_count['altered'] += 1
+            elif action == 'alter':
+                cursor.updateRow(update_feat + (None,))
+                feature_count['altered'] += 1
+            elif action == 'insert':
+                feats['insert'].append(update_feat)
+                feature_count['inserted'] += 1
+            else:
+                feature_count['unchanged'] += 1
+    if feats['insert']:
+        cursor = arcpy.da.InsertCursor(dataset_path, field_names=keys['feat'])
+        with session, cursor:
+            for feat in feats['insert']:
+                cursor.insertRow(feat)
+    for key in VERSION_UPDATE_TYPES:
+        log("%s features %s.", feature_count[key], key)
+    log("End: Update.")
+    return feature_count
@@ -1,13 +1,33 @@
-"""Geometry-related objects."""
+"""Geometry-related objects.
+
+Polygon functions here work on plain coordinates, with no ArcPy dependency. A
+polygon is a sequence of rings, each a sequence of (x, y) coordinates (closing
+coordinate optional). Multipart polygons simply have more than one outer ring.
+Rings may have any orientation on input: nesting decides which are holes. Results
+have outer rings counter-clockwise, each followed by its holes (clockwise).
+Boolean operations snap coordinates to a grid of the given resolution & run in
+exact integer arithmetic.
+"""
+from collections import defaultdict, namedtuple
 import logging
-from math import pi, sqrt
+from math import atan2, ceil, pi, sqrt
+import struct
 
 from more_itertools import pairwise
 
+try:
+    import shapely.ops
+    import shapely.wkb
+except ImportError:
+    shapely = None  # pylint: disable=invalid-name
+
 
 LOG = logging.getLogger(__name__)
 """logging.Logger: Module-level logger."""
 
+POLYGON_RESOLUTION = 0.0001
+"""float: Default coordinate resolution for polygon operations."""
+
 RATIO = {
     "meter": {
         "foot": 0.3048,
@@ -33,6 +53,1059 @@ Usage: `RATIO[to_measure][from_measure]`
 """
 
 
+GeometryFingerprint = namedtuple(
+    "GeometryFingerprint", ["vertex_count", "extent", "coordinate_hash"]
+)
+"""Cheap canonical fingerprint of a geometry.
+
+Attributes:
+    vertex_count (int): Number of vertices.
+    extent (tuple, None): (xmin, ymin, xmax, ymax) extent in resolution units; None
+        if geometry is empty.
+    coordinate_hash (int): Hash of the part structure & coordinates, quantized to
+        the resolution.
+"""
+
+
+class GeometryComparator(object):
+    """Two-stage geometry equality comparator.
+
+    A cheap fingerprint of each geometry settles most comparisons: geometries with
+    the same fingerprint (or simply the same WKB) are the same, & geometries with
+    extents further apart than the tolerance are different. Only the rest go to the
+    exact (& expensive) comparison: the geometry's own `equals` method.
+
+    Geometries need a `WKB` attribute & an `equals` method, so ArcPy geometries &
+    WKBGeometry adapters both work.
+
+    Attributes:
+        resolution (float, None): Coordinate resolution for fingerprints. If None,
+            the XY resolution of the geometries' spatial reference is used, else
+            POLYGON_RESOLUTION.
+        tolerance (float, None): Largest difference between extents of geometries
+            that may be the same. If None, the XY tolerance of the geometries'
+            spatial reference is used, else the resolution.
+        counts (dict): Mapping of comparison outcome ("matched", "rejected", "exact")
+            to number of geometry pairs settled by it.
+    """
+
+    def __init__(self, resolution=None, tolerance=None):
+        """Initialize instance.
+
+        Args:
+            resolution (float, None): Coordinate resolution for fingerprints.
+            tolerance (float, None): Largest difference between extents of
+                geometries that may be the same.
+        """
+        self.resolution = resolution
+        self.tolerance = tolerance
+        self.counts = {"matched": 0, "rejected": 0, "exact": 0}
+
+    def __repr__(self):
+        return "{}(resolution={!r}, tolerance={!r})".format(
+            self.__class__.__name__, self.resolution, self.tolerance
+        )
+
+    def _same_pair(self, geometry, other):
+        """Return True if the pair of geometries are the same."""
+        if geometry is None or other is None:
+            return geometry is None and other is None
+
+        resolution = self.resolution or _spatial_reference_value(
+            "XYResolution", geometry, other, default=POLYGON_RESOLUTION
+        )
+        try:
+            wkb, other_wkb = bytes(geometry.WKB), bytes(other.WKB)
+            if wkb == other_wkb:
+                self.counts["matched"] += 1
+                return True
+
+            fingerprint = _wkb_fingerprint(wkb, resolution)
+            other_fingerprint = _wkb_fingerprint(other_wkb, resolution)
+        except (TypeError, ValueError, struct.error):
+            # No readable WKB (e.g. empty ArcPy geometry): exact comparison only.
+            self.counts["exact"] += 1
+            return geometry.equals(other)
+
+        if fingerprint == other_fingerprint:
+            self.counts["matched"] += 1
+            return True
+
+        if fingerprint.extent and other_fingerprint.extent:
+            tolerance = self.tolerance or _spatial_reference_value(
+                "XYTolerance", geometry, other, default=resolution
+            )
+            # Extra unit allows for quantizing to either side of a value.
+            units = tolerance / resolution + 1
+            if any(
+                abs(value - other_value) > units
+                for value, other_value in zip(
+                    fingerprint.extent, other_fingerprint.extent
+                )
+            ):
+                self.counts["rejected"] += 1
+                return False
+
+        self.counts["exact"] += 1
+        return geometry.equals(other)
+
+    def fingerprint(self, geometry, resolution=None):
+        """Return fingerprint of geometry.
+
+        Args:
+            geometry: Geometry with a `WKB` attribute.
+            resolution (float): Coordinate resolution to quantize to. Default is the
+                instance resolution (or POLYGON_RESOLUTION if that is None).
+
+        Returns:
+            GeometryFingerprint.
+        """
+        return _wkb_fingerprint(
+            bytes(geometry.WKB), resolution or self.resolution or POLYGON_RESOLUTION
+        )
+
+    def same(self, *geometries):
+        """Return True if geometries are all the same.
+
+        Args:
+            *geometries: Collection of geometries to compare.
+
+        Returns:
+            bool.
+        """
+        return all(self._same_pair(*pair) for pair in pairwise(geometries))
+
+
+class PolygonKernel(object):
+    """Polygon operations on coordinate polygons, in pure Python.
+
+    Kernels give geometry-processing engines a common interface over polygon
+    representations; see ShapelyPolygonKernel for the accelerated one.
+
+    Attributes:
+        name (str): Name of the kernel.
+        resolution (float): Coordinate resolution for boolean operations.
+    """
+
+    name = "python"
+
+    def __init__(self, resolution=POLYGON_RESOLUTION):
+        """Initialize instance.
+
+        Args:
+            resolution (float): Coordinate resolution for boolean operations.
+        """
+        self.resolution = resolution
+
+    def __repr__(self):
+        return "{}(resolution={!r})".format(self.__class__.__name__, self.resolution)
+
+    def area(self, polygon):
+        """Return area of polygon."""
+        return polygon_area(polygon)
+
+    def bounds(self, polygon):
+        """Return (xmin, ymin, xmax, ymax) bounds of polygon."""
+        return polygon_bounds(polygon)
+
+    def difference(self, polygon, other):
+        """Return polygon with other polygon removed."""
+        return polygon_difference(polygon, other, self.resolution)
+
+    def from_wkb(self, wkb):
+        """Return polygon from well-known binary."""
+        return polygon_from_wkb(wkb)
+
+    def intersection(self, polygon, other):
+        """Return intersection of two polygons."""
+        return polygon_intersection(polygon, other, self.resolution)
+
+    def is_empty(self, polygon):
+        """Return True if polygon has no area."""
+        return not polygon
+
+    def parts(self, polygon):
+        """Return polygon split into single-part polygons."""
+        return polygon_parts(polygon)
+
+    def to_wkb(self, polygon):
+        """Return well-known binary for polygon."""
+        return polygon_to_wkb(polygon)
+
+    def union(self, polygons):
+        """Return union of polygons."""
+        return polygon_union(polygons, self.resolution)
+
+
+class ShapelyPolygonKernel(PolygonKernel):
+    """Polygon operations on shapely geometries (requires shapely)."""
+
+    name = "shapely"
+
+    def area(self, polygon):
+        return polygon.area
+
+    def bounds(self, polygon):
+        return polygon.bounds
+
+    def difference(self, polygon, other):
+        return _polygonal(polygon.difference(other))
+
+    def from_wkb(self, wkb):
+        return shapely.wkb.loads(bytes(wkb))
+
+    def intersection(self, polygon, other):
+        return _polygonal(polygon.intersection(other))
+
+    def is_empty(self, polygon):
+        return polygon.is_empty or not polygon.area
+
+    def parts(self, polygon):
+        return list(getattr(polygon, "geoms", [polygon]))
+
+    def to_wkb(self, polygon):
+        return polygon.wkb
+
+    def union(self, polygons):
+        return _polygonal(shapely.ops.unary_union(list(polygons)))
+
+
+class STRtree(object):
+    """Sort-tile-recursive (packed) R-tree of items by bounding box.
+
+    Attributes:
+        node_capacity (int): Maximum number of children per node.
+    """
+
+    def __init__(self, items, node_capacity=16):
+        """Initialize instance.
+
+        Args:
+            items (iter): Collection of (item, (xmin, ymin, xmax, ymax)) pairs.
+            node_capacity (int): Maximum number of children per node.
+        """
+        self.node_capacity = node_capacity
+        # Nodes are (bounds, children, is_leaf); leaf children are (bounds, item).
+        entries = [(tuple(bounds), item) for item, bounds in items]
+        self._count = len(entries)
+        level = [
+            (_bounds_union(child[0] for child in children), children, True)
+            for children in self._packed(entries)
+        ]
+        while len(level) > 1:
+            level = [
+                (_bounds_union(child[0] for child in children), children, False)
+                for children in self._packed(level)
+            ]
+        self._root = level[0] if level else None
+
+    def __len__(self):
+        return self._count
+
+    def _packed(self, entries):
+        """Return groups of entries, tiled by center-x slices then center-y."""
+        capacity = self.node_capacity
+        slice_count = int(ceil(sqrt(ceil(len(entries) / float(capacity)))))
+        slice_size = int(ceil(len(entries) / float(max(slice_count, 1)))) or 1
+        entries = sorted(entries, key=lambda entry: entry[0][0] + entry[0][2])
+        groups = []
+        for i in range(0, len(entries), slice_size):
+            vertical = sorted(
+                entries[i : i + slice_size], key=lambda entry: entry[0][1] + entry[0][3]
+            )
+            for j in range(0, len(vertical), capacity):
+                groups.append(vertical[j : j + capacity])
+        return groups
+
+    def query(self, bounds):
+        """Generate items with bounding boxes intersecting the bounds.
+
+        Args:
+            bounds (tuple): Query (xmin, ymin, xmax, ymax) bounds.
+
+        Yields:
+            Items, in no particular order.
+        """
+        if self._root is None:
+            return
+
+        xmin, ymin, xmax, ymax = bounds
+        stack = [self._root]
+        while stack:
+            _, children, is_leaf = stack.pop()
+            for child in children:
+                box = child[0]
+                if box[0] > xmax or box[2] < xmin or box[1] > ymax or box[3] < ymin:
+                    continue
+
+                if is_leaf:
+                    yield child[1]
+
+                else:
+                    stack.append(child)
+
+
+class WKBGeometry(object):
+    """Pure-Python geometry adapter over well-known binary.
+
+    Stands in for an ArcPy geometry in GeometryComparator (e.g. for geometries read
+    as WKB, or for testing without ArcPy), with the `WKB` attribute & `equals`
+    method the comparator uses.
+
+    Attributes:
+        WKB (bytes): Well-known binary of the geometry.
+        resolution (float): Coordinate resolution for equality.
+    """
+
+    def __init__(self, wkb, resolution=POLYGON_RESOLUTION):
+        """Initialize instance.
+
+        Args:
+            wkb (bytes, bytearray): Well-known binary (or extended WKB).
+            resolution (float): Coordinate resolution for equality.
+        """
+        self.WKB = bytes(wkb)  # pylint: disable=invalid-name
+        self.resolution = resolution
+
+    def __repr__(self):
+        return "{}(<{} bytes>)".format(self.__class__.__name__, len(self.WKB))
+
+    def equals(self, second_geometry):
+        """Return True if geometries are topologically equal (at the resolution).
+
+        Repeated & collinear vertices, line direction, ring start vertex &
+        orientation, & part order are not significant.
+
+        Args:
+            second_geometry: Geometry with a `WKB` attribute.
+
+        Returns:
+            bool.
+        """
+        shapes = []
+        for geometry in [self, second_geometry]:
+            parts = []
+            _read_wkb_parts(bytes(geometry.WKB), 0, parts)
+            shapes.append(parts)
+        dimensions = [{dimension for dimension, _ in parts} for parts in shapes]
+        if dimensions[0] != dimensions[1]:
+            return False
+
+        if dimensions[0] == {2}:
+            polygons = [
+                [list(zip(values[::2], values[1::2])) for _, values in parts]
+                for parts in shapes
+            ]
+            return not (
+                polygon_difference(polygons[0], polygons[1], self.resolution)
+                or polygon_difference(polygons[1], polygons[0], self.resolution)
+            )
+
+        return _canonical_paths(shapes[0], self.resolution) == _canonical_paths(
+            shapes[1], self.resolution
+        )
+
+
+def _add_intersections(p1, p2, q1, q2, p_splits, q_splits):
+    """Add intersection points of segments p1-p2 & q1-q2 to their split lists."""
+    rx, ry = p2[0] - p1[0], p2[1] - p1[1]
+    sx, sy = q2[0] - q1[0], q2[1] - q1[1]
+    qpx, qpy = q1[0] - p1[0], q1[1] - p1[1]
+    denom = rx * sy - ry * sx
+    if denom == 0:
+        if qpx * ry - qpy * rx != 0:
+            return
+
+        # Collinear: split each segment at the other's endpoints within it.
+        for origin, dx, dy, points, splits in [
+            (p1, rx, ry, (q1, q2), p_splits),
+            (q1, sx, sy, (p1, p2), q_splits),
+        ]:
+            length2 = dx * dx + dy * dy
+            for point in points:
+                along = (point[0] - origin[0]) * dx + (point[1] - origin[1]) * dy
+                if 0 < along < length2:
+                    splits.append(point)
+        return
+
+    t_num = qpx * sy - qpy * sx
+    u_num = qpx * ry - qpy * rx
+    if denom < 0:
+        denom, t_num, u_num = -denom, -t_num, -u_num
+    if not (0 <= t_num <= denom and 0 <= u_num <= denom):
+        return
+
+    if t_num == 0:
+        point = p1
+    elif t_num == denom:
+        point = p2
+    elif u_num == 0:
+        point = q1
+    elif u_num == denom:
+        point = q2
+    else:
+        point = (
+            p1[0] + _round_div(rx * t_num, denom),
+            p1[1] + _round_div(ry * t_num, denom),
+        )
+        # Snap to an endpoint within a grid unit, to avoid slivers & crossings.
+        for endpoint in (p1, p2, q1, q2):
+            if abs(point[0] - endpoint[0]) <= 1 and abs(point[1] - endpoint[1]) <= 1:
+                point = endpoint
+                break
+
+    p_splits.append(point)
+    q_splits.append(point)
+
+
+def _assembled_rings(edges):
+    """Return rings assembled from directed edges, turning left at junctions."""
+    outgoing = defaultdict(list)
+    for start, end in sorted(edges):
+        outgoing[start].append(end)
+    # Keep junction vertices, where rings touch, even if collinear.
+    junctions = set(point for point, ends in outgoing.items() if len(ends) > 1)
+    rings = []
+    for start in sorted(outgoing):
+        while outgoing[start]:
+            ring = [start]
+            previous, current = start, outgoing[start].pop()
+            while current != start:
+                ring.append(current)
+                candidates = outgoing.get(current)
+                if not candidates:
+                    ring = []
+                    break
+
+                if len(candidates) == 1:
+                    following = candidates.pop()
+                else:
+                    following = max(
+                        candidates, key=lambda end, p=previous, c=current: _turn(p, c, end)
+                    )
+                    candidates.remove(following)
+                previous, current = current, following
+            # Split rings touching themselves into simple rings.
+            path, path_index = [], {}
+            for point in ring + [start]:
+                if point in path_index:
+                    i = path_index[point]
+                    loop = _simplified_ring(path[i:], junctions)
+                    if loop:
+                        rings.append(loop)
+                    for loop_point in path[i + 1 :]:
+                        del path_index[loop_point]
+                    del path[i + 1 :]
+                else:
+                    path_index[point] = len(path)
+                    path.append(point)
+    return rings
+
+
+def _bounds_union(bounds_iter):
+    """Return (xmin, ymin, xmax, ymax) bounds covering all the bounds."""
+    xmins, ymins, xmaxs, ymaxs = zip(*bounds_iter)
+    return (min(xmins), min(ymins), max(xmaxs), max(ymaxs))
+
+
+def _canonical_paths(parts, resolution):
+    """Return canonical paths of point & line parts, snapped to resolution.
+
+    Paths drop repeated & collinear interior vertices, & run in their lesser
+    direction; duplicate paths are dropped & the rest sorted.
+    """
+    paths = set()
+    for _, values in parts:
+        path = []
+        for x, y in zip(values[::2], values[1::2]):
+            point = (int(round(x / resolution)), int(round(y / resolution)))
+            if path and point == path[-1]:
+                continue
+
+            if len(path) >= 2:
+                (x1, y1), (x2, y2) = path[-2:]
+                dx, dy, ex, ey = x2 - x1, y2 - y1, point[0] - x2, point[1] - y2
+                if dx * ey - dy * ex == 0 and dx * ex + dy * ey > 0:
+                    path.pop()
+            path.append(point)
+        path = tuple(path)
+        paths.add(min(path, path[::-1]))
+    return sorted(paths)
+
+
+def _clipped_rings(rings, bounds):
+    """Return rings clipped to the bounds box (Sutherland-Hodgman).
+
+    Clipped rings keep the same winding number for every point inside the box.
+    """
+    xmin, ymin, xmax, ymax = bounds
+    planes = [(0, xmin, True), (0, xmax, False), (1, ymin, True), (1, ymax, False)]
+    clipped_rings = []
+    for ring in rings:
+        ring_bounds = _ring_bounds(ring)
+        if (
+            ring_bounds[0] >= xmin
+            and ring_bounds[1] >= ymin
+            and ring_bounds[2] <= xmax
+            and ring_bounds[3] <= ymax
+        ):
+            clipped_rings.append(ring)
+            continue
+
+        if (
+            ring_bounds[0] > xmax
+            or ring_bounds[2] < xmin
+            or ring_bounds[1] > ymax
+            or ring_bounds[3] < ymin
+        ):
+            continue
+
+        points = ring
+        for axis, value, keep_greater in planes:
+            if not points:
+                break
+
+            other = 1 - axis
+            clipped = []
+            previous = points[-1]
+            previous_in = (previous[axis] >= value) == keep_greater or (
+                previous[axis] == value
+            )
+            for point in points:
+                point_in = (point[axis] >= value) == keep_greater or point[axis] == value
+                if point_in != previous_in:
+                    crossing = [0, 0]
+                    crossing[axis] = value
+                    crossing[other] = previous[other] + _round_div(
+                        (point[other] - previous[other]) * (value - previous[axis]),
+                        point[axis] - previous[axis],
+                    )
+                    clipped.append(tuple(crossing))
+                if point_in:
+                    clipped.append(point)
+                previous, previous_in = point, point_in
+            points = clipped
+        points = [point for point, _next in zip(points, points[1:] + points[:1])
+                  if point != _next]
+        if len(points) >= 3 and _ring_area2(points):
+            clipped_rings.append(points)
+    return clipped_rings
+
+
+def _grouped_parts(rings):
+    """Return oriented rings grouped into parts: [outer ring, hole rings...]."""
+    outers = [ring for ring in rings if _ring_area2(ring) > 0]
+    parts = [[ring] for ring in outers]
+    outer_meta = [(abs(_ring_area2(ring)), _ring_bounds(ring)) for ring in outers]
+    for hole in (ring for ring in rings if _ring_area2(ring) < 0):
+        hole_area, hole_bounds = abs(_ring_area2(hole)), _ring_bounds(hole)
+        container = None
+        for i, (area, bounds) in enumerate(outer_meta):
+            if (
+                area < hole_area
+                or bounds[0] > hole_bounds[0]
+                or bounds[1] > hole_bounds[1]
+                or bounds[2] < hole_bounds[2]
+                or bounds[3] < hole_bounds[3]
+            ):
+                continue
+
+            if _ring_contains_ring(outers[i], hole) and (
+                container is None or area < outer_meta[container][0]
+            ):
+                container = i
+        if container is None:
+            LOG.warning("Hole ring not within an outer ring: dropping hole.")
+        else:
+            parts[container].append(hole)
+    return parts
+
+
+def _overlay(polygon, other, operation, resolution):
+    """Return result of boolean operation on two polygons.
+
+    Edges of each polygon are split where they meet the other's, then kept or
+    dropped by whether they lie inside the other (coincident edges are kept once
+    or dropped by their relative direction), & reassembled into rings.
+
+    Args:
+        polygon (list): Polygon (sequence of rings).
+        other (list): Other polygon.
+        operation (str): Name of operation: "intersection", "union", or
+            "difference".
+        resolution (float): Coordinate resolution.
+
+    Returns:
+        list: Result polygon.
+    """
+    rings = {
+        "a": _oriented_rings(_snapped_rings(polygon, resolution)),
+        "b": _oriented_rings(_snapped_rings(other, resolution)),
+    }
+    if not rings["a"] or not rings["b"]:
+        if operation == "intersection":
+            return []
+
+        if operation == "difference" or not rings["b"]:
+            return _unsnapped(_grouped_parts(rings["a"]), resolution)
+
+        return _unsnapped(_grouped_parts(rings["b"]), resolution)
+
+    bounds = {key: _bounds_union(_ring_bounds(ring) for ring in rings[key])
+              for key in rings}
+    disjoint = (
+        bounds["a"][0] > bounds["b"][2]
+        or bounds["a"][2] < bounds["b"][0]
+        or bounds["a"][1] > bounds["b"][3]
+        or bounds["a"][3] < bounds["b"][1]
+    )
+    if disjoint:
+        if operation == "intersection":
+            return []
+
+        if operation == "difference":
+            return _unsnapped(_grouped_parts(rings["a"]), resolution)
+
+        return _unsnapped(_grouped_parts(rings["a"] + rings["b"]), resolution)
+
+    if operation != "union":
+        # Only the other's edges near the polygon matter: clip them to a box just
+        # outside the polygon's bounds.
+        rings["b"] = _clipped_rings(
+            rings["b"],
+            (bounds["a"][0] - 2, bounds["a"][1] - 2, bounds["a"][2] + 2,
+             bounds["a"][3] + 2),
+        )
+        if not rings["b"]:
+            if operation == "intersection":
+                return []
+
+            return _unsnapped(_grouped_parts(rings["a"]), resolution)
+
+    edges = {}
+    edges["a"], edges["b"] = _node_edges(
+        [edge for ring in rings["a"] for edge in zip(ring[-1:] + ring[:-1], ring)],
+        [edge for ring in rings["b"] for edge in zip(ring[-1:] + ring[:-1], ring)],
+    )
+    edge_sets = {key: set(edges[key]) for key in edges}
+    nodes = set(edge[0] for edge in edges["a"]) & set(edge[0] for edge in edges["b"])
+    keep = {
+        # (key, inside other): keep edge forward (1), reversed (-1), or drop (0).
+        "intersection": {("a", True): 1, ("b", True): 1},
+        "union": {("a", False): 1, ("b", False): 1},
+        "difference": {("a", False): 1, ("b", True): -1},
+    }[operation]
+    kept = set()
+    for key, other_key in [("a", "b"), ("b", "a")]:
+        inside = None
+        previous_end = None
+        for start, end in edges[key]:
+            if (end, start) in edge_sets[other_key]:
+                # Interiors on opposite sides: kept only for difference (once).
+                if operation == "difference" and key == "a":
+                    kept.add((start, end))
+                inside = None
+                continue
+
+            if (start, end) in edge_sets[other_key]:
+                # Interiors on same side: kept once for intersection & union.
+                if key == "a" and operation != "difference":
+                    kept.add((start, end))
+                inside = None
+                continue
+
+            # Containment can only change at nodes shared with the other polygon.
+            if inside is None or start != previous_end or start in nodes:
+                winding = _winding_number(
+                    start[0] + end[0], start[1] + end[1], rings[other_key]
+                )
+                inside = bool(winding)
+            previous_end = end
+            direction = keep.get((key, inside), 0)
+            if direction == 1:
+                kept.add((start, end))
+            elif direction == -1:
+                kept.add((end, start))
+    return _unsnapped(_grouped_parts(_assembled_rings(kept)), resolution)
+
+
+def _node_edges(edges, other_edges):
+    """Return edges & other edges, split wherever they meet.
+
+    Edges are also split where rings of the same polygon touch.
+    """
+    all_edges = [(start, end, 0) for start, end in edges] + [
+        (start, end, 1) for start, end in other_edges
+    ]
+    splits = [[] for _ in all_edges]
+    order = sorted(
+        range(len(all_edges)), key=lambda i: min(all_edges[i][0][0], all_edges[i][1][0])
+    )
+    active = []
+    for i in order:
+        p1, p2, _ = all_edges[i]
+        xmin = min(p1[0], p2[0])
+        ymin, ymax = min(p1[1], p2[1]), max(p1[1], p2[1])
+        still_active = []
+        for j in active:
+            q1, q2, _ = all_edges[j]
+            if max(q1[0], q2[0]) < xmin:
+                continue
+
+            still_active.append(j)
+            if max(q1[1], q2[1]) < ymin or min(q1[1], q2[1]) > ymax:
+                continue
+
+            _add_intersections(p1, p2, q1, q2, splits[i], splits[j])
+        still_active.append(i)
+        active = still_active
+    results = ([], [])
+    for (start, end, index), points in zip(all_edges, splits):
+        if points:
+            dx, dy = end[0] - start[0], end[1] - start[1]
+            points = sorted(
+                set(points),
+                key=lambda point: (point[0] - start[0]) * dx + (point[1] - start[1]) * dy,
+            )
+            chain = [start] + [pt for pt in points if pt not in (start, end)] + [end]
+        else:
+            chain = [start, end]
+        results[index].extend(
+            (point, _next) for point, _next in pairwise(chain) if point != _next
+        )
+    return results
+
+
+def _oriented_rings(rings):
+    """Return rings oriented by nesting: outer counter-clockwise, holes clockwise.
+
+    Zero-area rings are dropped.
+    """
+    areas = [_ring_area2(ring) for ring in rings]
+    bounds = [_ring_bounds(ring) for ring in rings]
+    oriented = []
+    for i, ring in enumerate(rings):
+        if not areas[i]:
+            continue
+
+        depth = 0
+        for j, other in enumerate(rings):
+            if (
+                j == i
+                or abs(areas[j]) < abs(areas[i])
+                or bounds[j][0] > bounds[i][0]
+                or bounds[j][1] > bounds[i][1]
+                or bounds[j][2] < bounds[i][2]
+                or bounds[j][3] < bounds[i][3]
+            ):
+                continue
+
+            if _ring_contains_ring(other, ring):
+                depth += 1
+        if (areas[i] > 0) != (depth % 2 == 0):
+            ring = ring[::-1]
+        oriented.append(ring)
+    return oriented
+
+
+def _points_in_rings(points, rings, tolerance=0.0):
+    """Return list of flags for whether each point is within the rings.
+
+    Rings are tested with even-odd ray casting, one edge at a time across all the
+    points, so holes & multiple parts need no special handling. Points within the
+    tolerance of a ring edge (or exactly on one, if tolerance is zero) are within.
+    """
+    inside = [False] * len(points)
+    on_edge = [False] * len(points)
+    tolerance2 = tolerance * tolerance
+    for ring in rings:
+        x1, y1 = ring[-1]
+        for x2, y2 in ring:
+            dx, dy = x2 - x1, y2 - y1
+            length2 = dx * dx + dy * dy
+            ymin, ymax = min(y1, y2) - tolerance, max(y1, y2) + tolerance
+            xmin, xmax = min(x1, x2) - tolerance, max(x1, x2) + tolerance
+            for i, (x, y) in enumerate(points):
+                if y < ymin or y > ymax:
+                    continue
+
+                if (y1 > y) != (y2 > y) and x < x1 + (y - y1) * dx / dy:
+                    inside[i] = not inside[i]
+                if on_edge[i] or x < xmin or x > xmax:
+                    continue
+
+                if not tolerance:
+                    on_edge[i] = dx * (y - y1) == dy * (x - x1)
+                    continue
+
+                ratio = ((x - x1) * dx + (y - y1) * dy) / length2 if length2 else 0.0
+                ratio = min(max(ratio, 0.0), 1.0)
+                near_x, near_y = x1 + ratio * dx - x, y1 + ratio * dy - y
+                on_edge[i] = near_x * near_x + near_y * near_y <= tolerance2
+            x1, y1 = x2, y2
+    return [within or edge for within, edge in zip(inside, on_edge)]
+
+
+def _polygonal(geometry):
+    """Return polygonal part of shapely geometry (drops points & lines)."""
+    if geometry.geom_type in ("Polygon", "MultiPolygon"):
+        return geometry
+
+    polygons = [
+        part
+        for part in getattr(geometry, "geoms", [])
+        if part.geom_type in ("Polygon", "MultiPolygon")
+    ]
+    return shapely.ops.unary_union(polygons)
+
+
+def _read_wkb_header(wkb, offset):
+    """Read WKB geometry header at offset.
+
+    Returns:
+        tuple: Byte order (struct prefix), base geometry type code, number of
+            dimensions per coordinate, & end offset.
+    """
+    order = "<" if wkb[offset : offset + 1] == b"\x01" else ">"
+    (code,) = struct.unpack_from(order + "I", wkb, offset + 1)
+    # Extended WKB flags Z & M; ISO WKB adds 1000 (Z), 2000 (M), or 3000 (ZM).
+    dimension_count = 2 + bool(code & 0x80000000) + bool(code & 0x40000000)
+    code &= 0x0FFFFFFF
+    dimension_count += {0: 0, 1: 1, 2: 1, 3: 2}[code // 1000]
+    return order, code % 1000, dimension_count, offset + 5
+
+
+def _read_wkb_parts(wkb, offset, parts):
+    """Read WKB geometry at offset, appending its parts; return end offset.
+
+    Parts are (dimension, values) pairs: dimension 0 for points, 1 for line strings,
+    & 2 for polygon rings; values are the flat x, y coordinate values (Z & M
+    dropped).
+    """
+    order, code, dimension_count, offset = _read_wkb_header(wkb, offset)
+    if code == 1:
+        values = struct.unpack_from(order + "{}d".format(dimension_count), wkb, offset)
+        # Empty points are NaN coordinates.
+        parts.append((0, values[:2] if values[0] == values[0] else ()))
+        return offset + 8 * dimension_count
+
+    (count,) = struct.unpack_from(order + "I", wkb, offset)
+    offset += 4
+    if code in (4, 5, 6, 7):
+        for _ in range(count):
+            offset = _read_wkb_parts(wkb, offset, parts)
+        return offset
+
+    if code not in (2, 3):
+        raise ValueError("WKB geometry type {} is not supported.".format(code))
+
+    # A line string is one path of count points; a polygon, count rings.
+    for _ in range(1 if code == 2 else count):
+        point_count = count
+        if code == 3:
+            (point_count,) = struct.unpack_from(order + "I", wkb, offset)
+            offset += 4
+        values = struct.unpack_from(
+            order + "{}d".format(point_count * dimension_count), wkb, offset
+        )
+        offset += 8 * point_count * dimension_count
+        if dimension_count > 2:
+            values = tuple(
+                value
+                for xy in zip(values[::dimension_count], values[1::dimension_count])
+                for value in xy
+            )
+        parts.append((code - 1, values))
+    return offset
+
+
+def _read_wkb_rings(wkb, offset, rings):
+    """Read polygonal WKB geometry at offset, appending its rings; return end offset."""
+    order, code, dimension_count, offset = _read_wkb_header(wkb, offset)
+    (count,) = struct.unpack_from(order + "I", wkb, offset)
+    offset += 4
+    if code == 6:
+        for _ in range(count):
+            offset = _read_wkb_rings(wkb, offset, rings)
+    elif code == 3:
+        for _ in range(count):
+            (point_count,) = struct.unpack_from(order + "I", wkb, offset)
+            offset += 4
+            values = struct.unpack_from(
+                order + "{}d".format(point_count * dimension_count), wkb, offset
+            )
+            offset += 8 * point_count * dimension_count
+            ring = list(zip(values[::dimension_count], values[1::dimension_count]))
+            if len(ring) > 1 and ring[0] == ring[-1]:
+                ring.pop()
+            if ring:
+                rings.append(ring)
+    else:
+        raise ValueError("WKB geometry type {} is not polygonal.".format(code))
+
+    return offset
+
+
+def _ring_area2(ring):
+    """Return twice the signed area of ring (positive if counter-clockwise)."""
+    return sum(
+        x1 * y2 - x2 * y1 for (x1, y1), (x2, y2) in zip(ring, ring[1:] + ring[:1])
+    )
+
+
+def _ring_bounds(ring):
+    """Return (xmin, ymin, xmax, ymax) bounds of ring."""
+    xs, ys = zip(*ring)
+    return (min(xs), min(ys), max(xs), max(ys))
+
+
+def _ring_contains_ring(ring, other):
+    """Return True if ring contains other ring (rings do not cross)."""
+    for point in other:
+        winding = _winding_number(2 * point[0], 2 * point[1], [ring])
+        if winding is not None:
+            return bool(winding)
+
+    # All vertices on the ring: try edge midpoints.
+    for point, _next in zip(other, other[1:] + other[:1]):
+        winding = _winding_number(point[0] + _next[0], point[1] + _next[1], [ring])
+        if winding is not None:
+            return bool(winding)
+
+    return False
+
+
+def _round_div(numerator, denominator):
+    """Return integer quotient rounded to nearest (halves round up)."""
+    if denominator < 0:
+        numerator, denominator = -numerator, -denominator
+    return (2 * numerator + denominator) // (2 * denominator)
+
+
+def _simplified_ring(ring, keep_points=()):
+    """Return ring without repeated, collinear, or spike vertices.
+
+    Collinear vertices in keep_points are kept (spikes are always removed).
+    """
+    changed = True
+    while changed and len(ring) >= 3:
+        changed = False
+        simplified = []
+        for i, point in enumerate(ring):
+            previous = simplified[-1] if simplified else ring[i - 1]
+            _next = ring[(i + 1) % len(ring)]
+            dx, dy = point[0] - previous[0], point[1] - previous[1]
+            ex, ey = _next[0] - point[0], _next[1] - point[1]
+            if point == previous or (
+                dx * ey - dy * ex == 0
+                and (point not in keep_points or dx * ex + dy * ey <= 0)
+            ):
+                changed = True
+                continue
+
+            simplified.append(point)
+        ring = simplified
+    return ring if len(ring) >= 3 and _ring_area2(ring) else []
+
+
+def _snapped_rings(polygon, resolution):
+    """Return rings of polygon snapped to integer grid coordinates."""
+    rings = []
+    for ring in polygon:
+        points = []
+        for x, y in ring:
+            point = (int(round(x / resolution)), int(round(y / resolution)))
+            if not points or point != points[-1]:
+                points.append(point)
+        if len(points) > 1 and points[0] == points[-1]:
+            points.pop()
+        if len(points) >= 3:
+            rings.append(points)
+    return rings
+
+
+def _spatial_reference_value(attribute_name, *geometries, **kwargs):
+    """Return largest spatial reference attribute value of geometries, or default."""
+    values = [
+        getattr(getattr(geometry, "spatialReference", None), attribute_name, None)
+        for geometry in geometries
+    ]
+    values = [value for value in values if value]
+    return max(values) if values else kwargs.get("default")
+
+
+def _turn(previous, current, following):
+    """Return turn angle at current point (left positive; U-turn least)."""
+    dx, dy = current[0] - previous[0], current[1] - previous[1]
+    ex, ey = following[0] - current[0], following[1] - current[1]
+    cross, dot = dx * ey - dy * ex, dx * ex + dy * ey
+    if cross == 0 and dot < 0:
+        return -pi
+
+    return atan2(cross, dot)
+
+
+def _unsnapped(parts, resolution):
+    """Return polygon from grouped parts of integer grid rings."""
+    return [
+        [(x * resolution, y * resolution) for x, y in ring]
+        for part in parts
+        for ring in part
+    ]
+
+
+def _winding_number(x2, y2, rings):
+    """Return winding number of rings around point, or None if point on a ring.
+
+    Point coordinates are doubled, so edge midpoints of integer rings stay exact.
+    """
+    winding = 0
+    for ring in rings:
+        x1, y1 = 2 * ring[-1][0], 2 * ring[-1][1]
+        for x, y in ring:
+            x, y = 2 * x, 2 * y
+            if (y1 <= y2 <= y) or (y <= y2 <= y1):
+                side = (x - x1) * (y2 - y1) - (x2 - x1) * (y - y1)
+                if side == 0 and min(x1, x) <= x2 <= max(x1, x):
+                    return None
+
+                if y1 <= y2 < y and side > 0:
+                    winding += 1
+                elif y <= y2 < y1 and side < 0:
+                    winding -= 1
+            x1, y1 = x, y
+    return winding
+
+
+def _wkb_fingerprint(wkb, resolution):
+    """Return GeometryFingerprint of WKB geometry at resolution."""
+    scale = 1.0 / resolution
+    parts = []
+    _read_wkb_parts(wkb, 0, parts)
+    quantized = []
+    vertex_count = 0
+    extent = None
+    for dimension, values in parts:
+        values = tuple([round(value * scale) for value in values])
+        quantized.append((dimension, values))
+        if not values:
+            continue
+
+        vertex_count += len(values) // 2
+        xs, ys = values[::2], values[1::2]
+        part_extent = (min(xs), min(ys), max(xs), max(ys))
+        if extent is None:
+            extent = part_extent
+        else:
+            extent = (
+                min(extent[0], part_extent[0]),
+                min(extent[1], part_extent[1]),
+                max(extent[2], part_extent[2]),
+                max(extent[3], part_extent[3]),
+            )
+    return GeometryFingerprint(vertex_count, extent, hash(tuple(quantized)))
+
+
 def compactness_ratio(geometry=None, **kwargs):
     """Return compactness ratio (4pi * area / perimeter ** 2) result.
 
@@ -88,6 +1161,228 @@ def coordinate_distance(*coordinates):
     return distance
 
 
+def partition_locations(locations, max_count):
+    """Return spatial tiles of locations, each with no more than the max count.
+
+    Tiles are built by recursively splitting locations at the median coordinate of
+    the longer extent axis (i.e. a k-d tree), so dense areas get smaller tiles.
+
+    Args:
+        locations (iter): Collection of (ID, (x, y)) pairs.
+        max_count (int): Maximum number of locations in a tile.
+
+    Returns:
+        list of list: Tiles of (ID, (x, y)) pairs.
+
+    """
+    if max_count < 1:
+        raise ValueError("max_count must be a positive integer.")
+
+    tiles = []
+    stack = [list(locations)]
+    while stack:
+        tile = stack.pop()
+        if len(tile) <= max_count:
+            if tile:
+                tiles.append(tile)
+            continue
+
+        xs = [coord[0] for _, coord in tile]
+        ys = [coord[1] for _, coord in tile]
+        axis = 0 if (max(xs) - min(xs)) >= (max(ys) - min(ys)) else 1
+        tile.sort(key=lambda location: location[1][axis])
+        middle = len(tile) // 2
+        stack.extend([tile[middle:], tile[:middle]])
+    return tiles
+
+
+def point_polygon_matches(points, polygons, tolerance=0.0, node_capacity=16):
+    """Generate point IDs & values of polygons the points are within.
+
+    Polygon extents are indexed in an STR-tree; each point is matched to candidate
+    polygons by extent, then each polygon's candidate points are tested together.
+
+    Args:
+        points (iter): Collection of (point ID, (x, y)) pairs.
+        polygons (iter): Collection of (value, polygon) pairs.
+        tolerance (float): Distance from a polygon boundary within which a point still
+            counts as within. Points exactly on a boundary are always within.
+        node_capacity (int): Maximum number of children per spatial index node.
+
+    Yields:
+        tuple: Point ID & polygon value.
+    """
+    polygons = [(value, polygon) for value, polygon in polygons if polygon]
+    index_items = []
+    for i, (_, polygon) in enumerate(polygons):
+        xmin, ymin, xmax, ymax = polygon_bounds(polygon)
+        index_items.append(
+            (i, (xmin - tolerance, ymin - tolerance, xmax + tolerance, ymax + tolerance))
+        )
+    index = STRtree(index_items, node_capacity)
+    candidates = defaultdict(list)
+    for point_id, (x, y) in points:
+        for i in index.query((x, y, x, y)):
+            candidates[i].append((point_id, (x, y)))
+    for i in sorted(candidates):
+        value, polygon = polygons[i]
+        flags = _points_in_rings([xy for _, xy in candidates[i]], polygon, tolerance)
+        for (point_id, _), within in zip(candidates[i], flags):
+            if within:
+                yield point_id, value
+
+
+def polygon_area(polygon):
+    """Return area of polygon.
+
+    Args:
+        polygon (list): Polygon (sequence of rings).
+
+    Returns:
+        float: Area of polygon.
+    """
+    rings = [list(ring) for ring in polygon]
+    rings = [ring[:-1] if ring[0] == ring[-1] else ring for ring in rings if ring]
+    return sum(_ring_area2(ring) for ring in _oriented_rings(rings)) / 2.0
+
+
+def polygon_bounds(polygon):
+    """Return (xmin, ymin, xmax, ymax) bounds of polygon.
+
+    Args:
+        polygon (list): Polygon (sequence of rings).
+
+    Returns:
+        tuple: Bounds of polygon. NoneType if polygon has no coordinates.
+    """
+    rings = [list(ring) for ring in polygon if ring]
+    return _bounds_union(_ring_bounds(ring) for ring in rings) if rings else None
+
+
+def polygon_difference(polygon, other, resolution=POLYGON_RESOLUTION):
+    """Return polygon with the other polygon removed.
+
+    Args:
+        polygon (list): Polygon (sequence of rings).
+        other (list): Polygon to remove.
+        resolution (float): Coordinate resolution.
+
+    Returns:
+        list: Difference polygon. Empty list if none remains.
+    """
+    return _overlay(polygon, other, "difference", resolution)
+
+
+def polygon_from_wkb(wkb):
+    """Return polygon from well-known binary for a polygon or multipolygon.
+
+    Z & M values are ignored.
+
+    Args:
+        wkb (bytes, bytearray): Well-known binary (or extended WKB).
+
+    Returns:
+        list: Polygon (list of rings, each a list of (x, y) tuples).
+    """
+    rings = []
+    _read_wkb_rings(bytes(wkb), 0, rings)
+    return rings
+
+
+def polygon_intersection(polygon, other, resolution=POLYGON_RESOLUTION):
+    """Return intersection of two polygons.
+
+    Args:
+        polygon (list): Polygon (sequence of rings).
+        other (list): Other polygon.
+        resolution (float): Coordinate resolution.
+
+    Returns:
+        list: Intersection polygon. Empty list if polygons do not overlap.
+    """
+    return _overlay(polygon, other, "intersection", resolution)
+
+
+def polygon_kernel(resolution=POLYGON_RESOLUTION, use_shapely=True):
+    """Return polygon kernel: shapely-accelerated if available, else pure Python.
+
+    Args:
+        resolution (float): Coordinate resolution for the pure-Python kernel.
+        use_shapely (bool): Flag to use shapely if installed. Default is True.
+
+    Returns:
+        PolygonKernel.
+    """
+    if use_shapely and shapely is not None:
+        return ShapelyPolygonKernel(resolution)
+
+    return PolygonKernel(resolution)
+
+
+def polygon_parts(polygon):
+    """Return polygon split into single-part polygons.
+
+    Args:
+        polygon (list): Polygon (sequence of rings).
+
+    Returns:
+        list: Single-part polygons, each an outer ring (counter-clockwise) followed by
+            its holes (clockwise).
+    """
+    rings = [list(ring) for ring in polygon]
+    rings = [ring[:-1] if ring[0] == ring[-1] else ring for ring in rings if ring]
+    return _grouped_parts(_oriented_rings(rings))
+
+
+def polygon_to_wkb(polygon):
+    """Return well-known binary (multipolygon, little-endian) for polygon.
+
+    Args:
+        polygon (list): Polygon (sequence of rings).
+
+    Returns:
+        bytes: Well-known binary.
+    """
+    parts = polygon_parts(polygon)
+    chunks = [struct.pack("<bII", 1, 6, len(parts))]
+    for part in parts:
+        chunks.append(struct.pack("<bII", 1, 3, len(part)))
+        for ring in part:
+            ring = ring + ring[:1]
+            chunks.append(struct.pack("<I", len(ring)))
+            chunks.append(
+                struct.pack("<{}d".format(2 * len(ring)), *(c for xy in ring for c in xy))
+            )
+    return b"".join(chunks)
+
+
+def polygon_union(polygons, resolution=POLYGON_RESOLUTION):
+    """Return union of polygons.
+
+    Unions pairs of polygons, then pairs of those results, & so on (cascaded), so
+    each step works on neighboring, similar-sized polygons.
+
+    Args:
+        polygons (iter): Collection of polygons (each a sequence of rings).
+        resolution (float): Coordinate resolution.
+
+    Returns:
+        list: Union polygon. Empty list if no polygons have area.
+    """
+    polygons = [polygon for polygon in polygons if polygon]
+    if len(polygons) == 1:
+        return _overlay(polygons[0], [], "union", resolution)
+
+    while len(polygons) > 1:
+        polygons = [
+            _overlay(polygons[i], polygons[i + 1], "union", resolution)
+            if i + 1 < len(polygons)
+            else polygons[i]
+            for i in range(0, len(polygons), 2)
+        ]
+    return polygons[0] if polygons else []
+
+
 def sexagesimal_angle_to_decimal(degrees, minutes=0, seconds=0, thirds=0, fourths=0):
     """Convert sexagesimal-parsed angles to a decimal.
 
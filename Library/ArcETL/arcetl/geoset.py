@@ -1,5 +1,10 @@
 """Set-theoretic geometry operations."""
+from collections import Counter, defaultdict
 import logging
+import multiprocessing
+import os
+import shutil
+import tempfile
 
 import arcpy
 
@@ -7,12 +12,384 @@ from arcetl import arcobj
 from arcetl import attributes
 from arcetl import dataset
 from arcetl import features
-from arcetl.helpers import leveled_logger, unique_name, unique_path
+from arcetl import geometry
+from arcetl.helpers import contain, leveled_logger, unique_name, unique_path
 
 
 LOG = logging.getLogger(__name__)
 """logging.Logger: Module-level logger."""
 
+_tile_worker_state = {'workspace_path': None}
+"""dict: Process-wide state for tile workers. Set by the worker initializer."""
+
+
+def _features_by_oid(dataset_path, field_names, oids, **kwargs):
+    """Generate feature rows for the given object IDs, querying in chunks.
+
+    Args:
+        dataset_path (str): Path of the dataset.
+        field_names (iter): Collection of field names/tokens to read.
+        oids (iter): Collection of object IDs.
+        **kwargs: Arbitrary keyword arguments. See below.
+
+    Keyword Args:
+        chunk_size (int): Number of object IDs per query. Default is 1000.
+        spatial_reference_item: Item from which the spatial reference of the output
+            geometry will be derived.
+
+    Yields:
+        tuple: Feature row values.
+
+    """
+    kwargs.setdefault('chunk_size', 1000)
+    oid_field_name = arcobj.dataset_metadata(dataset_path)['oid_field_name']
+    oids = sorted(oids)
+    for i in range(0, len(oids), kwargs['chunk_size']):
+        cursor = arcpy.da.SearchCursor(
+            in_table=dataset_path,
+            field_names=field_names,
+            where_clause="{} in ({})".format(
+                oid_field_name,
+                ", ".join(str(oid) for oid in oids[i:i + kwargs['chunk_size']]),
+            ),
+            spatial_reference=kwargs.get('spatial_reference_item'),
+        )
+        with cursor:
+            for row in cursor:
+                yield row
+
+
+def _identity_dissolved_rows(tile_keys, key_oids, identity_index, kernel, **kwargs):
+    """Generate identity-dissolved insert rows for a tile of source key-groups.
+
+    Args:
+        tile_keys (iter): Collection of source key-group keys in the tile.
+        key_oids (dict): Mapping of key-group key to source object IDs.
+        identity_index (arcetl.geometry.STRtree): Index of identity object IDs by
+            feature bounds.
+        kernel (arcetl.geometry.PolygonKernel): Polygon kernel.
+        **kwargs: Arbitrary keyword arguments. See below.
+
+    Keyword Args:
+        source_dataset_path (str): Path of the source dataset.
+        identity_dataset_path (str): Path of the identity dataset.
+        identity_field_name (str): Name of identity dataset's field with values.
+        key_field_names (list): Names of the source key fields.
+        keep_unmatched (bool): Flag to include unmatched parts, with null value.
+        spatial_reference_item: Item from which the spatial reference of the
+            geometry will be derived.
+
+    Yields:
+        tuple: Key values, identity value, & geometry WKB.
+
+    """
+    sref = kwargs['spatial_reference_item']
+    source_geoms = {}
+    for oid, wkb in _features_by_oid(
+        kwargs['source_dataset_path'],
+        ['oid@', 'shape@wkb'],
+        (oid for key in tile_keys for oid in key_oids[key]),
+        spatial_reference_item=sref,
+    ):
+        if wkb:
+            source_geoms[oid] = kernel.from_wkb(wkb)
+    if not source_geoms:
+        return
+
+    tile_bounds = geometry._bounds_union(  # pylint: disable=protected-access
+        kernel.bounds(geom) for geom in source_geoms.values()
+    )
+    identity_features = {}
+    for oid, value, wkb in _features_by_oid(
+        kwargs['identity_dataset_path'],
+        ['oid@', kwargs['identity_field_name'], 'shape@wkb'],
+        identity_index.query(tile_bounds),
+        spatial_reference_item=sref,
+    ):
+        # Identity treats empty string as no identity.
+        if wkb and value not in (None, ''):
+            identity_features[oid] = (value, kernel.from_wkb(wkb))
+    tile_index = geometry.STRtree(
+        (oid, kernel.bounds(geom)) for oid, (_, geom) in identity_features.items()
+    )
+    for key in tile_keys:
+        geoms = [source_geoms[oid] for oid in key_oids[key] if oid in source_geoms]
+        value_pieces = defaultdict(list)
+        for geom in geoms:
+            for oid in tile_index.query(kernel.bounds(geom)):
+                value, identity_geom = identity_features[oid]
+                piece = kernel.intersection(geom, identity_geom)
+                if not kernel.is_empty(piece):
+                    value_pieces[value].append(piece)
+        key_values = key if kwargs['key_field_names'] else ()
+        for value in sorted(value_pieces):
+            yield key_values + (
+                value, kernel.to_wkb(kernel.union(value_pieces[value]))
+            )
+
+        if kwargs['keep_unmatched']:
+            unmatched = kernel.difference(
+                kernel.union(geoms),
+                kernel.union(
+                    piece for pieces in value_pieces.values() for piece in pieces
+                ),
+            )
+            if not kernel.is_empty(unmatched):
+                yield key_values + (None, kernel.to_wkb(unmatched))
+
+
+def _identity_tile(dataset_path, oids, workspace_path, **kwargs):
+    """Return identity output rows for a tile of dataset features.
+
+    Args:
+        dataset_path (str): Path of the dataset.
+        oids (list): Object IDs of the features in the tile.
+        workspace_path (str): Path of the worker's scratch workspace.
+        **kwargs: Arbitrary keyword arguments. See `_tile_output_rows`.
+
+    Keyword Args:
+        overlay_dataset_path (str): Path of the identity dataset copy.
+        tolerance (float): Tolerance for coincidence, in dataset's units.
+
+    Returns:
+        list: Pairs of source object ID & output row.
+
+    """
+    output_path = unique_path('output', workspace_path=workspace_path)
+    view = arcobj.DatasetView(dataset_path, _oid_where_sql(dataset_path, oids))
+    with view:
+        arcpy.analysis.Identity(
+            in_features=view.name,
+            identity_features=kwargs['overlay_dataset_path'],
+            out_feature_class=output_path,
+            join_attributes='all',
+            cluster_tolerance=kwargs.get('tolerance'),
+            relationship=False,
+        )
+    # Identity keeps the input object IDs in the first FID field.
+    source_oid_field_name = next(
+        name
+        for name in arcobj.dataset_metadata(output_path)['field_names']
+        if name.upper().startswith('FID_')
+    )
+    return _tile_output_rows(output_path, source_oid_field_name, **kwargs)
+
+
+def _init_tile_worker(scratch_path):
+    """Initialize tile worker process, creating its own scratch workspace.
+
+    Args:
+        scratch_path (str): Path of the folder to create the workspace in.
+
+    """
+    _tile_worker_state['workspace_path'] = arcpy.management.CreateFileGDB(
+        scratch_path, 'worker_{}.gdb'.format(os.getpid())
+    ).getOutput(0)
+
+
+def _oid_where_sql(dataset_path, oids):
+    """Return SQL where-clause selecting the object IDs in the dataset."""
+    return "{} in ({})".format(
+        arcobj.dataset_metadata(dataset_path)['oid_field_name'],
+        ", ".join(str(oid) for oid in oids),
+    )
+
+
+def _overlay_tile(dataset_path, oids, workspace_path, **kwargs):
+    """Return overlay (spatial join) output rows for a tile of dataset features.
+
+    Args:
+        dataset_path (str): Path of the dataset.
+        oids (list): Object IDs of the features in the tile.
+        workspace_path (str): Path of the worker's scratch workspace.
+        **kwargs: Arbitrary keyword arguments. See `_tile_output_rows`.
+
+    Keyword Args:
+        overlay_dataset_path (str): Path of the overlay dataset copy.
+        join_kwargs (dict): Keyword arguments for the spatial join.
+        tolerance (float): Tolerance for coincidence, in dataset's units.
+
+    Returns:
+        list: Pairs of source object ID & output row.
+
+    """
+    output_path = unique_path('output', workspace_path=workspace_path)
+    view = arcobj.DatasetView(dataset_path, _oid_where_sql(dataset_path, oids))
+    orig_tolerance = arcpy.env.XYTolerance
+    if kwargs.get('tolerance') is not None:
+        arcpy.env.XYTolerance = kwargs['tolerance']
+    try:
+        with view:
+            arcpy.analysis.SpatialJoin(
+                target_features=view.name,
+                join_features=kwargs['overlay_dataset_path'],
+                out_feature_class=output_path,
+                **kwargs['join_kwargs']
+            )
+    finally:
+        arcpy.env.XYTolerance = orig_tolerance
+    return _tile_output_rows(output_path, 'TARGET_FID', **kwargs)
+
+
+def _parallel_overlay(
+    dataset_path,
+    field_name,
+    overlay_dataset_path,
+    overlay_field_name,
+    tile_operation,
+    **kwargs
+):
+    """Assign overlay values to features with a tile operation run in parallel.
+
+    The overlay dataset is copied to a scratch workspace all workers read from.
+
+    Args:
+        dataset_path (str): Path of the dataset.
+        field_name (str): Name of the dataset's field to assign to.
+        overlay_dataset_path (str): Path of the overlay dataset.
+        overlay_field_name (str): Name of overlay dataset's field with values to
+            assign.
+        tile_operation (function): Tile operation, `_identity_tile` or
+            `_overlay_tile`.
+        **kwargs: Arbitrary keyword arguments. See below.
+
+    Keyword Args:
+        dataset_where_sql (str): SQL where-clause for dataset subselection.
+        overlay_where_sql (str): SQL where-clause for the overlay dataset
+            subselection.
+        tile_size (int): Maximum number of features in a tile.
+        worker_count (int): Number of worker processes.
+        operation_kwargs (dict): Other keyword arguments for the tile operation.
+
+    Returns:
+        collections.Counter: Counts for each feature action.
+
+    """
+    meta = {'dataset': arcobj.dataset_metadata(dataset_path)}
+    # Shape area & length fields are not editable.
+    keys = {
+        'insert': [
+            field['name']
+            for field in meta['dataset']['user_fields']
+            if field['object'].editable and field['type'] != 'geometry'
+        ]
+        + ['shape@wkb']
+    }
+    scratch_path = tempfile.mkdtemp(prefix='arcetl_tiles_')
+    try:
+        temp_overlay = arcobj.TempDatasetCopy(
+            overlay_dataset_path,
+            kwargs['overlay_where_sql'],
+            output_path=unique_path(
+                'overlay',
+                workspace_path=arcpy.management.CreateFileGDB(
+                    scratch_path, 'shared.gdb'
+                ).getOutput(0),
+            ),
+            field_names=[overlay_field_name],
+        )
+        with temp_overlay:
+            operation_kwargs = dict(
+                kwargs['operation_kwargs'],
+                field_name=field_name,
+                field_names=keys['insert'],
+                overlay_dataset_path=temp_overlay.path,
+                # Avoid field name collisions with neutral field name.
+                overlay_field_name=dataset.rename_field(
+                    temp_overlay.path,
+                    overlay_field_name,
+                    new_field_name=unique_name(overlay_field_name),
+                    log_level=None,
+                ),
+            )
+            feature_count = tile_parallel_replace(
+                dataset_path,
+                tile_operation,
+                keys['insert'],
+                dataset_where_sql=kwargs['dataset_where_sql'],
+                operation_kwargs=operation_kwargs,
+                tile_size=kwargs['tile_size'],
+                worker_count=kwargs['worker_count'],
+                scratch_path=scratch_path,
+                log_level=None,
+            )
+    finally:
+        shutil.rmtree(scratch_path, ignore_errors=True)
+    return feature_count
+
+
+def _run_tile(task):
+    """Run tile operation, keeping only output rows for features in the tile.
+
+    Args:
+        task (tuple): Tile index, tile operation, dataset path, object IDs in the
+            tile, & tile operation keyword arguments.
+
+    Returns:
+        tuple: Tile index, kept output rows, & count of rows dropped.
+
+    """
+    tile_index, tile_operation, dataset_path, oids, operation_kwargs = task
+    tile_oids = set(oids)
+    rows = []
+    dropped_count = 0
+    for oid, row in tile_operation(
+        dataset_path, oids, _tile_worker_state['workspace_path'], **operation_kwargs
+    ):
+        if oid in tile_oids:
+            rows.append(row)
+        else:
+            dropped_count += 1
+    return tile_index, rows, dropped_count
+
+
+def _tile_output_rows(output_path, source_oid_field_name, **kwargs):
+    """Return rows from a tile operation's output dataset, then delete the dataset.
+
+    Args:
+        output_path (str): Path of the output dataset.
+        source_oid_field_name (str): Name of the output field with source object
+            IDs.
+        **kwargs: Arbitrary keyword arguments. See below.
+
+    Keyword Args:
+        field_name (str): Name of the dataset's field to assign to.
+        field_names (list): Names of the fields for output rows, in row order.
+        overlay_field_name (str): Name of the output field with values to assign.
+        replacement_value: Value to replace overlay field values with.
+        empty_as_null (bool): Flag to change empty string values to null. Default is
+            False.
+
+    Returns:
+        list: Pairs of source object ID & output row.
+
+    """
+    # Clean up bad or null geometry created in processing.
+    arcpy.management.RepairGeometry(output_path)
+    value_index = [name.lower() for name in kwargs['field_names']].index(
+        kwargs['field_name'].lower()
+    )
+    cursor = arcpy.da.SearchCursor(
+        in_table=output_path,
+        field_names=(
+            [source_oid_field_name, kwargs['overlay_field_name']]
+            + kwargs['field_names']
+        ),
+    )
+    rows = []
+    with cursor:
+        for row in cursor:
+            value = row[1]
+            if kwargs.get('replacement_value') is not None:
+                value = kwargs['replacement_value'] if value else None
+            elif kwargs.get('empty_as_null') and value == '':
+                value = None
+            output_row = list(row[2:])
+            output_row[value_index] = value
+            rows.append((row[0], tuple(output_row)))
+    dataset.delete(output_path, log_level=None)
+    return rows
+
 
 def identity(
     dataset_path, field_name, identity_dataset_path, identity_field_name, **kwargs
@@ -41,6 +418,9 @@ def identity(
             subselection.
         replacement_value: Value to replace identity field values with.
         tolerance (float): Tolerance for coincidence, in dataset's units.
+        worker_count (int): Number of worker processes. If more than one, features
+            are processed in spatial tiles (of up to chunk_size features) in
+            parallel, by `tile_parallel_replace`. Default is 1.
         log_level (str): Level to log the function at. Default is 'info'.
 
     Returns:
@@ -51,6 +431,7 @@ def identity(
     kwargs.setdefault('dataset_where_sql')
     kwargs.setdefault('identity_where_sql')
     kwargs.setdefault('tolerance')
+    kwargs.setdefault('worker_count', 1)
     log = leveled_logger(LOG, kwargs.setdefault('log_level', 'info'))
     log(
         "Start: Identity-set attributes in %s on %s by overlay values in %s on %s.",
@@ -59,6 +440,27 @@ def identity(
         identity_field_name,
         identity_dataset_path,
     )
+    if kwargs['worker_count'] > 1:
+        _parallel_overlay(
+            dataset_path,
+            field_name,
+            identity_dataset_path,
+            identity_field_name,
+            _identity_tile,
+            dataset_where_sql=kwargs['dataset_where_sql'],
+            overlay_where_sql=kwargs['identity_where_sql'],
+            tile_size=kwargs['chunk_size'],
+            worker_count=kwargs['worker_count'],
+            operation_kwargs={
+                'replacement_value': kwargs.get('replacement_value'),
+                # Identity puts empty string when identity feature not present.
+                'empty_as_null': True,
+                'tolerance': kwargs['tolerance'],
+            },
+        )
+        log("End: Identity.")
+        return dataset_path
+
     if 'replacement_value' in kwargs and kwargs['replacement_value'] is not None:
         update_function = (lambda x: kwargs['replacement_value'] if x else None)
     else:
@@ -109,6 +511,143 @@ def identity(
     return dataset_path
 
 
+def identity_dissolved(
+    dataset_path,
+    field_name,
+    source_dataset_path,
+    identity_dataset_path,
+    identity_field_name,
+    **kwargs
+):
+    """Insert source features split by identity features & dissolved by value.
+
+    Result matches copying the source features, running `identity`, deleting
+    features without identity values, dissolving on the key fields & identity field,
+    then inserting into the dataset. But here the work happens in-process: source
+    features are processed in spatial tiles of key-groups (bounding memory), each
+    piece is clipped only against identity features found through a spatial index,
+    & results stream into a single insert cursor.
+
+    Note:
+        Geometry operations use shapely if installed (& use_shapely is True), else
+        the pure-Python kernels in `arcetl.geometry`.
+
+    Args:
+        dataset_path (str): Path of the dataset to insert features into.
+        field_name (str): Name of the dataset's field to assign identity values to.
+        source_dataset_path (str): Path of the dataset with features to split.
+        identity_dataset_path (str): Path of the identity dataset.
+        identity_field_name (str): Name of identity dataset's field with values to
+            assign.
+        **kwargs: Arbitrary keyword arguments. See below.
+
+    Keyword Args:
+        key_field_names (iter): Collection of source field names to dissolve on.
+            Values are inserted into the same-named dataset fields. If no key field
+            names, each source feature is dissolved on its own.
+        keep_unmatched (bool): Flag to also insert parts of source features without
+            an identity value (with null value). Default is False.
+        source_where_sql (str): SQL where-clause for source dataset subselection.
+        identity_where_sql (str): SQL where-clause for identity dataset subselection.
+        tile_size (int): Maximum number of key-groups processed together. Default is
+            4096.
+        tolerance (float): Coordinate resolution for pure-Python geometry operations,
+            in dataset's units. Default is 0.0001.
+        use_edit_session (bool): Flag to perform updates in an edit session. Default is
+            False.
+        use_shapely (bool): Flag to use shapely for geometry operations, if installed.
+            Default is True.
+        log_level (str): Level to log the function at. Default is 'info'.
+
+    Returns:
+        collections.Counter: Counts for each feature action.
+
+    """
+    kwargs.setdefault('key_field_names', [])
+    kwargs.setdefault('keep_unmatched', False)
+    kwargs.setdefault('source_where_sql')
+    kwargs.setdefault('identity_where_sql')
+    kwargs.setdefault('tile_size', 4096)
+    kwargs.setdefault('tolerance', geometry.POLYGON_RESOLUTION)
+    kwargs.setdefault('use_edit_session', False)
+    kwargs.setdefault('use_shapely', True)
+    log = leveled_logger(LOG, kwargs.setdefault('log_level', 'info'))
+    log(
+        "Start: Insert identity-dissolved features into %s from %s"
+        " by overlay values in %s on %s.",
+        dataset_path,
+        source_dataset_path,
+        identity_field_name,
+        identity_dataset_path,
+    )
+    meta = {'dataset': arcobj.dataset_metadata(dataset_path)}
+    keys = {'key': list(contain(kwargs['key_field_names']))}
+    keys['insert'] = keys['key'] + [field_name, 'shape@wkb']
+    kernel = geometry.polygon_kernel(kwargs['tolerance'], kwargs['use_shapely'])
+    log("Using %s polygon kernel.", kernel.name)
+    # Index identity feature extents only: geometry is read per tile.
+    cursor = arcpy.da.SearchCursor(
+        in_table=identity_dataset_path,
+        field_names=['oid@', 'shape@wkb'],
+        where_clause=kwargs['identity_where_sql'],
+        spatial_reference=meta['dataset']['spatial_reference'],
+    )
+    with cursor:
+        identity_index = geometry.STRtree(
+            (oid, kernel.bounds(kernel.from_wkb(wkb))) for oid, wkb in cursor if wkb
+        )
+    # Group source features by key, located at the mean of their centroids.
+    key_oids = defaultdict(list)
+    key_xys = defaultdict(list)
+    cursor = arcpy.da.SearchCursor(
+        in_table=source_dataset_path,
+        field_names=['oid@', 'shape@xy'] + keys['key'],
+        where_clause=kwargs['source_where_sql'],
+        spatial_reference=meta['dataset']['spatial_reference'],
+    )
+    with cursor:
+        for row in cursor:
+            if row[1] is None or None in row[1]:
+                continue
+
+            key = tuple(row[2:]) if keys['key'] else row[0]
+            key_oids[key].append(row[0])
+            key_xys[key].append(row[1])
+    tiles = geometry.partition_locations(
+        (
+            (key, (sum(x for x, _ in xys) / len(xys), sum(y for _, y in xys) / len(xys)))
+            for key, xys in key_xys.items()
+        ),
+        kwargs['tile_size'],
+    )
+    del key_xys
+    session = arcobj.Editor(
+        meta['dataset']['workspace_path'], kwargs['use_edit_session']
+    )
+    cursor = arcpy.da.InsertCursor(dataset_path, field_names=keys['insert'])
+    feature_count = Counter()
+    with session, cursor:
+        for tile in tiles:
+            rows = _identity_dissolved_rows(
+                [key for key, _ in tile],
+                key_oids,
+                identity_index,
+                kernel,
+                source_dataset_path=source_dataset_path,
+                identity_dataset_path=identity_dataset_path,
+                identity_field_name=identity_field_name,
+                key_field_names=keys['key'],
+                keep_unmatched=kwargs['keep_unmatched'],
+                spatial_reference_item=meta['dataset']['spatial_reference'],
+            )
+            for row in rows:
+                cursor.insertRow(row)
+                feature_count['inserted'] += 1
+    log("%s features inserted.", feature_count['inserted'])
+    log("End: Insert.")
+    return feature_count
+
+
 def overlay(
     dataset_path, field_name, overlay_dataset_path, overlay_field_name, **kwargs
 ):
@@ -144,6 +683,9 @@ def overlay(
         overlay_where_sql (str): SQL where-clause for the overlay dataset subselection.
         replacement_value: Value to replace overlay field values with.
         tolerance (float): Tolerance for coincidence, in dataset's units.
+        worker_count (int): Number of worker processes. If more than one, features
+            are processed in spatial tiles (of up to chunk_size features) in
+            parallel, by `tile_parallel_replace`. Default is 1.
         log_level (str): Level to log the function at. Default is 'info'.
 
     Returns:
@@ -155,6 +697,7 @@ def overlay(
     kwargs.setdefault('overlay_central_coincident', False)
     kwargs.setdefault('overlay_most_coincident', False)
     kwargs.setdefault('overlay_where_sql')
+    kwargs.setdefault('worker_count', 1)
     log = leveled_logger(LOG, kwargs.setdefault('log_level', 'info'))
     log(
         "Start: Overlay-set attributes in %s on %s by overlay values in %s on %s.",
@@ -172,6 +715,26 @@ def overlay(
 
     else:
         join_kwargs['match_option'] = 'intersect'
+    if kwargs['worker_count'] > 1:
+        _parallel_overlay(
+            dataset_path,
+            field_name,
+            overlay_dataset_path,
+            overlay_field_name,
+            _overlay_tile,
+            dataset_where_sql=kwargs['dataset_where_sql'],
+            overlay_where_sql=kwargs['overlay_where_sql'],
+            tile_size=kwargs['chunk_size'],
+            worker_count=kwargs['worker_count'],
+            operation_kwargs={
+                'replacement_value': kwargs.get('replacement_value'),
+                'join_kwargs': join_kwargs,
+                'tolerance': kwargs.get('tolerance'),
+            },
+        )
+        log("End: Overlay.")
+        return dataset_path
+
     if 'replacement_value' in kwargs and kwargs['replacement_value'] is not None:
         update_function = (lambda x: kwargs['replacement_value'] if x else None)
     else:
@@ -223,6 +786,199 @@ def overlay(
     return dataset_path
 
 
+def partition_extents(extents, max_count, max_depth=16):
+    """Return spatial tiles of features, each with no more than the max count.
+
+    Tiles are quadtree cells: a cell with too many features is split into quarters at
+    its center. Each feature goes to the one cell holding its extent's centroid, so a
+    feature crossing cell boundaries is still in only one tile. Cells at the max
+    depth are not split further (e.g. many features sharing a centroid), so may
+    exceed the max count.
+
+    Args:
+        extents (iter): Collection of (ID, (xmin, ymin, xmax, ymax)) pairs.
+        max_count (int): Maximum number of features in a tile.
+        max_depth (int): Maximum number of times a cell is split. Default is 16.
+
+    Returns:
+        list of tuple: Tiles, as pairs of cell bounds (xmin, ymin, xmax, ymax) &
+            list of feature IDs.
+
+    """
+    if max_count < 1:
+        raise ValueError("max_count must be a positive integer.")
+
+    centroids = [
+        (feature_id, ((xmin + xmax) / 2.0, (ymin + ymax) / 2.0))
+        for feature_id, (xmin, ymin, xmax, ymax) in extents
+    ]
+    if not centroids:
+        return []
+
+    xs = [coord[0] for _, coord in centroids]
+    ys = [coord[1] for _, coord in centroids]
+    tiles = []
+    stack = [((min(xs), min(ys), max(xs), max(ys)), centroids, 0)]
+    while stack:
+        bounds, cell, depth = stack.pop()
+        if len(cell) <= max_count or depth >= max_depth:
+            if cell:
+                tiles.append((bounds, [feature_id for feature_id, _ in cell]))
+            continue
+
+        xmin, ymin, xmax, ymax = bounds
+        x_mid, y_mid = (xmin + xmax) / 2.0, (ymin + ymax) / 2.0
+        quarters = [[], [], [], []]
+        for location in cell:
+            x, y = location[1]
+            quarters[int(x >= x_mid) + 2 * int(y >= y_mid)].append(location)
+        quarter_bounds = [
+            (xmin, ymin, x_mid, y_mid),
+            (x_mid, ymin, xmax, y_mid),
+            (xmin, y_mid, x_mid, ymax),
+            (x_mid, y_mid, xmax, ymax),
+        ]
+        for i in reversed(range(4)):
+            stack.append((quarter_bounds[i], quarters[i], depth + 1))
+    return tiles
+
+
+def tile_parallel_replace(dataset_path, tile_operation, field_names, **kwargs):
+    """Replace features with outputs of an operation run on spatial tiles in parallel.
+
+    Features are partitioned into tiles (see `partition_extents`) & the operation
+    runs on each tile in a worker process, writing any intermediate datasets to that
+    worker's own scratch workspace. Output rows are kept only for features assigned
+    to the tile, so rows an operation returns for neighboring features are not
+    duplicated. Outputs are inserted through one insert cursor as tiles finish, then
+    the tiled features are deleted in one pass.
+
+    Note:
+        Features without geometry are not in any tile, & are left as they are.
+
+    Args:
+        dataset_path (str): Path of the dataset.
+        tile_operation (function): Module-level function (so it can be pickled to
+            worker processes) taking the dataset path, list of object IDs in the
+            tile, worker's scratch workspace path, & operation keyword arguments.
+            Returns or generates pairs of source object ID & output row.
+        field_names (iter): Collection of field names/tokens for output rows.
+        **kwargs: Arbitrary keyword arguments. See below.
+
+    Keyword Args:
+        dataset_where_sql (str): SQL where-clause for dataset subselection.
+        operation_kwargs (dict): Keyword arguments for the tile operation. Default is
+            no arguments.
+        tile_size (int): Maximum number of features in a tile. Default is 4096.
+        worker_count (int): Number of worker processes. Default is 1 (run tiles in
+            this process).
+        scratch_path (str): Path of the folder to create worker scratch workspaces
+            in. Default is a temporary folder, removed afterward.
+        use_edit_session (bool): Flag to perform updates in an edit session. Default is
+            False.
+        log_level (str): Level to log the function at. Default is 'info'.
+
+    Returns:
+        collections.Counter: Counts for each feature action.
+
+    """
+    kwargs.setdefault('dataset_where_sql')
+    kwargs.setdefault('operation_kwargs', {})
+    kwargs.setdefault('tile_size', 4096)
+    kwargs.setdefault('worker_count', 1)
+    kwargs.setdefault('use_edit_session', False)
+    log = leveled_logger(LOG, kwargs.setdefault('log_level', 'info'))
+    log(
+        "Start: Replace features in %s by tile operation %s.",
+        dataset_path,
+        tile_operation.__name__,
+    )
+    meta = {'dataset': arcobj.dataset_metadata(dataset_path)}
+    keys = {'insert': list(contain(field_names))}
+    extents = []
+    cursor = arcpy.da.SearchCursor(
+        in_table=dataset_path,
+        field_names=['oid@', 'shape@'],
+        where_clause=kwargs['dataset_where_sql'],
+    )
+    with cursor:
+        for oid, geom in cursor:
+            if geom:
+                extent = geom.extent
+                extents.append(
+                    (oid, (extent.XMin, extent.YMin, extent.XMax, extent.YMax))
+                )
+    tiles = partition_extents(extents, kwargs['tile_size'])
+    del extents
+    log("Partitioned features into %s tiles.", len(tiles))
+    tasks = [
+        (i, tile_operation, dataset_path, oids, kwargs['operation_kwargs'])
+        for i, (_, oids) in enumerate(tiles)
+    ]
+    scratch_path = kwargs.get('scratch_path') or tempfile.mkdtemp(
+        prefix='arcetl_tiles_'
+    )
+    if kwargs['worker_count'] > 1 and len(tasks) > 1:
+        pool = multiprocessing.Pool(
+            min(kwargs['worker_count'], len(tasks)),
+            initializer=_init_tile_worker,
+            initargs=(scratch_path,),
+        )
+        results = pool.imap_unordered(_run_tile, tasks)
+    else:
+        pool = None
+        _init_tile_worker(scratch_path)
+        results = (_run_tile(task) for task in tasks)
+    session = arcobj.Editor(
+        meta['dataset']['workspace_path'], kwargs['use_edit_session']
+    )
+    feature_count = Counter()
+    try:
+        with session:
+            # New features get new object IDs, so inserting before deleting is safe.
+            cursor = arcpy.da.InsertCursor(dataset_path, field_names=keys['insert'])
+            with cursor:
+                for tile_index, rows, dropped_count in results:
+                    for row in rows:
+                        cursor.insertRow(row)
+                    feature_count['inserted'] += len(rows)
+                    if dropped_count:
+                        LOG.debug(
+                            "Tile %s: dropped %s rows for features in other tiles.",
+                            tile_index,
+                            dropped_count,
+                        )
+            tiled_oids = set(oid for _, oids in tiles for oid in oids)
+            cursor = arcpy.da.UpdateCursor(
+                in_table=dataset_path,
+                field_names=['oid@'],
+                where_clause=kwargs['dataset_where_sql'],
+            )
+            with cursor:
+                for (oid,) in cursor:
+                    if oid in tiled_oids:
+                        cursor.deleteRow()
+                        feature_count['deleted'] += 1
+    except Exception:
+        if pool:
+            pool.terminate()
+        raise
+
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+        else:
+            arcpy.management.Delete(_tile_worker_state['workspace_path'])
+            _tile_worker_state['workspace_path'] = None
+        if not kwargs.get('scratch_path'):
+            shutil.rmtree(scratch_path, ignore_errors=True)
+    for key in ['deleted', 'inserted']:
+        log("%s features %s.", feature_count[key], key)
+    log("End: Replace.")
+    return feature_count
+
+
 def union(dataset_path, field_name, union_dataset_path, union_field_name, **kwargs):
     """Assign union attribute to features, splitting where necessary.
 
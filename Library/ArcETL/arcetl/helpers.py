@@ -1,13 +1,26 @@
 """Internal module helper objects."""
-from collections import Iterable
+try:
+    from collections.abc import Iterable
+except ImportError:
+    from collections import Iterable
+import ctypes
 import inspect
+import itertools
 import logging
+import multiprocessing
 import os
 import random
 import string
 import sys
+import threading
 import uuid
 
+try:
+    from math import gcd
+except ImportError:
+    # Python 2.
+    from fractions import gcd  # pylint: disable=deprecated-method
+
 if sys.version_info.major >= 3:
     basestring = str
     """Defining a basestring type instance for Py3+."""
@@ -16,6 +29,78 @@ if sys.version_info.major >= 3:
 LOG = logging.getLogger(__name__)
 """logging.Logger: Module-level logger."""
 
+ID_CHARACTERS = string.ascii_letters + string.digits
+"""str: Characters used in unique string IDs."""
+NAME_CHARACTERS = string.ascii_lowercase + string.digits
+"""str: Characters used in unique names (lowercase, as some workspaces ignore case)."""
+
+_unique_name_state = {'lock': threading.Lock(), 'pid': None}
+"""dict: Process-wide state for unique names. Reset in forked child processes."""
+
+
+class IDRangeAllocator(object):
+    """Allocator of unique integer IDs from a counter shared across processes.
+
+    Workers reserve blocks of IDs, so the shared counter is only touched once per
+    block. Pass the allocator to worker processes on creation (e.g. as a
+    `multiprocessing.Process` argument or `Pool` initializer argument).
+
+    Attributes:
+        block_size (int): Number of IDs to reserve per block when iterating.
+
+    """
+
+    def __init__(self, start=1, block_size=1024):
+        """Initialize instance.
+
+        Args:
+            start (int): First ID to allocate. Default is 1 (some processing
+                functions use 0 for null).
+            block_size (int): Number of IDs to reserve per block when iterating.
+
+        """
+        self.block_size = block_size
+        self._next_id = multiprocessing.Value(ctypes.c_longlong, start)
+
+    def __iter__(self):
+        return self.ids()
+
+    @property
+    def next_id(self):
+        """int: Next ID that will be reserved."""
+        return self._next_id.value
+
+    def ids(self):
+        """Generate unique IDs, reserving them a block at a time.
+
+        Yields:
+            int: Unique ID.
+
+        """
+        while True:
+            for unique_id in self.reserve():
+                yield unique_id
+
+    def reserve(self, count=None):
+        """Reserve a block of unique IDs.
+
+        Args:
+            count (int): Number of IDs to reserve. Default is the block size.
+
+        Returns:
+            range: Block of reserved IDs.
+
+        """
+        if count is None:
+            count = self.block_size
+        if count < 1:
+            raise ValueError("count must be at least 1.")
+
+        with self._next_id.get_lock():
+            start = self._next_id.value
+            self._next_id.value = start + count
+        return range(start, start + count)
+
 
 def contain(obj, nonetypes_as_empty=True):
     """Generate contained items if a collection, otherwise generate object.
@@ -140,13 +225,33 @@ def property_value(item, property_transform_map, *properties):
     return current_val
 
 
+def replace_file(source_path, destination_path):
+    """Move file at source path to destination path, replacing any existing file.
+
+    On the same volume this is atomic, so readers never see a partial file.
+
+    Args:
+        source_path (str): Path of the file to move.
+        destination_path (str): Path to move the file to.
+
+    """
+    if hasattr(os, 'replace'):
+        os.replace(source_path, destination_path)
+    else:
+        # Python 2 rename will not replace existing file on Windows.
+        if os.path.exists(destination_path):
+            os.remove(destination_path)
+        os.rename(source_path, destination_path)
+
+
 def unique_ids(data_type=uuid.UUID, string_length=4):
     """Generate unique IDs.
 
     Args:
         data_type: Type object to create unique IDs as.
         string_length (int): Length to make unique IDs of type string. Ignored if
-            data_type is not a string type.
+            data_type is not a string type. String IDs run out once every string
+            of the length has been generated.
 
     Yields:
         Unique ID.
@@ -164,16 +269,25 @@ def unique_ids(data_type=uuid.UUID, string_length=4):
             yield uuid.uuid4()
 
     elif data_type in [str]:
-        seed = string.ascii_letters + string.digits
-        used_ids = set()
-        while True:
-            unique_id = ''.join(random.choice(seed) for _ in range(string_length))
-            if unique_id in used_ids:
-                continue
-
+        # Walk every string of the length in a scrambled order: an affine map of a
+        # counter, so no memory of used IDs is needed. The map is a permutation
+        # when the multiplier is coprime to the modulus; multiplier 1 would only
+        # rotate the counter, so is excluded.
+        base = len(ID_CHARACTERS)
+        modulus = base ** string_length
+        multiplier = random.randrange(2, modulus)
+        while gcd(multiplier, modulus) != 1:
+            multiplier = random.randrange(2, modulus)
+        offset = random.randrange(modulus)
+        for count in range(modulus):
+            number = (multiplier * count + offset) % modulus
+            unique_id = ''
+            digits = number
+            for _ in range(string_length):
+                digits, index = divmod(digits, base)
+                unique_id += ID_CHARACTERS[index]
             yield unique_id
 
-            used_ids.add(unique_id)
     else:
         raise NotImplementedError(
             "Unique IDs for {} type not implemented.".format(data_type)
@@ -183,10 +297,14 @@ def unique_ids(data_type=uuid.UUID, string_length=4):
 def unique_name(prefix='', suffix='', unique_length=4, allow_initial_digit=True):
     """Generate unique name.
 
+    The unique part of the name is a process-wide random token, followed by the
+    next value of a process-wide counter. Tokens are regenerated in forked child
+    processes.
+
     Args:
         prefix (str): String to insert before the unique part of the name.
         suffix (str): String to append after the unique part of the name.
-        unique_length (int): Number of unique characters to generate.
+        unique_length (int): Number of characters in the process token.
         allow_initial_number (bool): Flag indicating whether to let the initial
             character be a number. Default is True.
 
@@ -194,7 +312,33 @@ def unique_name(prefix='', suffix='', unique_length=4, allow_initial_digit=True)
         str: Unique name.
 
     """
-    name = prefix + next(unique_ids(str, unique_length)) + suffix
+    state = _unique_name_state
+    if state['pid'] != os.getpid():
+        with state['lock']:
+            if state['pid'] != os.getpid():
+                state['counter'] = itertools.count()
+                state['tokens'] = {}
+                state['pid'] = os.getpid()
+    if unique_length not in state['tokens']:
+        # OS randomness: the random module is not reseeded in forked children on Py2.
+        token_bytes = bytearray(os.urandom(unique_length))
+        with state['lock']:
+            state['tokens'].setdefault(
+                unique_length,
+                string.ascii_lowercase[token_bytes[0] % len(string.ascii_lowercase)]
+                + ''.join(NAME_CHARACTERS[byte % len(NAME_CHARACTERS)]
+                          for byte in token_bytes[1:])
+            )
+    # Counter increments are atomic (itertools.count is implemented in C).
+    number = next(state['counter'])
+    count_part = ''
+    while True:
+        number, index = divmod(number, len(NAME_CHARACTERS))
+        count_part = NAME_CHARACTERS[index] + count_part
+        if not number:
+            break
+
+    name = prefix + state['tokens'][unique_length] + count_part + suffix
     if not allow_initial_digit and name[0].isdigit():
         name = unique_name(prefix, suffix, unique_length, allow_initial_digit)
     return name
@@ -206,7 +350,7 @@ def unique_path(prefix='', suffix='', unique_length=4, workspace_path='in_memory
     Args:
         prefix (str): String to insert before the unique part of the name.
         suffix (str): String to append after the unique part of the name.
-        unique_length (int): Number of unique characters to generate.
+        unique_length (int): Number of characters in the process token.
         workspace_path (str): Path of workspace to create the dataset in.
 
     Returns:
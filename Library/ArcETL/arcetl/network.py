@@ -1,12 +1,16 @@
 """Network analysis operations."""
+import heapq
 import logging
+import multiprocessing
 
 import arcpy
 
 from arcetl import arcobj
 from arcetl import attributes
 from arcetl import dataset
-from arcetl.helpers import leveled_logger
+from arcetl import features
+from arcetl import geometry
+from arcetl.helpers import leveled_logger, unique_path
 from arcetl import workspace
 
 
@@ -24,9 +28,203 @@ TYPE_ID_FUNCTION_MAP = {
 """dict: Mapping of ArcGIS field type to function to get ID from analysis layer label."""
 
 
+class ClosestFacilitySolver(object):
+    """Interface for solving a closest-facility problem on a partition of locations.
+
+    Locations are handed to the solver as plain `(id, (x, y))` pairs, so the
+    partitioning & merging logic in `partitioned_closest_facility` does not depend on
+    the solving backend. Solvers must be picklable to be used in worker processes.
+    """
+
+    def solve(self, incidents, facilities):
+        """Generate route info dictionaries for each incident's closest facility.
+
+        Args:
+            incidents (list): Collection of (incident ID, (x, y)) pairs.
+            facilities (list): Collection of (facility ID, (x, y)) pairs.
+
+        Yields:
+            dict: The next incident's analysis result details.
+                Dictionary keys: 'dataset_id', 'facility_id', 'cost', 'geometry'.
+
+        """
+        raise NotImplementedError
+
+
+class NetworkClosestFacilitySolver(ClosestFacilitySolver):
+    """Closest-facility solver using an ArcGIS network dataset.
+
+    Each solve loads the given locations into temporary point datasets & runs
+    `closest_facility_route` on them.
+
+    Attributes:
+        network_path (str): Path of the network dataset.
+        cost_attribute (str): Name of the network cost attribute to use.
+        id_field_metadata (dict): Field metadata for the dataset ID field.
+        facility_id_field_metadata (dict): Field metadata for the facility ID field.
+        spatial_reference_id (int): Spatial reference ID for the locations.
+        route_kwargs (dict): Keyword arguments passed to `closest_facility_route`.
+    """
+
+    def __init__(
+        self,
+        network_path,
+        cost_attribute,
+        id_field_metadata,
+        facility_id_field_metadata,
+        spatial_reference_id,
+        **kwargs
+    ):
+        """Initialize instance.
+
+        Args:
+            network_path (str): Path of the network dataset.
+            cost_attribute (str): Name of the network cost attribute to use.
+            id_field_metadata (dict): Field metadata for the dataset ID field.
+            facility_id_field_metadata (dict): Field metadata for the facility ID
+                field.
+            spatial_reference_id (int): Spatial reference ID for the locations.
+            **kwargs: Arbitrary keyword arguments. See below.
+
+        Keyword Args:
+            max_cost (float): Maximum travel cost the search will attempt, in the cost
+                attribute's units.
+            restriction_attributes (iter): Collection of network restriction attribute
+                names to use.
+            travel_from_facility (bool): Flag to indicate performing the analysis
+                travelling from (True) or to (False) the facility. Default is False.
+            geometry_as_wkb (bool): Flag to yield route geometry as WKB bytes rather
+                than geometry objects. Useful for passing routes between processes.
+                Default is False.
+
+        """
+        self.network_path = network_path
+        self.cost_attribute = cost_attribute
+        # Only keep the picklable parts of the field metadata.
+        self.id_field_metadata = {
+            key: val for key, val in id_field_metadata.items() if key != 'object'
+        }
+        self.facility_id_field_metadata = {
+            key: val
+            for key, val in facility_id_field_metadata.items()
+            if key != 'object'
+        }
+        self.spatial_reference_id = spatial_reference_id
+        self.geometry_as_wkb = kwargs.pop('geometry_as_wkb', False)
+        self.route_kwargs = kwargs
+
+    def _create_locations(self, locations, id_field_metadata):
+        """Return path of new temporary point dataset with the given locations."""
+        meta = dict(id_field_metadata, name='location_id')
+        # Cannot create an OID-type field, so force to long.
+        if meta['type'] == 'oid':
+            meta['type'] = 'long'
+        path = unique_path('locations')
+        dataset.create(
+            path,
+            field_metadata_list=[meta],
+            geometry_type='point',
+            spatial_reference_item=self.spatial_reference_id,
+            log_level=None,
+        )
+        features.insert_from_iters(
+            path, locations, field_names=['location_id', 'shape@xy'], log_level=None
+        )
+        return path
+
+    def solve(self, incidents, facilities):
+        """Generate route info dictionaries for each incident's closest facility.
+
+        Routes are all solved before the first is yielded, so the temporary datasets
+        are deleted even if the generator is not run through.
+
+        Args:
+            incidents (list): Collection of (incident ID, (x, y)) pairs.
+            facilities (list): Collection of (facility ID, (x, y)) pairs.
+
+        Yields:
+            dict: The next incident's analysis result details.
+                Dictionary keys: 'dataset_id', 'facility_id', 'cost', 'geometry'.
+
+        """
+        path = {
+            'incident': self._create_locations(incidents, self.id_field_metadata)
+        }
+        try:
+            path['facility'] = self._create_locations(
+                facilities, self.facility_id_field_metadata
+            )
+            routes = list(
+                closest_facility_route(
+                    dataset_path=path['incident'],
+                    id_field_name='location_id',
+                    facility_path=path['facility'],
+                    facility_id_field_name='location_id',
+                    network_path=self.network_path,
+                    cost_attribute=self.cost_attribute,
+                    log_level=None,
+                    **self.route_kwargs
+                )
+            )
+        finally:
+            for _path in path.values():
+                dataset.delete(_path, log_level=None)
+        for route in routes:
+            if self.geometry_as_wkb and route['geometry'] is not None:
+                route['geometry'] = bytes(route['geometry'].WKB)
+            yield route
+
+
+def _solve_partition(task):
+    """Return list of route info dictionaries for a single partition.
+
+    Module-level so it can be sent to worker processes.
+
+    Args:
+        task (tuple): Solver, incidents, & candidate facilities for the partition.
+
+    Returns:
+        list of dict.
+
+    """
+    solver, incidents, facilities = task
+    return list(solver.solve(incidents, facilities))
+
+
 build = workspace.build_network  # pylint: disable=invalid-name
 
 
+def candidate_facilities(incidents, facilities, candidate_count):
+    """Return facilities that are straight-line k-nearest to any of the incidents.
+
+    Args:
+        incidents (iter): Collection of (incident ID, (x, y)) pairs.
+        facilities (list): Collection of (facility ID, (x, y)) pairs.
+        candidate_count (int): Number of nearest facilities to keep per incident.
+
+    Returns:
+        list: Candidate (facility ID, (x, y)) pairs, in original facility order.
+
+    """
+    if len(facilities) <= candidate_count:
+        return list(facilities)
+
+    keep = set()
+    for _, (x, y) in incidents:
+        nearest = heapq.nsmallest(
+            candidate_count,
+            range(len(facilities)),
+            key=lambda i: (
+                (facilities[i][1][0] - x) ** 2 + (facilities[i][1][1] - y) ** 2
+            ),
+        )
+        keep.update(nearest)
+        if len(keep) == len(facilities):
+            break
+
+    return [facility for i, facility in enumerate(facilities) if i in keep]
+
+
 def closest_facility_route(
     dataset_path,
     id_field_name,
@@ -172,6 +370,122 @@ def closest_facility_route(
     log("End: Generate.")
 
 
+def closest_facility_route_partitioned(
+    dataset_path,
+    id_field_name,
+    facility_path,
+    facility_id_field_name,
+    network_path,
+    cost_attribute,
+    **kwargs
+):
+    """Generate route info dictionaries for dataset features's closest facility.
+
+    Unlike `closest_facility_route`, which solves one problem for all features, this
+    tiles the dataset features spatially & solves each tile against its straight-line
+    nearest facilities. See `partitioned_closest_facility` for details.
+
+    Args:
+        dataset_path (str): Path of the dataset.
+        id_field_name (str): Name of the dataset ID field.
+        facility_path (str): Path of the facilities dataset.
+        facility_id_field_name (str): Name of the facility ID field.
+        network_path (str): Path of the network dataset.
+        cost_attribute (str): Name of the network cost attribute to use.
+        **kwargs: Arbitrary keyword arguments. See below.
+
+    Keyword Args:
+        dataset_where_sql (str): SQL where-clause for dataset subselection.
+        facility_where_sql (str): SQL where-clause for facility subselection.
+        max_cost (float): Maximum travel cost the search will attempt, in the cost
+            attribute's units.
+        restriction_attributes (iter): Collection of network restriction attribute
+            names to use.
+        travel_from_facility (bool): Flag to indicate performing the analysis
+            travelling from (True) or to (False) the facility. Default is False.
+        max_tile_count (int): Maximum number of features solved together. Default is
+            2048.
+        candidate_count (int): Number of straight-line nearest facilities kept for
+            each feature in a tile. Default is 4.
+        worker_count (int): Number of worker processes to solve tiles with. Default
+            is 1.
+        log_level (str): Level to log the function at. Default is 'info'.
+
+    Yields:
+        dict: The next feature's analysis result details.
+            Dictionary keys: 'dataset_id', 'facility_id', 'cost', 'geometry',
+            'cost' value (float) will match units of the cost_attribute.
+            'geometry' (arcpy.Geometry) will match spatial reference to the dataset.
+
+    """
+    kwargs.setdefault('dataset_where_sql')
+    kwargs.setdefault('facility_where_sql')
+    kwargs.setdefault('max_cost')
+    kwargs.setdefault('restriction_attributes')
+    kwargs.setdefault('travel_from_facility', False)
+    kwargs.setdefault('max_tile_count', 2048)
+    kwargs.setdefault('candidate_count', 4)
+    kwargs.setdefault('worker_count', 1)
+    log = leveled_logger(LOG, kwargs.setdefault('log_level', 'info'))
+    log(
+        "Start: Generate closest facility in %s to locations in %s (partitioned).",
+        facility_path,
+        dataset_path,
+    )
+    meta = {
+        'dataset': arcobj.dataset_metadata(dataset_path),
+        'id_field': {
+            'dataset': arcobj.field_metadata(dataset_path, id_field_name),
+            'facility': arcobj.field_metadata(facility_path, facility_id_field_name),
+        },
+    }
+    solver = NetworkClosestFacilitySolver(
+        network_path,
+        cost_attribute,
+        id_field_metadata=meta['id_field']['dataset'],
+        facility_id_field_metadata=meta['id_field']['facility'],
+        spatial_reference_id=meta['dataset']['spatial_reference_id'],
+        max_cost=kwargs['max_cost'],
+        restriction_attributes=kwargs['restriction_attributes'],
+        travel_from_facility=kwargs['travel_from_facility'],
+        # Geometry objects do not cross process boundaries well.
+        geometry_as_wkb=(kwargs['worker_count'] > 1),
+    )
+    routes = partitioned_closest_facility(
+        incidents=(
+            location
+            for location in attributes.as_iters(
+                dataset_path,
+                field_names=[id_field_name, 'shape@xy'],
+                dataset_where_sql=kwargs['dataset_where_sql'],
+            )
+            if location[1] is not None
+        ),
+        facilities=(
+            location
+            for location in attributes.as_iters(
+                facility_path,
+                field_names=[facility_id_field_name, 'shape@xy'],
+                dataset_where_sql=kwargs['facility_where_sql'],
+                spatial_reference_item=meta['dataset']['spatial_reference'],
+            )
+            if location[1] is not None
+        ),
+        solver=solver,
+        max_tile_count=kwargs['max_tile_count'],
+        candidate_count=kwargs['candidate_count'],
+        worker_count=kwargs['worker_count'],
+    )
+    for route in routes:
+        if solver.geometry_as_wkb and route['geometry'] is not None:
+            route['geometry'] = arcpy.FromWKB(
+                bytearray(route['geometry']), meta['dataset']['spatial_reference']
+            )
+        yield route
+
+    log("End: Generate.")
+
+
 def generate_service_areas(
     dataset_path, output_path, network_path, cost_attribute, max_distance, **kwargs
 ):
@@ -387,3 +701,62 @@ def generate_service_rings(
         )
     log("End: Generate.")
     return output_path
+
+
+def partitioned_closest_facility(incidents, facilities, solver, **kwargs):
+    """Generate closest-facility routes, solving spatial partitions independently.
+
+    Incidents are tiled spatially & each tile is solved against only the facilities
+    that are among the straight-line nearest to its incidents. The prefilter is a
+    heuristic: a facility that is far by straight line but near by network may be
+    missed if candidate_count is set too low.
+
+    Args:
+        incidents (iter): Collection of (incident ID, (x, y)) pairs.
+        facilities (iter): Collection of (facility ID, (x, y)) pairs.
+        solver (ClosestFacilitySolver): Solver to run on each partition.
+        **kwargs: Arbitrary keyword arguments. See below.
+
+    Keyword Args:
+        max_tile_count (int): Maximum number of incidents solved together. Default is
+            2048.
+        candidate_count (int): Number of straight-line nearest facilities kept for
+            each incident in a tile. Default is 4.
+        worker_count (int): Number of worker processes to solve tiles with. Default
+            is 1 (solve in this process).
+
+    Yields:
+        dict: Route info dictionary for an incident, one per incident with a route.
+            If an incident has routes from more than one tile, the least-cost route
+            is kept.
+
+    """
+    kwargs.setdefault('max_tile_count', 2048)
+    kwargs.setdefault('candidate_count', 4)
+    kwargs.setdefault('worker_count', 1)
+    facilities = list(facilities)
+    tasks = []
+    for tile in geometry.partition_locations(incidents, kwargs['max_tile_count']):
+        tile_facilities = candidate_facilities(
+            tile, facilities, kwargs['candidate_count']
+        )
+        if tile_facilities:
+            tasks.append((solver, tile, tile_facilities))
+    LOG.debug("Solving %s partitions.", len(tasks))
+    if kwargs['worker_count'] > 1 and len(tasks) > 1:
+        pool = multiprocessing.Pool(min(kwargs['worker_count'], len(tasks)))
+        try:
+            results = pool.map(_solve_partition, tasks, chunksize=1)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        results = (_solve_partition(task) for task in tasks)
+    incident_route = {}
+    for routes in results:
+        for route in routes:
+            current = incident_route.get(route['dataset_id'])
+            if current is None or route['cost'] < current['cost']:
+                incident_route[route['dataset_id']] = route
+    for route in incident_route.values():
+        yield route
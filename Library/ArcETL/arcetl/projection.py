@@ -0,0 +1,361 @@
+"""Coordinate projection operations.
+
+Projection math here works on plain coordinate sequences, with no ArcPy dependency,
+for the handful of spatial references the project uses. It transforms coordinates in
+bulk, without building a geometry object per feature.
+
+NAD83 (including HARN) & WGS84 are treated as one datum, as ArcGIS does when
+projecting without a geographic transformation. Lambert conformal conic projection
+is closed-form; transverse Mercator uses the sixth-order Krueger series (Karney
+2011), accurate to well under a millimeter across a UTM zone.
+"""
+from math import asinh, atan, atan2, atanh, cos, cosh, degrees, hypot, log
+from math import pi, radians, sin, sinh, sqrt, tan
+import logging
+
+try:
+    import pyproj
+except ImportError:
+    pyproj = None
+
+
+LOG = logging.getLogger(__name__)
+"""logging.Logger: Module-level logger."""
+
+FOOT_INTL = 0.3048
+"""float: Length of an international foot in meters."""
+GRS80 = (6378137.0, 1 / 298.257222101)
+"""tuple: Semi-major axis (meters) & flattening of the GRS 1980 ellipsoid."""
+WGS84 = (6378137.0, 1 / 298.257223563)
+"""tuple: Semi-major axis (meters) & flattening of the WGS 1984 ellipsoid."""
+
+
+class Geographic(object):
+    """Geographic (longitude/latitude in degrees) coordinate system."""
+
+    is_geographic = True
+
+    def forward(self, lons, lats):
+        """Return coordinates from longitudes & latitudes (unchanged)."""
+        return list(lons), list(lats)
+
+    def inverse(self, xs, ys):
+        """Return longitudes & latitudes from coordinates (unchanged)."""
+        return list(xs), list(ys)
+
+
+class LambertConformalConic(object):
+    """Lambert conformal conic projection with two standard parallels.
+
+    Attributes:
+        unit (float): Length of the coordinate linear unit, in meters.
+    """
+
+    is_geographic = False
+
+    def __init__(self, ellipsoid, origin, standard_parallels, false_origin, unit=1.0):
+        """Initialize instance.
+
+        Args:
+            ellipsoid (tuple): Semi-major axis (meters) & flattening.
+            origin (tuple): Longitude & latitude of origin, in degrees.
+            standard_parallels (tuple): Latitudes of standard parallels, in degrees.
+            false_origin (tuple): False easting & northing, in meters.
+            unit (float): Length of the coordinate linear unit, in meters.
+        """
+        self.a, flattening = ellipsoid
+        self.e = sqrt(flattening * (2 - flattening))
+        self.lon0 = radians(origin[0])
+        self.false_easting, self.false_northing = false_origin
+        self.unit = unit
+        lat1, lat2 = (radians(lat) for lat in standard_parallels)
+        m1, m2 = self._m(lat1), self._m(lat2)
+        t0, t1, t2 = (self._t(lat) for lat in (radians(origin[1]), lat1, lat2))
+        self.n = (log(m1) - log(m2)) / (log(t1) - log(t2))
+        self.af = self.a * m1 / (self.n * t1 ** self.n)
+        self.r0 = self.af * t0 ** self.n
+
+    def _m(self, lat):
+        return cos(lat) / sqrt(1 - (self.e * sin(lat)) ** 2)
+
+    def _t(self, lat):
+        e_sin = self.e * sin(lat)
+        return tan(pi / 4 - lat / 2) / ((1 - e_sin) / (1 + e_sin)) ** (self.e / 2)
+
+    def forward(self, lons, lats):
+        """Return projected coordinates from longitudes & latitudes (degrees)."""
+        e, n, af, r0, lon0 = self.e, self.n, self.af, self.r0, self.lon0
+        false_easting, false_northing = self.false_easting, self.false_northing
+        unit = self.unit
+        xs, ys = [], []
+        for lon, lat in zip(lons, lats):
+            if lon is None or lat is None:
+                xs.append(None)
+                ys.append(None)
+                continue
+
+            lat = radians(lat)
+            e_sin = e * sin(lat)
+            t = tan(pi / 4 - lat / 2) / ((1 - e_sin) / (1 + e_sin)) ** (e / 2)
+            r = af * t ** n
+            theta = n * (radians(lon) - lon0)
+            xs.append((false_easting + r * sin(theta)) / unit)
+            ys.append((false_northing + r0 - r * cos(theta)) / unit)
+        return xs, ys
+
+    def inverse(self, xs, ys):
+        """Return longitudes & latitudes (degrees) from projected coordinates."""
+        e, n, af, r0, lon0 = self.e, self.n, self.af, self.r0, self.lon0
+        false_easting, false_northing = self.false_easting, self.false_northing
+        unit = self.unit
+        sign = 1.0 if n > 0 else -1.0
+        lons, lats = [], []
+        for x, y in zip(xs, ys):
+            if x is None or y is None:
+                lons.append(None)
+                lats.append(None)
+                continue
+
+            dx = x * unit - false_easting
+            dy = r0 - (y * unit - false_northing)
+            r = sign * hypot(dx, dy)
+            t = (r / af) ** (1 / n)
+            lat = pi / 2 - 2 * atan(t)
+            for _ in range(15):
+                e_sin = e * sin(lat)
+                next_lat = pi / 2 - 2 * atan(
+                    t * ((1 - e_sin) / (1 + e_sin)) ** (e / 2)
+                )
+                if abs(next_lat - lat) < 1e-14:
+                    lat = next_lat
+                    break
+
+                lat = next_lat
+            lons.append(degrees(atan2(sign * dx, sign * dy) / n + lon0))
+            lats.append(degrees(lat))
+        return lons, lats
+
+
+class TransverseMercator(object):
+    """Transverse Mercator projection, by Krueger series.
+
+    Attributes:
+        unit (float): Length of the coordinate linear unit, in meters.
+    """
+
+    is_geographic = False
+
+    def __init__(self, ellipsoid, origin, scale_factor, false_origin, unit=1.0):
+        """Initialize instance.
+
+        Args:
+            ellipsoid (tuple): Semi-major axis (meters) & flattening.
+            origin (tuple): Longitude & latitude of origin, in degrees.
+            scale_factor (float): Scale factor on the central meridian.
+            false_origin (tuple): False easting & northing, in meters.
+            unit (float): Length of the coordinate linear unit, in meters.
+        """
+        a, flattening = ellipsoid
+        self.e = sqrt(flattening * (2 - flattening))
+        n = flattening / (2 - flattening)
+        self.k0_a = (
+            scale_factor * a / (1 + n) * (1 + n ** 2 / 4 + n ** 4 / 64 + n ** 6 / 256)
+        )
+        self.alpha = [
+            n / 2 - 2 * n ** 2 / 3 + 5 * n ** 3 / 16 + 41 * n ** 4 / 180
+            - 127 * n ** 5 / 288 + 7891 * n ** 6 / 37800,
+            13 * n ** 2 / 48 - 3 * n ** 3 / 5 + 557 * n ** 4 / 1440
+            + 281 * n ** 5 / 630 - 1983433 * n ** 6 / 1935360,
+            61 * n ** 3 / 240 - 103 * n ** 4 / 140 + 15061 * n ** 5 / 26880
+            + 167603 * n ** 6 / 181440,
+            49561 * n ** 4 / 161280 - 179 * n ** 5 / 168 + 6601661 * n ** 6 / 7257600,
+            34729 * n ** 5 / 80640 - 3418889 * n ** 6 / 1995840,
+            212378941 * n ** 6 / 319334400,
+        ]
+        self.beta = [
+            n / 2 - 2 * n ** 2 / 3 + 37 * n ** 3 / 96 - n ** 4 / 360
+            - 81 * n ** 5 / 512 + 96199 * n ** 6 / 604800,
+            n ** 2 / 48 + n ** 3 / 15 - 437 * n ** 4 / 1440 + 46 * n ** 5 / 105
+            - 1118711 * n ** 6 / 3870720,
+            17 * n ** 3 / 480 - 37 * n ** 4 / 840 - 209 * n ** 5 / 4480
+            + 5569 * n ** 6 / 90720,
+            4397 * n ** 4 / 161280 - 11 * n ** 5 / 504 - 830251 * n ** 6 / 7257600,
+            4583 * n ** 5 / 161280 - 108847 * n ** 6 / 3991680,
+            20648693 * n ** 6 / 638668800,
+        ]
+        self.lon0 = radians(origin[0])
+        self.false_easting = false_origin[0]
+        self.false_northing = false_origin[1]
+        self.unit = unit
+        # Northing of the latitude of origin on the central meridian.
+        self.false_northing -= self._forward(radians(origin[1]), 0.0)[1]
+
+    def _forward(self, lat, dlon):
+        """Return unscaled-origin easting & northing (meters) for radians."""
+        e = self.e
+        tau = sinh(asinh(tan(lat)) - e * atanh(e * sin(lat)))
+        xi = atan2(tau, cos(dlon))
+        eta = asinh(sin(dlon) / hypot(tau, cos(dlon)))
+        x, y = eta, xi
+        for j, alpha in enumerate(self.alpha, start=1):
+            x += alpha * cos(2 * j * xi) * sinh(2 * j * eta)
+            y += alpha * sin(2 * j * xi) * cosh(2 * j * eta)
+        return self.k0_a * x, self.k0_a * y
+
+    def forward(self, lons, lats):
+        """Return projected coordinates from longitudes & latitudes (degrees)."""
+        e, k0_a, alphas, lon0 = self.e, self.k0_a, self.alpha, self.lon0
+        false_easting, false_northing = self.false_easting, self.false_northing
+        unit = self.unit
+        orders = [2 * j for j in range(1, len(alphas) + 1)]
+        xs, ys = [], []
+        for lon, lat in zip(lons, lats):
+            if lon is None or lat is None:
+                xs.append(None)
+                ys.append(None)
+                continue
+
+            lat, dlon = radians(lat), radians(lon) - lon0
+            tau = sinh(asinh(tan(lat)) - e * atanh(e * sin(lat)))
+            cos_dlon = cos(dlon)
+            xi = atan2(tau, cos_dlon)
+            eta = asinh(sin(dlon) / hypot(tau, cos_dlon))
+            x, y = eta, xi
+            for order, alpha in zip(orders, alphas):
+                x += alpha * cos(order * xi) * sinh(order * eta)
+                y += alpha * sin(order * xi) * cosh(order * eta)
+            xs.append((false_easting + k0_a * x) / unit)
+            ys.append((false_northing + k0_a * y) / unit)
+        return xs, ys
+
+    def inverse(self, xs, ys):
+        """Return longitudes & latitudes (degrees) from projected coordinates."""
+        e, k0_a, betas, lon0 = self.e, self.k0_a, self.beta, self.lon0
+        false_easting, false_northing = self.false_easting, self.false_northing
+        unit = self.unit
+        one_e2 = 1 - e * e
+        orders = [2 * j for j in range(1, len(betas) + 1)]
+        lons, lats = [], []
+        for x, y in zip(xs, ys):
+            if x is None or y is None:
+                lons.append(None)
+                lats.append(None)
+                continue
+
+            eta = (x * unit - false_easting) / k0_a
+            xi = (y * unit - false_northing) / k0_a
+            eta_prime, xi_prime = eta, xi
+            for order, beta in zip(orders, betas):
+                eta_prime -= beta * cos(order * xi) * sinh(order * eta)
+                xi_prime -= beta * sin(order * xi) * cosh(order * eta)
+            # Conformal latitude tangent to geodetic latitude tangent (Newton).
+            tau_prime = sin(xi_prime) / hypot(sinh(eta_prime), cos(xi_prime))
+            tau = tau_prime
+            for _ in range(5):
+                sqrt_tau = sqrt(1 + tau * tau)
+                sigma = sinh(e * atanh(e * tau / sqrt_tau))
+                tau_i = tau * sqrt(1 + sigma * sigma) - sigma * sqrt_tau
+                delta = (
+                    (tau_prime - tau_i)
+                    / sqrt(1 + tau_i * tau_i)
+                    * (1 + one_e2 * tau * tau)
+                    / (one_e2 * sqrt_tau)
+                )
+                tau += delta
+                if abs(delta) < 1e-15:
+                    break
+
+            lons.append(degrees(lon0 + atan2(sinh(eta_prime), cos(xi_prime))))
+            lats.append(degrees(atan(tau)))
+        return lons, lats
+
+
+PROJECTION = {
+    2913: LambertConformalConic(
+        GRS80, (-120.5, 43 + 40 / 60.0), (46.0, 44 + 20 / 60.0), (2500000.0, 0.0),
+        unit=FOOT_INTL,
+    ),
+    2914: LambertConformalConic(
+        GRS80, (-120.5, 41 + 40 / 60.0), (44.0, 42 + 20 / 60.0), (1500000.0, 0.0),
+        unit=FOOT_INTL,
+    ),
+    2992: LambertConformalConic(
+        GRS80, (-120.5, 41.75), (43.0, 45.5), (400000.0, 0.0), unit=FOOT_INTL
+    ),
+    4269: Geographic(),
+    4326: Geographic(),
+    26910: TransverseMercator(GRS80, (-123.0, 0.0), 0.9996, (500000.0, 0.0)),
+    32610: TransverseMercator(WGS84, (-123.0, 0.0), 0.9996, (500000.0, 0.0)),
+}
+"""dict: Mapping of spatial reference ID to projection object.
+
+2913: NAD83(HARN) Oregon State Plane North (international feet).
+2914: NAD83(HARN) Oregon State Plane South (international feet); Lane County data.
+2992: NAD83 Oregon Statewide Lambert (international feet).
+4269: NAD83 geographic.
+4326: WGS84 geographic.
+26910: NAD83 UTM zone 10N.
+32610: WGS84 UTM zone 10N.
+"""
+
+
+def is_supported(*spatial_reference_ids):
+    """Return True if all spatial references have projection math here.
+
+    Args:
+        *spatial_reference_ids: Spatial reference IDs (EPSG/WKID codes).
+
+    Returns:
+        bool
+    """
+    return all(srid in PROJECTION for srid in spatial_reference_ids)
+
+
+def transform(xs, ys, from_spatial_reference_id, to_spatial_reference_id, **kwargs):
+    """Return coordinates transformed between spatial references, in bulk.
+
+    Args:
+        xs (iter): Collection of x-coordinates (longitudes, if geographic). None
+            values pass through as None.
+        ys (iter): Collection of y-coordinates (latitudes, if geographic).
+        from_spatial_reference_id (int): Spatial reference ID of the coordinates.
+        to_spatial_reference_id (int): Spatial reference ID to transform to.
+        **kwargs: Arbitrary keyword arguments. See below.
+
+    Keyword Args:
+        use_pyproj (bool): Transform with pyproj if it is installed. Default is
+            False.
+
+    Returns:
+        tuple: List of x-coordinates & list of y-coordinates.
+
+    Raises:
+        ValueError: If either spatial reference is not supported.
+    """
+    if not is_supported(from_spatial_reference_id, to_spatial_reference_id):
+        raise ValueError(
+            "Projection from {} to {} not supported.".format(
+                from_spatial_reference_id, to_spatial_reference_id
+            )
+        )
+
+    xs, ys = list(xs), list(ys)
+    if from_spatial_reference_id == to_spatial_reference_id:
+        return xs, ys
+
+    if kwargs.get("use_pyproj") and pyproj is not None:
+        transformer = pyproj.Transformer.from_crs(
+            from_spatial_reference_id, to_spatial_reference_id, always_xy=True
+        )
+        missing = [x is None or y is None for x, y in zip(xs, ys)]
+        result = transformer.transform(
+            [0.0 if skip else x for skip, x in zip(missing, xs)],
+            [0.0 if skip else y for skip, y in zip(missing, ys)],
+        )
+        return tuple(
+            [None if skip else coord for skip, coord in zip(missing, coords)]
+            for coords in result
+        )
+
+    lons, lats = PROJECTION[from_spatial_reference_id].inverse(xs, ys)
+    return PROJECTION[to_spatial_reference_id].forward(lons, lats)
@@ -6,6 +6,7 @@ import arcpy
 from arcetl import arcobj
 from arcetl import attributes
 from arcetl import dataset
+from arcetl import geometry
 from arcetl.helpers import unique_path
 
 
@@ -89,3 +90,60 @@ def id_near_info_map(
             }
     dataset.delete(temp_near_path, log_level=None)
     return near_info_map
+
+
+def points_in_polygons(
+    dataset_path, id_field_name, polygon_dataset_path, polygon_field_name, **kwargs
+):
+    """Return mapping of point feature IDs to values of polygons they are within.
+
+    Matching runs in-process, without temporary datasets: polygon extents are indexed
+    in an STR-tree & candidate points tested by ray casting.
+
+    Args:
+        dataset_path (str): Path of the point dataset.
+        id_field_name (str): Name of point ID field.
+        polygon_dataset_path (str): Path of the polygon dataset.
+        polygon_field_name (str): Name of the polygon field with values to map.
+        **kwargs: Arbitrary keyword arguments. See below.
+
+    Keyword Args:
+        dataset_where_sql (str): SQL where-clause for point dataset subselection.
+        polygon_where_sql (str): SQL where-clause for polygon dataset subselection.
+        tolerance (float): Distance from a polygon boundary within which a point still
+            counts as within, in units of the point dataset's spatial reference.
+            Points exactly on a boundary are always within. Default is 0.
+
+    Returns:
+        dict: Mapping of point ID to set of polygon values. Points without geometry
+            or not within any polygon map to an empty set.
+
+    """
+    kwargs.setdefault('dataset_where_sql')
+    kwargs.setdefault('polygon_where_sql')
+    kwargs.setdefault('tolerance', 0.0)
+    meta = {'dataset': arcobj.dataset_metadata(dataset_path)}
+    point_values = {}
+    points = []
+    for point_id, xy in attributes.as_iters(
+        dataset_path,
+        [id_field_name, 'shape@xy'],
+        dataset_where_sql=kwargs['dataset_where_sql'],
+    ):
+        point_values[point_id] = set()
+        if xy is not None and None not in xy:
+            points.append((point_id, xy))
+    polygons = (
+        (value, geometry.polygon_from_wkb(wkb))
+        for value, wkb in attributes.as_iters(
+            polygon_dataset_path,
+            [polygon_field_name, 'shape@wkb'],
+            dataset_where_sql=kwargs['polygon_where_sql'],
+            spatial_reference_item=meta['dataset']['spatial_reference'],
+        )
+        if wkb
+    )
+    matches = geometry.point_polygon_matches(points, polygons, kwargs['tolerance'])
+    for point_id, value in matches:
+        point_values[point_id].add(value)
+    return point_values
@@ -0,0 +1,336 @@
+"""SQL pushdown of attribute updates.
+
+Attribute updates on a dataset stored in a SQL database (e.g. an enterprise
+geodatabase) can run as one set-based UPDATE statement in that database, rather than
+pulling every row through a Python cursor. The planner here translates an update
+spec into that statement. Updates it cannot translate, or that would bypass
+geodatabase behavior (versioned or archived data, geometry), are left to the cursor.
+
+Update specs are dictionaries, in one of these forms:
+    {"value": value}: Assign constant value (None clears values to null).
+    {"expression": sql}: Assign value of a SQL expression on the row's fields.
+    {"join_table": name, "join_field_name": name, "on_field_pairs": pairs}: Assign
+        value of a field in another table in the same database, joined on the
+        (field name, join field name) pairs. Rows with no join are set to null.
+
+Statements use qmark-style parameters (as pyodbc & sqlite3 do).
+"""
+from collections import Counter, namedtuple
+import datetime
+import logging
+import numbers
+import sys
+import uuid
+
+
+if sys.version_info.major >= 3:
+    basestring = str
+    """Defining a basestring type instance for Py3+."""
+
+
+LOG = logging.getLogger(__name__)
+"""logging.Logger: Module-level logger."""
+
+DIALECTS = ["mssql", "postgresql", "sqlite"]
+"""list: Names of SQL dialects statements can be generated for."""
+SCALAR_TYPES = (basestring, numbers.Number, datetime.date, datetime.time, uuid.UUID)
+"""tuple: Types of constant values that can be passed as statement parameters."""
+UNSUPPORTED_FIELD_TYPES = ["blob", "geometry", "globalid", "oid", "raster"]
+"""list: Field types (as in field metadata) that updates are never pushed down for."""
+
+
+Statement = namedtuple("Statement", ["sql", "parameters"])
+"""SQL statement with its parameters.
+
+Attributes:
+    sql (str): SQL statement, with qmark-style parameter markers.
+    parameters (list): Parameter values, in marker order.
+"""
+UpdatePlan = namedtuple("UpdatePlan", ["count", "update"])
+"""Plan for a pushed-down update.
+
+Attributes:
+    count (Statement): Statement counting the rows in the update subset.
+    update (Statement): Statement updating the rows with changed values.
+"""
+
+
+def _changed_sql(old_sql, new_sql, binary_collation=None):
+    """Return SQL condition true where the new value differs from the old one."""
+    if binary_collation:
+        old_sql = "{} COLLATE {}".format(old_sql, binary_collation)
+        new_sql = "{} COLLATE {}".format(new_sql, binary_collation)
+    return (
+        "({old} <> {new} OR ({old} IS NULL AND {new} IS NOT NULL)"
+        " OR ({old} IS NOT NULL AND {new} IS NULL))"
+    ).format(old=old_sql, new=new_sql)
+
+
+def _quoted(identifier):
+    """Return SQL identifier, each dot-separated part quoted."""
+    return ".".join(
+        '"{}"'.format(part.replace('"', '""')) for part in identifier.split(".")
+    )
+
+
+def _spec_form(spec):
+    """Return form of update spec ("value", "expression", or "join").
+
+    Raises:
+        ValueError: If spec is not one of the known forms.
+    """
+    if set(spec) == {"value"}:
+        return "value"
+
+    if set(spec) == {"expression"}:
+        return "expression"
+
+    if set(spec) == {"join_table", "join_field_name", "on_field_pairs"}:
+        return "join"
+
+    raise ValueError("Invalid update spec keys: {}.".format(sorted(spec)))
+
+
+def count_statement(table_name, dataset_where_sql=None):
+    """Return statement counting the rows of a table subset.
+
+    Args:
+        table_name (str): Name of the table.
+        dataset_where_sql (str): SQL where-clause for table subselection.
+
+    Returns:
+        Statement.
+    """
+    sql = "SELECT COUNT(*) FROM {}".format(_quoted(table_name))
+    if dataset_where_sql:
+        sql += " WHERE ({})".format(dataset_where_sql)
+    return Statement(sql, [])
+
+
+def execute_plan(connection, plan):
+    """Execute update plan in a single transaction.
+
+    Args:
+        connection: DB-API connection to the database holding the dataset.
+        plan (UpdatePlan): Plan to execute.
+
+    Returns:
+        collections.Counter: Counts for each feature action.
+    """
+    cursor = connection.cursor()
+    try:
+        cursor.execute(plan.count.sql, plan.count.parameters)
+        (row_count,) = cursor.fetchone()
+        cursor.execute(plan.update.sql, plan.update.parameters)
+        altered_count = cursor.rowcount
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+
+    finally:
+        cursor.close()
+    update_action_count = Counter()
+    if altered_count:
+        update_action_count["altered"] = altered_count
+    if row_count - altered_count:
+        update_action_count["unchanged"] = row_count - altered_count
+    return update_action_count
+
+
+def plan_update(dataset_meta, field_name, spec, **kwargs):
+    """Return plan pushing an attribute update down to SQL, or None if unsupported.
+
+    Args:
+        dataset_meta (dict): Dataset metadata, as from `arcobj.dataset_metadata`.
+        field_name (str): Name of the field to update.
+        spec (dict): Update spec (see module docstring).
+        **kwargs: Arbitrary keyword arguments. See below.
+
+    Keyword Args:
+        dataset_where_sql (str): SQL where-clause for dataset subselection.
+        join_dataset_meta (dict): Metadata of the join dataset, for a join spec.
+        dialect (str): SQL dialect of the database. Default is "mssql".
+
+    Returns:
+        UpdatePlan, None: Plan for the update; None if it cannot be pushed down.
+    """
+    kwargs.setdefault("dataset_where_sql")
+    kwargs.setdefault("dialect", "mssql")
+    reason = unsupported_reason(
+        dataset_meta, field_name, spec, kwargs.get("join_dataset_meta")
+    )
+    if reason:
+        LOG.info("Update of %s not pushed down to SQL: %s.", field_name, reason)
+        return None
+
+    field_type = next(
+        field["type"]
+        for field in dataset_meta["fields"]
+        if field["name"].lower() == field_name.lower()
+    )
+    return UpdatePlan(
+        count=count_statement(dataset_meta["name"], kwargs["dataset_where_sql"]),
+        update=update_statement(
+            dataset_meta["name"],
+            field_name,
+            spec,
+            dataset_where_sql=kwargs["dataset_where_sql"],
+            oid_field_name=dataset_meta["oid_field_name"],
+            is_text=(field_type in ["string", "text"]),
+            dialect=kwargs["dialect"],
+        ),
+    )
+
+
+def unsupported_reason(dataset_meta, field_name, spec, join_dataset_meta=None):
+    """Return reason an update cannot be pushed down to SQL, or None if it can.
+
+    Args:
+        dataset_meta (dict): Dataset metadata, as from `arcobj.dataset_metadata`.
+        field_name (str): Name of the field to update.
+        spec (dict): Update spec (see module docstring).
+        join_dataset_meta (dict): Metadata of the join dataset, for a join spec.
+
+    Returns:
+        str, None.
+    """
+    form = _spec_form(spec)
+    # Versioned edits & archive rows are kept by the geodatabase client, not SQL.
+    for meta in [dataset_meta, join_dataset_meta]:
+        if meta and meta["is_versioned"]:
+            return "{} is versioned".format(meta["name"])
+
+        if meta and getattr(meta["object"], "isArchived", False):
+            return "{} is archived".format(meta["name"])
+
+    field = next(
+        (
+            field
+            for field in dataset_meta["fields"]
+            if field["name"].lower() == field_name.lower()
+        ),
+        None,
+    )
+    if field is None:
+        return "field not in {}".format(dataset_meta["name"])
+
+    if field["type"] in UNSUPPORTED_FIELD_TYPES:
+        return "{} field".format(field["type"])
+
+    if form == "value" and not (
+        spec["value"] is None or isinstance(spec["value"], SCALAR_TYPES)
+    ):
+        return "value type {}".format(type(spec["value"]).__name__)
+
+    if form == "join":
+        if not join_dataset_meta:
+            return "no join dataset metadata"
+
+        if not dataset_meta["oid_field_name"]:
+            return "{} has no object ID".format(dataset_meta["name"])
+
+    return None
+
+
+def update_statement(table_name, field_name, spec, **kwargs):
+    """Return statement updating field values in a table.
+
+    Only rows whose value changes are updated, so the statement's row count is the
+    count of altered rows.
+
+    Args:
+        table_name (str): Name of the table.
+        field_name (str): Name of the field to update.
+        spec (dict): Update spec (see module docstring).
+        **kwargs: Arbitrary keyword arguments. See below.
+
+    Keyword Args:
+        dataset_where_sql (str): SQL where-clause for table subselection.
+        oid_field_name (str): Name of the table's object ID field. Required for join
+            specs.
+        is_text (bool): Field is text. On mssql, text compares with binary
+            collation, so case-only changes are not missed. Default is False.
+        dialect (str): SQL dialect of the database. Default is "mssql".
+
+    Returns:
+        Statement.
+
+    Raises:
+        ValueError: If spec or dialect is invalid.
+    """
+    kwargs.setdefault("dataset_where_sql")
+    kwargs.setdefault("dialect", "mssql")
+    if kwargs["dialect"] not in DIALECTS:
+        raise ValueError("Invalid dialect {!r}.".format(kwargs["dialect"]))
+
+    form = _spec_form(spec)
+    binary_collation = (
+        "Latin1_General_BIN2"
+        if kwargs.get("is_text") and kwargs["dialect"] == "mssql"
+        else None
+    )
+    field_sql = _quoted(field_name)
+    if form in ["value", "expression"]:
+        parameters = []
+        if form == "expression":
+            new_sql = "({})".format(spec["expression"])
+            condition_sql = _changed_sql(field_sql, new_sql, binary_collation)
+        elif spec["value"] is None:
+            new_sql = "NULL"
+            condition_sql = "{} IS NOT NULL".format(field_sql)
+        else:
+            new_sql = "?"
+            old_sql = field_sql
+            if binary_collation:
+                old_sql += " COLLATE " + binary_collation
+            condition_sql = "({} <> ? OR {} IS NULL)".format(old_sql, field_sql)
+            parameters = [spec["value"], spec["value"]]
+        sql = "UPDATE {} SET {} = {} WHERE ".format(
+            _quoted(table_name), field_sql, new_sql
+        )
+        if kwargs["dataset_where_sql"]:
+            sql += "({}) AND ".format(kwargs["dataset_where_sql"])
+        return Statement(sql + condition_sql, parameters)
+
+    # Join: subset rows in a subquery, so the where-clause's field names cannot
+    # collide with the join table's.
+    oid_sql = _quoted(kwargs["oid_field_name"])
+    source_sql = "(SELECT {} AS source_oid, {} FROM {}{}) AS source".format(
+        oid_sql,
+        ", ".join(_quoted(name) for name, _ in spec["on_field_pairs"]),
+        _quoted(table_name),
+        " WHERE ({})".format(kwargs["dataset_where_sql"])
+        if kwargs["dataset_where_sql"]
+        else "",
+    )
+    join_sql = "LEFT JOIN {} AS joined ON {}".format(
+        _quoted(spec["join_table"]),
+        " AND ".join(
+            "joined.{} = source.{}".format(_quoted(join_name), _quoted(name))
+            for name, join_name in spec["on_field_pairs"]
+        ),
+    )
+    new_sql = "joined." + _quoted(spec["join_field_name"])
+    condition_sql = _changed_sql("target." + field_sql, new_sql, binary_collation)
+    if kwargs["dialect"] == "mssql":
+        sql = (
+            "UPDATE target SET {field} = {new} FROM {table} AS target"
+            " INNER JOIN {source} ON target.{oid} = source.source_oid {join}"
+            " WHERE {condition}"
+        )
+    else:
+        sql = (
+            "UPDATE {table} AS target SET {field} = {new} FROM {source} {join}"
+            " WHERE target.{oid} = source.source_oid AND {condition}"
+        )
+    sql = sql.format(
+        field=field_sql,
+        new=new_sql,
+        table=_quoted(table_name),
+        source=source_sql,
+        oid=oid_sql,
+        join=join_sql,
+        condition=condition_sql,
+    )
+    return Statement(sql, [])
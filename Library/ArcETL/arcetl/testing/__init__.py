@@ -0,0 +1,5 @@
+"""Testing support objects for ArcETL.
+
+Nothing here may import ArcPy (or other ArcETL submodules that do): the fake
+ArcPy must be installable before those are imported.
+"""
@@ -0,0 +1,183 @@
+"""In-memory stand-in for the subset of ArcPy that ArcETL uses.
+
+Allows running & benchmarking ArcETL without ArcGIS. Covers `arcpy.da` cursors &
+editor, `Describe`, `Exists`, `ListFields`, simple planar geometry objects, and
+the `arcpy.management` tools for creating, viewing, copying & deleting datasets.
+Datasets live in a process-wide catalog until deleted or `reset()` is called.
+
+Usage:
+    Call `install()` before importing arcetl, or set the environment variable
+    `ARCETL_FAKE_ARCPY=1` to have arcetl install it on import.
+"""
+import os
+import sys
+
+from arcetl.testing.fakearcpy import da
+from arcetl.testing.fakearcpy import management
+from arcetl.testing.fakearcpy import tables
+from arcetl.testing.fakearcpy.geometries import (  # pylint: disable=unused-import
+    Array,
+    Extent,
+    FromWKB,
+    FromWKT,
+    Geometry,
+    Multipoint,
+    Point,
+    PointGeometry,
+    Polygon,
+    Polyline,
+)
+from arcetl.testing.fakearcpy.sql import matches_wildcard
+from arcetl.testing.fakearcpy.tables import (  # pylint: disable=unused-import
+    Field,
+    FieldInfo,
+    SpatialReference,
+)
+
+
+IS_FAKE = True
+"""bool: Flag to tell the fake apart from the real ArcPy."""
+SHAPE_TYPE = {
+    "multipoint": "Multipoint",
+    "point": "Point",
+    "polygon": "Polygon",
+    "polyline": "Polyline",
+}
+"""dict: Mapping of geometry type to describe shape type."""
+
+
+class ExecuteError(Exception):
+    """Geoprocessing tool execution error."""
+
+
+class _Describe(object):
+    """Describe object for a fake dataset, view, or workspace."""
+
+
+class _Environment(object):
+    """Geoprocessing environment settings."""
+
+    def __init__(self):
+        self.overwriteOutput = True
+        self.outputCoordinateSystem = None
+        self.scratchGDB = "in_memory"
+        self.workspace = None
+        self.XYTolerance = None
+
+
+env = _Environment()  # pylint: disable=invalid-name
+
+
+def CheckInExtension(product):
+    """Return status of checking in extension."""
+    return "CheckedIn"
+
+
+def CheckOutExtension(product):
+    """Return status of checking out extension."""
+    return "CheckedOut"
+
+
+def Describe(value, data_type=None):
+    """Return describe object for a dataset, view, or workspace."""
+    key = tables.normalized(value)
+    describe = _Describe()
+    if key in tables.WORKSPACES:
+        describe.name = os.path.basename(str(value))
+        describe.baseName = describe.name
+        describe.catalogPath = str(value)
+        describe.path = os.path.dirname(str(value))
+        describe.dataType = "Workspace"
+        if key == "in_memory":
+            describe.workspaceFactoryProgID = (
+                "esriDataSourcesGDB.InMemoryWorkspaceFactory"
+            )
+        elif key.endswith(".gdb"):
+            describe.workspaceFactoryProgID = "esriDataSourcesGDB.FileGDBWorkspaceFactory"
+        else:
+            describe.workspaceFactoryProgID = ""
+        return describe
+
+    item = tables.get(value)
+    table, _, hidden = tables.resolve(value)
+    describe.name = item.name
+    describe.baseName = item.name
+    describe.catalogPath = table.path
+    describe.path = table.workspace_path
+    describe.hasOID = True
+    describe.OIDFieldName = table.oid_field_name
+    describe.isVersioned = False
+    describe.fields = [
+        field for field in table.fields if field.name.lower() not in hidden
+    ]
+    describe.indexes = []
+    if table.geometry_type:
+        describe.dataType = (
+            "FeatureLayer" if isinstance(item, tables.View) else "FeatureClass"
+        )
+        describe.shapeType = SHAPE_TYPE[table.geometry_type]
+        describe.shapeFieldName = table.shape_field_name
+        describe.spatialReference = table.spatial_reference or SpatialReference()
+        describe.hasM = describe.hasZ = False
+    else:
+        describe.dataType = "TableView" if isinstance(item, tables.View) else "Table"
+    return describe
+
+
+def Exists(dataset):
+    """Return True if dataset, view, or workspace exists."""
+    key = tables.normalized(dataset)
+    return key in tables.CATALOG or key in tables.WORKSPACES
+
+
+def GetMessages(severity=0):
+    """Return geoprocessing messages (none are kept)."""
+    return ""
+
+
+def GetReturnCode(message_index):
+    """Return message code (none are kept)."""
+    return 0
+
+
+def ListFields(dataset, wild_card=None, field_type=None):
+    """Return list of field objects on dataset."""
+    fields = Describe(dataset).fields
+    return [
+        field
+        for field in fields
+        if matches_wildcard(field.name, wild_card)
+        and (field_type in (None, "All") or field.type.lower() == field_type.lower())
+    ]
+
+
+def install():
+    """Install fake ArcPy as the `arcpy` module (import hook).
+
+    Subsequent `import arcpy` statements get this module.
+
+    Returns:
+        module: The fake ArcPy module.
+    """
+    module = sys.modules[__name__]
+    sys.modules["arcpy"] = module
+    sys.modules["arcpy.da"] = da
+    sys.modules["arcpy.management"] = management
+    return module
+
+
+def reset():
+    """Remove all fake datasets & restore default environment settings."""
+    tables.clear()
+    env.__init__()
+
+
+def uninstall():
+    """Remove fake ArcPy from the `arcpy` module slot, if installed."""
+    for name, module in [
+        ("arcpy", sys.modules[__name__]),
+        ("arcpy.da", da),
+        ("arcpy.management", management),
+    ]:
+        if sys.modules.get(name) is module:
+            del sys.modules[name]
@@ -0,0 +1,326 @@
+"""Fake `arcpy.da` data access objects on in-memory tables."""
+from operator import itemgetter
+import re
+
+from arcetl.testing.fakearcpy import geometries
+from arcetl.testing.fakearcpy import sql
+from arcetl.testing.fakearcpy import tables
+
+
+ORDER_BY_PATTERN = re.compile(r"^\s*order\s+by\s+(.+)$", re.IGNORECASE)
+"""_sre.SRE_Pattern: Pattern matching an order-by postfix SQL clause."""
+SHAPE_TOKEN_GETTER = {
+    "shape@": lambda shape: shape,
+    "shape@area": lambda shape: shape.area if shape else None,
+    "shape@json": lambda shape: shape.JSON if shape else None,
+    "shape@length": lambda shape: shape.length if shape else None,
+    "shape@truecentroid": lambda shape: (
+        (shape.centroid.X, shape.centroid.Y) if shape else (None, None)
+    ),
+    "shape@wkb": lambda shape: shape.WKB if shape else None,
+    "shape@wkt": lambda shape: shape.WKT if shape else None,
+    "shape@x": lambda shape: shape.centroid.X if shape else None,
+    "shape@xy": lambda shape: (
+        (shape.centroid.X, shape.centroid.Y) if shape else (None, None)
+    ),
+    "shape@y": lambda shape: shape.centroid.Y if shape else None,
+}
+"""dict: Mapping of geometry cursor token to function deriving value from shape."""
+
+
+class _Cursor(object):
+    """Base cursor on a fake table or view."""
+
+    def __init__(
+        self,
+        in_table,
+        field_names,
+        where_clause=None,
+        spatial_reference=None,
+        explode_to_points=False,
+        sql_clause=(None, None),
+        **kwargs
+    ):
+        self._table, view_predicate, hidden = tables.resolve(in_table)
+        if field_names == "*" or field_names == ["*"]:
+            field_names = [
+                field.name
+                for field in self._table.fields
+                if field.name.lower() not in hidden
+            ]
+        elif isinstance(field_names, str):
+            field_names = [field_names]
+        self.fields = tuple(field_names)
+        self._indexes = [self._index(name) for name in self.fields]
+        if (
+            spatial_reference is not None
+            and self._table.spatial_reference is not None
+            and spatial_reference.factoryCode
+            != self._table.spatial_reference.factoryCode
+            and any(name.lower().startswith("shape@") for name in self.fields)
+        ):
+            raise NotImplementedError("Fake ArcPy does not support projection.")
+
+        predicates = [
+            predicate
+            for predicate in [
+                view_predicate,
+                sql.compile_where(where_clause, self._table.field_index),
+            ]
+            if predicate is not None
+        ]
+        if len(predicates) == 1:
+            self._predicate = predicates[0]
+        else:
+            self._predicate = lambda row: all(_pred(row) for _pred in predicates)
+        self._order_by = self._order(sql_clause)
+        self._getter = self._row_getter()
+        self._iterator = None
+        self._current_oid = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exception_type, exception_value, traceback):
+        self.reset()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._iterator is None:
+            self._iterator = self._rows()
+        return next(self._iterator)
+
+    next = __next__
+
+    def _index(self, name):
+        """Return table row index for field name, or the shape token (str)."""
+        key = name.lower()
+        if key in self._table.field_index:
+            return self._table.field_index[key]
+
+        if key in SHAPE_TOKEN_GETTER and self._table.geometry_type:
+            return key
+
+        raise RuntimeError("Cannot find field '{}'.".format(name))
+
+    def _order(self, sql_clause):
+        """Return list of (row index, descending flag) from sql_clause."""
+        postfix = (sql_clause or (None, None))[1]
+        match = ORDER_BY_PATTERN.match(postfix) if postfix else None
+        if not match:
+            return []
+
+        order_by = []
+        for term in match.group(1).split(","):
+            words = term.split()
+            order_by.append(
+                (
+                    self._table.field_index[words[0].lower()],
+                    len(words) > 1 and words[1].lower() == "desc",
+                )
+            )
+        return order_by
+
+    def _row_getter(self):
+        """Return function returning the cursor values from a table row."""
+        if all(isinstance(index, int) for index in self._indexes):
+            if len(self._indexes) == 1:
+                index = self._indexes[0]
+                return lambda row: (row[index],)
+
+            return itemgetter(*self._indexes)
+
+        getters = []
+        for index in self._indexes:
+            if isinstance(index, int):
+                getters.append(itemgetter(index))
+            else:
+                getters.append(
+                    lambda row, derive=SHAPE_TOKEN_GETTER[index]: derive(row[1])
+                )
+        return lambda row: tuple(getter(row) for getter in getters)
+
+    def _rows(self):
+        """Generate cursor rows, tracking the current object ID."""
+        rows = self._table.rows
+        oids = list(rows)
+        for index, descending in reversed(self._order_by):
+            oids.sort(
+                key=lambda oid: (rows[oid][index] is not None, rows[oid][index]),
+                reverse=descending,
+            )
+        predicate = self._predicate
+        getter = self._getter
+        for oid in oids:
+            row = rows.get(oid)
+            if row is None or not predicate(row):
+                continue
+
+            self._current_oid = oid
+            yield self._convert(getter(row))
+
+        self._current_oid = None
+
+    def _convert(self, values):
+        """Return cursor row from tuple of values."""
+        return values
+
+    def _pairs(self, values):
+        """Return list of (row index, value) pairs to write from cursor values."""
+        if len(values) != len(self._indexes):
+            raise RuntimeError("Row has wrong number of values for cursor fields.")
+
+        pairs = []
+        for index, value in zip(self._indexes, values):
+            if index == 0:
+                continue
+
+            if isinstance(index, int):
+                pairs.append((index, value))
+            elif index == "shape@xy":
+                pairs.append((1, self._point_geometry(value)))
+            elif index == "shape@wkb":
+                pairs.append(
+                    (
+                        1,
+                        geometries.FromWKB(value, self._table.spatial_reference)
+                        if value is not None
+                        else None,
+                    )
+                )
+            elif index == "shape@wkt":
+                pairs.append(
+                    (
+                        1,
+                        geometries.FromWKT(value, self._table.spatial_reference)
+                        if value is not None
+                        else None,
+                    )
+                )
+        return pairs
+
+    def _point_geometry(self, xy):
+        """Return point geometry from (x, y) coordinates."""
+        if xy is None or None in xy:
+            return None
+
+        return geometries.PointGeometry(
+            geometries.Point(*xy), self._table.spatial_reference
+        )
+
+    def reset(self):
+        """Reset cursor to the first row."""
+        self._iterator = None
+        self._current_oid = None
+
+
+class Editor(object):
+    """Edit session on a fake workspace, with rollback of unsaved edits."""
+
+    def __init__(self, workspace):
+        self.workspace = workspace
+        self.isEditing = False
+
+    def __enter__(self):
+        self.startEditing()
+        self.startOperation()
+        return self
+
+    def __exit__(self, exception_type, exception_value, traceback):
+        if exception_type:
+            self.abortOperation()
+            self.stopEditing(False)
+        else:
+            self.stopOperation()
+            self.stopEditing(True)
+
+    def _tables(self):
+        """Generate tables in the workspace."""
+        workspace = tables.normalized(self.workspace)
+        for item in list(tables.CATALOG.values()):
+            if (
+                isinstance(item, tables.Table)
+                and tables.normalized(item.workspace_path) == workspace
+            ):
+                yield item
+
+    def abortOperation(self):
+        """Abort edit operation, rolling back its edits."""
+        for table in self._tables():
+            if table.undo is not None:
+                table.rollback()
+                table.undo = {}
+
+    def startEditing(self, with_undo=True, multiuser_mode=True):
+        """Start edit session."""
+        for table in self._tables():
+            table.undo = {}
+        self.isEditing = True
+
+    def startOperation(self):
+        """Start edit operation."""
+        for table in self._tables():
+            if table.undo is None:
+                table.undo = {}
+
+    def stopEditing(self, save_changes):
+        """Stop edit session, saving or discarding its edits."""
+        for table in self._tables():
+            if table.undo is not None and not save_changes:
+                table.rollback()
+            table.undo = None
+        self.isEditing = False
+
+    def stopOperation(self):
+        """Stop edit operation."""
+
+
+class InsertCursor(object):
+    """Cursor inserting rows into a fake table."""
+
+    def __init__(self, in_table, field_names, **kwargs):
+        self._cursor = _Cursor(in_table, field_names, where_clause="1=0")
+        self._table = self._cursor._table
+        self.fields = self._cursor.fields
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exception_type, exception_value, traceback):
+        pass
+
+    def insertRow(self, row):
+        """Insert row; return the object ID of the new row."""
+        return self._table.insert(self._cursor._pairs(list(row)))
+
+
+class SearchCursor(_Cursor):
+    """Cursor reading rows (as tuples) from a fake table or view."""
+
+
+class UpdateCursor(_Cursor):
+    """Cursor reading rows (as lists) from a fake table or view, for updating."""
+
+    def _convert(self, values):
+        return list(values)
+
+    def deleteRow(self):
+        """Delete current row."""
+        if self._current_oid is None:
+            raise RuntimeError("No current row to delete.")
+
+        self._table.delete(self._current_oid)
+
+    def updateRow(self, row):
+        """Update current row with values in field order."""
+        if self._current_oid is None:
+            raise RuntimeError("No current row to update.")
+
+        self._table.update(self._current_oid, self._pairs(list(row)))
+
+
+def ListDomains(workspace=None):
+    """Return list of workspace domains (fake workspaces have none)."""
+    return []
@@ -0,0 +1,562 @@
+"""Simple geometry objects for fake ArcPy.
+
+Geometry is planar & two-dimensional. Coordinates are kept as parts of paths of
+(x, y) tuples: one path per part for points, multipoints & polylines; polygon
+parts may have several rings (exterior first, then holes).
+"""
+import json
+import math
+import re
+import struct
+
+
+WKB_TYPE = {
+    1: "point",
+    2: "polyline",
+    3: "polygon",
+    4: "multipoint",
+    5: "polyline",
+    6: "polygon",
+}
+"""dict: Mapping of WKB geometry type code to geometry type."""
+
+
+class Point(object):
+    """Coordinate point (not a geometry).
+
+    Attributes:
+        X (float): X-coordinate.
+        Y (float): Y-coordinate.
+        Z (float): Z-coordinate (unused in calculations).
+        M (float): Measure value (unused in calculations).
+        ID (int): Shape ID.
+    """
+
+    def __init__(self, X=0.0, Y=0.0, Z=None, M=None, ID=0):
+        self.X = X
+        self.Y = Y
+        self.Z = Z
+        self.M = M
+        self.ID = ID
+
+    def __repr__(self):
+        return "<Point {} {}>".format(self.X, self.Y)
+
+    def equals(self, second_point):
+        """Return True if points have the same coordinates."""
+        return (self.X, self.Y) == (second_point.X, second_point.Y)
+
+
+class Array(object):
+    """Ordered collection of points, arrays, or None (ring separators)."""
+
+    def __init__(self, items=None):
+        self._items = list(items) if items is not None else []
+
+    def __getitem__(self, index):
+        return self._items[index]
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __len__(self):
+        return len(self._items)
+
+    @property
+    def count(self):
+        """int: Number of items in array."""
+        return len(self._items)
+
+    def add(self, value):
+        """Add item to end of array."""
+        self._items.append(value)
+
+    append = add
+
+    def extend(self, items):
+        """Add items to end of array."""
+        self._items.extend(items)
+
+    def getObject(self, index):
+        """Return item at index."""
+        return self._items[index]
+
+
+class Extent(object):
+    """Rectangle bounding a geometry.
+
+    Attributes:
+        XMin (float): Minimum x-coordinate.
+        YMin (float): Minimum y-coordinate.
+        XMax (float): Maximum x-coordinate.
+        YMax (float): Maximum y-coordinate.
+    """
+
+    def __init__(self, XMin=None, YMin=None, XMax=None, YMax=None):
+        self.XMin = XMin
+        self.YMin = YMin
+        self.XMax = XMax
+        self.YMax = YMax
+        self.ZMin = self.ZMax = self.MMin = self.MMax = None
+
+    def __repr__(self):
+        return "{} {} {} {}".format(self.XMin, self.YMin, self.XMax, self.YMax)
+
+    @property
+    def height(self):
+        """float: Height of extent."""
+        return self.YMax - self.YMin
+
+    @property
+    def width(self):
+        """float: Width of extent."""
+        return self.XMax - self.XMin
+
+
+class Geometry(object):
+    """Base geometry object.
+
+    Attributes:
+        type (str): Geometry type (point, multipoint, polyline, polygon).
+        spatialReference (SpatialReference): Spatial reference of geometry.
+    """
+
+    def __init__(self, geometry_type, parts, spatial_reference=None):
+        """Initialize instance.
+
+        Args:
+            geometry_type (str): Geometry type.
+            parts (list): Parts as lists of paths; paths are lists of (x, y) tuples.
+            spatial_reference (SpatialReference): Spatial reference of geometry.
+        """
+        self.type = geometry_type
+        self.spatialReference = spatial_reference
+        self._parts = parts
+
+    def __repr__(self):
+        return "<{} {}>".format(type(self).__name__, self.WKT)
+
+    @property
+    def area(self):
+        """float: Area of polygon; 0 for other types."""
+        if self.type != "polygon":
+            return 0.0
+
+        area = sum(_ring_area(ring) for part in self._parts for ring in part)
+        return abs(area)
+
+    @property
+    def centroid(self):
+        """Point: Center of gravity of the geometry."""
+        if self.type == "polygon" and self.area:
+            sum_x = sum_y = sum_area = 0.0
+            for part in self._parts:
+                for ring in part:
+                    for (x1, y1), (x2, y2) in zip(ring, ring[1:]):
+                        cross = x1 * y2 - x2 * y1
+                        sum_area += cross
+                        sum_x += (x1 + x2) * cross
+                        sum_y += (y1 + y2) * cross
+            return Point(sum_x / (3.0 * sum_area), sum_y / (3.0 * sum_area))
+
+        if self.type == "polyline" and self.length:
+            sum_x = sum_y = 0.0
+            for (x1, y1), (x2, y2) in self._segments():
+                length = math.hypot(x2 - x1, y2 - y1)
+                sum_x += (x1 + x2) / 2.0 * length
+                sum_y += (y1 + y2) / 2.0 * length
+            return Point(sum_x / self.length, sum_y / self.length)
+
+        coordinates = list(self._coordinates())
+        return Point(
+            sum(x for x, _ in coordinates) / len(coordinates),
+            sum(y for _, y in coordinates) / len(coordinates),
+        )
+
+    @property
+    def extent(self):
+        """Extent: Extent of the geometry."""
+        coordinates = list(self._coordinates())
+        return Extent(
+            min(x for x, _ in coordinates),
+            min(y for _, y in coordinates),
+            max(x for x, _ in coordinates),
+            max(y for _, y in coordinates),
+        )
+
+    @property
+    def firstPoint(self):
+        """Point: First coordinate point of the geometry."""
+        return Point(*self._parts[0][0][0])
+
+    @property
+    def isMultipart(self):
+        """bool: True if geometry has more than one part."""
+        return len(self._parts) > 1
+
+    @property
+    def JSON(self):
+        """str: Esri JSON representation of geometry."""
+        if self.type == "point":
+            x, y = self._parts[0][0][0]
+            result = {"x": x, "y": y}
+        elif self.type == "multipoint":
+            result = {"points": [list(path[0]) for path in self._parts]}
+        elif self.type == "polyline":
+            result = {"paths": [[list(xy) for xy in part[0]] for part in self._parts]}
+        else:
+            result = {
+                "rings": [
+                    [list(xy) for xy in ring] for part in self._parts for ring in part
+                ]
+            }
+        if self.spatialReference is not None:
+            result["spatialReference"] = {"wkid": self.spatialReference.factoryCode}
+        return json.dumps(result)
+
+    @property
+    def labelPoint(self):
+        """Point: Point for labeling the geometry."""
+        return self.centroid
+
+    @property
+    def lastPoint(self):
+        """Point: Last coordinate point of the geometry."""
+        return Point(*self._parts[-1][-1][-1])
+
+    @property
+    def length(self):
+        """float: Length of lines or perimeter of polygons; 0 for points."""
+        return sum(
+            math.hypot(x2 - x1, y2 - y1) for (x1, y1), (x2, y2) in self._segments()
+        )
+
+    @property
+    def partCount(self):
+        """int: Number of parts in the geometry."""
+        return len(self._parts)
+
+    @property
+    def pointCount(self):
+        """int: Number of coordinate points in the geometry."""
+        return sum(len(path) for part in self._parts for path in part)
+
+    @property
+    def trueCentroid(self):
+        """Point: Center of gravity of the geometry."""
+        return self.centroid
+
+    @property
+    def WKB(self):
+        """bytearray: Well-known binary representation of geometry."""
+        if self.type == "point":
+            return bytearray(struct.pack("<bI2d", 1, 1, *self._parts[0][0][0]))
+
+        if self.type == "multipoint":
+            chunks = [struct.pack("<bII", 1, 4, len(self._parts))]
+            for part in self._parts:
+                chunks.append(struct.pack("<bI2d", 1, 1, *part[0][0]))
+        elif self.type == "polyline":
+            chunks = [struct.pack("<bII", 1, 5, len(self._parts))]
+            for part in self._parts:
+                chunks.append(_wkb_path(part[0], line_string=True))
+        else:
+            chunks = [struct.pack("<bII", 1, 6, len(self._parts))]
+            for part in self._parts:
+                chunks.append(struct.pack("<bII", 1, 3, len(part)))
+                chunks.extend(_wkb_path(ring) for ring in part)
+        return bytearray(b"".join(chunks))
+
+    @property
+    def WKT(self):
+        """str: Well-known text representation of geometry."""
+        if self.type == "point":
+            return "POINT ({} {})".format(*map(_wkt_number, self._parts[0][0][0]))
+
+        if self.type == "multipoint":
+            return "MULTIPOINT ({})".format(
+                ", ".join(
+                    "({} {})".format(*map(_wkt_number, part[0][0]))
+                    for part in self._parts
+                )
+            )
+
+        if self.type == "polyline":
+            return "MULTILINESTRING ({})".format(
+                ", ".join("({})".format(_wkt_path(part[0])) for part in self._parts)
+            )
+
+        return "MULTIPOLYGON ({})".format(
+            ", ".join(
+                "({})".format(", ".join("({})".format(_wkt_path(ring)) for ring in part))
+                for part in self._parts
+            )
+        )
+
+    def _coordinates(self):
+        """Generate all (x, y) coordinates in the geometry."""
+        for part in self._parts:
+            for path in part:
+                for coordinates in path:
+                    yield coordinates
+
+    def _normalized(self):
+        """Return hashable normalized coordinate structure for comparison."""
+        if self.type in ("point", "multipoint"):
+            return (self.type, tuple(sorted(self._coordinates())))
+
+        if self.type == "polyline":
+            paths = []
+            for part in self._parts:
+                path = tuple(part[0])
+                paths.append(min(path, path[::-1]))
+            return (self.type, tuple(sorted(paths)))
+
+        rings = []
+        for part in self._parts:
+            for ring in part:
+                ring = list(ring[:-1])
+                if _ring_area(ring + ring[:1]) > 0:
+                    ring.reverse()
+                start = ring.index(min(ring))
+                rings.append(tuple(ring[start:] + ring[:start]))
+        return (self.type, tuple(sorted(rings)))
+
+    def _segments(self):
+        """Generate coordinate pairs for each segment in the geometry."""
+        if self.type in ("point", "multipoint"):
+            return
+
+        for part in self._parts:
+            for path in part:
+                for segment in zip(path, path[1:]):
+                    yield segment
+
+    def equals(self, second_geometry):
+        """Return True if geometries have the same type & coordinates.
+
+        Ring start vertices, ring orientation, & part order are not significant.
+        """
+        if not isinstance(second_geometry, Geometry):
+            return False
+
+        return self._normalized() == second_geometry._normalized()
+
+    def getPart(self, index=None):
+        """Return part(s) as Array(s) of Points."""
+        if index is None:
+            return Array(self.getPart(i) for i in range(len(self._parts)))
+
+        if self.type == "point":
+            return Point(*self._parts[0][0][0])
+
+        points = []
+        for i, path in enumerate(self._parts[index]):
+            if i:
+                points.append(None)
+            points.extend(Point(*xy) for xy in path)
+        return Array(points)
+
+    def projectAs(self, spatial_reference, transformation_name=None):
+        """Return geometry in the given spatial reference.
+
+        Only a no-op projection (same or unset reference) is supported.
+        """
+        if not _same_reference(self.spatialReference, spatial_reference):
+            raise NotImplementedError("Fake ArcPy does not support projection.")
+
+        return self
+
+
+class Multipoint(Geometry):
+    """Multipoint geometry."""
+
+    def __init__(self, inputs, spatial_reference=None, has_z=False, has_m=False):
+        parts = [[[(point.X, point.Y)]] for point in inputs]
+        super(Multipoint, self).__init__("multipoint", parts, spatial_reference)
+
+
+class PointGeometry(Geometry):
+    """Point geometry."""
+
+    def __init__(self, inputs, spatial_reference=None, has_z=False, has_m=False):
+        parts = [[[(inputs.X, inputs.Y)]]]
+        super(PointGeometry, self).__init__("point", parts, spatial_reference)
+
+
+class Polygon(Geometry):
+    """Polygon geometry. Rings are closed automatically."""
+
+    def __init__(self, inputs, spatial_reference=None, has_z=False, has_m=False):
+        parts = []
+        for path in _paths(inputs):
+            part = []
+            for ring in path:
+                if ring[0] != ring[-1]:
+                    ring = ring + ring[:1]
+                part.append(ring)
+            parts.append(part)
+        super(Polygon, self).__init__("polygon", parts, spatial_reference)
+
+
+class Polyline(Geometry):
+    """Polyline geometry."""
+
+    def __init__(self, inputs, spatial_reference=None, has_z=False, has_m=False):
+        parts = [[path] for paths in _paths(inputs) for path in paths]
+        super(Polyline, self).__init__("polyline", parts, spatial_reference)
+
+
+def _paths(inputs):
+    """Return list of parts (lists of paths) from an Array of points/arrays.
+
+    None items within a part separate its paths (polygon rings).
+    """
+    items = list(inputs)
+    if items and (isinstance(items[0], Point) or items[0] is None):
+        items = [items]
+    parts = []
+    for part in items:
+        paths = [[]]
+        for point in part:
+            if point is None:
+                paths.append([])
+            else:
+                paths[-1].append((point.X, point.Y))
+        parts.append([path for path in paths if path])
+    return parts
+
+
+def _ring_area(ring):
+    """Return signed area of ring: positive if clockwise (ArcGIS exterior)."""
+    return sum(x1 * y2 - x2 * y1 for (x1, y1), (x2, y2) in zip(ring, ring[1:])) / -2.0
+
+
+def _same_reference(reference1, reference2):
+    """Return True if references are the same (or either is unset)."""
+    if reference1 is None or reference2 is None:
+        return True
+
+    return reference1.factoryCode == reference2.factoryCode
+
+
+def _wkb_path(path, line_string=False):
+    """Return WKB bytes for a path (line string with header, or bare ring)."""
+    chunks = [struct.pack("<bII", 1, 2, len(path)) if line_string else b""]
+    if not line_string:
+        chunks[0] = struct.pack("<I", len(path))
+    chunks.extend(struct.pack("<2d", x, y) for x, y in path)
+    return b"".join(chunks)
+
+
+def _wkt_number(number):
+    """Return WKT representation of number (integral values without decimals)."""
+    if float(number).is_integer():
+        return str(int(number))
+
+    return repr(float(number))
+
+
+def _wkt_path(path):
+    """Return WKT coordinate list for a path."""
+    return ", ".join(
+        "{} {}".format(_wkt_number(x), _wkt_number(y)) for x, y in path
+    )
+
+
+def _geometry_from_parts(geometry_type, parts, spatial_reference):
+    """Return geometry object of type from parts."""
+    geometry_class = {
+        "point": PointGeometry,
+        "multipoint": Multipoint,
+        "polyline": Polyline,
+        "polygon": Polygon,
+    }[geometry_type]
+    geometry = geometry_class.__new__(geometry_class)
+    Geometry.__init__(geometry, geometry_type, parts, spatial_reference)
+    return geometry
+
+
+def FromWKB(wkb, spatial_reference=None):
+    """Return geometry object from well-known binary."""
+    wkb = bytes(wkb)
+
+    def read(offset):
+        """Return (geometry type code, parts, next offset) read at offset."""
+        order = "<" if wkb[offset : offset + 1] == b"\x01" else ">"
+        (code,) = struct.unpack_from(order + "I", wkb, offset + 1)
+        offset += 5
+        code %= 1000
+        if code == 1:
+            point = struct.unpack_from(order + "2d", wkb, offset)
+            return code, [[[point]]], offset + 16
+
+        if code == 2:
+            path, offset = read_path(order, offset)
+            return code, [[path]], offset
+
+        if code == 3:
+            (ring_count,) = struct.unpack_from(order + "I", wkb, offset)
+            offset += 4
+            rings = []
+            for _ in range(ring_count):
+                ring, offset = read_path(order, offset)
+                rings.append(ring)
+            return code, [rings], offset
+
+        (count,) = struct.unpack_from(order + "I", wkb, offset)
+        offset += 4
+        parts = []
+        for _ in range(count):
+            _, member_parts, offset = read(offset)
+            parts.extend(member_parts)
+        return code, parts, offset
+
+    def read_path(order, offset):
+        """Return (path, next offset) read at offset."""
+        (count,) = struct.unpack_from(order + "I", wkb, offset)
+        offset += 4
+        path = [
+            struct.unpack_from(order + "2d", wkb, offset + 16 * i) for i in range(count)
+        ]
+        return path, offset + 16 * count
+
+    code, parts, _ = read(0)
+    return _geometry_from_parts(WKB_TYPE[code], parts, spatial_reference)
+
+
+def FromWKT(wkt_string, spatial_reference=None):
+    """Return geometry object from well-known text."""
+    match = re.match(r"\s*([A-Za-z]+)\s*(?:Z|M|ZM)?\s*(\(.*\))\s*$", wkt_string, re.S)
+    if not match:
+        raise ValueError("Invalid WKT: {!r}".format(wkt_string))
+
+    name = match.group(1).upper()
+    text = re.sub(
+        r"(-?[\d.eE+-]+)\s+(-?[\d.eE+-]+)(?:\s+-?[\d.eE+-]+)*", r"[\1, \2]",
+        match.group(2),
+    )
+    nested = json.loads(text.replace("(", "[").replace(")", "]"))
+    if name == "POINT":
+        parts = [[[tuple(nested[0])]]]
+        geometry_type = "point"
+    elif name == "MULTIPOINT":
+        points = [point[0] if isinstance(point[0], list) else point for point in nested]
+        parts = [[[tuple(point)]] for point in points]
+        geometry_type = "multipoint"
+    elif name == "LINESTRING":
+        parts = [[[tuple(xy) for xy in nested]]]
+        geometry_type = "polyline"
+    elif name == "MULTILINESTRING":
+        parts = [[[tuple(xy) for xy in path]] for path in nested]
+        geometry_type = "polyline"
+    elif name == "POLYGON":
+        parts = [[[tuple(xy) for xy in ring] for ring in nested]]
+        geometry_type = "polygon"
+    elif name == "MULTIPOLYGON":
+        parts = [[[tuple(xy) for xy in ring] for ring in part] for part in nested]
+        geometry_type = "polygon"
+    else:
+        raise ValueError("Unsupported WKT type: {}".format(name))
+
+    return _geometry_from_parts(geometry_type, parts, spatial_reference)
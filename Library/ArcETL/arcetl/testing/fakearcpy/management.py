@@ -0,0 +1,254 @@
+"""Fake `arcpy.management` geoprocessing tools on in-memory tables."""
+import os
+
+from arcetl.testing.fakearcpy import tables
+
+
+class Result(object):
+    """Geoprocessing tool result."""
+
+    def __init__(self, *outputs):
+        self._outputs = outputs
+
+    def __getitem__(self, index):
+        return self._outputs[index]
+
+    def getOutput(self, index):
+        """Return output value at index."""
+        return self._outputs[index]
+
+
+def _copy(in_rows, out_path):
+    """Copy table or view rows (& visible fields) to a new table."""
+    source, predicate, hidden = tables.resolve(in_rows)
+    indexes = [
+        index
+        for index, field in enumerate(source.fields)
+        if index == 0 or field.name.lower() not in hidden
+    ]
+    table = tables.Table(out_path, source.geometry_type, source.spatial_reference)
+    for index in indexes[1:]:
+        field = source.fields[index]
+        if field.type != "Geometry":
+            table.add_field(
+                tables.Field(
+                    field.name,
+                    field.type,
+                    field.length,
+                    field.precision,
+                    field.scale,
+                    is_nullable=field.isNullable,
+                )
+            )
+    target_index = [table.field_index[source.fields[i].name.lower()] for i in indexes]
+    for row in source.rows.values():
+        if predicate is None or predicate(row):
+            table.insert(
+                [(target, row[i]) for target, i in zip(target_index, indexes) if target]
+            )
+    _register(out_path, table)
+    return Result(out_path)
+
+
+def _make_view(in_table, out_name, where_clause=None, field_info=None):
+    """Create view on table or view."""
+    source, predicate, hidden = tables.resolve(in_table)
+    item = tables.get(in_table)
+    if field_info is not None:
+        hidden = hidden | field_info.hidden_field_names
+    view = tables.View(out_name, source, hidden_field_names=hidden)
+    if isinstance(item, tables.View):
+        # View on a view: combine definition & selection with the new where-clause.
+        where_sqls = [item.where_sql, item.selection_where_sql, where_clause]
+        view.where_sql = " and ".join(
+            "({})".format(where_sql) for where_sql in where_sqls if where_sql
+        )
+    else:
+        view.where_sql = where_clause
+    _register(out_name, view)
+    return Result(out_name)
+
+
+def _register(path, item):
+    """Register dataset or view in the catalog."""
+    workspace_path = os.path.dirname(str(path))
+    if workspace_path and tables.normalized(workspace_path) not in tables.WORKSPACES:
+        raise RuntimeError("Workspace {} does not exist.".format(workspace_path))
+
+    tables.CATALOG[tables.normalized(path)] = item
+
+
+def AddField(
+    in_table,
+    field_name,
+    field_type,
+    field_precision=None,
+    field_scale=None,
+    field_length=None,
+    field_alias=None,
+    field_is_nullable=True,
+    field_is_required=False,
+    field_domain=None,
+):
+    """Add field to table."""
+    table, _, _ = tables.resolve(in_table)
+    table.add_field(
+        tables.Field(
+            field_name,
+            field_type,
+            field_length,
+            field_precision,
+            field_scale,
+            alias_name=field_alias or field_name,
+            is_nullable=field_is_nullable in (True, "NULLABLE"),
+            is_required=field_is_required in (True, "REQUIRED"),
+        )
+    )
+    return Result(in_table)
+
+
+def AddIndex(in_table, fields, index_name=None, unique=False, ascending=False):
+    """Add attribute index (no-op on fake tables)."""
+    tables.get(in_table)
+    return Result(in_table)
+
+
+def AddSpatialIndex(in_features, *args, **kwargs):
+    """Add spatial index (no-op on fake tables)."""
+    tables.get(in_features)
+    return Result(in_features)
+
+
+def CopyFeatures(in_features, out_feature_class, *args, **kwargs):
+    """Copy features to a new feature class."""
+    return _copy(in_features, out_feature_class)
+
+
+def CopyRows(in_rows, out_table, *args, **kwargs):
+    """Copy rows to a new table."""
+    return _copy(in_rows, out_table)
+
+
+def CreateFeatureclass(
+    out_path,
+    out_name,
+    geometry_type="POLYGON",
+    template=None,
+    has_m="DISABLED",
+    has_z="DISABLED",
+    spatial_reference=None,
+    *args,
+    **kwargs
+):
+    """Create feature class."""
+    path = os.path.join(out_path, out_name)
+    if hasattr(spatial_reference, "factoryCode"):
+        spatial_reference = tables.SpatialReference(spatial_reference.factoryCode)
+    elif spatial_reference is not None:
+        spatial_reference = tables.SpatialReference(spatial_reference)
+    _register(path, tables.Table(path, geometry_type, spatial_reference))
+    return Result(path)
+
+
+def CreateFileGDB(out_folder_path, out_name, out_version=None):
+    """Create (register) file geodatabase workspace."""
+    if not out_name.lower().endswith(".gdb"):
+        out_name += ".gdb"
+    path = os.path.join(out_folder_path, out_name)
+    tables.WORKSPACES.add(tables.normalized(path))
+    return Result(path)
+
+
+def CreateTable(out_path, out_name, template=None, config_keyword=None):
+    """Create nonspatial table."""
+    path = os.path.join(out_path, out_name)
+    _register(path, tables.Table(path))
+    return Result(path)
+
+
+def Delete(in_data, data_type=None):
+    """Delete dataset, view, or workspace (& its datasets)."""
+    key = tables.normalized(in_data)
+    if key in tables.WORKSPACES:
+        tables.WORKSPACES.discard(key)
+        for path in list(tables.CATALOG):
+            if os.path.dirname(path) == key:
+                del tables.CATALOG[path]
+    else:
+        tables.get(in_data)
+        del tables.CATALOG[key]
+    return Result(True)
+
+
+def DeleteField(in_table, drop_field):
+    """Delete field(s) from table."""
+    table, _, _ = tables.resolve(in_table)
+    for field_name in [drop_field] if isinstance(drop_field, str) else drop_field:
+        table.delete_field(field_name)
+    return Result(in_table)
+
+
+def DeleteRows(in_rows):
+    """Delete rows in table or view."""
+    table, predicate, _ = tables.resolve(in_rows)
+    for oid, row in list(table.rows.items()):
+        if predicate is None or predicate(row):
+            table.delete(oid)
+    return Result(in_rows)
+
+
+def GetCount(in_rows):
+    """Return result with row count (as a string) for table or view."""
+    table, predicate, _ = tables.resolve(in_rows)
+    if predicate is None:
+        count = len(table.rows)
+    else:
+        count = sum(1 for row in table.rows.values() if predicate(row))
+    return Result(str(count))
+
+
+def MakeFeatureLayer(
+    in_features, out_layer, where_clause=None, workspace=None, field_info=None
+):
+    """Create feature layer."""
+    return _make_view(in_features, out_layer, where_clause, field_info)
+
+
+def MakeTableView(in_table, out_view, where_clause=None, workspace=None, field_info=None):
+    """Create table view."""
+    return _make_view(in_table, out_view, where_clause, field_info)
+
+
+def SelectLayerByAttribute(
+    in_layer_or_view, selection_type="NEW_SELECTION", where_clause=None, invert=None
+):
+    """Select view rows by attribute."""
+    view = tables.get(in_layer_or_view)
+    if not isinstance(view, tables.View):
+        raise RuntimeError("{} is not a layer or view.".format(in_layer_or_view))
+
+    selection_type = selection_type.upper()
+    if selection_type == "NEW_SELECTION":
+        view.selection_where_sql = where_clause
+    elif selection_type == "CLEAR_SELECTION":
+        view.selection_where_sql = None
+    elif selection_type == "SUBSET_SELECTION":
+        view.selection_where_sql = " and ".join(
+            "({})".format(where_sql)
+            for where_sql in [view.selection_where_sql, where_clause]
+            if where_sql
+        )
+    else:
+        raise NotImplementedError(
+            "Selection type {} not supported in fake ArcPy.".format(selection_type)
+        )
+
+    return Result(in_layer_or_view)
+
+
+def TruncateTable(in_table):
+    """Delete all rows in table."""
+    table, _, _ = tables.resolve(in_table)
+    for oid in list(table.rows):
+        table.delete(oid)
+    return Result(in_table)
@@ -0,0 +1,283 @@
+"""SQL where-clause evaluation for fake ArcPy tables.
+
+Supports the subset of SQL that ArcPy where-clauses commonly use: comparisons,
+`and`/`or`/`not`, parentheses, `is [not] null`, `[not] in (...)`,
+`[not] like`, `[not] between`, and the `upper`/`lower` functions.
+
+Comparisons involving nulls are false (close to SQL three-valued logic, except
+that `not` of an unknown comparison is true).
+"""
+import fnmatch
+import re
+
+
+TOKEN_PATTERN = re.compile(
+    r"""
+    \s*(?:
+        (?P<number>\d+\.\d*|\.\d+|\d+)
+        |'(?P<string>(?:[^']|'')*)'
+        |"(?P<quoted>[^"]+)"
+        |\[(?P<bracketed>[^\]]+)\]
+        |(?P<name>[A-Za-z_][A-Za-z0-9_.@]*)
+        |(?P<operator><>|!=|>=|<=|=|<|>|\(|\)|,|-)
+    )
+    """,
+    re.VERBOSE,
+)
+"""_sre.SRE_Pattern: Pattern matching a single where-clause token."""
+
+COMPARISON = {
+    "=": lambda x, y: x == y,
+    "<>": lambda x, y: x != y,
+    "!=": lambda x, y: x != y,
+    ">": lambda x, y: x > y,
+    ">=": lambda x, y: x >= y,
+    "<": lambda x, y: x < y,
+    "<=": lambda x, y: x <= y,
+}
+"""dict: Mapping of comparison operator to function."""
+FUNCTION = {
+    "lower": lambda x: x.lower() if x is not None else None,
+    "upper": lambda x: x.upper() if x is not None else None,
+}
+"""dict: Mapping of supported SQL function name to function."""
+KEYWORDS = {"and", "between", "in", "is", "like", "not", "null", "or"}
+"""set: SQL keywords recognized by the parser."""
+
+
+def _compare(operator, left, right):
+    """Return predicate for comparison of two operands."""
+    function = COMPARISON[operator]
+
+    def predicate(row):
+        x, y = left(row), right(row)
+        if x is None or y is None:
+            return False
+
+        try:
+            return function(x, y)
+
+        except TypeError:
+            return False
+
+    return predicate
+
+
+def _like_pattern(pattern):
+    """Return compiled regular expression for SQL like-pattern."""
+    translated = "".join(
+        ".*" if char == "%" else "." if char == "_" else re.escape(char)
+        for char in pattern
+    )
+    return re.compile(translated + r"\Z", re.DOTALL)
+
+
+def _tokens(where_sql):
+    """Return list of (kind, value) tokens for a where-clause."""
+    tokens = []
+    position = 0
+    where_sql = where_sql.rstrip()
+    while position < len(where_sql):
+        match = TOKEN_PATTERN.match(where_sql, position)
+        if not match or match.end() == position:
+            raise ValueError(
+                "Unsupported where-clause syntax at {!r}.".format(where_sql[position:])
+            )
+
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == "string":
+            value = value.replace("''", "'")
+        elif kind in ("quoted", "bracketed"):
+            kind = "field"
+        elif kind == "name":
+            if value.lower() in KEYWORDS:
+                kind, value = "keyword", value.lower()
+            else:
+                kind = "field"
+        tokens.append((kind, value))
+        position = match.end()
+    return tokens
+
+
+class _Parser(object):
+    """Recursive-descent parser building a row predicate from tokens."""
+
+    def __init__(self, tokens, field_index):
+        self.tokens = tokens
+        self.position = 0
+        self.field_index = field_index
+
+    def accept(self, kind, value=None):
+        """Consume & return next token if it matches, else return None."""
+        if self.position < len(self.tokens):
+            token = self.tokens[self.position]
+            if token[0] == kind and (value is None or token[1] == value):
+                self.position += 1
+                return token
+
+        return None
+
+    def expect(self, kind, value=None):
+        """Consume & return next token, raising ValueError if no match."""
+        token = self.accept(kind, value)
+        if token is None:
+            raise ValueError("Expected {} {!r} in where-clause.".format(kind, value))
+
+        return token
+
+    def parse(self):
+        """Return predicate for the whole where-clause."""
+        predicate = self.or_expression()
+        if self.position != len(self.tokens):
+            raise ValueError(
+                "Unexpected token {!r} in where-clause.".format(
+                    self.tokens[self.position][1]
+                )
+            )
+
+        return predicate
+
+    def or_expression(self):
+        predicates = [self.and_expression()]
+        while self.accept("keyword", "or"):
+            predicates.append(self.and_expression())
+        if len(predicates) == 1:
+            return predicates[0]
+
+        return lambda row: any(predicate(row) for predicate in predicates)
+
+    def and_expression(self):
+        predicates = [self.not_expression()]
+        while self.accept("keyword", "and"):
+            predicates.append(self.not_expression())
+        if len(predicates) == 1:
+            return predicates[0]
+
+        return lambda row: all(predicate(row) for predicate in predicates)
+
+    def not_expression(self):
+        if self.accept("keyword", "not"):
+            predicate = self.not_expression()
+            return lambda row: not predicate(row)
+
+        return self.condition()
+
+    def condition(self):
+        # Parenthesized boolean expression (vs. a parenthesized operand).
+        if self.accept("operator", "("):
+            start = self.position
+            try:
+                predicate = self.or_expression()
+                self.expect("operator", ")")
+                return predicate
+
+            except ValueError:
+                self.position = start - 1
+        left = self.operand()
+        negate = bool(self.accept("keyword", "not"))
+        if self.accept("keyword", "is"):
+            negate = bool(self.accept("keyword", "not"))
+            self.expect("keyword", "null")
+            predicate = lambda row: left(row) is None
+        elif self.accept("keyword", "in"):
+            self.expect("operator", "(")
+            members = [self.operand()]
+            while self.accept("operator", ","):
+                members.append(self.operand())
+            self.expect("operator", ")")
+            predicate = lambda row: any(
+                _compare("=", left, member)(row) for member in members
+            )
+        elif self.accept("keyword", "like"):
+            pattern = self.operand()
+            predicate = lambda row: (
+                left(row) is not None
+                and pattern(row) is not None
+                and bool(_like_pattern(pattern(row)).match(left(row)))
+            )
+        elif self.accept("keyword", "between"):
+            lower = self.operand()
+            self.expect("keyword", "and")
+            upper = self.operand()
+            predicate = lambda row: (
+                _compare(">=", left, lower)(row) and _compare("<=", left, upper)(row)
+            )
+        else:
+            if negate:
+                raise ValueError("Unexpected `not` in where-clause.")
+
+            token = self.expect("operator")
+            if token[1] not in COMPARISON:
+                raise ValueError("Unexpected {!r} in where-clause.".format(token[1]))
+
+            predicate = _compare(token[1], left, self.operand())
+        if negate:
+            return lambda row: not predicate(row)
+
+        return predicate
+
+    def operand(self):
+        negative = bool(self.accept("operator", "-"))
+        token = self.accept("number")
+        if token:
+            number = float(token[1]) if "." in token[1] else int(token[1])
+            number = -number if negative else number
+            return lambda row: number
+
+        if negative:
+            raise ValueError("Unexpected `-` in where-clause.")
+
+        token = self.accept("string")
+        if token:
+            return lambda row: token[1]
+
+        if self.accept("keyword", "null"):
+            return lambda row: None
+
+        if self.accept("operator", "("):
+            inner = self.operand()
+            self.expect("operator", ")")
+            return inner
+
+        token = self.expect("field")
+        if token[1].lower() in FUNCTION and self.accept("operator", "("):
+            function = FUNCTION[token[1].lower()]
+            inner = self.operand()
+            self.expect("operator", ")")
+            return lambda row: function(inner(row))
+
+        try:
+            index = self.field_index[token[1].lower()]
+        except KeyError:
+            raise RuntimeError(
+                "An invalid SQL statement was used: field {} not present.".format(
+                    token[1]
+                )
+            )
+
+        return lambda row: row[index]
+
+
+def compile_where(where_sql, field_index):
+    """Return predicate function for a where-clause.
+
+    Args:
+        where_sql (str): SQL where-clause. If None or empty, all rows match.
+        field_index (dict): Mapping of lowercase field name to row index.
+
+    Returns:
+        function: Function taking a row (sequence) & returning True if it matches.
+    """
+    if not where_sql or not where_sql.strip():
+        return lambda row: True
+
+    return _Parser(_tokens(where_sql), field_index).parse()
+
+
+def matches_wildcard(name, wild_card):
+    """Return True if name matches an ArcPy-style wildcard (case-insensitive)."""
+    if not wild_card:
+        return True
+
+    return fnmatch.fnmatchcase(name.lower(), wild_card.lower())
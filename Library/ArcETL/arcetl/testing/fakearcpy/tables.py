@@ -0,0 +1,357 @@
+"""In-memory dataset storage for fake ArcPy.
+
+Datasets are kept in a process-wide catalog keyed by normalized path. Rows are
+lists of values in field order, kept in a dictionary keyed by object ID.
+"""
+import datetime
+import os
+
+from arcetl.testing.fakearcpy import sql
+
+
+FIELD_TYPE = {
+    "blob": "Blob",
+    "date": "Date",
+    "double": "Double",
+    "float": "Single",
+    "geometry": "Geometry",
+    "globalid": "GlobalID",
+    "guid": "Guid",
+    "integer": "Integer",
+    "long": "Integer",
+    "oid": "OID",
+    "short": "SmallInteger",
+    "single": "Single",
+    "smallinteger": "SmallInteger",
+    "string": "String",
+    "text": "String",
+}
+"""dict: Mapping of lowercase field type description to ArcPy field type."""
+FIELD_PYTHON_TYPES = {
+    "Date": (datetime.datetime,),
+    "Double": (float, int),
+    "Guid": (str,),
+    "Integer": (int,),
+    "Single": (float, int),
+    "SmallInteger": (int,),
+    "String": (str,),
+}
+"""dict: Mapping of ArcPy field type to Python types accepted for its values."""
+SPATIAL_REFERENCE = {
+    2913: ("NAD_1983_HARN_StatePlane_Oregon_North_FIPS_3601_Feet_Intl", "Foot"),
+    2914: ("NAD_1983_HARN_StatePlane_Oregon_South_FIPS_3602_Feet_Intl", "Foot"),
+    2992: ("NAD_1983_Oregon_Statewide_Lambert_Feet_Intl", "Foot"),
+    3857: ("WGS_1984_Web_Mercator_Auxiliary_Sphere", "Meter"),
+    4269: ("GCS_North_American_1983", None),
+    4326: ("GCS_WGS_1984", None),
+    26910: ("NAD_1983_UTM_Zone_10N", "Meter"),
+    32610: ("WGS_1984_UTM_Zone_10N", "Meter"),
+}
+"""dict: Mapping of known spatial reference ID to name & linear unit."""
+
+try:
+    FIELD_PYTHON_TYPES["Integer"] += (long,)
+    FIELD_PYTHON_TYPES["SmallInteger"] += (long,)
+    FIELD_PYTHON_TYPES["String"] += (unicode,)
+    FIELD_PYTHON_TYPES["Guid"] += (unicode,)
+except NameError:
+    pass
+
+CATALOG = {}
+"""dict: Mapping of normalized path to dataset (Table or View) object."""
+WORKSPACES = {"in_memory"}
+"""set: Normalized paths of existing workspaces."""
+
+
+class Field(object):
+    """Field object, as returned by ListFields."""
+
+    def __init__(self, name, field_type, length=None, precision=0, scale=0, **kwargs):
+        self.name = name
+        self.aliasName = kwargs.get("alias_name", name)
+        self.baseName = name
+        self.type = FIELD_TYPE.get(field_type.lower(), field_type)
+        self.length = length if length is not None else _default_length(self.type)
+        self.precision = precision or 0
+        self.scale = scale or 0
+        self.isNullable = kwargs.get("is_nullable", True)
+        self.required = kwargs.get("is_required", self.type in ("OID", "Geometry"))
+        self.editable = self.type != "OID"
+        self.domain = ""
+
+    def __repr__(self):
+        return "<Field {} ({})>".format(self.name, self.type)
+
+    def check_value(self, value):
+        """Return value if valid for field, else raise RuntimeError (as ArcPy does)."""
+        if value is None:
+            if not self.isNullable:
+                raise RuntimeError(
+                    "Field {} is not nullable: cannot assign null.".format(self.name)
+                )
+
+            return value
+
+        types = FIELD_PYTHON_TYPES.get(self.type)
+        if types and (not isinstance(value, types) or isinstance(value, bool)):
+            # Integer fields take integral floats, as ArcPy does.
+            if int in types and isinstance(value, float) and value.is_integer():
+                value = int(value)
+            else:
+                raise RuntimeError(
+                    "The value type is incompatible with the field type. [{}]".format(
+                        self.name
+                    )
+                )
+
+        if self.type == "String" and len(value) > self.length:
+            raise RuntimeError(
+                "The value is too large for field {} (length {}).".format(
+                    self.name, self.length
+                )
+            )
+
+        return value
+
+
+class FieldInfo(object):
+    """Field visibility settings for views."""
+
+    def __init__(self):
+        self.hidden_field_names = set()
+
+    def addField(self, field_name, new_field_name, visible, split_rule):
+        """Add field setting."""
+        if visible.upper() == "HIDDEN":
+            self.hidden_field_names.add(field_name.lower())
+
+
+class SpatialReference(object):
+    """Spatial reference object.
+
+    Only references in SPATIAL_REFERENCE have names & units; others are treated as
+    projected with meter units.
+    """
+
+    def __init__(self, item=None):
+        if isinstance(item, SpatialReference):
+            item = item.factoryCode
+        if item is not None and not isinstance(item, int):
+            item = next(
+                (code for code, (name, _) in SPATIAL_REFERENCE.items() if name == item),
+                None,
+            )
+            if item is None:
+                raise RuntimeError("Unsupported spatial reference in fake ArcPy.")
+
+        self.factoryCode = item or 0
+        self.PCSCode = self.GCSCode = self.factoryCode
+        name, unit = SPATIAL_REFERENCE.get(self.factoryCode, ("Unknown", "Meter"))
+        self.name = name
+        self.type = "Geographic" if unit is None else "Projected"
+        self.linearUnitName = unit or ""
+        self.angularUnitName = "Degree" if unit is None else ""
+
+    def __repr__(self):
+        return "<SpatialReference {}>".format(self.factoryCode)
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, SpatialReference)
+            and self.factoryCode == other.factoryCode
+        )
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self.factoryCode)
+
+
+class Table(object):
+    """In-memory table or feature class.
+
+    Attributes:
+        path (str): Catalog path.
+        fields (list of Field): Fields on the table, object ID field first.
+        rows (dict): Mapping of object ID to row (list of values in field order).
+        geometry_type (str): Geometry type if feature class, else None.
+        spatial_reference (SpatialReference): Reference if feature class.
+        undo (dict): Mapping of object ID to original row (or None if inserted)
+            while an edit session is active on the workspace; None otherwise.
+    """
+
+    oid_field_name = "OBJECTID"
+    shape_field_name = "Shape"
+
+    def __init__(self, path, geometry_type=None, spatial_reference=None):
+        self.path = path
+        self.geometry_type = geometry_type.lower() if geometry_type else None
+        self.spatial_reference = spatial_reference
+        self.fields = [Field(self.oid_field_name, "OID", length=4)]
+        if self.geometry_type:
+            self.fields.append(Field(self.shape_field_name, "Geometry", length=0))
+        self.rows = {}
+        self.next_oid = 1
+        self.undo = None
+        self._refresh_index()
+
+    def _refresh_index(self):
+        self.field_index = {
+            field.name.lower(): index for index, field in enumerate(self.fields)
+        }
+        self.field_index["oid@"] = 0
+        if self.geometry_type:
+            self.field_index["shape@"] = 1
+
+    @property
+    def name(self):
+        """str: Name of table."""
+        return os.path.basename(self.path)
+
+    @property
+    def workspace_path(self):
+        """str: Path of the table's workspace."""
+        return os.path.dirname(self.path)
+
+    def add_field(self, field):
+        """Add field to table, with null values on existing rows."""
+        if field.name.lower() in self.field_index:
+            raise RuntimeError("Field {} already exists.".format(field.name))
+
+        self.fields.append(field)
+        for row in self.rows.values():
+            row.append(None)
+        self._refresh_index()
+
+    def delete(self, oid):
+        """Delete row."""
+        self.save_undo(oid)
+        del self.rows[oid]
+
+    def delete_field(self, field_name):
+        """Delete field from table."""
+        index = self.field_index[field_name.lower()]
+        if index == 0 or (self.geometry_type and index == 1):
+            raise RuntimeError("Cannot delete required field {}.".format(field_name))
+
+        del self.fields[index]
+        for row in self.rows.values():
+            del row[index]
+        self._refresh_index()
+
+    def insert(self, values_by_index):
+        """Insert row from mapping of field index to value; return object ID."""
+        oid = self.next_oid
+        self.next_oid += 1
+        row = [None] * len(self.fields)
+        row[0] = oid
+        for index, value in values_by_index:
+            row[index] = self.fields[index].check_value(value)
+        if self.undo is not None:
+            self.undo.setdefault(oid, None)
+        self.rows[oid] = row
+        return oid
+
+    def save_undo(self, oid):
+        """Keep original row for undo, if an edit session is active."""
+        if self.undo is not None and oid not in self.undo:
+            self.undo[oid] = list(self.rows[oid])
+
+    def rollback(self):
+        """Restore rows changed since the edit session started."""
+        for oid, row in self.undo.items():
+            if row is None:
+                self.rows.pop(oid, None)
+            else:
+                self.rows[oid] = row
+        self.rows = dict(sorted(self.rows.items()))
+
+    def update(self, oid, values_by_index):
+        """Update row from pairs of field index & value."""
+        row = self.rows[oid]
+        checked = [
+            (index, self.fields[index].check_value(value))
+            for index, value in values_by_index
+        ]
+        self.save_undo(oid)
+        for index, value in checked:
+            row[index] = value
+
+
+class View(object):
+    """Feature layer or table view on a table.
+
+    Attributes:
+        name (str): Name of view.
+        table (Table): Table the view is on.
+        where_sql (str): Definition query for the view.
+        selection_where_sql (str): Where-clause of current selection, if any.
+        hidden_field_names (set): Lowercase names of fields hidden in view.
+    """
+
+    def __init__(self, name, table, where_sql=None, hidden_field_names=()):
+        self.name = name
+        self.table = table
+        self.where_sql = where_sql
+        self.selection_where_sql = None
+        self.hidden_field_names = set(hidden_field_names)
+
+    @property
+    def path(self):
+        """str: Path of view (the name)."""
+        return self.name
+
+    def predicate(self):
+        """Return predicate for rows in view (definition & selection)."""
+        predicates = [
+            sql.compile_where(where_sql, self.table.field_index)
+            for where_sql in [self.where_sql, self.selection_where_sql]
+            if where_sql
+        ]
+        return lambda row: all(predicate(row) for predicate in predicates)
+
+
+def _default_length(field_type):
+    """Return default length for field type."""
+    return {
+        "Date": 8,
+        "Double": 8,
+        "Guid": 38,
+        "Integer": 4,
+        "OID": 4,
+        "Single": 4,
+        "SmallInteger": 2,
+        "String": 255,
+    }.get(field_type, 0)
+
+
+def clear():
+    """Remove all datasets & views from the catalog."""
+    CATALOG.clear()
+    WORKSPACES.clear()
+    WORKSPACES.add("in_memory")
+
+
+def get(path):
+    """Return dataset (Table or View) at path, raising RuntimeError if missing."""
+    try:
+        return CATALOG[normalized(path)]
+
+    except KeyError:
+        raise RuntimeError("ERROR 000732: Dataset {} does not exist.".format(path))
+
+
+def normalized(path):
+    """Return normalized path for catalog keys."""
+    return os.path.normpath(str(path)).replace("\\", "/").lower()
+
+
+def resolve(path):
+    """Return (table, row predicate, hidden field names) for a table or view path."""
+    item = get(path)
+    if isinstance(item, View):
+        return item.table, item.predicate(), item.hidden_field_names
+
+    return item, None, set()
+
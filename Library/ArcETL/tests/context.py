@@ -1,6 +1,12 @@
 """Test context for ArcETL."""
 import os
 import sys
-sys.path.insert(0, os.path.abspath('..'))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Use the in-memory ArcPy stand-in where ArcGIS is not installed.
+try:
+    import arcpy  # pylint: disable=unused-import
+except ImportError:
+    os.environ.setdefault('ARCETL_FAKE_ARCPY', '1')
 
 import arcetl
@@ -0,0 +1,162 @@
+"""Tests for arcetl.attributes geometry property updates."""
+import math
+
+import pytest
+
+from .context import arcetl
+from arcetl import attributes
+from arcetl.testing import fakearcpy
+
+
+class FakeExtent(object):
+    def __init__(self, xmin, ymin, xmax, ymax):
+        self.XMin, self.YMin, self.XMax, self.YMax = xmin, ymin, xmax, ymax
+
+
+class FakePoint(object):
+    def __init__(self, x, y):
+        self.X, self.Y = x, y
+
+
+class FakeGeometry(object):
+    """Geometry stand-in with only the properties read by the getters."""
+
+    def __init__(self, xmin, ymin, xmax, ymax):
+        self.extent = FakeExtent(xmin, ymin, xmax, ymax)
+        self.centroid = FakePoint((xmin + xmax) / 2.0, (ymin + ymax) / 2.0)
+        self.area = float((xmax - xmin) * (ymax - ymin))
+        self.length = float(2 * (xmax - xmin) + 2 * (ymax - ymin))
+
+
+def test_geometry_property_values():
+    getters = [
+        attributes._geometry_property_getter(properties)
+        for properties in [
+            'area',
+            ['centroid', 'x'],
+            ['centroid', 'Y'],
+            'xmax',
+            'compactness_ratio',
+            lambda geometry: geometry.length / 2,
+        ]
+    ]
+    geometries = [('square', FakeGeometry(0, 0, 2, 2)), ('none', None)]
+    results = dict(attributes._geometry_property_values(geometries, getters))
+    assert results['square'][:4] == [4.0, 1.0, 1.0, 2]
+    assert results['square'][4] == pytest.approx(math.pi / 4)
+    assert results['square'][5] == 4.0
+    assert results['none'] == [None] * 6
+
+
+@pytest.fixture
+def parcels():
+    fakearcpy.reset()
+    path = 'in_memory/parcels'
+    arcetl.dataset.create(
+        path,
+        field_metadata_list=[
+            {'name': name, 'type': 'double'}
+            for name in ['area', 'xcoord', 'ycoord', 'xmin', 'compactness']
+        ],
+        geometry_type='polygon',
+        spatial_reference_item=2914,
+        log_level=None,
+    )
+    arcetl.features.insert_from_iters(
+        path,
+        [
+            ('POLYGON ((0 0, 0 10, 10 10, 10 0, 0 0))',),
+            ('POLYGON ((20 0, 20 5, 40 5, 40 0, 20 0))',),
+        ],
+        ['shape@wkt'],
+        log_level=None,
+    )
+    yield path
+
+    fakearcpy.reset()
+
+
+def test_update_by_geometry_properties(parcels):
+    field_geometry_properties = {
+        'area': ('area', None),
+        'xcoord': (['centroid', 'x'], 2914),
+        'ycoord': (['centroid', 'y'], None),
+        'xmin': ('xmin', 2914),
+        'compactness': ('compactness_ratio', None),
+    }
+    count = attributes.update_by_geometry_properties(
+        parcels, field_geometry_properties, log_level=None
+    )
+    assert count == {'altered': 2}
+    rows = sorted(
+        attributes.as_iters(
+            parcels, ['area', 'xcoord', 'ycoord', 'xmin', 'compactness']
+        )
+    )
+    assert list(rows[0][:4]) == [100.0, 5.0, 5.0, 0.0]
+    assert list(rows[1][:4]) == [100.0, 30.0, 2.5, 20.0]
+    assert rows[0][4] == pytest.approx(math.pi / 4)
+    assert rows[1][4] == pytest.approx(4 * math.pi * 100 / 50 ** 2)
+    # Values match the one-property-per-call path.
+    for field_name, (properties, spatial_reference_item) in sorted(
+        field_geometry_properties.items()
+    ):
+        if field_name == 'compactness':
+            continue
+
+        assert attributes.update_by_geometry(
+            parcels,
+            field_name,
+            properties,
+            spatial_reference_item=spatial_reference_item,
+            log_level=None,
+        ) == {'unchanged': 2}
+    assert attributes.update_by_geometry_properties(
+        parcels, field_geometry_properties, log_level=None
+    ) == {'unchanged': 2}
+
+
+def test_update_by_geometry_properties_projection_math():
+    fakearcpy.reset()
+    path = 'in_memory/addresses'
+    arcetl.dataset.create(
+        path,
+        field_metadata_list=[
+            {'name': name, 'type': 'double'}
+            for name in ['x_coordinate', 'longitude', 'latitude', 'utm_x']
+        ],
+        geometry_type='point',
+        spatial_reference_item=2914,
+        log_level=None,
+    )
+    arcetl.features.insert_from_iters(
+        path,
+        [('POINT (4250000 870000)',), ('POINT (4210000.5 880000.25)',)],
+        ['shape@wkt'],
+        log_level=None,
+    )
+    count = attributes.update_by_geometry_properties(
+        path,
+        {
+            'x_coordinate': (['centroid', 'x'], 2914),
+            'longitude': (['centroid', 'X'], 4326),
+            'latitude': (['centroid', 'Y'], 4326),
+            'utm_x': (['centroid', 'x'], 26910),
+        },
+        use_projection_math=True,
+        log_level=None,
+    )
+    assert count == {'altered': 2}
+    lons, lats = arcetl.projection.transform(
+        [4250000, 4210000.5], [870000, 880000.25], 2914, 4326
+    )
+    utm_xs, _ = arcetl.projection.transform(lons, lats, 4326, 26910)
+    rows = sorted(
+        attributes.as_iters(path, ['x_coordinate', 'longitude', 'latitude', 'utm_x']),
+        reverse=True,
+    )
+    assert [list(row) for row in rows] == [
+        [4250000.0, lons[0], lats[0], utm_xs[0]],
+        [4210000.5, lons[1], lats[1], utm_xs[1]],
+    ]
+    fakearcpy.reset()
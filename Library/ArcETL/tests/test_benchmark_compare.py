@@ -0,0 +1,76 @@
+"""Benchmarks for ArcETL geometry change detection.
+
+Feature counts above ARCETL_BENCHMARK_MAX_ROWS (default 10,000) are skipped; set it
+to 100000 to run the full benchmark. Requires pytest-benchmark.
+"""
+import math
+import os
+import random
+
+import pytest
+
+from .context import arcetl
+from arcetl import geometry
+from arcetl.testing import fakearcpy
+
+pytest.importorskip('pytest_benchmark')
+
+
+MAX_ROWS = int(os.environ.get('ARCETL_BENCHMARK_MAX_ROWS', 10000))
+"""int: Largest feature count to benchmark."""
+
+
+def polygon_pairs(feature_count, vertex_count=100, changed_ratio=0.1):
+    """Return (old, new) taxlot-like polygon pairs, some new ones changed."""
+    rand = random.Random(feature_count)
+    pairs = []
+    for _ in range(feature_count):
+        x, y = rand.uniform(0, 100000), rand.uniform(0, 100000)
+        ring = [
+            (
+                round(x + 50 * math.cos(2 * math.pi * i / vertex_count), 4),
+                round(y + 50 * math.sin(2 * math.pi * i / vertex_count), 4),
+            )
+            for i in range(vertex_count)
+        ]
+        changed = list(ring)
+        if rand.random() < changed_ratio:
+            changed[rand.randrange(vertex_count)] = (x, y)
+        pairs.append(
+            tuple(
+                fakearcpy.Polygon(
+                    fakearcpy.Array(fakearcpy.Point(*xy) for xy in path + path[:1])
+                )
+                for path in [ring, changed]
+            )
+        )
+    return pairs
+
+
+@pytest.mark.parametrize(
+    'feature_count, method',
+    [
+        pytest.param(
+            feature_count,
+            method,
+            marks=pytest.mark.skipif(
+                feature_count > MAX_ROWS,
+                reason="Feature count above ARCETL_BENCHMARK_MAX_ROWS.",
+            ),
+        )
+        for feature_count in [10000, 100000]
+        for method in ['equals', 'comparator']
+    ],
+)
+def test_benchmark_same_geometry(benchmark, feature_count, method):
+    pairs = polygon_pairs(feature_count)
+    if method == 'equals':
+        compare = lambda old, new: old.equals(new)
+    else:
+        compare = geometry.GeometryComparator().same
+
+    def _run():
+        return sum(1 for old, new in pairs if not compare(old, new))
+
+    changed_count = benchmark.pedantic(_run, rounds=1, iterations=1)
+    assert 0 < changed_count < feature_count / 5
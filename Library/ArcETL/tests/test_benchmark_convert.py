@@ -0,0 +1,66 @@
+"""Benchmarks for ArcETL CSV output.
+
+Row counts above ARCETL_BENCHMARK_MAX_ROWS (default 10,000) are skipped; set it to
+1000000 to run the full benchmark. Requires pytest-benchmark.
+"""
+import datetime
+import os
+import random
+
+import pytest
+
+from .context import arcetl
+from arcetl import convert
+
+pytest.importorskip('pytest_benchmark')
+
+
+MAX_ROWS = int(os.environ.get('ARCETL_BENCHMARK_MAX_ROWS', 10000))
+"""int: Largest row count to benchmark."""
+FIELD_NAMES = ['id', 'name', 'measure', 'inspected']
+
+
+def synthetic_rows(row_count):
+    rand = random.Random(row_count)
+    start = datetime.datetime(2000, 1, 1)
+    return [
+        (
+            i,
+            'Street {}'.format(rand.randint(1, 5000)),
+            rand.uniform(0.0, 10000.0),
+            start + datetime.timedelta(days=rand.randint(0, 7000)),
+        )
+        for i in range(row_count)
+    ]
+
+
+@pytest.mark.parametrize(
+    'row_count, suffix',
+    [
+        pytest.param(
+            row_count,
+            suffix,
+            marks=pytest.mark.skipif(
+                row_count > MAX_ROWS,
+                reason="Row count above ARCETL_BENCHMARK_MAX_ROWS.",
+            ),
+        )
+        for row_count in [10000, 1000000]
+        for suffix in ['.csv', '.csv.gz']
+    ],
+)
+def test_benchmark_rows_to_csvfile(benchmark, tmpdir, row_count, suffix):
+    rows = synthetic_rows(row_count)
+    path = str(tmpdir.join('rows' + suffix))
+    benchmark.pedantic(
+        convert.rows_to_csvfile,
+        args=(rows, path, FIELD_NAMES),
+        kwargs={
+            'header': True,
+            'formatters': {'measure': '.3f', 'inspected': 'isoformat'},
+            'log_level': None,
+        },
+        rounds=1,
+        iterations=1,
+    )
+    assert os.path.getsize(path) > 0
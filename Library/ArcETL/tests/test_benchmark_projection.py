@@ -0,0 +1,44 @@
+"""Benchmarks for ArcETL bulk coordinate projection.
+
+Point counts above ARCETL_BENCHMARK_MAX_ROWS (default 10,000) are skipped; set it to
+1000000 to run the full benchmark. Requires pytest-benchmark.
+"""
+import os
+import random
+
+import pytest
+
+from .context import arcetl
+from arcetl import projection
+
+pytest.importorskip('pytest_benchmark')
+
+
+MAX_ROWS = int(os.environ.get('ARCETL_BENCHMARK_MAX_ROWS', 10000))
+"""int: Largest row count to benchmark."""
+
+
+@pytest.mark.parametrize(
+    'point_count, to_srid',
+    [
+        pytest.param(
+            point_count,
+            to_srid,
+            marks=pytest.mark.skipif(
+                point_count > MAX_ROWS,
+                reason="Row count above ARCETL_BENCHMARK_MAX_ROWS.",
+            ),
+        )
+        for point_count in [10000, 1000000]
+        for to_srid in [4326, 26910]
+    ],
+)
+def test_benchmark_transform(benchmark, point_count, to_srid):
+    # Address-like points across Lane County, in Oregon South (feet).
+    rand = random.Random(point_count)
+    xs = [rand.uniform(3950000.0, 4550000.0) for _ in range(point_count)]
+    ys = [rand.uniform(650000.0, 1000000.0) for _ in range(point_count)]
+    result = benchmark.pedantic(
+        projection.transform, args=(xs, ys, 2914, to_srid), rounds=1, iterations=1
+    )
+    assert len(result[0]) == point_count
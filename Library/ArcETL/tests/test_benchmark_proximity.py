@@ -0,0 +1,55 @@
+"""Benchmarks for ArcETL point-in-polygon matching.
+
+Point counts above ARCETL_BENCHMARK_MAX_ROWS (default 10,000) are skipped; set it to
+300000 to run the full benchmark. Requires pytest-benchmark.
+"""
+import os
+import random
+
+import pytest
+
+from .context import arcetl
+from arcetl import geometry
+
+pytest.importorskip('pytest_benchmark')
+
+
+MAX_ROWS = int(os.environ.get('ARCETL_BENCHMARK_MAX_ROWS', 10000))
+"""int: Largest row count to benchmark."""
+
+
+@pytest.mark.parametrize(
+    'point_count, polygon_count',
+    [
+        pytest.param(
+            point_count,
+            polygon_count,
+            marks=pytest.mark.skipif(
+                point_count > MAX_ROWS,
+                reason="Row count above ARCETL_BENCHMARK_MAX_ROWS.",
+            ),
+        )
+        for point_count, polygon_count in [(10000, 5000), (300000, 150000)]
+    ],
+)
+def test_benchmark_point_polygon_matches(benchmark, point_count, polygon_count):
+    # Grid of lot-like hexagons, two points per lot.
+    side = int(polygon_count ** 0.5)
+    polygons = []
+    for i in range(polygon_count):
+        x, y = 10.0 * (i % side), 10.0 * (i // side)
+        ring = [
+            (x, y), (x + 6, y), (x + 10, y + 5), (x + 6, y + 10), (x, y + 10),
+            (x - 2, y + 5),
+        ]
+        polygons.append((i, [ring]))
+    rand = random.Random(1)
+    points = [
+        (i, (rand.uniform(0, 10.0 * side), rand.uniform(0, 10.0 * side)))
+        for i in range(point_count)
+    ]
+
+    def run():
+        return sum(1 for _ in geometry.point_polygon_matches(points, polygons))
+
+    assert benchmark.pedantic(run, rounds=1, iterations=1) > 0
@@ -0,0 +1,159 @@
+"""Benchmarks for ArcETL attribute & feature update paths, on fake ArcPy.
+
+Row counts above ARCETL_BENCHMARK_MAX_ROWS (default 10,000) are skipped; set it to
+1000000 to run the full suite. Requires pytest-benchmark.
+"""
+import os
+
+import pytest
+
+from .context import arcetl
+from arcetl.testing import fakearcpy
+
+pytest.importorskip('pytest_benchmark')
+
+
+MAX_ROWS = int(os.environ.get('ARCETL_BENCHMARK_MAX_ROWS', 10000))
+"""int: Largest row count to benchmark."""
+ROW_COUNTS = [
+    pytest.param(
+        count,
+        marks=pytest.mark.skipif(
+            count > MAX_ROWS, reason="Row count above ARCETL_BENCHMARK_MAX_ROWS."
+        ),
+    )
+    for count in [10000, 100000, 1000000]
+]
+"""list: Row counts to benchmark."""
+FIELD_METADATA = [
+    {'name': 'parcel_id', 'type': 'long'},
+    {'name': 'owner', 'type': 'text', 'length': 32},
+    {'name': 'zone', 'type': 'text', 'length': 8},
+]
+"""list of dict: Field metadata for benchmark datasets."""
+
+
+def create_dataset(path, row_count, id_offset=0):
+    """Create benchmark point dataset with row_count rows; return path."""
+    if fakearcpy.Exists(path):
+        fakearcpy.management.Delete(path)
+    arcetl.dataset.create(
+        path,
+        FIELD_METADATA,
+        geometry_type='point',
+        spatial_reference_item=2914,
+        log_level=None,
+    )
+    with fakearcpy.da.InsertCursor(
+        path, ['parcel_id', 'owner', 'zone', 'shape@xy']
+    ) as cursor:
+        for i in range(id_offset, id_offset + row_count):
+            cursor.insertRow(
+                [i, 'owner {}'.format(i % 997), 'R{}'.format(i % 4), (i % 1000, i)]
+            )
+    return path
+
+
+def run(benchmark, row_count, function, *args, **kwargs):
+    """Benchmark function on a freshly-created dataset each round."""
+    kwargs.setdefault('log_level', None)
+
+    def setup():
+        dataset_path = create_dataset('in_memory/bench', row_count)
+        return (dataset_path,) + args, kwargs
+
+    rounds = 3 if row_count <= 10000 else 1
+    result = benchmark.pedantic(function, setup=setup, rounds=rounds)
+    fakearcpy.reset()
+    return result
+
+
+@pytest.mark.parametrize('row_count', ROW_COUNTS)
+def test_update_by_function(benchmark, row_count):
+    counts = run(
+        benchmark, row_count, arcetl.attributes.update_by_function,
+        'owner', lambda x: x.upper(),
+    )
+    assert counts['altered'] == row_count
+
+
+@pytest.mark.parametrize('row_count', ROW_COUNTS)
+def test_update_by_joined_value(benchmark, row_count):
+    join_path = create_dataset('in_memory/join', row_count)
+    arcetl.attributes.update_by_value(join_path, 'zone', 'C', log_level=None)
+    counts = run(
+        benchmark, row_count, arcetl.attributes.update_by_joined_value,
+        'zone', join_path, 'zone', [('parcel_id', 'parcel_id')],
+    )
+    assert counts['altered'] == row_count
+
+
+@pytest.mark.parametrize('row_count', ROW_COUNTS)
+def test_update_by_mapping(benchmark, row_count):
+    mapping = {'R0': 'RES', 'R1': 'COM'}
+    counts = run(
+        benchmark, row_count, arcetl.attributes.update_by_mapping,
+        'zone', {(key,): value for key, value in mapping.items()}, ['zone'],
+    )
+    assert counts['altered'] == row_count
+
+
+@pytest.mark.parametrize('row_count', ROW_COUNTS)
+def test_update_by_unique_id(benchmark, row_count):
+    counts = run(
+        benchmark, row_count, arcetl.attributes.update_by_unique_id, 'parcel_id',
+        use_edit_session=False,
+    )
+    assert counts['unchanged'] == row_count
+
+
+@pytest.mark.parametrize('row_count', ROW_COUNTS)
+def test_update_by_value(benchmark, row_count):
+    counts = run(
+        benchmark, row_count, arcetl.attributes.update_by_value, 'zone', 'X'
+    )
+    assert counts['altered'] == row_count
+
+
+@pytest.mark.parametrize('row_count', ROW_COUNTS)
+def test_update_from_dicts(benchmark, row_count):
+    # Tenth of features changed, tenth deleted, tenth inserted.
+    tenth = row_count // 10
+    features = [
+        {
+            'parcel_id': i,
+            'owner': 'owner {}'.format(i % 997) if i >= 2 * tenth else 'changed',
+            'zone': 'R{}'.format(i % 4),
+        }
+        for i in range(tenth, row_count + tenth)
+    ]
+    counts = run(
+        benchmark, row_count, arcetl.features.update_from_dicts,
+        features, 'parcel_id', ['owner', 'zone'],
+    )
+    assert counts['deleted'] == counts['inserted'] == counts['altered'] == tenth
+
+
+@pytest.mark.parametrize('row_count', ROW_COUNTS)
+def test_update_from_iters(benchmark, row_count):
+    tenth = row_count // 10
+    features = [
+        (i, 'owner {}'.format(i % 997) if i >= 2 * tenth else 'changed')
+        for i in range(tenth, row_count + tenth)
+    ]
+    counts = run(
+        benchmark, row_count, arcetl.features.update_from_iters,
+        features, 'parcel_id', ['parcel_id', 'owner'],
+    )
+    assert counts['deleted'] == counts['inserted'] == counts['altered'] == tenth
+
+
+@pytest.mark.parametrize('row_count', ROW_COUNTS)
+def test_update_from_path(benchmark, row_count):
+    tenth = row_count // 10
+    update_path = create_dataset('in_memory/update', row_count, id_offset=tenth)
+    counts = run(
+        benchmark, row_count, arcetl.features.update_from_path,
+        update_path, 'parcel_id', ['owner', 'zone'],
+    )
+    assert counts['deleted'] == counts['inserted'] == tenth
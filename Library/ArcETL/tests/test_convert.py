@@ -0,0 +1,148 @@
+"""Tests for arcetl.convert CSV output."""
+import datetime
+import gzip
+import io
+import os
+
+import pytest
+
+from .context import arcetl
+from arcetl import convert
+from arcetl.testing import fakearcpy
+
+
+FIELD_NAMES = ['id', 'name', 'measure', 'inspected']
+ROWS = [
+    (1, 'Main St', 12.3456, datetime.datetime(2020, 1, 2, 3, 4, 5)),
+    (2, 'Oak, "Old" Rd', None, None),
+    (3, u'Caf\xe9 Way', 0.5, datetime.datetime(2021, 12, 31)),
+]
+FORMATTERS = {'measure': '.2f', 'inspected': '%Y-%m-%d'}
+GOLDEN = (
+    u'id,name,measure,inspected\r\n'
+    u'1,Main St,12.35,2020-01-02\r\n'
+    u'2,"Oak, ""Old"" Rd",,\r\n'
+    u'3,Caf\xe9 Way,0.50,2021-12-31\r\n'
+).encode('utf-8')
+
+
+def read_bytes(path):
+    with io.open(path, mode='rb') as file:
+        return file.read()
+
+
+def test_rows_to_csvfile_golden(tmpdir):
+    for rows in [ROWS, [dict(zip(FIELD_NAMES, row)) for row in ROWS]]:
+        path = str(tmpdir.join('rows.csv'))
+        convert.rows_to_csvfile(
+            iter(rows),
+            path,
+            FIELD_NAMES,
+            header=True,
+            formatters=FORMATTERS,
+            batch_size=2,
+            log_level=None,
+        )
+        assert read_bytes(path) == GOLDEN
+    # Only the output file: temporary file moved into place.
+    assert os.listdir(str(tmpdir)) == ['rows.csv']
+
+
+def test_rows_to_csvfile_gzip(tmpdir):
+    paths = [str(tmpdir.join(name)) for name in ['a.csv.gz', 'b.csv.gz']]
+    for path in paths:
+        convert.rows_to_csvfile(
+            ROWS, path, FIELD_NAMES, header=True, formatters=FORMATTERS, log_level=None
+        )
+        with gzip.open(path, 'rb') as file:
+            assert file.read() == GOLDEN
+    assert read_bytes(paths[0]) == read_bytes(paths[1])
+
+
+def test_rows_to_csvfile_append_and_dialect(tmpdir):
+    path = str(tmpdir.join('rows.txt'))
+    for rows in [[ROWS[0][:2]], [ROWS[2][:2]]]:
+        convert.rows_to_csvfile(
+            rows,
+            path,
+            FIELD_NAMES[:2],
+            file_mode='a',
+            dialect='excel-tab',
+            formatters={'name': lambda value: value.upper()},
+            log_level=None,
+        )
+    assert read_bytes(path) == u'1\tMAIN ST\r\n3\tCAF\xc9 WAY\r\n'.encode('utf-8')
+
+
+def test_rows_to_csvfile_failure_keeps_existing(tmpdir):
+    path = str(tmpdir.join('rows.csv'))
+    convert.rows_to_csvfile(ROWS, path, FIELD_NAMES, log_level=None)
+    original = read_bytes(path)
+
+    def failing_rows():
+        yield ROWS[0]
+        raise RuntimeError('Source failed.')
+
+    with pytest.raises(RuntimeError):
+        convert.rows_to_csvfile(failing_rows(), path, FIELD_NAMES, log_level=None)
+    assert read_bytes(path) == original
+    assert os.listdir(str(tmpdir)) == ['rows.csv']
+    with pytest.raises(ValueError):
+        convert.rows_to_csvfile(
+            ROWS, path, FIELD_NAMES, compression='bz2', log_level=None
+        )
+    with pytest.raises(TypeError):
+        convert.rows_to_csvfile([1, 2], path, FIELD_NAMES, log_level=None)
+    assert read_bytes(path) == original
+
+
+@pytest.fixture
+def points():
+    fakearcpy.reset()
+    path = 'in_memory/points'
+    arcetl.dataset.create(
+        path,
+        field_metadata_list=[
+            {'name': 'point_id', 'type': 'long'},
+            {'name': 'elevation', 'type': 'double'},
+        ],
+        geometry_type='point',
+        spatial_reference_item=2914,
+        log_level=None,
+    )
+    arcetl.features.insert_from_iters(
+        path,
+        [(1, 101.25, 'POINT (1 2)'), (2, None, 'POINT (3 4)'), (3, 7.0, None)],
+        ['point_id', 'elevation', 'shape@wkt'],
+        log_level=None,
+    )
+    yield path
+
+    fakearcpy.reset()
+
+
+def test_dataset_to_csvfile(points, tmpdir):
+    path = str(tmpdir.join('points.csv'))
+    convert.dataset_to_csvfile(
+        points,
+        path,
+        ['point_id', 'elevation', 'shape@'],
+        dataset_where_sql='point_id < 3',
+        formatters={'elevation': '.1f', 'shape@': 'wkt'},
+        log_level=None,
+    )
+    assert read_bytes(path) == (
+        b'point_id,elevation,shape@\r\n1,101.2,POINT (1 2)\r\n2,,POINT (3 4)\r\n'
+    )
+    convert.dataset_to_csvfile(
+        points,
+        path,
+        ['point_id', 'shape@'],
+        header=False,
+        formatters={'shape@': 'wkb_hex'},
+        log_level=None,
+    )
+    lines = read_bytes(path).decode('ascii').splitlines()
+    assert [line.split(',')[0] for line in lines] == ['1', '2', '3']
+    assert lines[0].split(',')[1] == fakearcpy.FromWKT('POINT (1 2)').WKB.hex()
+    assert lines[2] == '3,'
@@ -0,0 +1,131 @@
+"""Tests for the in-memory ArcPy stand-in, & ArcETL running on it."""
+import pytest
+
+from .context import arcetl
+from arcetl.testing import fakearcpy
+
+
+@pytest.fixture
+def parcels():
+    """Return path of a fake parcel feature class with three features."""
+    fakearcpy.reset()
+    path = arcetl.dataset.create(
+        'in_memory/parcels',
+        field_metadata_list=[
+            {'name': 'parcel_id', 'type': 'long'},
+            {'name': 'owner', 'type': 'text', 'length': 16},
+        ],
+        geometry_type='polygon',
+        spatial_reference_item=2914,
+        log_level=None,
+    )
+    features = [
+        (1, 'smith', 'POLYGON ((0 0, 0 1, 1 1, 1 0, 0 0))'),
+        (2, 'jones', 'POLYGON ((1 0, 1 1, 3 1, 3 0, 1 0))'),
+        (3, None, 'POLYGON ((0 1, 0 2, 1 2, 1 1, 0 1))'),
+    ]
+    arcetl.features.insert_from_iters(
+        path, features, ['parcel_id', 'owner', 'shape@wkt'], log_level=None
+    )
+    yield path
+    fakearcpy.reset()
+
+
+def test_install_provides_arcpy():
+    import arcpy
+
+    if not getattr(arcpy, 'IS_FAKE', False):
+        pytest.skip("Real ArcPy installed.")
+    assert arcpy.da.SearchCursor is fakearcpy.da.SearchCursor
+
+
+def test_describe_and_list_fields(parcels):
+    meta = arcetl.arcobj.dataset_metadata(parcels)
+    assert meta['is_spatial']
+    assert meta['geometry_type'] == 'Polygon'
+    assert meta['spatial_reference_id'] == 2914
+    assert meta['user_field_names'] == ['Shape', 'parcel_id', 'owner']
+    assert arcetl.arcobj.field_metadata(parcels, 'OWNER')['length'] == 16
+    assert fakearcpy.Exists(parcels)
+
+
+def test_search_cursor_where_and_tokens(parcels):
+    rows = list(
+        arcetl.attributes.as_iters(
+            parcels,
+            ['parcel_id', 'shape@area'],
+            dataset_where_sql="owner is not null and parcel_id in (1, 2)",
+        )
+    )
+    assert rows == [(1, 1.0), (2, 2.0)]
+    sql_rows = fakearcpy.da.SearchCursor(
+        parcels, ['parcel_id'], where_clause="upper(owner) like 'J%' or owner is null"
+    )
+    assert [row for row, in sql_rows] == [2, 3]
+
+
+def test_update_cursor_validates_values(parcels):
+    with fakearcpy.da.UpdateCursor(parcels, ['owner']) as cursor:
+        for _ in cursor:
+            with pytest.raises(RuntimeError):
+                cursor.updateRow(['x' * 17])
+            break
+
+
+def test_editor_rolls_back_on_error(parcels):
+    with pytest.raises(ValueError):
+        with arcetl.arcobj.Editor('in_memory'):
+            arcetl.attributes.update_by_value(
+                parcels, 'owner', 'nobody', use_edit_session=False, log_level=None
+            )
+            raise ValueError()
+
+    owners = [owner for owner, in arcetl.attributes.as_iters(parcels, ['owner'])]
+    assert owners == ['smith', 'jones', None]
+
+
+def test_views_and_chunks(parcels):
+    with arcetl.arcobj.DatasetView(parcels, "parcel_id > 1") as view:
+        assert view.count == 2
+        chunks = [chunk.count for chunk in view.as_chunks(1)]
+    assert chunks == [1, 1]
+    assert not fakearcpy.Exists(view.name)
+
+
+def test_update_by_function_and_mapping(parcels):
+    counts = arcetl.attributes.update_by_function(
+        parcels, 'owner', lambda x: x.upper() if x else x, log_level=None
+    )
+    assert counts == {'altered': 2, 'unchanged': 1}
+    counts = arcetl.attributes.update_by_mapping(
+        parcels, 'owner', {3: 'BROWN'}, 'parcel_id', default_value=None,
+        dataset_where_sql="parcel_id = 3", log_level=None
+    )
+    assert counts == {'altered': 1}
+
+
+def test_update_from_iters(parcels):
+    updates = [
+        (1, 'smith', 'MULTIPOLYGON (((0 0, 0 1, 1 1, 1 0, 0 0)))'),
+        (2, 'lee', 'MULTIPOLYGON (((1 0, 1 1, 3 1, 3 0, 1 0)))'),
+        (4, 'new', 'MULTIPOLYGON (((5 5, 5 6, 6 6, 6 5, 5 5)))'),
+    ]
+    counts = arcetl.features.update_from_iters(
+        parcels,
+        updates,
+        id_field_names=['parcel_id'],
+        field_names=['parcel_id', 'owner', 'shape@wkt'],
+        log_level=None,
+    )
+    assert counts == {'deleted': 1, 'inserted': 1, 'altered': 1, 'unchanged': 1}
+    assert arcetl.dataset.feature_count(parcels, log_level=None) == 3
+
+
+def test_geometry_wkb_round_trip():
+    polygon = fakearcpy.FromWKT(
+        'MULTIPOLYGON (((0 0, 0 4, 4 4, 4 0, 0 0), (1 1, 2 1, 2 2, 1 2, 1 1)))'
+    )
+    assert polygon.area == 15.0
+    assert polygon.length == 20.0
+    assert fakearcpy.FromWKB(polygon.WKB).equals(polygon)
+    assert fakearcpy.FromWKT(polygon.WKT).equals(polygon)
@@ -0,0 +1,276 @@
+"""Tests for arcetl.features versioned (type 2) updates & in-process dissolve."""
+import datetime
+import os
+
+import pytest
+
+from .context import arcetl
+from arcetl import features
+from arcetl.testing import fakearcpy
+
+
+JAN = datetime.datetime(2020, 1, 1)
+FEB = datetime.datetime(2020, 2, 1)
+MAR = datetime.datetime(2020, 3, 1)
+FIELD_NAMES = ['msag_id', 'street_name', 'effective_date', 'shape@']
+
+
+class FakeGeometry(object):
+    def __init__(self, wkb):
+        self.WKB = bytearray(wkb)
+
+
+class FakeCursor(object):
+    """Cursor stand-in recording the row current when each action arrives."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.position = -1
+
+    def __iter__(self):
+        for self.position, row in enumerate(self.rows):
+            yield row
+
+
+def test_feature_digest():
+    digest = features._feature_digest
+    assert digest([1, 'A', FakeGeometry(b'\x01')]) == digest(
+        (1, 'A', FakeGeometry(b'\x01'))
+    )
+    assert digest([1, 'A', FakeGeometry(b'\x01')]) != digest(
+        [1, 'A', FakeGeometry(b'\x02')]
+    )
+    assert digest([1, 'AB']) != digest([1, 'A', 'B'])
+    assert digest([1, None]) != digest([1, 'None'])
+
+
+def test_version_actions():
+    cursor = FakeCursor(
+        [(1, 'Main', JAN, None), (2, 'Oak', JAN, None), (3, 'Elm', JAN, None)]
+    )
+    update_id_features = {
+        (1,): (1, 'Main', JAN),
+        (3,): (3, 'Elm St', FEB),
+        (4,): (4, 'Pine', FEB),
+    }
+    actions = []
+    for action, feature, update_feature in features._version_actions(
+        cursor, update_id_features, id_count=1
+    ):
+        actions.append((action, cursor.position, feature, update_feature))
+    assert actions == [
+        ('unchanged', 0, (1, 'Main', JAN, None), None),
+        ('retire', 1, (2, 'Oak', JAN, None), None),
+        ('alter', 2, (3, 'Elm', JAN, None), (3, 'Elm St', FEB)),
+        ('insert', 2, None, (4, 'Pine', FEB)),
+    ]
+    actions = features._version_actions(
+        cursor.rows, update_id_features, id_count=1, version_changes=True
+    )
+    assert [action for action, _, _ in actions] == [
+        'unchanged', 'retire', 'retire', 'insert'
+    ]
+
+
+@pytest.fixture
+def master():
+    fakearcpy.reset()
+    path = 'in_memory/msag_master'
+    arcetl.dataset.create(
+        path,
+        field_metadata_list=[
+            {'name': 'msag_id', 'type': 'long'},
+            {'name': 'street_name', 'type': 'text', 'length': 32},
+            {'name': 'effective_date', 'type': 'date'},
+            {'name': 'expiration_date', 'type': 'date'},
+        ],
+        geometry_type='polyline',
+        spatial_reference_item=2914,
+        log_level=None,
+    )
+    arcetl.features.insert_from_iters(
+        path,
+        [
+            (1, 'Main', JAN, None, 'LINESTRING (0 0, 10 0)'),
+            (2, 'Oak', JAN, None, 'LINESTRING (0 10, 10 10)'),
+            (3, 'Elm', JAN, None, 'LINESTRING (0 20, 10 20)'),
+            (9, 'Old', JAN, FEB, 'LINESTRING (0 90, 10 90)'),
+        ],
+        FIELD_NAMES[:3] + ['expiration_date', 'shape@wkt'],
+        log_level=None,
+    )
+    yield path
+
+    fakearcpy.reset()
+
+
+def master_rows(path):
+    return sorted(
+        arcetl.attributes.as_iters(
+            path, FIELD_NAMES[:3] + ['expiration_date', 'shape@wkt']
+        )
+    )
+
+
+def line(wkt):
+    return fakearcpy.FromWKT(wkt)
+
+
+CURRENT = [
+    (1, 'Main', JAN, line('LINESTRING (0 0, 10 0)')),
+    (3, 'Elm', JAN, line('LINESTRING (0 20, 12 20)')),
+    (4, 'Pine', MAR, line('LINESTRING (0 40, 10 40)')),
+]
+
+
+def test_update_versioned(master):
+    feature_count = features.update_versioned(
+        master, CURRENT, 'msag_id', FIELD_NAMES, log_level=None
+    )
+    assert feature_count == {'retired': 1, 'altered': 1, 'inserted': 1, 'unchanged': 1}
+    assert master_rows(master) == [
+        (1, 'Main', JAN, None, 'MULTILINESTRING ((0 0, 10 0))'),
+        # Retired at latest effective date of current.
+        (2, 'Oak', JAN, MAR, 'MULTILINESTRING ((0 10, 10 10))'),
+        (3, 'Elm', JAN, None, 'MULTILINESTRING ((0 20, 12 20))'),
+        (4, 'Pine', MAR, None, 'MULTILINESTRING ((0 40, 10 40))'),
+        (9, 'Old', JAN, FEB, 'MULTILINESTRING ((0 90, 10 90))'),
+    ]
+    # Re-run is all unchanged.
+    feature_count = features.update_versioned(
+        master, CURRENT, 'msag_id', FIELD_NAMES, log_level=None
+    )
+    assert feature_count == {'unchanged': 3}
+
+
+def test_update_versioned_version_changes(master):
+    current = [(3, 'Elm St', FEB, line('LINESTRING (0 20, 10 20)'))] + CURRENT[:1]
+    feature_count = features.update_versioned(
+        master,
+        current,
+        'msag_id',
+        FIELD_NAMES,
+        version_changes=True,
+        expiration_value=MAR,
+        log_level=None,
+    )
+    assert feature_count == {'retired': 1, 'altered': 1, 'unchanged': 1}
+    rows = master_rows(master)
+    assert [row for row in rows if row[0] in (2, 3)] == [
+        (2, 'Oak', JAN, MAR, 'MULTILINESTRING ((0 10, 10 10))'),
+        (3, 'Elm', JAN, FEB, 'MULTILINESTRING ((0 20, 10 20))'),
+        (3, 'Elm St', FEB, None, 'MULTILINESTRING ((0 20, 10 20))'),
+    ]
+
+
+def test_update_versioned_change_guard(master):
+    with pytest.raises(ValueError):
+        features.update_versioned(
+            master, CURRENT[:1], 'msag_id', FIELD_NAMES, max_change_ratio=0.01,
+            log_level=None,
+        )
+    # Nothing applied.
+    assert len([row for row in master_rows(master) if row[3] is None]) == 3
+    feature_count = features.update_versioned(
+        master, CURRENT, 'msag_id', FIELD_NAMES, max_change_ratio=0.01,
+        log_level=None,
+    )
+    assert feature_count['inserted'] == 1
+
+
+def square(x, y, size=10):
+    return 'POLYGON (({0} {1}, {0} {3}, {2} {3}, {2} {1}, {0} {1}))'.format(
+        x, y, x + size, y + size
+    )
+
+
+@pytest.fixture
+def squares():
+    """Return path of fake polygon dataset with a 5x5 grid of 10-unit squares."""
+    fakearcpy.reset()
+    path = 'in_memory/squares'
+    arcetl.dataset.create(
+        path,
+        field_metadata_list=[
+            {'name': 'col', 'type': 'text', 'length': 4},
+            {'name': 'note', 'type': 'text', 'length': 8},
+        ],
+        geometry_type='polygon',
+        spatial_reference_item=2914,
+        log_level=None,
+    )
+    features.insert_from_iters(
+        path,
+        [
+            ('c{}'.format(i), 'n{}'.format(j), square(10 * i, 10 * j))
+            for i in range(5)
+            for j in range(5)
+        ]
+        # Disjoint square in column 0.
+        + [('c0', 'far', square(100, 100))],
+        ['col', 'note', 'shape@wkt'],
+        log_level=None,
+    )
+    yield path
+    fakearcpy.reset()
+
+
+def test_grouped_values(tmpdir, monkeypatch):
+    monkeypatch.setattr(features.tempfile, 'tempdir', str(tmpdir))
+    pairs = [((i % 7,), bytes(bytearray([i % 256]))) for i in range(200)]
+    expected = {}
+    for key, value in pairs:
+        expected.setdefault(key, []).append(value)
+    for memory_limit in [None, 1, 50]:
+        groups = dict(features._grouped_values(iter(pairs), memory_limit, 4))
+        assert {key: sorted(values) for key, values in groups.items()} == {
+            key: sorted(values) for key, values in expected.items()
+        }
+        # Spill files are removed once groups are read.
+        assert os.listdir(str(tmpdir)) == []
+
+
+@pytest.mark.parametrize('use_shapely', [False, True])
+@pytest.mark.parametrize('memory_limit', [2 ** 28, 1])
+def test_dissolve_in_process(squares, use_shapely, memory_limit):
+    if use_shapely:
+        pytest.importorskip('shapely')
+    features.dissolve(
+        squares,
+        ['col'],
+        dataset_where_sql="col <> 'c4'",
+        in_process=True,
+        memory_limit=memory_limit,
+        use_shapely=use_shapely,
+        log_level=None,
+    )
+    rows = sorted(
+        arcetl.attributes.as_iters(squares, ['col', 'note', 'shape@area'])
+    )
+    assert [(col, note, round(area, 6)) for col, note, area in rows] == [
+        # Multipart: column rectangle & the disjoint square.
+        ('c0', None, 600.0),
+        ('c1', None, 500.0),
+        ('c2', None, 500.0),
+        ('c3', None, 500.0),
+    ] + [('c4', 'n{}'.format(j), 100.0) for j in range(5)]
+
+
+def test_dissolve_in_process_singlepart(squares):
+    features.dissolve(
+        squares,
+        ['col'],
+        multipart=False,
+        dataset_where_sql="col = 'c0'",
+        in_process=True,
+        use_shapely=False,
+        log_level=None,
+    )
+    rows = sorted(
+        round(area, 6)
+        for area, in arcetl.attributes.as_iters(
+            squares, ['shape@area'], dataset_where_sql="col = 'c0'"
+        )
+    )
+    assert rows == [100.0, 500.0]
+    assert len(list(arcetl.attributes.as_iters(squares, ['oid@']))) == 22
@@ -0,0 +1,244 @@
+"""Tests for arcetl.geometry polygon kernels & spatial index."""
+import random
+
+import pytest
+
+from .context import arcetl
+from arcetl import geometry
+
+
+def square(x, y, size=1.0):
+    """Return counter-clockwise square ring with lower-left corner at (x, y)."""
+    return [(x, y), (x + size, y), (x + size, y + size), (x, y + size)]
+
+
+def area(polygon):
+    return geometry.polygon_area(polygon)
+
+
+def test_partition_locations_bounds_tile_size():
+    rand = random.Random(1)
+    locations = [(i, (rand.uniform(0, 10000), rand.uniform(0, 10000))) for i in range(1000)]
+    tiles = geometry.partition_locations(locations, max_count=64)
+    assert all(0 < len(tile) <= 64 for tile in tiles)
+    assert sorted(loc for tile in tiles for loc in tile) == sorted(locations)
+
+
+def test_partition_locations_coincident_points():
+    locations = [(i, (5.0, 5.0)) for i in range(100)]
+    tiles = geometry.partition_locations(locations, max_count=7)
+    assert sum(len(tile) for tile in tiles) == 100
+    assert all(len(tile) <= 7 for tile in tiles)
+
+
+def test_intersection_overlap():
+    result = geometry.polygon_intersection([square(0, 0, 2)], [square(1, 1, 2)])
+    assert area(result) == pytest.approx(1.0)
+    assert geometry.polygon_bounds(result) == pytest.approx((1, 1, 2, 2))
+
+
+def test_shared_edge_union_dissolves():
+    result = geometry.polygon_union([[square(0, 0)], [square(1, 0)]])
+    assert len(result) == 1
+    assert area(result) == pytest.approx(2.0)
+    assert geometry.polygon_bounds(result) == pytest.approx((0, 0, 2, 1))
+
+
+def test_shared_edge_intersection_empty():
+    result = geometry.polygon_intersection([square(0, 0)], [square(1, 0)])
+    assert result == []
+
+
+def test_difference_makes_hole():
+    result = geometry.polygon_difference([square(0, 0, 4)], [square(1, 1, 2)])
+    assert area(result) == pytest.approx(12.0)
+    parts = geometry.polygon_parts(result)
+    assert len(parts) == 1
+    assert len(parts[0]) == 2
+
+
+def test_hole_excluded_from_intersection():
+    donut = geometry.polygon_difference([square(0, 0, 4)], [square(1, 1, 2)])
+    assert geometry.polygon_intersection(donut, [square(1.5, 1.5, 1)]) == []
+    result = geometry.polygon_intersection(donut, [square(0, 0, 2)])
+    assert area(result) == pytest.approx(3.0)
+
+
+def test_multipart():
+    multipart = [square(0, 0), square(3, 0)]
+    result = geometry.polygon_intersection(multipart, [square(0.5, 0, 3)])
+    assert len(geometry.polygon_parts(result)) == 2
+    assert area(result) == pytest.approx(1.0)
+
+
+def test_touching_at_vertex_union_stays_valid():
+    result = geometry.polygon_union([[square(0, 0)], [square(1, 1)]])
+    assert area(result) == pytest.approx(2.0)
+    assert len(geometry.polygon_parts(result)) == 2
+
+
+def test_union_grid_of_squares():
+    squares = [[square(x, y)] for x in range(10) for y in range(10)]
+    random.Random(1).shuffle(squares)
+    result = geometry.polygon_union(squares)
+    assert len(result) == 1
+    assert area(result) == pytest.approx(100.0)
+
+
+def test_wkb_round_trip():
+    polygon = geometry.polygon_difference(
+        [square(0, 0, 4), square(10, 10)], [square(1, 1, 2)]
+    )
+    result = geometry.polygon_from_wkb(geometry.polygon_to_wkb(polygon))
+    assert area(result) == pytest.approx(13.0)
+    assert len(geometry.polygon_parts(result)) == 2
+
+
+def test_wkb_matches_fake_arcpy():
+    from arcetl.testing import fakearcpy
+
+    shape = fakearcpy.FromWKT('POLYGON ((0 0, 4 0, 4 4, 0 4, 0 0), (1 1, 1 2, 2 2, 1 1))')
+    polygon = geometry.polygon_from_wkb(shape.WKB)
+    assert area(polygon) == pytest.approx(shape.area)
+    shape = fakearcpy.FromWKB(geometry.polygon_to_wkb(polygon))
+    assert shape.area == pytest.approx(area(polygon))
+
+
+def test_strtree_query():
+    items = [((x, y), (x, y, x + 1, y + 1)) for x in range(50) for y in range(50)]
+    index = arcetl.geometry.STRtree(items, node_capacity=4)
+    assert len(index) == 2500
+    found = sorted(index.query((10.5, 10.5, 11.5, 11.5)))
+    assert found == [(10, 10), (10, 11), (11, 10), (11, 11)]
+    assert list(index.query((100, 100, 101, 101))) == []
+    assert list(geometry.STRtree([]).query((0, 0, 1, 1))) == []
+
+
+@pytest.mark.parametrize('operation', ['intersection', 'difference', 'union'])
+def test_kernel_matches_shapely(operation):
+    shapely_geometry = pytest.importorskip('shapely.geometry')
+    rand = random.Random(operation)
+    python_kernel = geometry.polygon_kernel(use_shapely=False)
+    shapely_kernel = geometry.polygon_kernel()
+    assert shapely_kernel.name == 'shapely'
+    for _ in range(200):
+        polygons = []
+        for _ in range(2):
+            x, y = rand.uniform(0, 10), rand.uniform(0, 10)
+            radius = rand.uniform(1, 5)
+            polygons.append(
+                [list(shapely_geometry.Point(x, y).buffer(radius, 3).exterior.coords)]
+            )
+        if operation == 'union':
+            result = python_kernel.union(polygons)
+            expected = shapely_kernel.union(
+                shapely_kernel.from_wkb(geometry.polygon_to_wkb(polygon))
+                for polygon in polygons
+            )
+        else:
+            result = getattr(python_kernel, operation)(*polygons)
+            expected = getattr(shapely_kernel, operation)(
+                *(
+                    shapely_kernel.from_wkb(geometry.polygon_to_wkb(polygon))
+                    for polygon in polygons
+                )
+            )
+        assert python_kernel.area(result) == pytest.approx(
+            shapely_kernel.area(expected), abs=1e-3
+        )
+        assert shapely_kernel.from_wkb(python_kernel.to_wkb(result)).is_valid or (
+            python_kernel.is_empty(result)
+        )
+
+
+def wkb_geometry(wkt):
+    from arcetl.testing import fakearcpy
+
+    return geometry.WKBGeometry(fakearcpy.FromWKT(wkt).WKB)
+
+
+def test_wkb_geometry_equals():
+    polygon = wkb_geometry('POLYGON ((0 0, 4 0, 4 4, 0 4, 0 0))')
+    # Rotated start, reversed orientation, extra collinear vertex.
+    assert polygon.equals(wkb_geometry('POLYGON ((4 4, 4 2, 4 0, 0 0, 0 4, 4 4))'))
+    assert not polygon.equals(wkb_geometry('POLYGON ((0 0, 4 0, 4 5, 0 4, 0 0))'))
+    line = wkb_geometry('LINESTRING (0 0, 1 1, 2 2, 5 2)')
+    assert line.equals(wkb_geometry('LINESTRING (5 2, 2 2, 0 0)'))
+    assert not line.equals(wkb_geometry('LINESTRING (0 0, 2 2, 5 3)'))
+    assert not line.equals(polygon)
+    assert wkb_geometry('POINT (1 2)').equals(wkb_geometry('POINT (1.00001 2)'))
+
+
+def test_read_wkb_parts_z():
+    import struct
+
+    wkb = struct.pack('<bI', 1, 1002) + struct.pack('<I6d', 2, 0, 1, 9, 2, 3, 9)
+    parts = []
+    assert geometry._read_wkb_parts(wkb, 0, parts) == len(wkb)
+    assert parts == [(1, (0.0, 1.0, 2.0, 3.0))]
+
+
+def test_comparator_stages():
+    comparator = geometry.GeometryComparator(resolution=0.01)
+    polygon = wkb_geometry('POLYGON ((0 0, 4 0, 4 4, 0 4, 0 0))')
+    # Jitter well under the resolution: fingerprints match.
+    assert comparator.same(
+        polygon, wkb_geometry('POLYGON ((0.0001 0, 4 0, 4 4, 0 4, 0.0001 0))')
+    )
+    assert comparator.counts == {'matched': 1, 'rejected': 0, 'exact': 0}
+    # Different extent: rejected without exact comparison.
+    assert not comparator.same(polygon, wkb_geometry('POLYGON ((0 0, 5 0, 5 5, 0 0))'))
+    assert comparator.counts == {'matched': 1, 'rejected': 1, 'exact': 0}
+    # Same extent, different vertices: exact comparison decides.
+    assert comparator.same(
+        polygon, wkb_geometry('POLYGON ((0 4, 0 0, 4 0, 4 4, 0 4))'), polygon
+    )
+    assert not comparator.same(
+        polygon, wkb_geometry('POLYGON ((0 0, 4 0, 4 4, 2 3, 0 4, 0 0))')
+    )
+    assert comparator.counts == {'matched': 1, 'rejected': 1, 'exact': 3}
+    assert comparator.same(None, None)
+    assert not comparator.same(polygon, None)
+
+
+def test_comparator_matches_exact():
+    rand = random.Random(47)
+    comparator = geometry.GeometryComparator(resolution=0.001)
+    for _ in range(300):
+        ring = [
+            (round(rand.uniform(0, 100), 2), round(rand.uniform(0, 100), 2))
+            for _ in range(3)
+        ]
+        variant = list(ring)
+        change = rand.choice(['same', 'rotate', 'jitter', 'move', 'midpoint'])
+        if change == 'rotate':
+            variant = variant[1:] + variant[:1]
+        elif change == 'jitter':
+            variant = [(x + 0.00001, y - 0.00001) for x, y in variant]
+        elif change == 'move':
+            variant[0] = (variant[0][0] + 0.5, variant[0][1])
+        elif change == 'midpoint':
+            (x1, y1), (x2, y2) = variant[:2]
+            variant.insert(1, ((x1 + x2) / 2, (y1 + y2) / 2))
+        shapes = [
+            geometry.WKBGeometry(geometry.polygon_to_wkb([path]), resolution=0.001)
+            for path in [ring, variant]
+        ]
+        assert comparator.same(*shapes) == shapes[0].equals(shapes[1])
+    assert all(comparator.counts.values())
+
+
+def test_same_value_geometry():
+    from arcetl.testing import fakearcpy
+
+    comparator = geometry.GeometryComparator()
+    square_wkt = 'POLYGON ((0 0, 4 0, 4 4, 0 4, 0 0))'
+    values = [fakearcpy.FromWKT(square_wkt), fakearcpy.FromWKT(square_wkt)]
+    assert arcetl.arcobj.same_value(*values, geometry_comparator=comparator)
+    assert arcetl.arcobj.same_feature(
+        [1, values[0]], [1, values[1]], geometry_comparator=comparator
+    )
+    assert comparator.counts['matched'] == 2
+    assert not arcetl.arcobj.same_value(
+        values[0], fakearcpy.FromWKT('POLYGON ((0 0, 4 0, 4 5, 0 4, 0 0))')
+    )
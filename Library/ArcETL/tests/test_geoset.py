@@ -0,0 +1,226 @@
+"""Tests for arcetl.geoset identity-dissolve engine & tile executor, on fake ArcPy."""
+import os
+import random
+
+import pytest
+
+from .context import arcetl
+from arcetl.testing import fakearcpy
+
+
+def create(path, field_metadata_list, features, field_names):
+    arcetl.dataset.create(
+        path,
+        field_metadata_list=field_metadata_list,
+        geometry_type='polygon',
+        spatial_reference_item=2914,
+        log_level=None,
+    )
+    arcetl.features.insert_from_iters(path, features, field_names, log_level=None)
+    return path
+
+
+@pytest.fixture
+def datasets():
+    """Return paths of fake lot, flood, & output datasets."""
+    fakearcpy.reset()
+    lot_fields = [
+        {'name': 'maptaxlot', 'type': 'text', 'length': 16},
+        {'name': 'taxlot', 'type': 'text', 'length': 8},
+    ]
+    # Lot A is two parts (same key); lot B is one square; lot C is a square with a
+    # hole; lot D is outside all flood areas.
+    lots = create(
+        'in_memory/lots',
+        lot_fields,
+        [
+            ('A', '1', 'POLYGON ((0 0, 0 10, 10 10, 10 0, 0 0))'),
+            ('A', '1', 'POLYGON ((10 0, 10 10, 20 10, 20 0, 10 0))'),
+            ('B', '2', 'POLYGON ((0 10, 0 20, 10 20, 10 10, 0 10))'),
+            (
+                'C',
+                '3',
+                'POLYGON ((20 0, 20 10, 30 10, 30 0, 20 0),'
+                ' (22 2, 28 2, 28 8, 22 8, 22 2))',
+            ),
+            ('D', '4', 'POLYGON ((100 100, 100 110, 110 110, 110 100, 100 100))'),
+            ('X', None, 'POLYGON ((0 0, 0 20, 30 20, 30 0, 0 0))'),
+        ],
+        ['maptaxlot', 'taxlot', 'shape@wkt'],
+    )
+    flood = create(
+        'in_memory/flood',
+        [{'name': 'fld_ar_id', 'type': 'text', 'length': 8}],
+        [
+            ('f1', 'POLYGON ((5 -5, 5 15, 25 15, 25 -5, 5 -5))'),
+            ('f2', 'POLYGON ((-5 5, -5 25, 5 25, 5 5, -5 5))'),
+            ('', 'POLYGON ((0 0, 0 30, 30 30, 30 0, 0 0))'),
+            ('f3', 'POLYGON ((200 200, 200 210, 210 210, 210 200, 200 200))'),
+        ],
+        ['fld_ar_id', 'shape@wkt'],
+    )
+    output = create(
+        'in_memory/output',
+        lot_fields + [{'name': 'flood_area_id', 'type': 'text', 'length': 8}],
+        [],
+        ['maptaxlot', 'taxlot', 'shape@wkt'],
+    )
+    yield lots, flood, output
+    fakearcpy.reset()
+
+
+def output_areas(path):
+    return {
+        row[:-1]: round(row[-1], 6)
+        for row in arcetl.attributes.as_iters(
+            path, ['maptaxlot', 'flood_area_id', 'shape@area']
+        )
+    }
+
+
+@pytest.mark.parametrize('use_shapely', [False, True])
+@pytest.mark.parametrize('tile_size', [1, 4096])
+def test_identity_dissolved(datasets, use_shapely, tile_size):
+    if use_shapely:
+        pytest.importorskip('shapely')
+    lots, flood, output = datasets
+    count = arcetl.geoset.identity_dissolved(
+        output,
+        'flood_area_id',
+        source_dataset_path=lots,
+        source_where_sql="taxlot is not null",
+        identity_dataset_path=flood,
+        identity_field_name='fld_ar_id',
+        key_field_names=['maptaxlot', 'taxlot'],
+        tile_size=tile_size,
+        use_shapely=use_shapely,
+        log_level=None,
+    )
+    assert count['inserted'] == 5
+    assert output_areas(output) == {
+        # Two lot parts dissolve to one feature per flood area.
+        ('A', 'f1'): 150.0,
+        ('A', 'f2'): 25.0,
+        ('B', 'f1'): 25.0,
+        ('B', 'f2'): 50.0,
+        # Hole area is not flooded.
+        ('C', 'f1'): 32.0,
+    }
+    assert sorted(arcetl.attributes.as_iters(output, ['taxlot'])) == [
+        ('1',), ('1',), ('2',), ('2',), ('3',)
+    ]
+
+
+def test_identity_dissolved_keep_unmatched(datasets):
+    lots, flood, output = datasets
+    arcetl.geoset.identity_dissolved(
+        output,
+        'flood_area_id',
+        source_dataset_path=lots,
+        source_where_sql="taxlot is not null",
+        identity_dataset_path=flood,
+        identity_field_name='fld_ar_id',
+        key_field_names=['maptaxlot', 'taxlot'],
+        keep_unmatched=True,
+        use_shapely=False,
+        log_level=None,
+    )
+    areas = output_areas(output)
+    assert areas[('A', None)] == 200.0 - 150.0 - 25.0
+    assert areas[('C', None)] == 64.0 - 32.0
+    assert areas[('D', None)] == 100.0
+    assert sum(area for (key, _), area in areas.items() if key == 'B') == 100.0
+
+
+def split_tile(dataset_path, oids, workspace_path):
+    """Fake tile operation: split every feature in the dataset into halves.
+
+    Ignores the tile's object IDs, so rows for other tiles' features must be dropped.
+    """
+    features = arcetl.attributes.as_iters(dataset_path, ['oid@', 'name', 'shape@'])
+    for oid, name, geom in features:
+        if geom is None:
+            continue
+
+        extent = geom.extent
+        x_mid = (extent.XMin + extent.XMax) / 2.0
+        for xmin, xmax in [(extent.XMin, x_mid), (x_mid, extent.XMax)]:
+            wkt = 'POLYGON (({0} {2}, {0} {3}, {1} {3}, {1} {2}, {0} {2}))'.format(
+                xmin, xmax, extent.YMin, extent.YMax
+            )
+            yield oid, (name, os.path.basename(workspace_path), wkt)
+
+
+@pytest.fixture
+def squares():
+    """Return path of fake dataset with a 5x5 grid of 10-unit squares."""
+    fakearcpy.reset()
+    path = create(
+        'in_memory/squares',
+        [
+            {'name': 'name', 'type': 'text', 'length': 8},
+            {'name': 'note', 'type': 'text', 'length': 32},
+        ],
+        [
+            (
+                'sq{}'.format(5 * i + j),
+                'POLYGON (({0} {1}, {0} {3}, {2} {3}, {2} {1}, {0} {1}))'.format(
+                    10 * i, 10 * j, 10 * i + 10, 10 * j + 10
+                ),
+            )
+            for i in range(5)
+            for j in range(5)
+        ],
+        ['name', 'shape@wkt'],
+    )
+    yield path
+    fakearcpy.reset()
+
+
+def test_partition_extents():
+    rand = random.Random(49)
+    extents = []
+    for feature_id in range(500):
+        x, y = rand.uniform(0, 1000), rand.uniform(0, 1000)
+        extents.append((feature_id, (x, y, x + rand.uniform(0, 50), y + 5)))
+    tiles = arcetl.geoset.partition_extents(extents, 16)
+    assert sorted(i for _, ids in tiles for i in ids) == list(range(500))
+    for (xmin, ymin, xmax, ymax), ids in tiles:
+        assert 0 < len(ids) <= 16
+        for i in ids:
+            extent = extents[i][1]
+            x, y = (extent[0] + extent[2]) / 2.0, (extent[1] + extent[3]) / 2.0
+            assert xmin <= x <= xmax and ymin <= y <= ymax
+
+
+def test_partition_extents_shared_centroid():
+    # Big feature spans every cell, but is assigned to one by its centroid.
+    extents = [(i, (0, 0, 10, 10)) for i in range(10)] + [(10, (-100, -100, 200, 200))]
+    tiles = arcetl.geoset.partition_extents(extents, 3, max_depth=4)
+    assert sorted(i for _, ids in tiles for i in ids) == list(range(11))
+    assert arcetl.geoset.partition_extents([], 3) == []
+    with pytest.raises(ValueError):
+        arcetl.geoset.partition_extents(extents, 0)
+
+
+@pytest.mark.parametrize('worker_count', [1, 2])
+def test_tile_parallel_replace(squares, worker_count):
+    count = arcetl.geoset.tile_parallel_replace(
+        squares,
+        split_tile,
+        ['name', 'note', 'shape@wkt'],
+        dataset_where_sql="name <> 'sq0'",
+        tile_size=4,
+        worker_count=worker_count,
+        log_level=None,
+    )
+    assert count == {'deleted': 24, 'inserted': 48}
+    rows = list(arcetl.attributes.as_iters(squares, ['name', 'note', 'shape@area']))
+    # Each feature is split once, whichever tiles returned rows for it.
+    assert sorted(name for name, _, _ in rows) == ['sq0'] + sorted(
+        2 * ['sq{}'.format(i) for i in range(1, 25)]
+    )
+    assert sum(area for _, _, area in rows) == 2500.0
+    workspaces = set(note for name, note, _ in rows if name != 'sq0')
+    assert all(name.startswith('worker_') for name in workspaces)
+    assert 1 <= len(workspaces) <= worker_count
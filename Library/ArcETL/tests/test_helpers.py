@@ -0,0 +1,135 @@
+"""Tests for arcetl.helpers unique ID & name generation."""
+import multiprocessing
+import random
+import threading
+
+from .context import arcetl
+from arcetl import helpers
+
+
+def _put_names(queue, count):
+    """Put unique names generated in this process on the queue."""
+    queue.put([helpers.unique_name('temp') for _ in range(count)])
+
+
+def _put_names_same_seed(queue, count):
+    """Put unique names generated after seeding random as every process does."""
+    random.seed(0)
+    _put_names(queue, count)
+
+
+def _put_reserved_ids(allocator, queue, count):
+    """Put IDs reserved from the allocator in this process on the queue."""
+    ids = []
+    for unique_id in allocator:
+        ids.append(unique_id)
+        if len(ids) == count:
+            break
+    queue.put(ids)
+
+
+def _run_in_processes(target, args, process_count=4):
+    """Return lists put on a queue by target run in several processes."""
+    queue = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(target=target, args=args[:-1] + (queue, args[-1]))
+        for _ in range(process_count)
+    ]
+    for process in processes:
+        process.start()
+    results = [queue.get(timeout=60) for _ in processes]
+    for process in processes:
+        process.join()
+    return results
+
+
+def _run_in_threads(function, thread_count=8):
+    """Return lists returned by function run in several threads."""
+    results = []
+    lock = threading.Lock()
+
+    def run():
+        result = function()
+        with lock:
+            results.append(result)
+
+    threads = [threading.Thread(target=run) for _ in range(thread_count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_unique_ids_string_exhausts_without_repeats():
+    ids = list(helpers.unique_ids(str, string_length=2))
+    assert len(ids) == len(helpers.ID_CHARACTERS) ** 2
+    assert len(set(ids)) == len(ids)
+    assert all(len(_id) == 2 for _id in ids)
+
+
+def test_unique_ids_string_length_one_scrambled():
+    for _ in range(20):
+        ids = list(helpers.unique_ids(str, string_length=1))
+        assert sorted(ids) == sorted(helpers.ID_CHARACTERS)
+        # Not simply the characters in order, from some starting point.
+        assert ''.join(ids) not in helpers.ID_CHARACTERS * 2
+
+
+def test_unique_ids_integer():
+    ids = helpers.unique_ids(int)
+    assert [next(ids) for _ in range(3)] == [1, 2, 3]
+
+
+def test_unique_name_threads():
+    results = _run_in_threads(
+        lambda: [helpers.unique_name('temp') for _ in range(5000)]
+    )
+    names = [name for result in results for name in result]
+    assert len(set(names)) == len(names)
+    assert all(name.startswith('temp') for name in names)
+
+
+def test_unique_name_processes():
+    results = _run_in_processes(_put_names, (5000,))
+    results.append([helpers.unique_name('temp') for _ in range(5000)])
+    names = [name for result in results for name in result]
+    assert len(set(names)) == len(names)
+
+
+def test_unique_name_processes_same_random_state():
+    # As forked Py2 workers share the parent's random state.
+    results = _run_in_processes(_put_names_same_seed, (100,))
+    names = [name for result in results for name in result]
+    assert len(set(names)) == len(names)
+
+
+def test_unique_path_initial_character():
+    name = helpers.unique_path(workspace_path='').lstrip('\\/')
+    assert name[0].isalpha()
+
+
+def test_id_range_allocator_reserve():
+    allocator = helpers.IDRangeAllocator(start=10, block_size=5)
+    assert list(allocator.reserve()) == [10, 11, 12, 13, 14]
+    assert list(allocator.reserve(2)) == [15, 16]
+    assert allocator.next_id == 17
+
+
+def test_id_range_allocator_threads():
+    allocator = helpers.IDRangeAllocator(block_size=7)
+
+    def take():
+        ids = allocator.ids()
+        return [next(ids) for _ in range(1000)]
+
+    ids = [_id for result in _run_in_threads(take) for _id in result]
+    assert len(set(ids)) == len(ids) == 8000
+
+
+def test_id_range_allocator_processes():
+    allocator = helpers.IDRangeAllocator(block_size=64)
+    results = _run_in_processes(_put_reserved_ids, (allocator, 1000))
+    ids = [_id for result in results for _id in result]
+    assert len(set(ids)) == len(ids) == 4000
+    assert min(ids) >= 1
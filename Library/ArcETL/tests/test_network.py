@@ -0,0 +1,142 @@
+"""Tests for arcetl.network partitioned closest-facility routing."""
+import math
+import random
+
+import pytest
+
+from .context import arcetl
+
+
+class EuclideanSolver(arcetl.network.ClosestFacilitySolver):
+    """Closest-facility solver using straight-line distance as the cost."""
+
+    def __init__(self):
+        self.solve_sizes = []
+
+    def solve(self, incidents, facilities):
+        self.solve_sizes.append((len(incidents), len(facilities)))
+        for incident_id, (x, y) in incidents:
+            cost, facility_id = min(
+                (math.hypot(fx - x, fy - y), facility_id)
+                for facility_id, (fx, fy) in facilities
+            )
+            yield {
+                "dataset_id": incident_id,
+                "facility_id": facility_id,
+                "cost": cost,
+                "geometry": None,
+            }
+
+
+def random_locations(count, seed):
+    rand = random.Random(seed)
+    return [(i, (rand.uniform(0, 10000), rand.uniform(0, 10000))) for i in range(count)]
+
+
+def test_candidate_facilities_keeps_nearest():
+    facilities = [("a", (0, 0)), ("b", (10, 0)), ("c", (100, 0)), ("d", (1000, 0))]
+    incidents = [(1, (1, 0)), (2, (95, 0))]
+    candidates = arcetl.network.candidate_facilities(incidents, facilities, 1)
+    assert [facility_id for facility_id, _ in candidates] == ["a", "c"]
+
+
+def test_partitioned_matches_single_solve():
+    incidents = random_locations(2000, seed=2)
+    facilities = [("f{}".format(i), xy) for i, xy in random_locations(40, seed=3)]
+    expected = {
+        route["dataset_id"]: route
+        for route in EuclideanSolver().solve(incidents, facilities)
+    }
+    solver = EuclideanSolver()
+    routes = list(
+        arcetl.network.partitioned_closest_facility(
+            incidents, facilities, solver, max_tile_count=128, candidate_count=2
+        )
+    )
+    assert len(routes) == len(expected)
+    for route in routes:
+        assert route["facility_id"] == expected[route["dataset_id"]]["facility_id"]
+    # Every partition solved against a reduced facility set.
+    assert all(size <= 128 for size, _ in solver.solve_sizes)
+    assert all(count < len(facilities) for _, count in solver.solve_sizes)
+
+
+def test_partitioned_worker_processes():
+    incidents = random_locations(500, seed=4)
+    facilities = [("f{}".format(i), xy) for i, xy in random_locations(10, seed=5)]
+    kwargs = {"max_tile_count": 100, "candidate_count": 3}
+    serial = list(
+        arcetl.network.partitioned_closest_facility(
+            incidents, facilities, EuclideanSolver(), **kwargs
+        )
+    )
+    parallel = list(
+        arcetl.network.partitioned_closest_facility(
+            incidents, facilities, EuclideanSolver(), worker_count=2, **kwargs
+        )
+    )
+    key = lambda route: route["dataset_id"]
+    assert sorted(serial, key=key) == sorted(parallel, key=key)
+
+
+def test_partitioned_keeps_least_cost_duplicate():
+
+    class DuplicatingSolver(arcetl.network.ClosestFacilitySolver):
+        def solve(self, incidents, facilities):
+            for incident_id, _ in incidents:
+                for cost in [5.0, 2.0, 7.0]:
+                    yield {
+                        "dataset_id": incident_id,
+                        "facility_id": cost,
+                        "cost": cost,
+                        "geometry": None,
+                    }
+
+    routes = list(
+        arcetl.network.partitioned_closest_facility(
+            [(1, (0, 0))], [("a", (1, 1))], DuplicatingSolver()
+        )
+    )
+    assert [route["cost"] for route in routes] == [2.0]
+
+
+def test_network_solver_deletes_locations(monkeypatch):
+    solver_class = arcetl.network.NetworkClosestFacilitySolver
+    paths = []
+
+    def create_locations(self, locations, id_field_metadata):
+        paths.append(original_create_locations(self, locations, id_field_metadata))
+        return paths[-1]
+
+    def route(**kwargs):
+        for incident_id in [1, 2]:
+            yield {
+                "dataset_id": incident_id,
+                "facility_id": "a",
+                "cost": 1.0,
+                "geometry": None,
+            }
+
+    def failed_route(**kwargs):
+        raise RuntimeError("Solve failed.")
+
+    original_create_locations = solver_class._create_locations
+    monkeypatch.setattr(solver_class, "_create_locations", create_locations)
+    monkeypatch.setattr(arcetl.network, "closest_facility_route", route)
+    solver = solver_class(
+        network_path="network",
+        cost_attribute="cost",
+        id_field_metadata={"name": "id", "type": "long"},
+        facility_id_field_metadata={"name": "id", "type": "string", "length": 8},
+        spatial_reference_id=2914,
+    )
+    # Deleted even though routes are not run through.
+    routes = solver.solve([(1, (0, 0)), (2, (5, 5))], [("a", (1, 1))])
+    assert next(routes)["dataset_id"] == 1
+    assert len(paths) == 2
+    assert not any(arcetl.dataset.is_valid(path) for path in paths)
+    monkeypatch.setattr(arcetl.network, "closest_facility_route", failed_route)
+    with pytest.raises(RuntimeError):
+        list(solver.solve([(1, (0, 0))], [("a", (1, 1))]))
+    assert len(paths) == 4
+    assert not any(arcetl.dataset.is_valid(path) for path in paths)
@@ -0,0 +1,122 @@
+"""Tests for arcetl.projection coordinate math."""
+import math
+import random
+
+import pytest
+
+from .context import arcetl
+from arcetl import projection
+
+US_FOOT = 1200 / 3937.0
+
+
+def meridian_arc(ellipsoid, latitude, steps=20000):
+    """Return meridian arc length (meters) from the equator, by Simpson's rule."""
+    a, flattening = ellipsoid
+    e2 = flattening * (2 - flattening)
+    h = math.radians(latitude) / steps
+    total = 0.0
+    for i in range(steps + 1):
+        weight = 1 if i in (0, steps) else (4 if i % 2 else 2)
+        total += weight * a * (1 - e2) / (1 - e2 * math.sin(i * h) ** 2) ** 1.5
+    return total * h / 3
+
+
+def test_lambert_conformal_conic_reference():
+    # EPSG Guidance Note 7-2 example: NAD27 / Texas South Central.
+    lcc = projection.LambertConformalConic(
+        (6378206.4, 1 / 294.9786982),
+        (-99.0, 27 + 50 / 60.0),
+        (28 + 23 / 60.0, 30 + 17 / 60.0),
+        (2000000 * US_FOOT, 0.0),
+        unit=US_FOOT,
+    )
+    xs, ys = lcc.forward([-96.0], [28.5])
+    assert xs[0] == pytest.approx(2963503.91, abs=0.005)
+    assert ys[0] == pytest.approx(254759.80, abs=0.005)
+
+
+def test_transverse_mercator_reference():
+    # EPSG Guidance Note 7-2 example: OSGB 1936 / British National Grid.
+    tm = projection.TransverseMercator(
+        (6377563.396, 1 / 299.3249646), (-2.0, 49.0), 0.9996012717, (400000, -100000)
+    )
+    xs, ys = tm.forward([0.5], [50.5])
+    assert xs[0] == pytest.approx(577274.98, abs=0.005)
+    assert ys[0] == pytest.approx(69740.49, abs=0.005)
+
+
+@pytest.mark.parametrize('latitude', [0.0, 42.0, 45.0, 46.3])
+def test_utm_central_meridian(latitude):
+    for srid, ellipsoid in [(26910, projection.GRS80), (32610, projection.WGS84)]:
+        xs, ys = projection.PROJECTION[srid].forward([-123.0], [latitude])
+        assert xs[0] == pytest.approx(500000.0, abs=1e-6)
+        assert ys[0] == pytest.approx(0.9996 * meridian_arc(ellipsoid, latitude), abs=1e-4)
+
+
+def test_state_plane_origins():
+    for srid, latitude in [(2913, 43 + 40 / 60.0), (2914, 41 + 40 / 60.0), (2992, 41.75)]:
+        meters = 0.3048
+        xs, ys = projection.PROJECTION[srid].forward([-120.5], [latitude])
+        assert xs[0] * meters == pytest.approx(
+            {2913: 2500000.0, 2914: 1500000.0, 2992: 400000.0}[srid], abs=1e-6
+        )
+        assert ys[0] == pytest.approx(0.0, abs=1e-6)
+
+
+def test_lambert_scale_on_standard_parallels():
+    """Ground distance along a standard parallel is true to scale."""
+    lcc = projection.PROJECTION[2914]
+    a, flattening = projection.GRS80
+    e2 = flattening * (2 - flattening)
+    for latitude in [44.0, 42 + 20 / 60.0]:
+        xs, ys = lcc.forward([-123.0, -122.999], [latitude, latitude])
+        grid = math.hypot(xs[1] - xs[0], ys[1] - ys[0]) * 0.3048
+        radius = a * math.cos(math.radians(latitude)) / math.sqrt(
+            1 - e2 * math.sin(math.radians(latitude)) ** 2
+        )
+        # Chord of a 0.001-degree parallel arc (under a micrometer from the arc).
+        ground = 2 * radius * math.sin(math.radians(0.001) / 2)
+        assert grid == pytest.approx(ground, abs=1e-6)
+
+
+@pytest.mark.parametrize('srid', [2913, 2914, 2992, 26910, 32610])
+def test_round_trip_within_millimeter(srid):
+    rand = random.Random(srid)
+    lons = [rand.uniform(-124.6, -116.5) for _ in range(2000)]
+    lats = [rand.uniform(41.9, 46.3) for _ in range(2000)]
+    xs, ys = projection.transform(lons, lats, 4326, srid)
+    back_lons, back_lats = projection.transform(xs, ys, srid, 4326)
+    again_xs, again_ys = projection.transform(back_lons, back_lats, 4326, srid)
+    unit = projection.PROJECTION[srid].unit
+    assert max(abs(b - a) for a, b in zip(lons, back_lons)) < 1e-9
+    assert max(abs(b - a) for a, b in zip(lats, back_lats)) < 1e-9
+    assert max(abs(b - a) * unit for a, b in zip(xs + ys, again_xs + again_ys)) < 1e-3
+
+
+def test_transform_between_projections():
+    xs, ys = projection.transform([4250000.0, None], [870000.0, None], 2914, 26910)
+    lons, lats = projection.transform([4250000.0], [870000.0], 2914, 4326)
+    utm_xs, utm_ys = projection.transform(lons, lats, 4326, 26910)
+    assert xs[0] == pytest.approx(utm_xs[0], abs=1e-6)
+    assert ys[0] == pytest.approx(utm_ys[0], abs=1e-6)
+    assert (xs[1], ys[1]) == (None, None)
+    with pytest.raises(ValueError):
+        projection.transform([0.0], [0.0], 2914, 3857)
+    assert projection.is_supported(2914, 4326)
+    assert not projection.is_supported(2914, 3857)
+
+
+def test_pyproj_agrees():
+    pytest.importorskip('pyproj')
+    rand = random.Random(0)
+    lons = [rand.uniform(-124.6, -116.5) for _ in range(500)]
+    lats = [rand.uniform(41.9, 46.3) for _ in range(500)]
+    for srid in [2913, 2914, 2992, 26910, 32610]:
+        ours = projection.transform(lons, lats, 4269, srid)
+        theirs = projection.transform(lons, lats, 4269, srid, use_pyproj=True)
+        unit = projection.PROJECTION[srid].unit
+        for ours_coords, their_coords in zip(ours, theirs):
+            assert max(
+                abs(a - b) * unit for a, b in zip(ours_coords, their_coords)
+            ) < 1e-3
@@ -0,0 +1,139 @@
+"""Tests for arcetl.proximity point-in-polygon matching."""
+import random
+
+
+from .context import arcetl
+from arcetl import geometry
+from arcetl.testing import fakearcpy
+
+
+def square(x, y, size=1.0):
+    return [(x, y), (x + size, y), (x + size, y + size), (x, y + size)]
+
+
+def matches(points, polygons, tolerance=0.0):
+    result = {point_id: set() for point_id, _ in points}
+    for point_id, value in geometry.point_polygon_matches(points, polygons, tolerance):
+        result[point_id].add(value)
+    return result
+
+
+def test_hole():
+    donut = [square(0, 0, 4), list(reversed(square(1, 1, 2)))]
+    points = [('in', (0.5, 0.5)), ('hole', (2, 2)), ('hole_edge', (1, 2))]
+    assert matches(points, [('donut', donut)]) == {
+        'in': {'donut'},
+        'hole': set(),
+        'hole_edge': {'donut'},
+    }
+
+
+def test_multipart():
+    multipart = [square(0, 0), square(5, 5)]
+    points = [('a', (0.5, 0.5)), ('b', (5.5, 5.5)), ('between', (3, 3))]
+    assert matches(points, [('multi', multipart)]) == {
+        'a': {'multi'},
+        'b': {'multi'},
+        'between': set(),
+    }
+
+
+def test_shared_edges():
+    polygons = [('left', [square(0, 0)]), ('right', [square(1, 0)])]
+    points = [
+        ('edge', (1, 0.5)),
+        ('corner', (1, 1)),
+        ('left', (0.5, 0.5)),
+        ('right', (1.5, 0.5)),
+        ('outside', (1, 1.5)),
+    ]
+    assert matches(points, polygons) == {
+        'edge': {'left', 'right'},
+        'corner': {'left', 'right'},
+        'left': {'left'},
+        'right': {'right'},
+        'outside': set(),
+    }
+
+
+def test_diagonal_edge_tolerance():
+    triangle = [[(0, 0), (3, 0), (0, 3)]]
+    points = [('near', (1.51, 1.51)), ('far', (1.6, 1.6)), ('vertex', (3, 0))]
+    assert matches(points, [('tri', triangle)]) == {
+        'near': set(),
+        'far': set(),
+        'vertex': {'tri'},
+    }
+    assert matches(points, [('tri', triangle)], tolerance=0.05) == {
+        'near': {'tri'},
+        'far': set(),
+        'vertex': {'tri'},
+    }
+
+
+def test_matches_brute_force():
+    rand = random.Random(3)
+    polygons = []
+    for i in range(200):
+        x, y = rand.uniform(0, 100), rand.uniform(0, 100)
+        ring = [
+            (x + rand.uniform(-5, 5), y + rand.uniform(-5, 5)) for _ in range(3)
+        ]
+        polygons.append((i, [ring]))
+    points = [(i, (rand.uniform(0, 100), rand.uniform(0, 100))) for i in range(2000)]
+    expected = {
+        point_id: {
+            value
+            for value, polygon in polygons
+            if geometry._points_in_rings([xy], polygon)[0]
+        }
+        for point_id, xy in points
+    }
+    assert matches(points, polygons) == expected
+    assert any(expected.values())
+
+
+def test_points_in_polygons_datasets():
+    fakearcpy.reset()
+    addresses = arcetl.dataset.create(
+        'in_memory/addresses',
+        field_metadata_list=[{'name': 'address_id', 'type': 'long'}],
+        geometry_type='point',
+        spatial_reference_item=2914,
+        log_level=None,
+    )
+    arcetl.features.insert_from_iters(
+        addresses,
+        [(1, (0.5, 0.5)), (2, (1, 0.5)), (3, (9, 9)), (4, None)],
+        ['address_id', 'shape@xy'],
+        log_level=None,
+    )
+    lots = arcetl.dataset.create(
+        'in_memory/lots',
+        field_metadata_list=[{'name': 'maptaxlot', 'type': 'text', 'length': 16}],
+        geometry_type='polygon',
+        spatial_reference_item=2914,
+        log_level=None,
+    )
+    arcetl.features.insert_from_iters(
+        lots,
+        [
+            ('A', 'POLYGON ((0 0, 0 1, 1 1, 1 0, 0 0))'),
+            ('B', 'POLYGON ((1 0, 1 1, 2 1, 2 0, 1 0))'),
+        ],
+        ['maptaxlot', 'shape@wkt'],
+        log_level=None,
+    )
+    assert arcetl.proximity.points_in_polygons(
+        addresses, 'address_id', lots, 'maptaxlot'
+    ) == {1: {'A'}, 2: {'A', 'B'}, 3: set(), 4: set()}
+    assert arcetl.proximity.points_in_polygons(
+        addresses,
+        'address_id',
+        lots,
+        'maptaxlot',
+        dataset_where_sql='address_id = 2',
+        polygon_where_sql="maptaxlot = 'B'",
+    ) == {2: {'B'}}
+    fakearcpy.reset()
+
@@ -0,0 +1,209 @@
+"""Tests for arcetl.pushdown SQL update planning."""
+import sqlite3
+
+import pytest
+
+from .context import arcetl
+from arcetl import pushdown
+from arcetl.testing import fakearcpy
+
+
+class FakeDescribe(object):
+    isArchived = False
+
+
+def meta(name='taxlot', versioned=False, archived=False):
+    describe = FakeDescribe()
+    describe.isArchived = archived
+    return {
+        'object': describe,
+        'name': name,
+        'is_versioned': versioned,
+        'oid_field_name': 'objectid',
+        'fields': [
+            {'name': 'objectid', 'type': 'oid'},
+            {'name': 'maptaxlot', 'type': 'string'},
+            {'name': 'owner', 'type': 'string'},
+            {'name': 'acres', 'type': 'double'},
+            {'name': 'shape', 'type': 'geometry'},
+        ],
+    }
+
+
+JOIN_SPEC = {
+    'join_table': 'rlid.dbo.owner',
+    'join_field_name': 'owner_name',
+    'on_field_pairs': [('maptaxlot', 'maptaxlot')],
+}
+
+
+def test_update_statement_value():
+    statement = pushdown.update_statement(
+        'RLID.dbo.Taxlot', 'acres', {'value': 1.5}, dataset_where_sql='acres > 0'
+    )
+    assert statement.sql == (
+        'UPDATE "RLID"."dbo"."Taxlot" SET "acres" = ? WHERE (acres > 0) AND'
+        ' ("acres" <> ? OR "acres" IS NULL)'
+    )
+    assert statement.parameters == [1.5, 1.5]
+    statement = pushdown.update_statement('taxlot', 'owner', {'value': None})
+    assert statement == ('UPDATE "taxlot" SET "owner" = NULL WHERE "owner" IS NOT NULL', [])
+    statement = pushdown.update_statement(
+        'taxlot', 'owner', {'value': 'A'}, is_text=True
+    )
+    assert '"owner" COLLATE Latin1_General_BIN2 <> ?' in statement.sql
+    statement = pushdown.update_statement(
+        'taxlot', 'owner', {'value': 'A'}, is_text=True, dialect='sqlite'
+    )
+    assert 'COLLATE' not in statement.sql
+
+
+def test_update_statement_expression_join():
+    statement = pushdown.update_statement(
+        'taxlot', 'owner', {'expression': 'upper(owner)'}, dialect='sqlite'
+    )
+    assert statement.sql == (
+        'UPDATE "taxlot" SET "owner" = (upper(owner)) WHERE ("owner" <> (upper(owner))'
+        ' OR ("owner" IS NULL AND (upper(owner)) IS NOT NULL)'
+        ' OR ("owner" IS NOT NULL AND (upper(owner)) IS NULL))'
+    )
+    statement = pushdown.update_statement(
+        'RLID.dbo.Taxlot', 'owner', JOIN_SPEC, oid_field_name='OBJECTID'
+    )
+    assert statement.sql.startswith(
+        'UPDATE target SET "owner" = joined."owner_name" FROM "RLID"."dbo"."Taxlot"'
+        ' AS target INNER JOIN (SELECT "OBJECTID" AS source_oid, "maptaxlot" FROM'
+        ' "RLID"."dbo"."Taxlot") AS source ON target."OBJECTID" = source.source_oid'
+        ' LEFT JOIN "rlid"."dbo"."owner" AS joined'
+        ' ON joined."maptaxlot" = source."maptaxlot" WHERE ('
+    )
+    with pytest.raises(ValueError):
+        pushdown.update_statement('taxlot', 'owner', {'value': 1, 'expression': 'x'})
+    with pytest.raises(ValueError):
+        pushdown.update_statement('taxlot', 'owner', {'value': 1}, dialect='oracle')
+
+
+def test_unsupported_reason():
+    reason = pushdown.unsupported_reason
+    assert reason(meta(), 'owner', {'value': 'A'}) is None
+    assert reason(meta(), 'OWNER', {'value': None}) is None
+    assert reason(meta(versioned=True), 'owner', {'value': 'A'}) == 'taxlot is versioned'
+    assert reason(meta(archived=True), 'owner', {'value': 'A'}) == 'taxlot is archived'
+    assert reason(meta(), 'shape', {'value': None}) == 'geometry field'
+    assert reason(meta(), 'nope', {'value': None}) == 'field not in taxlot'
+    assert reason(meta(), 'owner', {'value': object()}) == 'value type object'
+    assert reason(meta(), 'owner', JOIN_SPEC) == 'no join dataset metadata'
+    assert (
+        reason(meta(), 'owner', JOIN_SPEC, meta('owner', versioned=True))
+        == 'owner is versioned'
+    )
+    assert pushdown.plan_update(meta(versioned=True), 'owner', {'value': 'A'}) is None
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(':memory:')
+    conn.executescript(
+        """
+        create table taxlot (objectid integer primary key, maptaxlot text,
+            owner text, acres real);
+        insert into taxlot values (1, 'A', 'Smith', 1.0), (2, 'B', null, 2.0),
+            (3, 'C', 'Jones', 3.0), (4, 'D', 'Keep', 4.0);
+        create table owner (objectid integer, maptaxlot text, owner_name text);
+        insert into owner values (9, 'A', 'Smith'), (8, 'B', 'Brown'),
+            (7, 'C', null);
+        """
+    )
+    yield conn
+
+    conn.close()
+
+
+def rows(conn):
+    return conn.execute('select * from taxlot order by objectid;').fetchall()
+
+
+def test_execute_join(conn):
+    plan = pushdown.plan_update(
+        meta(),
+        'owner',
+        dict(JOIN_SPEC, join_table='owner'),
+        # Where-clause field names are also in the join table.
+        dataset_where_sql="maptaxlot <> 'D' and objectid < 9",
+        join_dataset_meta=meta('owner'),
+        dialect='sqlite',
+    )
+    assert pushdown.execute_plan(conn, plan) == {'altered': 2, 'unchanged': 1}
+    assert rows(conn) == [
+        (1, 'A', 'Smith', 1.0),
+        (2, 'B', 'Brown', 2.0),
+        (3, 'C', None, 3.0),
+        (4, 'D', 'Keep', 4.0),
+    ]
+    # Rows with no join are set to null, as the cursor update does.
+    plan = pushdown.plan_update(
+        meta(),
+        'owner',
+        dict(JOIN_SPEC, join_table='owner'),
+        join_dataset_meta=meta('owner'),
+        dialect='sqlite',
+    )
+    assert pushdown.execute_plan(conn, plan) == {'altered': 1, 'unchanged': 3}
+    assert rows(conn)[3] == (4, 'D', None, 4.0)
+
+
+def test_execute_value_expression(conn):
+    for spec, where_sql, expected_count in [
+        ({'value': 2.0}, 'acres >= 2', {'altered': 2, 'unchanged': 1}),
+        ({'value': 2.0}, 'acres >= 2', {'unchanged': 3}),
+        ({'value': None}, None, {'altered': 3, 'unchanged': 1}),
+        ({'expression': "maptaxlot || '-1'"}, None, {'altered': 4}),
+    ]:
+        field_name = 'acres' if 'value' in spec and spec['value'] else 'owner'
+        plan = pushdown.plan_update(
+            meta(), field_name, spec, dataset_where_sql=where_sql, dialect='sqlite'
+        )
+        assert pushdown.execute_plan(conn, plan) == expected_count
+    assert rows(conn) == [
+        (1, 'A', 'A-1', 1.0),
+        (2, 'B', 'B-1', 2.0),
+        (3, 'C', 'C-1', 2.0),
+        (4, 'D', 'D-1', 2.0),
+    ]
+
+
+def test_execute_rolls_back(conn):
+    plan = pushdown.plan_update(
+        meta(), 'owner', {'expression': 'no_such_field'}, dialect='sqlite'
+    )
+    with pytest.raises(sqlite3.OperationalError):
+        pushdown.execute_plan(conn, plan)
+    assert rows(conn)[0] == (1, 'A', 'Smith', 1.0)
+
+
+def test_update_by_value_pushdown(conn):
+    fakearcpy.reset()
+    path = 'in_memory/taxlot'
+    arcetl.dataset.create(
+        path,
+        field_metadata_list=[{'name': 'owner', 'type': 'text', 'length': 32}],
+        log_level=None,
+    )
+    arcetl.features.insert_from_iters(path, [('Smith',)], ['owner'], log_level=None)
+    update_count = arcetl.attributes.update_by_value(
+        path,
+        'owner',
+        'Doe',
+        dataset_where_sql='objectid > 2',
+        sql_connection=conn,
+        sql_dialect='sqlite',
+        log_level=None,
+    )
+    assert update_count == {'altered': 2}
+    assert [row[2] for row in rows(conn)] == ['Smith', None, 'Doe', 'Doe']
+    # Cursor fallback without a connection.
+    update_count = arcetl.attributes.update_by_value(
+        path, 'owner', 'Doe', log_level=None
+    )
+    assert update_count == {'altered': 1}
+    fakearcpy.reset()
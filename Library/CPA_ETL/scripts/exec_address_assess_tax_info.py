@@ -4,11 +4,17 @@ from collections import defaultdict
 import logging
 
 import arcetl
-import arcpy
+from etlassist.cache import cached_lookup
 from etlassist.pipeline import Job, execute_pipeline
+from etlassist.rules import Rule, RuleTable, column_value
 
 from helper import dataset
-from helper.misc import CURRENT_TAX_YEAR, rlid_accounts, rlid_tax_year_accounts
+from helper.misc import (
+    CURRENT_TAX_YEAR,
+    RLID_CHANGE_SOURCE,
+    rlid_accounts,
+    rlid_tax_year_accounts,
+)
 
 
 LOG = logging.getLogger(__name__)
@@ -23,107 +29,166 @@ ADDRESS_WHERE_SQL["valid"] = ADDRESS_WHERE_SQL["unarchived"] + " and valid = 'Y'
 # Helpers.
 
 
-def address_accounts():
-    """Generate address ID & tax account tuple."""
+def address_account_changes():
+    """Generate address ID & tax account tuple, for addresses whose account changes.
+
+    Yields:
+        tuple
+    """
+    for address_account in address_accounts(changes_only=True):
+        yield address_account
+
+
+def address_accounts(changes_only=False):
+    """Generate address ID & tax account tuple.
+
+    Args:
+        changes_only (bool): Generate only addresses whose account changes if True.
+
+    Yields:
+        tuple
+    """
     taxlot_accounts = taxlot_accounts_map()
     taxlot_code_accounts = taxlot_code_accounts_map()
+    # Precompute multiplicity: the single account where only one, else None.
+    taxlot_single = {
+        key: min(accounts) if len(accounts) == 1 else None
+        for key, accounts in taxlot_accounts.items()
+    }
+    taxlot_code_single = {
+        key: min(accounts) if len(accounts) == 1 else None
+        for key, accounts in taxlot_code_accounts.items()
+    }
     addr_tax_code = arcetl.attributes.id_map(
         dataset.ADDRESS_ASSESS_TAX_INFO.path(),
         id_field_names=["geofeat_id"],
         field_names=["tax_code_overlay"],
     )
-    g_addr_attrs = arcetl.attributes.as_dicts(
+    field_names = ["geofeat_id", "maptaxlot", "account", "valid", "archived"]
+    columns = {name: [] for name in field_names + ["tax_code", "maptaxlot_code"]}
+    g_addr_attrs = arcetl.attributes.as_iters(
         dataset.SITE_ADDRESS.path("maint"),
-        field_names=["geofeat_id", "maptaxlot", "account", "valid", "archived"],
+        field_names=field_names,
         dataset_where_sql=ADDRESS_WHERE_SQL["valid"],
     )
     for addr in g_addr_attrs:
-        addr["tax_code"] = addr_tax_code[addr["geofeat_id"]]
-        addr["maptaxlot_code"] = (addr["maptaxlot"], addr["tax_code"])
-        # Order of checks matter!
-        # Manually-set no-account flag: Preserve.
-        if addr["account"] == "NO ACCT":
-            pass
-
-        # Archived & invalid address: No-account flag.
-        elif addr["archived"] == "Y" or addr["valid"] == "N":
-            addr["account"] = "NO ACCT"
-        # Missing taxlot: Clear account.
-        elif not addr["maptaxlot"]:
-            addr["account"] = None
-        # Address in right-of-way: ROW exception flag.
-        elif int(addr["maptaxlot"][-5:]) < 100:
-            addr["account"] = "ROAD"
-        # Taxlot not (yet) in RLID A&T data: Preserve set account.
-        elif addr["maptaxlot"] not in taxlot_accounts:
-            pass
-
-        # Only one account associated with taxlot: Assign.
-        elif len(taxlot_accounts[addr["maptaxlot"]]) == 1:
-            addr["account"] = min(taxlot_accounts[addr["maptaxlot"]])
-        # Past here means multiple accounts on taxlot.
-        # Taxlot-code pair not (yet) in RLID A&T data: Preserve set account.
-        elif addr["maptaxlot_code"] not in taxlot_code_accounts:
-            pass
-
-        # Only one account associated with taxlot/tax code combo: Assign.
-        elif len(taxlot_code_accounts[addr["maptaxlot_code"]]) == 1:
-            addr["account"] = min(taxlot_code_accounts[addr["maptaxlot_code"]])
-        # Past here means multiple accounts on taxlot-code combo.
-        # Current account is valid for taxlot: Preserve set account.
-        elif addr["account"] and addr["account"] in taxlot_accounts[addr["maptaxlot"]]:
-            pass
-
-        # Didn not satisify any of the above criteria: Clear account.
-        else:
-            addr["account"] = None
-        yield (addr["geofeat_id"], addr["account"])
+        for name, value in zip(field_names, addr):
+            columns[name].append(value)
+        columns["tax_code"].append(addr_tax_code.get(addr[0]))
+        columns["maptaxlot_code"].append((addr[1], columns["tax_code"][-1]))
+    preserve = column_value("account")
+    # Order of rules matter!
+    rules = RuleTable(
+        [
+            # Manually-set no-account flag: Preserve.
+            Rule(
+                "no-account flag",
+                lambda cols, idx: [cols["account"][i] == "NO ACCT" for i in idx],
+                preserve,
+            ),
+            # Archived & invalid address: No-account flag.
+            Rule(
+                "archived or invalid",
+                lambda cols, idx: [
+                    cols["archived"][i] == "Y" or cols["valid"][i] == "N" for i in idx
+                ],
+                "NO ACCT",
+            ),
+            # Missing taxlot: Clear account.
+            Rule(
+                "missing taxlot",
+                lambda cols, idx: [not cols["maptaxlot"][i] for i in idx],
+                None,
+            ),
+            # Address in right-of-way: ROW exception flag.
+            Rule(
+                "right-of-way",
+                lambda cols, idx: [int(cols["maptaxlot"][i][-5:]) < 100 for i in idx],
+                "ROAD",
+            ),
+            # Taxlot not (yet) in RLID A&T data: Preserve set account.
+            Rule(
+                "taxlot not in A&T",
+                lambda cols, idx: [
+                    cols["maptaxlot"][i] not in taxlot_single for i in idx
+                ],
+                preserve,
+            ),
+            # Only one account associated with taxlot: Assign.
+            Rule(
+                "single taxlot account",
+                lambda cols, idx: [
+                    taxlot_single[cols["maptaxlot"][i]] is not None for i in idx
+                ],
+                lambda cols, i: taxlot_single[cols["maptaxlot"][i]],
+            ),
+            # Past here means multiple accounts on taxlot.
+            # Taxlot-code pair not (yet) in RLID A&T data: Preserve set account.
+            Rule(
+                "taxlot-code not in A&T",
+                lambda cols, idx: [
+                    cols["maptaxlot_code"][i] not in taxlot_code_single for i in idx
+                ],
+                preserve,
+            ),
+            # Only one account associated with taxlot/tax code combo: Assign.
+            Rule(
+                "single taxlot-code account",
+                lambda cols, idx: [
+                    taxlot_code_single[cols["maptaxlot_code"][i]] is not None
+                    for i in idx
+                ],
+                lambda cols, i: taxlot_code_single[cols["maptaxlot_code"][i]],
+            ),
+            # Past here means multiple accounts on taxlot-code combo.
+            # Current account is valid for taxlot: Preserve set account.
+            Rule(
+                "valid current account",
+                lambda cols, idx: [
+                    bool(cols["account"][i])
+                    and cols["account"][i] in taxlot_accounts[cols["maptaxlot"][i]]
+                    for i in idx
+                ],
+                preserve,
+            ),
+        ],
+        # Did not satisify any of the above criteria: Clear account.
+        default=None,
+    )
+    if changes_only:
+        for addr_id, account in rules.changes(columns, "geofeat_id", "account"):
+            yield (addr_id, account)
+
+    else:
+        for addr_id, account in zip(columns["geofeat_id"], rules.resolve(columns)):
+            yield (addr_id, account)
+
+    LOG.info("Account rule counts: %s.", dict(rules.rule_counts))
 
 
 def address_maptaxlots():
     """Generate address ID & maptaxlot tuple."""
-    address_copy = arcetl.TempDatasetCopy(
+    addr_overlay_maptaxlots = arcetl.proximity.points_in_polygons(
         dataset.SITE_ADDRESS.path("maint"),
+        id_field_name="geofeat_id",
+        polygon_dataset_path=dataset.TAXLOT.path("maint"),
+        polygon_field_name="maptaxlot",
         dataset_where_sql=ADDRESS_WHERE_SQL["unarchived"],
-        field_names=["geofeat_id", "maptaxlot"],
-    )
-    taxlot_copy = arcetl.TempDatasetCopy(
-        dataset.TAXLOT.path("maint"), field_names=["maptaxlot"]
     )
-    with address_copy, taxlot_copy:
-        arcetl.dataset.rename_field(
-            dataset_path=taxlot_copy.path,
-            field_name="maptaxlot",
-            new_field_name="overlay_maptaxlot",
-            log_level=None,
-        )
-        output_path = arcetl.unique_path()
-        arcpy.analysis.SpatialJoin(
-            target_features=address_copy.path,
-            join_features=taxlot_copy.path,
-            out_feature_class=output_path,
-            join_operation="join_one_to_many",
-            join_type="keep_all",
-            match_option="within",
-        )
-    addr_maptaxlot = {}
     g_addr_maptaxlots = arcetl.attributes.as_iters(
-        output_path, field_names=["geofeat_id", "maptaxlot", "overlay_maptaxlot"]
+        dataset.SITE_ADDRESS.path("maint"),
+        field_names=["geofeat_id", "maptaxlot"],
+        dataset_where_sql=ADDRESS_WHERE_SQL["unarchived"],
     )
-    for addr_id, maptaxlot, overlay_maptaxlot in g_addr_maptaxlots:
-        if addr_id not in addr_maptaxlot:
-            addr_maptaxlot[addr_id] = {"current": maptaxlot, "overlays": set()}
-        if overlay_maptaxlot:
-            addr_maptaxlot[addr_id]["overlays"].add(overlay_maptaxlot)
-    arcetl.dataset.delete(output_path)
-    for addr_id, maptaxlot in addr_maptaxlot.items():
+    for addr_id, maptaxlot in g_addr_maptaxlots:
+        overlay_maptaxlots = addr_overlay_maptaxlots[addr_id] - {None, ""}
         # OK if assigned taxlot in overlaid taxlots.
-        if maptaxlot["current"] in maptaxlot["overlays"]:
-            yield (addr_id, maptaxlot["current"])
+        if maptaxlot in overlay_maptaxlots:
+            yield (addr_id, maptaxlot)
 
         # Can assign if only one overlaid taxlot.
-        elif len(maptaxlot["overlays"]) == 1:
-            yield (addr_id, maptaxlot["overlays"].pop())
+        elif len(overlay_maptaxlots) == 1:
+            yield (addr_id, overlay_maptaxlots.pop())
 
         # Cannot assign if there are multiple: needs manual override.
         else:
@@ -132,33 +197,19 @@ def address_maptaxlots():
 
 def address_tax_codes():
     """Generate address ID & tax code tuple."""
-    address_copy = arcetl.TempDatasetCopy(
+    addr_tax_codes = arcetl.proximity.points_in_polygons(
         dataset.SITE_ADDRESS.path("maint"),
+        id_field_name="geofeat_id",
+        polygon_dataset_path=dataset.TAX_CODE_AREA_CERTIFIED.path(CURRENT_TAX_YEAR),
+        polygon_field_name="taxcode",
         dataset_where_sql=ADDRESS_WHERE_SQL["valid"],
-        field_names=["geofeat_id"],
     )
-    with address_copy:
-        arcetl.dataset.add_field(
-            address_copy.path,
-            field_name="tax_code",
-            field_type="text",
-            field_length=6,
-            log_level=None,
-        )
-        arcetl.attributes.update_by_overlay(
-            address_copy.path,
-            field_name="tax_code",
-            overlay_dataset_path=dataset.TAX_CODE_AREA_CERTIFIED.path(CURRENT_TAX_YEAR),
-            overlay_field_name="taxcode",
-            log_level=None,
-        )
-        g_addr_tax_code = arcetl.attributes.as_iters(
-            address_copy.path, field_names=["geofeat_id", "tax_code"]
-        )
-        for addr_id, tax_code in g_addr_tax_code:
-            yield (addr_id, tax_code)
+    for addr_id, tax_codes in addr_tax_codes.items():
+        # Addresses on a boundary between code areas get the lowest code.
+        yield (addr_id, min(tax_codes) if tax_codes else None)
 
 
+@cached_lookup(sources=[RLID_CHANGE_SOURCE])
 def taxlot_accounts_map():
     """Return mapping of maptaxlot to set of accounts."""
     g_account_taxlot = rlid_accounts(
@@ -168,9 +219,10 @@ def taxlot_accounts_map():
     for account, maptaxlot in g_account_taxlot:
         if account and maptaxlot:
             taxlot_accounts[maptaxlot].add(str(account))
-    return taxlot_accounts
+    return dict(taxlot_accounts)
 
 
+@cached_lookup(sources=[RLID_CHANGE_SOURCE])
 def taxlot_code_accounts_map():
     """Return mapping of maptaxlot & tax code to set of accounts."""
     g_account_taxlot_code = rlid_tax_year_accounts(
@@ -180,7 +232,7 @@ def taxlot_code_accounts_map():
     for account, maptaxlot, code in g_account_taxlot_code:
         taxlot_code = (maptaxlot, code[:3] + "-" + code[3:] if code else None)
         taxlot_code_accounts[taxlot_code].add(str(account))
-    return taxlot_code_accounts
+    return dict(taxlot_code_accounts)
 
 
 # ETLs & updates.
@@ -221,7 +273,12 @@ def assess_tax_info_update():
         {
             "update_features": address_accounts,
             "field_names": ["geofeat_id", "account"],
-            "datasets": ["info", "address"],
+            "datasets": ["info"],
+        },
+        {
+            "update_features": address_account_changes,
+            "field_names": ["geofeat_id", "account"],
+            "datasets": ["address"],
         },
     ]
     for kwargs in update_kwargs:
@@ -181,18 +181,16 @@ def facility_etl():
         transform.force_uppercase(etl, field_names=["label"])
         transform.add_missing_fields(etl, dataset.FACILITY, tags=["pub"])
         # Assign geometry attributes.
-        coordinate_system_xy_keys = {
-            2914: {"x": "x_coordinate", "y": "y_coordinate"},
-            4326: {"x": "longitude", "y": "latitude"},
-        }
-        for spatial_reference_id, xy_key in coordinate_system_xy_keys.items():
-            for axis, key in xy_key.items():
-                etl.transform(
-                    arcetl.attributes.update_by_geometry,
-                    field_name=key,
-                    spatial_reference_item=spatial_reference_id,
-                    geometry_properties=["centroid", axis],
-                )
+        etl.transform(
+            arcetl.attributes.update_by_geometry_properties,
+            field_geometry_properties={
+                "x_coordinate": (["centroid", "x"], 2914),
+                "y_coordinate": (["centroid", "y"], 2914),
+                "longitude": (["centroid", "x"], 4326),
+                "latitude": (["centroid", "y"], 4326),
+            },
+            use_projection_math=True,
+        )
         etl.transform(
             arcetl.attributes.update_by_mapping,
             field_name="address_uuid",
@@ -247,18 +245,16 @@ def site_address_etl():
         transform.force_yn(etl, field_names=["valid"], default="Y")
         transform.add_missing_fields(etl, dataset.SITE_ADDRESS, tags=["pub"])
         # Assign geometry attributes.
-        coordinate_system_xy_keys = {
-            2914: {"x": "x_coordinate", "y": "y_coordinate"},
-            4326: {"x": "longitude", "y": "latitude"},
-        }
-        for spatial_reference_id, xy_key in coordinate_system_xy_keys.items():
-            for axis, key in xy_key.items():
-                etl.transform(
-                    arcetl.attributes.update_by_geometry,
-                    field_name=key,
-                    spatial_reference_item=spatial_reference_id,
-                    geometry_properties=["centroid", axis],
-                )
+        etl.transform(
+            arcetl.attributes.update_by_geometry_properties,
+            field_geometry_properties={
+                "x_coordinate": (["centroid", "x"], 2914),
+                "y_coordinate": (["centroid", "y"], 2914),
+                "longitude": (["centroid", "x"], 4326),
+                "latitude": (["centroid", "y"], 4326),
+            },
+            use_projection_math=True,
+        )
         # Assign overlays.
         overlay_kwargs = [
             # City attributes.
@@ -22,7 +22,7 @@ from etlassist.pipeline import Job, execute_pipeline
 from helper import database
 from helper import dataset
 from helper import path
-from helper.value import clean_whitespace, concatenate_arguments
+from helper.value import clean_whitespace, compiled_cleaner, concatenate_arguments
 
 
 LOG = logging.getLogger(__name__)
@@ -193,10 +193,11 @@ def address_3rd_party_usps_rows():
     addresses = arcetl.attributes.as_dicts(
         dataset.ADDRESS_WORKFILE_3RD_PARTY.path(), field_names=keys["workfile"]
     )
+    clean = compiled_cleaner(clean_whitespace)
     for addr in addresses:
         for key in addr:
             if isinstance(addr[key], (str, type(u""))):
-                addr[key] = clean_whitespace(addr[key])
+                addr[key] = clean(addr[key])
         for key in keys["info"]:
             addr.setdefault(key)
         if not addr["result_code"]:
@@ -295,10 +296,11 @@ def postal_info_rows():
         dataset.ADDRESS_WORKFILE.path(), field_names=keys["workfile"]
     )
     zip_code_overlay = address_zip_overlay_map()
+    clean = compiled_cleaner(clean_whitespace)
     for addr in addresses:
         for key in addr:
             if isinstance(addr[key], (str, type(u""))):
-                addr[key] = clean_whitespace(addr[key])
+                addr[key] = clean(addr[key])
         for key in keys["info"]:
             addr.setdefault(key)
         if not addr["result_code"]:
@@ -107,12 +107,13 @@ def ugb_etl():
             join_dataset_path=dataset.CITY.path(),
             on_field_pairs=[("ugbcity", "CityNameAbbr")],
         )
-        for geom_property in ["xmin", "xmax", "ymin", "ymax"]:
-            etl.transform(
-                arcetl.attributes.update_by_geometry,
-                field_name=geom_property,
-                geometry_properties=[geom_property],
-            )
+        etl.transform(
+            arcetl.attributes.update_by_geometry_properties,
+            field_geometry_properties={
+                geom_property: (geom_property, None)
+                for geom_property in ["xmin", "xmax", "ymin", "ymax"]
+            },
+        )
         etl.load(dataset.UGB.path("pub"))
 
 
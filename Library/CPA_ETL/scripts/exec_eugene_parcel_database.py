@@ -1,11 +1,12 @@
 """Execution code for Eugene parcel database extract processing."""
 import argparse
-import csv
+import functools
 import logging
 import os
 
 import pyodbc
 
+from etlassist.extract import export_queries
 from etlassist.pipeline import Job, execute_pipeline
 
 from helper import database
@@ -223,21 +224,6 @@ EXTRACT_TABLE_QUERY_SQL = {
 }
 
 
-# Helpers.
-
-
-def extract_database_file(file_path, sql):
-    """Extract CSVfile for Eugene Parcel Database."""
-    LOG.info("Start: Create %s.", file_path)
-    with pyodbc.connect(database.RLID.odbc_string) as conn:
-        cursor = conn.execute(sql)
-        with open(file_path, "wb") as csvfile:
-            csvwriter = csv.writer(csvfile, delimiter="|")
-            for row in cursor:
-                csvwriter.writerow(row)
-    LOG.info("End: Create.")
-
-
 # ETLs.
 
 
@@ -249,11 +235,17 @@ def eugene_parcel_database_etl():
     Barry: "SPAARS is an older app that will presumably be replaced before too many
     years from now, but I am not aware of any active project at this time."
     """
-    for table_name, sql in EXTRACT_TABLE_QUERY_SQL.items():
-        file_path = os.path.join(
-            path.REGIONAL_STAGING, "EugeneParcelDB", table_name + ".txt"
-        )
-        extract_database_file(file_path, sql)
+    file_queries = {
+        os.path.join(path.REGIONAL_STAGING, "EugeneParcelDB", table_name + ".txt"): sql
+        for table_name, sql in EXTRACT_TABLE_QUERY_SQL.items()
+    }
+    pool = database.ConnectionPool(
+        connect=functools.partial(pyodbc.connect, database.RLID.odbc_string),
+        size=4,
+        retry_exceptions=[pyodbc.OperationalError],
+    )
+    with pool:
+        export_queries(pool, file_queries, delimiter="|")
 
 
 # Jobs.
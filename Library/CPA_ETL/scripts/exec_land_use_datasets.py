@@ -97,18 +97,15 @@ def land_use_area_etl():
         )
         transform.add_missing_fields(etl, dataset.LAND_USE_AREA, tags=["pub"])
         # Assign geometry attributes.
-        coordinate_system_xy_keys = {
-            2914: {"x": "xcoord", "y": "ycoord"},
-            4326: {"x": "longitude", "y": "latitude"},
-        }
-        for spatial_reference_id, xy_key in coordinate_system_xy_keys.items():
-            for axis, key in xy_key.items():
-                etl.transform(
-                    arcetl.attributes.update_by_geometry,
-                    field_name=key,
-                    spatial_reference_item=spatial_reference_id,
-                    geometry_properties=["centroid", axis],
-                )
+        etl.transform(
+            arcetl.attributes.update_by_geometry_properties,
+            field_geometry_properties={
+                "xcoord": (["centroid", "x"], 2914),
+                "ycoord": (["centroid", "y"], 2914),
+                "longitude": (["centroid", "x"], 4326),
+                "latitude": (["centroid", "y"], 4326),
+            },
+        )
         # Assign overlays.
         overlay_kwargs = [
             # City attributes.
@@ -6,13 +6,9 @@ LMStat parameters sourced from:
 https://media.3ds.com/support/simulia/public/flexlm108/EndUser/chap7.htm
 """
 import argparse
-import datetime
 import logging
-import re
-import subprocess
-
-import dateutil.parser
 
+from etlassist.flexnet import LicensePoller
 from etlassist.pipeline import Job, execute_pipeline
 
 from helper import database
@@ -23,75 +19,15 @@ from helper import path
 LOG = logging.getLogger(__name__)
 """logging.Logger: Script-level logger."""
 
-REGEX_PATTERN = {
-    "borrowed": re.compile(
-        r"""
-        ACTIVATED\sLICENSE\(S\)\s
-        (?P<user_host>\w*)\s
-        ACTIVATION\s
-        \((?P<license_version>v[0-9.]*)\)\s
-        \((?P<flexnet_host>\w*)
-        /(?P<flexnet_port>\d*)\s
-        (?P<flexnet_license_handle>\d*)\),\s
-        start\s(?P<checkout_time>.*)
-        """,
-        re.VERBOSE,
-    ),
-    "checked-out": re.compile(
-        r"""
-        (?P<user_handle>\S*)\s
-        (?P<user_host>\w*)\s
-        (?P<user_display>.*(?=\s\(v))\s
-        \((?P<license_version>v[0-9.]*)\)\s
-        \((?P<flexnet_host>\w*)
-        /(?P<flexnet_port>\d*)\s
-        (?P<flexnet_license_handle>\d*)\),\s
-        start\s(?P<checkout_time>.*)
-        """,
-        re.VERBOSE,
-    ),
-}
-
-
-# Helpers.
-
-
-def license_usage_info(internal_name):
-    """Generate concurrent license usage info.
-
-    Args:
-        internal_name (str): Name used internally for license.
-
-    Returns:
-        dict: Mapping of license usage attribute name to value.
-    """
-    call = """"{}" lmstat -c @gisrv100 -f {}""".format(path.LMUTIL, internal_name)
-    raw_output = subprocess.check_output(call).decode()
-    if "floating license" not in raw_output:
-        return
-
-    lines = (
-        line.strip()
-        for line in raw_output.split("floating license")[1].split("\r\n")
-        if line.strip()
-    )
-    for line in lines:
-        usage_type = (
-            "borrowed" if line.startswith("ACTIVATED LICENSE(S)") else "checked-out"
-        )
-        match = REGEX_PATTERN[usage_type].match(line).groupdict()
-        usage = {
-            "usage_check_time": datetime.datetime.now(),
-            # Borrowed licenses have no user handle.
-            "user_handle": (
-                match["user_handle"].upper() if "user_handle" in match else None
-            ),
-            "user_host": match["user_host"].upper(),
-            "license_internal_name": internal_name,
-            "checkout_time": dateutil.parser.parse(match["checkout_time"]),
-            "is_borrowed": True if usage_type == "borrowed" else False,
-        }
-        yield usage
+USAGE_KEYS = [
+    "usage_check_time",
+    "user_handle",
+    "user_host",
+    "license_internal_name",
+    "checkout_time",
+    "is_borrowed",
+]
+"""list of str: Keys of license usage records to load."""
 
 
 # ETLs.
@@ -101,11 +37,14 @@ def license_usage_update():
     """Run update for current license usage."""
     LOG.info("Start: Collect license usage from FlexNet License Manager.")
     session = database.CPA_ADMIN.create_session()
-    names = (name for name, in session.query(LicenseArcGISDesktop.internal_name))
-    for name in names:
-        session.add_all(LicenseUsage(**usage) for usage in license_usage_info(name))
+    names = [name for name, in session.query(LicenseArcGISDesktop.internal_name)]
+    poller = LicensePoller("@gisrv100", path.LMUTIL, timeout=120)
+    # Load every current checkout: each poll is a snapshot of concurrent usage.
+    usages = ({key: usage[key] for key in USAGE_KEYS} for usage in poller.poll(names))
+    count = database.bulk_insert(session, LicenseUsage, usages)
     session.commit()
     session.close()
+    LOG.info("%s usage rows loaded.", count)
     LOG.info("End: Collect.")
 
 
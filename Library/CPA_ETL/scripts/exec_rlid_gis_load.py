@@ -1,9 +1,12 @@
 """Execution code for RLID GIS loading."""
 import argparse
 import logging
-import subprocess
+import os
 
 from etlassist.pipeline import Job, execute_pipeline
+from etlassist.process import run_commands
+
+from helper import path
 
 
 ##TODO: Rename exec_rlid_gis.py.
@@ -13,6 +16,13 @@ from etlassist.pipeline import Job, execute_pipeline
 LOG = logging.getLogger(__name__)
 """logging.Logger: Script-level logger."""
 
+LOAD_LOG_DIRECTORY = os.path.join(path.CPA_WORK_SHARE, "Processing", "log")
+"""str: Path of directory for load command output logs."""
+LOAD_SERVERS = ["gisql113"]
+"""list of str: Names of the RLID warehouse server instances to load."""
+LOAD_TIMEOUT = 6 * 60 * 60
+"""int: Time in seconds to allow a server's load to run."""
+
 
 # ETLs.
 
@@ -23,8 +33,8 @@ def load_rlid_gis():
     Using command-line tool to avoid issues with procedure processes suspending in
     `arcetl.workspace.execute_sql()` & `pyodbc.connect().execute()`.
 
-    SQLCMD does not like check_call putting arguments in other list items.
-    Use a single-string instead.
+    Arguments are passed as a list, so no shell is needed; the query is a single
+    item, so Popen quotes it as one argument.
     SQLCMD options:
         -S {name}: server instance name.
         -E: trusted connection.
@@ -32,13 +42,19 @@ def load_rlid_gis():
         -b: terminate batch job if errors.
         -Q "{string}": query string.
     """
-    call_string = " ".join(
-        [
-            "sqlcmd.exe -S {} -E -d RLID -b -Q",
-            '"exec dbo.proc_load_GIS @as_return_msg = null, @ai_return_code = null;"',
-        ]
+    query = "exec dbo.proc_load_GIS @as_return_msg = null, @ai_return_code = null;"
+    run_commands(
+        (
+            (
+                "RLID_GIS_Load_" + server,
+                ["sqlcmd.exe", "-S", server, "-E", "-d", "RLID", "-b", "-Q", query],
+            )
+            for server in LOAD_SERVERS
+        ),
+        timeout=LOAD_TIMEOUT,
+        log_directory=LOAD_LOG_DIRECTORY,
+        check=True,
     )
-    subprocess.check_call(call_string.format("gisql113"))
 
 
 # Jobs.
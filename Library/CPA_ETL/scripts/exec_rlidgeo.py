@@ -9,7 +9,6 @@ import tempfile
 import uuid
 
 import arcetl
-import arcpy
 from etlassist.pipeline import Job, execute_pipeline
 
 from helper.communicate import send_email
@@ -507,27 +506,6 @@ def datasets_secondary_update():
 def msag_update():
     """Run update for the Master Street Address Guide dataset in RLIDGeo warehouse."""
     LOG.info("Start: Update MSAG dataset in RLIDGeo warehouse.")
-    unretired_where_sql = "expiration_date is null"
-    # Do not update MSAG if there will be a significant change.
-    count = {
-        "current": arcetl.features.count(dataset.MSAG_RANGE.path("current")),
-        "previous": arcetl.features.count(
-            dataset.MSAG_RANGE.path("master"), dataset_where_sql=unretired_where_sql
-        ),
-    }
-    if abs(count["current"] - count["previous"]) > count["previous"] * 0.01:
-        send_email(
-            subject="RLIDGeo MSAG Update Issues",
-            body="""
-                <p>
-                    Greater than 1% change in number of un-expired ranges; not applying
-                    changes.
-                </p>
-            """,
-            body_format="HTML",
-            **KWARGS_ISSUES_MESSAGE
-        )
-
     msag_keys = [
         "msag_id",
         "emergency_service_number",
@@ -543,48 +521,34 @@ def msag_update():
         "effective_date",
         "shape@",
     ]
-    msag_id_range = {
-        feature["msag_id"]: feature
-        for feature in arcetl.attributes.as_dicts(
-            dataset.MSAG_RANGE.path("current"), field_names=msag_keys
+    try:
+        feature_count = arcetl.features.update_versioned(
+            dataset.MSAG_RANGE.path("master"),
+            update_features=arcetl.attributes.as_iters(
+                dataset.MSAG_RANGE.path("current"), field_names=msag_keys
+            ),
+            id_field_names=["msag_id"],
+            field_names=msag_keys,
+            # Do not update MSAG if there will be a significant change.
+            max_change_ratio=0.01,
+            use_edit_session=False,
         )
-    }
-    feature_count = Counter(deleted=0)
-    most_recent_date = max(val["effective_date"] for val in msag_id_range.values())
-    master_cursor = arcpy.da.UpdateCursor(
-        dataset.MSAG_RANGE.path("master"),
-        field_names=["msag_id", "expiration_date", "shape@"],
-        where_clause=unretired_where_sql,
-    )
-    # Collect IDs for add-check later.
-    master_ids = set()
-    LOG.info("Start: Update geometry & expiration dates.")
-    with master_cursor:
-        for msag_id, expiration_date, geom in master_cursor:
-            master_ids.add(msag_id)
-            if msag_id not in msag_id_range:
-                LOG.info("Range (ID=%s) not in current: set expiration date.", msag_id)
-                expiration_date = most_recent_date
-            elif geom is None or not geom.equals(msag_id_range[msag_id]["shape@"]):
-                LOG.info("Range (ID=%s) changed geometry.", msag_id)
-                geom = msag_id_range[msag_id]["shape@"]
-            else:
-                feature_count["unchanged"] += 1
-                continue
-            master_cursor.updateRow((msag_id, expiration_date, geom))
-            feature_count["altered"] += 1
-    LOG.info("End: Update.")
-    LOG.info("Start: Insert new ranges from current MSAG.")
-    master_cursor = arcpy.da.InsertCursor(
-        dataset.MSAG_RANGE.path("master"), field_names=msag_keys
-    )
-    with master_cursor:
-        for msag_id, range_ in msag_id_range.items():
-            if msag_id not in master_ids:
-                LOG.info("Range (ID=%s) new in current: adding.", msag_id)
-                master_cursor.insertRow(tuple(range_[key] for key in msag_keys))
-                feature_count["inserted"] += 1
-    LOG.info("End: Insert.")
+    except ValueError:
+        send_email(
+            subject="RLIDGeo MSAG Update Issues",
+            body="""
+                <p>
+                    Greater than 1% change in number of un-expired ranges; not applying
+                    changes.
+                </p>
+            """,
+            body_format="HTML",
+            **KWARGS_ISSUES_MESSAGE
+        )
+        raise
+
+    # Retiring a range alters it in the master.
+    feature_count["altered"] += feature_count.pop("retired", 0)
     record_dataset_update(
         os.path.basename(dataset.MSAG_RANGE.path("master")),
         feature_count,
@@ -12,6 +12,10 @@ from helper import transform
 LOG = logging.getLogger(__name__)
 """logging.Logger: Script-level logger."""
 
+CLOSEST_FACILITY_CANDIDATE_COUNT = 4
+"""int: Number of straight-line nearest facilities to route to for each address."""
+CLOSEST_FACILITY_TILE_COUNT = 2048
+"""int: Maximum number of addresses to solve routes for together."""
 MAX_COST_FEET = 8 * 5280  # Eight miles in feet.
 PROVIDER_CLOSEST_FIRE_STATION_KWARGS = {
     "Coburg RFPD": {
@@ -196,7 +200,7 @@ def closest_facility_route_wrapper(provider_key, dataset_where_sql, facility_whe
     Yields:
         dict: Mapping of attribute name to value for a single route.
     """
-    routes = arcetl.network.closest_facility_route(
+    routes = arcetl.network.closest_facility_route_partitioned(
         dataset_path=dataset.SITE_ADDRESS.path("pub"),
         # Route layer won"t transfer UUID type, so use integer ID.
         id_field_name="geofeat_id",
@@ -209,6 +213,8 @@ def closest_facility_route_wrapper(provider_key, dataset_where_sql, facility_whe
         max_cost=MAX_COST_FEET,
         restriction_attributes=["Oneway"],
         travel_from_facility=True,
+        max_tile_count=CLOSEST_FACILITY_TILE_COUNT,
+        candidate_count=CLOSEST_FACILITY_CANDIDATE_COUNT,
     )
     for route in routes:
         if route["facility_id"] is not None:
@@ -304,16 +310,18 @@ def closest_hydrant_etl():
             hydrants_copy.path, field_name="hydrant_id", field_type="long"
         )
         arcetl.attributes.update_by_unique_id(hydrants_copy.path, "hydrant_id")
-        for field_name, axis in [("longitude", "x"), ("latitude", "y")]:
+        for field_name in ["longitude", "latitude"]:
             arcetl.dataset.add_field(
                 hydrants_copy.path, field_name, field_type="double"
             )
-            arcetl.attributes.update_by_geometry(
-                hydrants_copy.path,
-                field_name,
-                spatial_reference_item=4326,
-                geometry_properties=["centroid", axis],
-            )
+        arcetl.attributes.update_by_geometry_properties(
+            hydrants_copy.path,
+            field_geometry_properties={
+                "longitude": (["centroid", "x"], 4326),
+                "latitude": (["centroid", "y"], 4326),
+            },
+            use_projection_math=True,
+        )
         etl.extract(dataset.SITE_ADDRESS.path("pub"))
         field_name_change = {
             "site_address_gfid": "site_address_uuid",
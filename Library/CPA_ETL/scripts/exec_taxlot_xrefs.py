@@ -8,6 +8,7 @@ import os
 import pyodbc
 
 import arcetl
+from etlassist.cache import cached_lookup, file_change_source
 from etlassist.pipeline import Job, execute_pipeline
 
 from helper import credential
@@ -66,6 +67,7 @@ PATH = {
 # Helpers.
 
 
+@cached_lookup(sources=[file_change_source(os.path.dirname(PATH["soil_component"]))])
 def soil_key_components_map():
     """Return mapping of soil key to tuple of ordered components.
 
@@ -169,34 +171,18 @@ def taxlot_flood_hazard_etl():
     keys = {"taxlot": ["maptaxlot", "maptaxlot_hyphen", "map", "taxlot"]}
     with arcetl.ArcETL("Taxlot Flood Hazard") as etl:
         etl.init_schema(dataset.TAXLOT_FLOOD_HAZARD.path())
-        # To avoid memory/topoengine errors when processing, run ETL on subsets.
-        subsets = taxlot_subset_temp_copies(REAL_LOT_SQL, field_names=keys["taxlot"])
-        for subset in subsets:
-            with subset:
-                arcetl.dataset.add_field(
-                    subset.path, field_name="flood_area_id", field_type="text"
-                )
-                arcetl.geoset.identity(
-                    dataset_path=subset.path,
-                    field_name="flood_area_id",
-                    identity_dataset_path=PATH["flood_hazard_area"],
-                    identity_field_name="fld_ar_id",
-                )
-                # Remove features without overlay.
-                arcetl.features.delete(
-                    dataset_path=subset.path, dataset_where_sql="flood_area_id is null"
-                )
-                # Dissolve on lot & overlay, for proper area representation.
-                arcetl.features.dissolve(
-                    dataset_path=subset.path,
-                    dissolve_field_names=keys["taxlot"] + ["flood_area_id"],
-                    tolerance=TOLERANCE["xy"],
-                )
-                etl.transform(
-                    arcetl.features.insert_from_path,
-                    insert_dataset_path=subset.path,
-                    field_names=keys["taxlot"] + ["flood_area_id"],
-                )
+        # Split lots by overlay & dissolve on lot & overlay (for proper area
+        # representation) in-process, tiled to bound memory.
+        etl.transform(
+            arcetl.geoset.identity_dissolved,
+            field_name="flood_area_id",
+            source_dataset_path=dataset.TAXLOT.path("pub"),
+            source_where_sql=REAL_LOT_SQL,
+            identity_dataset_path=PATH["flood_hazard_area"],
+            identity_field_name="fld_ar_id",
+            key_field_names=keys["taxlot"],
+            tolerance=TOLERANCE["xy"],
+        )
         # Assign joinable attributes.
         join_kwargs = [
             {
@@ -487,34 +473,18 @@ def taxlot_soil_etl():
     keys = {"taxlot": ["maptaxlot", "maptaxlot_hyphen", "map", "taxlot"]}
     with arcetl.ArcETL("Taxlot Soil") as etl:
         etl.init_schema(dataset.TAXLOT_SOIL.path())
-        # To avoid memory/topoengine errors when processing, run ETL on subsets.
-        subsets = taxlot_subset_temp_copies(REAL_LOT_SQL, field_names=keys["taxlot"])
-        for subset in subsets:
-            with subset:
-                arcetl.dataset.add_field(
-                    subset.path, field_name="mukey", field_type="text"
-                )
-                arcetl.geoset.identity(
-                    dataset_path=subset.path,
-                    field_name="mukey",
-                    identity_dataset_path=PATH["soil"],
-                    identity_field_name="mukey",
-                )
-                # Remove features without overlay.
-                arcetl.features.delete(
-                    dataset_path=subset.path, dataset_where_sql="mukey is null"
-                )
-                # Dissolve on lot & overlay, for proper area representation.
-                arcetl.features.dissolve(
-                    dataset_path=subset.path,
-                    dissolve_field_names=keys["taxlot"] + ["mukey"],
-                    tolerance=TOLERANCE["xy"],
-                )
-                etl.transform(
-                    arcetl.features.insert_from_path,
-                    insert_dataset_path=subset.path,
-                    field_names=keys["taxlot"] + ["mukey"],
-                )
+        # Split lots by overlay & dissolve on lot & overlay (for proper area
+        # representation) in-process, tiled to bound memory.
+        etl.transform(
+            arcetl.geoset.identity_dissolved,
+            field_name="mukey",
+            source_dataset_path=dataset.TAXLOT.path("pub"),
+            source_where_sql=REAL_LOT_SQL,
+            identity_dataset_path=PATH["soil"],
+            identity_field_name="mukey",
+            key_field_names=keys["taxlot"],
+            tolerance=TOLERANCE["xy"],
+        )
         key_components = soil_key_components_map()
         etl.transform(
             arcetl.attributes.update_by_function,
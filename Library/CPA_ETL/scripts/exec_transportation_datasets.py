@@ -1569,18 +1569,16 @@ def road_intersection_etl():
             field_names=init_keys,
         )
         # Assign geometry attributes.
-        coordinate_system_xy_keys = {
-            2914: {"x": "xcoord", "y": "ycoord"},
-            4326: {"x": "longitude", "y": "latitude"},
-        }
-        for spatial_reference_id, xy_key in coordinate_system_xy_keys.items():
-            for axis, key in xy_key.items():
-                etl.transform(
-                    arcetl.attributes.update_by_geometry,
-                    field_name=key,
-                    spatial_reference_item=spatial_reference_id,
-                    geometry_properties=["centroid", axis],
-                )
+        etl.transform(
+            arcetl.attributes.update_by_geometry_properties,
+            field_geometry_properties={
+                "xcoord": (["centroid", "x"], 2914),
+                "ycoord": (["centroid", "y"], 2914),
+                "longitude": (["centroid", "x"], 4326),
+                "latitude": (["centroid", "y"], 4326),
+            },
+            use_projection_math=True,
+        )
         # Assign overlays.
         overlay_kwargs = [
             {
@@ -11,6 +11,7 @@ import sqlalchemy as sql
 
 # arcetl imported locally to avoid slow imports when unused.
 # import arcetl
+from etlassist.cache import cached_lookup, sql_change_source
 from etlassist.misc import *  # pylint: disable=wildcard-import, unused-wildcard-import
 
 from . import database  # pylint: disable=relative-beyond-top-level
@@ -49,6 +50,40 @@ REAL_LOT_SQL = "taxlot not in ('11', '22', '33', '44', '55', '66', '77', '88', '
 """str: SQL where-clause for real property taxlot subselection."""
 TOLERANCE = {"area": 2.0, "xy": 0.02}
 """dict: Mapping of tolerance type to value (in feet)."""
+RLID_CHANGE_SOURCE = sql_change_source(
+    database.RLID, "select max(load_date) from dbo.MD_Data_Currency;"
+)
+"""function: Change-token source for RLID warehouse lookups."""
+TAXLOT_CHANGE_SOURCE = sql_change_source(
+    database.ETL_LOAD_A,
+    # Binary checksum of all columns skips the geometry: Add one over the areas.
+    """
+    select
+        count_big(*),
+        checksum_agg(binary_checksum(*)),
+        checksum_agg(binary_checksum(maptaxlot, shape.STArea()))
+    from dbo.Taxlot;
+    """,
+)
+"""function: Change-token source for publication taxlot lookups."""
+
+
+@cached_lookup(sources=[TAXLOT_CHANGE_SOURCE])
+def _taxlot_prefix_count(prefix_length):
+    """Return counter of taxlots by prefix of given length.
+
+    Args:
+        prefix_length (int): Length of the taxlot prefixes to count.
+
+    Returns:
+        collections.Counter
+    """
+    import arcetl
+
+    maptaxlots = arcetl.attributes.as_iters(
+        dataset_path=dataset.TAXLOT.path("pub"), field_names=["maptaxlot"]
+    )
+    return Counter(maptaxlot[:prefix_length] for maptaxlot, in maptaxlots if maptaxlot)
 
 
 def address_intid_to_uuid_map(address_where_sql=None):
@@ -89,6 +124,7 @@ CURRENT_TAX_YEAR = current_tax_year()
 """int: The current tax year, as set in RLID."""
 
 
+@cached_lookup(sources=[RLID_CHANGE_SOURCE])
 def rlid_owners(include_attributes=None):
     """Generate RLID owner IDs or tuples of owner IDs with extra attributes.
 
@@ -115,6 +151,7 @@ def rlid_owners(include_attributes=None):
         session.close()
 
 
+@cached_lookup(sources=[RLID_CHANGE_SOURCE])
 def rlid_accounts(include_attributes=None, **kwargs):
     """Generate RLID account IDs or tuples of owner IDs with other included attributes.
 
@@ -222,6 +259,7 @@ def rlid_data_currency_setter(data_description, currency_date):
     return currency_date
 
 
+@cached_lookup(sources=[RLID_CHANGE_SOURCE])
 def rlid_tax_year_accounts(tax_year=CURRENT_TAX_YEAR, include_attributes=None):
     """Generate RLID account tax-year IDs or tuples of owner IDs with extra attributes.
 
@@ -257,6 +295,7 @@ def rlid_tax_year_accounts(tax_year=CURRENT_TAX_YEAR, include_attributes=None):
         session.close()
 
 
+@cached_lookup(sources=[TAXLOT_CHANGE_SOURCE])
 def taxlot_area_map():
     """Return mapping of maptaxlot to total area.
 
@@ -293,14 +332,7 @@ def taxlot_prefixes(prefix_length, sort_style=None):
     Yields:
         str
     """
-    import arcetl
-
-    maptaxlots = arcetl.attributes.as_iters(
-        dataset_path=dataset.TAXLOT.path("pub"), field_names=["maptaxlot"]
-    )
-    prefix_count = Counter(
-        maptaxlot[:prefix_length] for maptaxlot, in maptaxlots if maptaxlot
-    )
+    prefix_count = _taxlot_prefix_count(prefix_length)
     if sort_style is None:
         prefixes = (prefix for prefix in prefix_count)
     elif sort_style == "count_ascending":
@@ -1,12 +1,20 @@
 """ETL assistance library."""
 # pylint: disable=unused-import
+from . import cache
 from . import communicate
 from . import credential
 from . import database
 from . import dataset
+from . import delivery
 from . import document
+from . import extract
+from . import flexnet
+from . import msag
 from . import path
 from . import pipeline
+from . import process
+from . import rules
+from . import snapshot
 from . import transform
 from . import url
 from . import value
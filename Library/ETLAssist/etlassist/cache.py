@@ -0,0 +1,209 @@
+"""Result caching objects."""
+import functools
+import inspect
+import logging
+import os
+import pickle
+import tempfile
+import threading
+import time
+
+from sqlalchemy import text
+
+from .misc import replace_file
+
+
+__all__ = [
+    "cached_lookup",
+    "dataset_change_source",
+    "file_change_source",
+    "sql_change_source",
+]
+LOG = logging.getLogger(__name__)
+"""logging.Logger: Module-level logger."""
+
+
+def _frozen(value):
+    """Return hashable version of value, for use in a cache key."""
+    if isinstance(value, dict):
+        return tuple(sorted((key, _frozen(val)) for key, val in value.items()))
+
+    if isinstance(value, (list, tuple)):
+        return tuple(_frozen(val) for val in value)
+
+    if isinstance(value, (set, frozenset)):
+        return frozenset(_frozen(val) for val in value)
+
+    return value
+
+
+def cached_lookup(sources=(), ttl=None, persist_path=None):
+    """Return decorator caching a lookup function's results per process.
+
+    Results are kept per set of arguments. A cached result is used until a change
+    token from one of the sources moves, or it is older than the time-to-live. If a
+    source fails, the function runs uncached (with a warning).
+
+    Results of generator functions are stored as lists; each call gets a fresh
+    iterator over them. Other results are shared between callers, so treat them as
+    read-only.
+
+    Args:
+        sources (iter): Collection of functions returning a change token for a
+            source of the lookup (see `dataset_change_source`, `file_change_source`,
+            & `sql_change_source`).
+        ttl (float): Maximum age of a cached result, in seconds. If None, results do
+            not expire with age.
+        persist_path (str): Path of a pickle file to persist the cache to between
+            runs. If None, the cache is not persisted.
+
+    Returns:
+        function: Decorator for the lookup function.
+
+    """
+    sources = list(sources)
+
+    def decorator(function):
+        is_generator = inspect.isgeneratorfunction(function)
+        cache = {}
+        lock = threading.Lock()
+        state = {"loaded": persist_path is None}
+
+        def _load():
+            if os.path.exists(persist_path):
+                try:
+                    with open(persist_path, "rb") as picklefile:
+                        cache.update(pickle.load(picklefile))
+                except Exception as error:  # pylint: disable=broad-except
+                    LOG.warning("Cannot load cache %s: %s.", persist_path, error)
+            state["loaded"] = True
+
+        def _persist():
+            file_descriptor, temp_path = tempfile.mkstemp(
+                suffix=".tmp",
+                prefix="." + os.path.basename(persist_path) + ".",
+                dir=os.path.dirname(os.path.abspath(persist_path)),
+            )
+            with os.fdopen(file_descriptor, "wb") as picklefile:
+                pickle.dump(dict(cache), picklefile, protocol=2)
+            replace_file(temp_path, persist_path)
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            try:
+                tokens = tuple(source() for source in sources)
+            except Exception as error:  # pylint: disable=broad-except
+                LOG.warning(
+                    "Change token for %s failed (%s): running uncached.",
+                    function.__name__,
+                    error,
+                )
+                result = function(*args, **kwargs)
+                return iter(list(result)) if is_generator else result
+
+            key = (_frozen(args), _frozen(kwargs))
+            with lock:
+                if not state["loaded"]:
+                    _load()
+                entry = cache.get(key)
+            if (
+                entry is None
+                or entry[0] != tokens
+                or (ttl is not None and time.time() - entry[1] > ttl)
+            ):
+                result = function(*args, **kwargs)
+                if is_generator:
+                    result = list(result)
+                entry = (tokens, time.time(), result)
+                with lock:
+                    cache[key] = entry
+                    if persist_path:
+                        _persist()
+            return iter(entry[2]) if is_generator else entry[2]
+
+        def cache_clear():
+            """Clear the cache (including any persisted file)."""
+            with lock:
+                cache.clear()
+                state["loaded"] = persist_path is None
+                if persist_path and os.path.exists(persist_path):
+                    os.remove(persist_path)
+
+        wrapper.cache_clear = cache_clear
+        return wrapper
+
+    return decorator
+
+
+def dataset_change_source(
+    dataset_path, init_date_field_name="init_date", mod_date_field_name="mod_date"
+):
+    """Return change-token function for a dataset with change-tracking fields.
+
+    Args:
+        dataset_path (str): Path of the dataset.
+        init_date_field_name (str): Name of the initial-date field.
+        mod_date_field_name (str): Name of the modified-date field.
+
+    Returns:
+        function: Function returning the dataset's last change date.
+
+    """
+    from .dataset import last_change_date
+
+    return functools.partial(
+        last_change_date, dataset_path, init_date_field_name, mod_date_field_name
+    )
+
+
+def file_change_source(path):
+    """Return change-token function for a file or directory (e.g. file geodatabase).
+
+    Args:
+        path (str): Path of the file or directory.
+
+    Returns:
+        function: Function returning the latest modification time of the file, or of
+            the directory & the files directly in it.
+
+    """
+
+    def _token():
+        if not os.path.isdir(path):
+            return os.path.getmtime(path)
+
+        return max(
+            [os.path.getmtime(path)]
+            + [
+                os.path.getmtime(os.path.join(path, name))
+                for name in os.listdir(path)
+            ]
+        )
+
+    return _token
+
+
+def sql_change_source(database, sql):
+    """Return change-token function for a SQL query result.
+
+    The query should be cheap & return a single row that moves when the source
+    changes, e.g. a load date, a row version, or a row count & checksum.
+
+    Args:
+        database (etlassist.database.Database): Database to query.
+        sql (str): SQL query for the change token.
+
+    Returns:
+        function: Function returning the query's first row, as a tuple.
+
+    """
+
+    def _token():
+        session = database.create_session()
+        try:
+            row = session.execute(text(sql)).first()
+        finally:
+            session.close()
+        return tuple(row) if row is not None else None
+
+    return _token
@@ -1,13 +1,19 @@
 """Database objects."""
+from collections import Counter
+from contextlib import contextmanager
 import logging
 import os
+import threading
+import time
 try:
     from urllib.parse import quote_plus
 except ImportError:
     from urllib import quote_plus
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import sqlalchemy
+from sqlalchemy import and_, create_engine, event
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session, sessionmaker
 
 from . import credential
 from . import path
@@ -40,13 +46,316 @@ __all__ = [
     "SPRINGFIELD_SANDBOX",
     "GISRV106_DATABASES",
     "TAX_MAP_DISTRIBUTION",
+    "ConnectionPool",
     "Database",
     "access_odbc_string",
+    "bulk_insert",
+    "bulk_upsert",
     "sql_server_odbc_string",
 ]
 LOG = logging.getLogger(__name__)
 """logging.Logger: Module-level logger."""
 
+_fast_executemany_state = {"lock": threading.Lock(), "counts": Counter()}
+"""dict: Count of bulk calls on each engine with the fast_executemany listener."""
+
+
+class ConnectionPool(object):
+    """Pool of reusable DB-API connections, with bounded retries on failure.
+
+    Each statement runs inside a retry loop: if it raises one of the retryable
+    exceptions, the connection it ran on is discarded, the pool waits, & the
+    statement runs again on a fresh connection. The wait doubles after each
+    failure, up to the maximum.
+
+    Attributes:
+        connect (function): Function returning a new DB-API connection.
+        size (int): Maximum number of connections open at once.
+        retry_count (int): Number of times to retry a statement after failure.
+        retry_exceptions (tuple): Exception types that trigger a retry.
+        retry_predicate (function): Function taking an exception & returning True
+            if it triggers a retry, regardless of type. NoneType if only the types
+            trigger retries.
+        retry_wait (float): Seconds to wait before the first retry.
+        retry_wait_max (float): Maximum seconds to wait before a retry.
+
+    """
+
+    def __init__(self, connect, size=4, **kwargs):
+        """Initialize instance.
+
+        Args:
+            connect (function): Function returning a new DB-API connection.
+            size (int): Maximum number of connections open at once.
+            **kwargs: Arbitrary keyword arguments. See below.
+
+        Keyword Args:
+            retry_count (int): Number of times to retry a statement after failure.
+                Default is 4.
+            retry_exceptions (iter): Exception types that trigger a retry. Default
+                is no types (no retries).
+            retry_predicate (function): Function taking an exception & returning
+                True if it triggers a retry, regardless of type. Use for errors
+                only transient for certain messages. Default is None.
+            retry_wait (float): Seconds to wait before the first retry. Default is
+                1.
+            retry_wait_max (float): Maximum seconds to wait before a retry. Default
+                is 60.
+
+        """
+        self.connect = connect
+        self.size = size
+        self.retry_count = kwargs.get("retry_count", 4)
+        self.retry_exceptions = tuple(kwargs.get("retry_exceptions", ()))
+        self.retry_predicate = kwargs.get("retry_predicate")
+        self.retry_wait = kwargs.get("retry_wait", 1)
+        self.retry_wait_max = kwargs.get("retry_wait_max", 60)
+        self._idle = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exception_type, exception_value, traceback):
+        self.close()
+
+    def __repr__(self):
+        return "{}(connect={!r}, size={!r})".format(
+            self.__class__.__name__, self.connect, self.size
+        )
+
+    def _is_retryable(self, error):
+        """Return True if the exception triggers a retry, False otherwise."""
+        if isinstance(error, self.retry_exceptions):
+            return True
+
+        return bool(self.retry_predicate and self.retry_predicate(error))
+
+    def close(self):
+        """Close all idle connections in the pool."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            _close_quietly(conn)
+
+    @contextmanager
+    def connection(self):
+        """Provide a connection from the pool as a context manager.
+
+        Blocks while the pool already has `size` connections checked out. On a
+        retryable exception the connection is discarded; on any other exception it
+        is rolled back before returning to the pool.
+
+        Yields:
+            Connection object for the DB-API module.
+
+        """
+        self._slots.acquire()
+        try:
+            with self._lock:
+                conn = self._idle.pop() if self._idle else None
+            if conn is None:
+                conn = self.connect()
+            try:
+                yield conn
+
+            except Exception as error:
+                if self._is_retryable(error):
+                    _close_quietly(conn)
+                    raise
+
+                try:
+                    conn.rollback()
+                except Exception:  # pylint: disable=broad-except
+                    _close_quietly(conn)
+                else:
+                    with self._lock:
+                        self._idle.append(conn)
+                raise
+
+            else:
+                with self._lock:
+                    self._idle.append(conn)
+        finally:
+            self._slots.release()
+
+    def execute(self, statement, parameters=None):
+        """Execute SQL statement & commit.
+
+        Args:
+            statement (str): SQL statement to execute.
+            parameters (iter): Values for the statement parameter markers.
+
+        Returns:
+            int: Count of rows affected, as reported by the DB-API cursor.
+
+        """
+
+        def _execute(conn):
+            cursor = conn.cursor()
+            if parameters is None:
+                cursor.execute(statement)
+            else:
+                cursor.execute(statement, tuple(parameters))
+            conn.commit()
+            return cursor.rowcount
+
+        return self.run(_execute)
+
+    def execute_many(self, statement, parameter_rows, chunk_size=1000):
+        """Execute SQL statement once for each row of parameters.
+
+        Each chunk of rows executes as one transaction: a failed chunk rolls back
+        & retries as a whole, so a retry never applies a row twice.
+
+        Args:
+            statement (str): SQL statement to execute.
+            parameter_rows (iter): Collection of parameter value sequences.
+            chunk_size (int): Number of parameter rows to execute per transaction.
+
+        Returns:
+            int: Count of parameter rows executed.
+
+        """
+        row_count = 0
+        for chunk in _chunked(parameter_rows, chunk_size):
+
+            def _execute_many(conn, chunk=chunk):
+                cursor = conn.cursor()
+                cursor.executemany(statement, chunk)
+                conn.commit()
+
+            self.run(_execute_many)
+            row_count += len(chunk)
+        return row_count
+
+    def query(self, statement, parameters=None, result_type=tuple):
+        """Return SQL query results.
+
+        Results are fetched in full before returning, so a retry never yields a row
+        twice, & the connection is free for writes as soon as this returns.
+
+        Args:
+            statement (str): SQL statement to query.
+            parameters (iter): Values for the statement parameter markers.
+            result_type: Type of container each result row is returned as. If dict,
+                maps column names to values.
+
+        Returns:
+            list: Result rows in the chosen result_type.
+
+        """
+
+        def _query(conn):
+            cursor = conn.cursor()
+            if parameters is None:
+                cursor.execute(statement)
+            else:
+                cursor.execute(statement, tuple(parameters))
+            rows = cursor.fetchall()
+            if result_type == dict:
+                column_names = [column[0] for column in cursor.description]
+                return [dict(zip(column_names, row)) for row in rows]
+
+            return [result_type(row) for row in rows]
+
+        return self.run(_query)
+
+    def run(self, function):
+        """Return result of function(connection), retrying on retryable failure.
+
+        Each attempt gets its own connection from the pool, so the function must be
+        safe to run again from the start (e.g. commit only at its end).
+
+        Args:
+            function (function): Function taking a connection as its only argument.
+
+        Returns:
+            Result of the function.
+
+        """
+        wait = self.retry_wait
+        for attempt in range(self.retry_count + 1):
+            try:
+                with self.connection() as conn:
+                    return function(conn)
+
+            except Exception as error:
+                if not self._is_retryable(error) or attempt == self.retry_count:
+                    raise
+
+                LOG.warning(
+                    "%s - retry %s of %s in %s seconds.",
+                    error, attempt + 1, self.retry_count, wait,
+                )
+                time.sleep(wait)
+                wait = min(wait * 2, self.retry_wait_max)
+
+    def upsert(self, table_name, field_names, rows, key_field_names, chunk_size=1000):
+        """Update rows matching key values, & insert those that do not exist.
+
+        Uses parameterized update & insert-where-not-exists statements, so works
+        with any DB-API module using `?` parameter markers (e.g. pyodbc, sqlite3).
+
+        Args:
+            table_name (str): Name of the table.
+            field_names (iter): Collection of field names, in row value order.
+            rows (iter): Collection of row value sequences.
+            key_field_names (iter): Collection of names of fields uniquely
+                identifying a row. Must be included in field_names.
+            chunk_size (int): Number of rows to upsert per transaction.
+
+        Returns:
+            int: Count of rows upserted.
+
+        """
+        field_names = list(field_names)
+        key_field_names = list(key_field_names)
+        key_indexes = [field_names.index(name) for name in key_field_names]
+        value_indexes = [
+            i for i, name in enumerate(field_names) if name not in key_field_names
+        ]
+        key_sql = " and ".join("{} = ?".format(name) for name in key_field_names)
+        sql = {
+            "update": "update {} set {} where {};".format(
+                table_name,
+                ", ".join("{} = ?".format(field_names[i]) for i in value_indexes),
+                key_sql,
+            ),
+            "insert": (
+                "insert into {table} ({fields}) select {markers}"
+                " where not exists (select 1 from {table} where {keys});"
+            ).format(
+                table=table_name,
+                fields=", ".join(field_names),
+                markers=", ".join("?" for _ in field_names),
+                keys=key_sql,
+            ),
+        }
+        row_count = 0
+        for chunk in _chunked(rows, chunk_size):
+
+            def _upsert(conn, chunk=chunk):
+                cursor = conn.cursor()
+                if value_indexes:
+                    cursor.executemany(
+                        sql["update"],
+                        [
+                            tuple(row[i] for i in value_indexes + key_indexes)
+                            for row in chunk
+                        ],
+                    )
+                cursor.executemany(
+                    sql["insert"],
+                    [tuple(row) + tuple(row[i] for i in key_indexes) for row in chunk],
+                )
+                conn.commit()
+
+            self.run(_upsert)
+            row_count += len(chunk)
+        return row_count
+
 
 class Database(object):
     """Representation of database information.
@@ -161,6 +470,206 @@ def access_odbc_string(database_path):
     return _string
 
 
+def _chunk_connections(session_or_engine, rows, chunk_size):
+    """Generate (connection, chunk) for each chunk of rows.
+
+    Sessions & connections are used as-is, within the caller's transaction; engines
+    provide a connection with its own transaction for each chunk. pyodbc
+    fast_executemany is on until the last chunk is generated.
+    """
+    if isinstance(session_or_engine, Session):
+        engine = session_or_engine.get_bind().engine
+    else:
+        engine = session_or_engine.engine
+    with _fast_executemany_enabled(engine):
+        if isinstance(session_or_engine, Session):
+            conn = session_or_engine.connection()
+            for chunk in _chunked(rows, chunk_size):
+                yield conn, chunk
+
+        elif isinstance(session_or_engine, Connection):
+            for chunk in _chunked(rows, chunk_size):
+                yield session_or_engine, chunk
+
+        else:
+            for chunk in _chunked(rows, chunk_size):
+                with session_or_engine.begin() as conn:
+                    yield conn, chunk
+
+
+def _chunked(iterable, size):
+    """Generate lists of up to size items from iterable."""
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _close_quietly(conn):
+    """Close connection, ignoring errors (e.g. connection already broken)."""
+    try:
+        conn.close()
+    except Exception:  # pylint: disable=broad-except
+        pass
+
+
+def _fast_executemany(
+    conn, cursor, statement, parameters, context, executemany
+):  # pylint: disable=unused-argument,too-many-arguments
+    """Set pyodbc cursor to send executemany parameters in one batch."""
+    if executemany and hasattr(cursor, "fast_executemany"):
+        cursor.fast_executemany = True
+
+
+@contextmanager
+def _fast_executemany_enabled(engine):
+    """Provide context with pyodbc fast_executemany on for the engine's executemany.
+
+    The listener is removed once the last context on the engine exits, so other
+    executemany calls (e.g. ORM flushes) keep the driver default.
+    """
+    state = _fast_executemany_state
+    listen = engine.dialect.driver == "pyodbc"
+    if listen:
+        with state["lock"]:
+            if not state["counts"][engine]:
+                event.listen(engine, "before_cursor_execute", _fast_executemany)
+            state["counts"][engine] += 1
+    try:
+        yield
+
+    finally:
+        if listen:
+            with state["lock"]:
+                state["counts"][engine] -= 1
+                if not state["counts"][engine]:
+                    del state["counts"][engine]
+                    event.remove(engine, "before_cursor_execute", _fast_executemany)
+
+
+def _select(columns):
+    """Return select statement on columns, for SQLAlchemy before & after 1.4."""
+    if tuple(int(part) for part in sqlalchemy.__version__.split(".")[:2]) < (1, 4):
+        return sqlalchemy.select(columns)
+
+    return sqlalchemy.select(*columns)
+
+
+def _table(model):
+    """Return SQLAlchemy table for an ORM model or table."""
+    return getattr(model, "__table__", model)
+
+
+def bulk_insert(session_or_engine, model, rows, chunk_size=10000):
+    """Insert rows into a model's table in chunked executemany statements.
+
+    Avoids the ORM unit-of-work: each chunk is one Core insert statement executed with
+    many parameter sets (with pyodbc fast_executemany where available).
+
+    Args:
+        session_or_engine: SQLAlchemy session, connection, or engine. Sessions &
+            connections insert within their current transaction (caller commits);
+            engines commit each chunk.
+        model: SQLAlchemy ORM model class or table.
+        rows (iter): Collection of mappings of column name to value.
+        chunk_size (int): Number of rows per executemany statement.
+
+    Returns:
+        int: Count of rows inserted.
+
+    """
+    table = _table(model)
+    row_count = 0
+    for conn, chunk in _chunk_connections(session_or_engine, rows, chunk_size):
+        conn.execute(table.insert(), chunk)
+        row_count += len(chunk)
+    LOG.debug("%s rows inserted into %s.", row_count, table.name)
+    return row_count
+
+
+def bulk_upsert(session_or_engine, model, rows, key_names=None, chunk_size=1000):
+    """Update rows matching on key, insert the rest, in chunked statements.
+
+    For each chunk, existing keys are found with one query; matching rows are updated
+    with one executemany update statement & the rest are inserted with one
+    executemany insert statement.
+
+    Args:
+        session_or_engine: SQLAlchemy session, connection, or engine. Sessions &
+            connections upsert within their current transaction (caller commits);
+            engines commit each chunk.
+        model: SQLAlchemy ORM model class or table.
+        rows (iter): Collection of mappings of column name to value. All rows must
+            have the same keys, including the key names, & key values must be
+            unique among the rows.
+        key_names (iter): Names of columns identifying a row. Default is the table's
+            primary key columns.
+        chunk_size (int): Number of rows per chunk. Keep low enough for the key lookup
+            to stay under the database's parameter limit.
+
+    Returns:
+        collections.Counter: Counts of rows "inserted" & "updated".
+
+    """
+    table = _table(model)
+    if key_names is None:
+        key_names = [column.name for column in table.primary_key.columns]
+    key_names = list(key_names)
+    key_columns = [table.columns[name] for name in key_names]
+    count = Counter()
+    for conn, chunk in _chunk_connections(session_or_engine, rows, chunk_size):
+        # Narrow lookup on first key column, then match full keys in Python.
+        query = _select(key_columns).where(
+            key_columns[0].in_(list({row[key_names[0]] for row in chunk}))
+        )
+        existing_keys = {tuple(key) for key in conn.execute(query)}
+        updates, inserts = [], []
+        for row in chunk:
+            if tuple(row[name] for name in key_names) in existing_keys:
+                updates.append(
+                    {
+                        ("_key_" + name if name in key_names else name): val
+                        for name, val in row.items()
+                    }
+                )
+            else:
+                inserts.append(row)
+        if updates:
+            value_names = [name for name in chunk[0] if name not in key_names]
+            if value_names:
+                statement = (
+                    table.update()
+                    .where(
+                        and_(
+                            *(
+                                column == sqlalchemy.bindparam("_key_" + column.name)
+                                for column in key_columns
+                            )
+                        )
+                    )
+                    .values(
+                        {name: sqlalchemy.bindparam(name) for name in value_names}
+                    )
+                )
+                conn.execute(statement, updates)
+        if inserts:
+            conn.execute(table.insert(), inserts)
+        count["updated"] += len(updates)
+        count["inserted"] += len(inserts)
+    LOG.debug(
+        "%s rows inserted & %s rows updated in %s.",
+        count["inserted"],
+        count["updated"],
+        table.name,
+    )
+    return count
+
+
 def sql_server_odbc_string(host, database_name=None, username=None, password=None,
                            **kwargs):
     """Return ODBC connection string for use by ODBC libraries & apps.
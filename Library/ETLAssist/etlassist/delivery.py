@@ -0,0 +1,262 @@
+"""Delivery packaging objects.
+
+A delivery is a set of dataset exports zipped into one archive. Exports run
+concurrently in worker processes; each export's output files are streamed into the
+archive as soon as that export finishes, so archiving overlaps the exports still
+running.
+"""
+import hashlib
+import io
+import logging
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+import traceback
+import zipfile
+
+from .misc import replace_file
+from .transform import etl_dataset
+
+
+__all__ = ["manifest_html", "package_deliverables"]
+LOG = logging.getLogger(__name__)
+"""logging.Logger: Module-level logger."""
+
+ROW_COUNT_KEYS = ["inserted", "altered", "unchanged"]
+"""list of str: Feature-count keys that sum to the rows in a loaded output."""
+
+
+def _archive_file(archive, file_path, archive_name, chunk_size=2 ** 20):
+    """Stream file into archive, returning the file's size & SHA-256 hex digest."""
+    digest = hashlib.sha256()
+    size = 0
+    with io.open(file_path, mode="rb") as file:
+        # Writable archive members only exist in Python 3.6+: there, read once.
+        if sys.version_info >= (3, 6):
+            info = zipfile.ZipInfo.from_file(file_path, archive_name)
+            info.compress_type = archive.compression
+            with archive.open(info, mode="w", force_zip64=True) as member:
+                for chunk in iter(lambda: file.read(chunk_size), b""):
+                    digest.update(chunk)
+                    member.write(chunk)
+                    size += len(chunk)
+            return size, digest.hexdigest()
+
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            digest.update(chunk)
+            size += len(chunk)
+    archive.write(file_path, archive_name)
+    return size, digest.hexdigest()
+
+
+def _excluded(path, exclude_patterns):
+    """Return True if file or directory name includes any exclude pattern."""
+    name = os.path.basename(path).lower()
+    return any(pattern.lower() in name for pattern in exclude_patterns)
+
+
+def _export(task):
+    """Run export in worker process.
+
+    Exceptions are returned as text rather than raised, so one failed export does
+    not stop the others.
+
+    Returns:
+        tuple: Name, row count (None if unknown), elapsed seconds, & error text (None
+            if no error).
+    """
+    name, exporter, kwargs = task
+    start_time = time.time()
+    try:
+        result = exporter(**kwargs)
+    except Exception:  # pylint: disable=broad-except
+        return name, None, time.time() - start_time, traceback.format_exc()
+
+    if isinstance(result, dict):
+        row_count = sum(result.get(key, 0) for key in ROW_COUNT_KEYS)
+    elif isinstance(result, int) and not isinstance(result, bool):
+        row_count = result
+    else:
+        row_count = None
+    return name, row_count, time.time() - start_time, None
+
+
+def _output_file_paths(output_path, exclude_patterns):
+    """Return paths of files making up an export output.
+
+    A file output includes its same-named siblings (e.g. a shapefile's .shx, .dbf,
+    & .prj files); a directory output includes all files under it. Outputs that are
+    neither (e.g. a feature class inside a file geodatabase) have no files of their
+    own.
+    """
+    if os.path.isdir(output_path):
+        file_paths = []
+        for directory_path, directory_names, file_names in os.walk(output_path):
+            directory_names[:] = [
+                name for name in directory_names
+                if not _excluded(name, exclude_patterns)
+            ]
+            file_paths.extend(
+                os.path.join(directory_path, name) for name in sorted(file_names)
+            )
+    elif os.path.isfile(output_path):
+        directory_path, file_name = os.path.split(output_path)
+        prefix = os.path.splitext(file_name)[0].lower() + "."
+        file_paths = [
+            os.path.join(directory_path, name)
+            for name in os.listdir(directory_path or os.curdir)
+            if name.lower() == file_name.lower() or name.lower().startswith(prefix)
+        ]
+    else:
+        file_paths = []
+    return sorted(
+        path for path in file_paths if not _excluded(path, exclude_patterns)
+    )
+
+
+def manifest_html(manifest):
+    """Return HTML table of delivery manifest, for a message body.
+
+    Args:
+        manifest (list of dict): Manifest entries, as returned by
+            `package_deliverables`.
+
+    Returns:
+        str: HTML table.
+    """
+    rows = ["<tr><th>Dataset</th><th>Rows</th><th>Files</th><th>SHA-256</th></tr>"]
+    for entry in manifest:
+        for i, file_entry in enumerate(entry["files"] or [{"name": "", "sha256": ""}]):
+            rows.append(
+                "<tr><td>{}</td><td>{}</td><td>{}</td><td>{}</td></tr>".format(
+                    entry["name"] if i == 0 else "",
+                    entry["row_count"] if i == 0 and entry["row_count"] is not None
+                    else "",
+                    file_entry["name"],
+                    file_entry["sha256"],
+                )
+            )
+    return '<table style="width:100%">{}</table>'.format("".join(rows))
+
+
+def package_deliverables(exports, archive_path, **kwargs):
+    """Run dataset exports concurrently & package their outputs in a zip archive.
+
+    Each export's output files are added to the archive as soon as that export
+    finishes. The archive is built under a temporary name & only moved into place
+    once every export has succeeded.
+
+    Args:
+        exports (dict): Mapping of deliverable name to keyword arguments for the
+            exporter. Each set of arguments must include "output_path".
+        archive_path (str): Path of the archive to create.
+        **kwargs: Arbitrary keyword arguments. See below.
+
+    Keyword Args:
+        exporter (function): Module-level function (so it can be pickled to worker
+            processes) taking export keyword arguments & returning a feature
+            counter or row count. Default is etlassist.transform.etl_dataset.
+        worker_count (int): Number of worker processes. Default is 4.
+        base_path (str): Path of the directory archive names are relative to.
+            Default is the common directory of the output paths.
+        trailing_paths (iter): Paths of files or directories to add to the archive
+            after all exports finish, e.g. a file geodatabase the exports load into.
+            Default is no paths.
+        archive_exclude_patterns (iter): Collection of file name patterns to exclude
+            from archive. Default is [".lock"].
+
+    Returns:
+        list of dict: Manifest of the delivery. Each entry has "name", "row_count",
+            & "files" (list of dicts with "name", "size", & "sha256"), for exports
+            in completion order, then trailing paths.
+
+    Raises:
+        RuntimeError: If any export failed.
+
+    """
+    kwargs.setdefault("exporter", etl_dataset)
+    kwargs.setdefault("worker_count", 4)
+    kwargs.setdefault("trailing_paths", [])
+    kwargs.setdefault("archive_exclude_patterns", [".lock"])
+    LOG.info("Start: Package deliverables into %s.", archive_path)
+    if not kwargs.get("base_path"):
+        directory_paths = [
+            os.path.dirname(os.path.abspath(path))
+            for path in [export["output_path"] for export in exports.values()]
+            + list(kwargs["trailing_paths"])
+        ]
+        # Trailing separators keep the common prefix on whole directory names.
+        kwargs["base_path"] = os.path.dirname(
+            os.path.commonprefix([path + os.sep for path in directory_paths])
+        )
+    tasks = [
+        (name, kwargs["exporter"], export_kwargs)
+        for name, export_kwargs in sorted(exports.items())
+    ]
+    file_descriptor, temp_path = tempfile.mkstemp(
+        suffix=".tmp",
+        prefix="." + os.path.basename(archive_path) + ".",
+        dir=os.path.dirname(os.path.abspath(archive_path)),
+    )
+    os.close(file_descriptor)
+    manifest = []
+    failures = []
+    archive_names = set()
+
+    def _add_entry(name, row_count, paths):
+        entry = {"name": name, "row_count": row_count, "files": []}
+        for file_path in paths:
+            archive_name = os.path.relpath(file_path, kwargs["base_path"])
+            # Trailing paths may hold files already streamed in with an export.
+            if archive_name in archive_names:
+                continue
+
+            archive_names.add(archive_name)
+            size, sha256 = _archive_file(archive, file_path, archive_name)
+            entry["files"].append(
+                {"name": archive_name.replace(os.sep, "/"), "size": size, "sha256": sha256}
+            )
+        manifest.append(entry)
+
+    archive = zipfile.ZipFile(temp_path, mode="w", compression=zipfile.ZIP_DEFLATED)
+    pool = multiprocessing.Pool(max(1, min(kwargs["worker_count"], len(tasks))))
+    try:
+        with archive:
+            for name, row_count, elapsed, error in pool.imap_unordered(_export, tasks):
+                if error:
+                    LOG.error("Export %s failed:\n%s", name, error)
+                    failures.append(name)
+                    continue
+
+                LOG.info("Export %s finished in %.1f seconds.", name, elapsed)
+                _add_entry(
+                    name,
+                    row_count,
+                    _output_file_paths(
+                        exports[name]["output_path"], kwargs["archive_exclude_patterns"]
+                    ),
+                )
+            if not failures:
+                for path in kwargs["trailing_paths"]:
+                    _add_entry(
+                        os.path.basename(path),
+                        None,
+                        _output_file_paths(path, kwargs["archive_exclude_patterns"]),
+                    )
+    except Exception:
+        pool.terminate()
+        pool.join()
+        os.remove(temp_path)
+        raise
+
+    pool.close()
+    pool.join()
+    if failures:
+        os.remove(temp_path)
+        raise RuntimeError("Exports failed: {}.".format(", ".join(sorted(failures))))
+
+    replace_file(temp_path, archive_path)
+    LOG.info("End: Package.")
+    return manifest
@@ -0,0 +1,152 @@
+"""Query extract objects."""
+import csv
+import io
+import logging
+from multiprocessing.pool import ThreadPool
+import os
+import sys
+import tempfile
+
+from .misc import replace_file
+
+
+__all__ = ["export_queries", "query_to_csvfile"]
+LOG = logging.getLogger(__name__)
+"""logging.Logger: Module-level logger."""
+
+
+def export_queries(pool, file_queries, **kwargs):
+    """Export SQL queries to CSV files, in parallel over pooled connections.
+
+    Args:
+        pool (etlassist.database.ConnectionPool): Pool of connections to query on.
+        file_queries (dict, iter): Mapping of (or collection of pairs of) output file
+            path & SQL query.
+        **kwargs: Arbitrary keyword arguments. See below; all other keyword arguments
+            are passed to `query_to_csvfile`.
+
+    Keyword Args:
+        worker_count (int): Number of queries to export at once. Default is the pool
+            size.
+
+    Returns:
+        dict: Mapping of file path to count of rows written.
+
+    """
+    worker_count = kwargs.pop("worker_count", pool.size)
+    if hasattr(file_queries, "items"):
+        file_queries = file_queries.items()
+    file_queries = list(file_queries)
+    LOG.info("Start: Export %s queries.", len(file_queries))
+
+    def _export(file_query):
+        file_path, sql = file_query
+        return file_path, query_to_csvfile(pool, sql, file_path, **kwargs)
+
+    workers = ThreadPool(max(min(worker_count, len(file_queries)), 1))
+    try:
+        file_row_count = dict(workers.imap_unordered(_export, file_queries))
+    finally:
+        workers.close()
+        workers.join()
+    LOG.info("End: Export.")
+    return file_row_count
+
+
+def query_to_csvfile(pool, sql, file_path, **kwargs):
+    """Write SQL query results to a CSV file.
+
+    Rows are fetched in batches & written through a buffered text writer to a
+    temporary file, which replaces the output file only once complete. A retry
+    (see `etlassist.database.ConnectionPool`) starts the file over.
+
+    Args:
+        pool (etlassist.database.ConnectionPool): Pool of connections to query on.
+        sql (str): SQL query.
+        file_path (str): Path of the output CSV file.
+        **kwargs: Arbitrary keyword arguments. See below.
+
+    Keyword Args:
+        parameters (iter): Values for the query parameter markers.
+        fetch_size (int): Number of rows to fetch from the cursor at a time. Default
+            is 5000.
+        buffer_size (int): Size of the file write buffer, in bytes. Default is 1 MiB.
+        delimiter (str): Field delimiter. Default is ",".
+        quoting (int): `csv` module quoting constant. Default is csv.QUOTE_MINIMAL.
+        encoding (str): Text encoding of the file. Default is "utf-8".
+        lineterminator (str): Line terminator. Default is "\\r\\n".
+        include_header (bool): Flag to write column names as the first row. Default
+            is False.
+
+    Returns:
+        int: Count of rows written (not including header).
+
+    """
+    kwargs.setdefault("parameters")
+    kwargs.setdefault("fetch_size", 5000)
+    kwargs.setdefault("buffer_size", 2 ** 20)
+    kwargs.setdefault("include_header", False)
+    LOG.info("Start: Write %s.", file_path)
+    dialect = {
+        "delimiter": kwargs.get("delimiter", ","),
+        "quoting": kwargs.get("quoting", csv.QUOTE_MINIMAL),
+        "lineterminator": kwargs.get("lineterminator", "\r\n"),
+    }
+
+    def _encoded(row):
+        if sys.version_info.major >= 3:
+            return row
+
+        return [
+            value.encode(kwargs.get("encoding", "utf-8"))
+            if isinstance(value, unicode)  # pylint: disable=undefined-variable
+            else value
+            for value in row
+        ]
+
+    def _write(conn):
+        cursor = conn.cursor()
+        if kwargs["parameters"] is None:
+            cursor.execute(sql)
+        else:
+            cursor.execute(sql, tuple(kwargs["parameters"]))
+        file_descriptor, temp_path = tempfile.mkstemp(
+            suffix=".tmp",
+            prefix="." + os.path.basename(file_path) + ".",
+            dir=os.path.dirname(os.path.abspath(file_path)),
+        )
+        row_count = 0
+        try:
+            # Python 2 csv writes byte strings: write to the binary stream there.
+            csvfile = io.open(
+                file_descriptor, mode="wb", buffering=kwargs["buffer_size"]
+            )
+            if sys.version_info.major >= 3:
+                csvfile = io.TextIOWrapper(
+                    csvfile, encoding=kwargs.get("encoding", "utf-8"), newline=""
+                )
+            with csvfile:
+                writer = csv.writer(csvfile, **dialect)
+                if kwargs["include_header"]:
+                    writer.writerow(
+                        _encoded([column[0] for column in cursor.description])
+                    )
+                while True:
+                    rows = cursor.fetchmany(kwargs["fetch_size"])
+                    if not rows:
+                        break
+
+                    writer.writerows(_encoded(row) for row in rows)
+                    row_count += len(rows)
+            replace_file(temp_path, file_path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        return row_count
+
+    row_count = pool.run(_write)
+    LOG.info("%s rows written.", row_count)
+    LOG.info("End: Write.")
+    return row_count
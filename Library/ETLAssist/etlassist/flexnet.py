@@ -0,0 +1,313 @@
+"""FlexNet license manager objects."""
+import datetime
+import io
+import json
+import logging
+from multiprocessing.pool import ThreadPool
+import os
+import re
+import subprocess
+import sys
+import tempfile
+
+import dateutil.parser
+
+from .misc import replace_file
+
+
+__all__ = ["LicensePoller", "parse_lmstat"]
+LOG = logging.getLogger(__name__)
+"""logging.Logger: Module-level logger."""
+
+LMSTAT_TOKEN = re.compile(
+    r"""
+    ^\s*(?:
+        # Feature header.
+        Users\sof\s(?P<feature>[^:]+):[^\r\n]*
+        |
+        # Usage line: borrowed (activated) or checked-out.
+        (?:
+            ACTIVATED\sLICENSE\(S\)\s(?P<borrow_host>\w*)\sACTIVATION
+            |
+            (?P<user_handle>\S*)\s(?P<user_host>\w*)\s(?P<user_display>.*?)
+        )
+        \s\((?P<license_version>v[0-9.]*)\)
+        \s\((?P<flexnet_host>[\w.-]*)/(?P<flexnet_port>\d*)
+        \s(?P<flexnet_license_handle>\d*)\),
+        \sstart\s(?P<checkout_time>\w+\s[\d/]+\s[\d:]+)[^\r\n]*
+    )\s*$
+    """,
+    re.MULTILINE | re.VERBOSE,
+)
+"""_sre.SRE_Pattern: Tokenizer for feature headers & usage lines in lmstat output."""
+
+
+class LicensePoller(object):
+    """Poller for license usage on a FlexNet license server.
+
+    Attributes:
+        server (str): License server, as used by lmstat -c (e.g. "@gisrv100").
+        lmutil_path (str): Path to the lmutil executable.
+        runner (function): Function taking the command argument list & a timeout (in
+            seconds), returning the command output as text.
+        timeout (float): Time in seconds to wait on each lmstat call.
+        state_path (str, None): Path of file to save the last poll's checkouts to (see
+            `save_state`), for de-duplicating between processes. If None, kept in
+            memory only.
+    """
+
+    def __init__(self, server, lmutil_path, **kwargs):
+        """Initialize instance.
+
+        Args:
+            server (str): License server, as used by lmstat -c (e.g. "@gisrv100").
+            lmutil_path (str): Path to the lmutil executable.
+            **kwargs: Arbitrary keyword arguments. See below.
+
+        Keyword Args:
+            runner (function): Function to run commands with. Default runs a
+                subprocess.
+            timeout (float): Time in seconds to wait on each lmstat call. Default is
+                60.
+            state_path (str): Path of file to persist the last poll's checkouts to.
+                Default is None (in memory only).
+        """
+        self.server = server
+        self.lmutil_path = lmutil_path
+        self.runner = kwargs.get("runner", _check_output)
+        self.timeout = kwargs.get("timeout", 60)
+        self.state_path = kwargs.get("state_path")
+        self._last_keys = None
+
+    def __repr__(self):
+        return "{}(server={!r})".format(self.__class__.__name__, self.server)
+
+    @property
+    def last_keys(self):
+        """dict: Mapping of feature name to set of checkout keys in the last poll."""
+        if self._last_keys is None:
+            self._last_keys = {}
+            if self.state_path and os.path.exists(self.state_path):
+                try:
+                    with io.open(self.state_path, encoding="utf-8") as statefile:
+                        state = json.load(statefile)
+                    self._last_keys = {
+                        feature: {tuple(key) for key in keys}
+                        for feature, keys in state.items()
+                    }
+                except (IOError, ValueError) as error:
+                    LOG.warning("Cannot load poll state %s: %s.", self.state_path, error)
+        return self._last_keys
+
+    def _lmstat(self, *args):
+        """Return lmstat output for arguments."""
+        return self.runner(
+            [self.lmutil_path, "lmstat", "-c", self.server] + list(args), self.timeout
+        )
+
+    def _poll(self, feature_names=None, **kwargs):
+        """Return current usages & names of the features successfully polled.
+
+        Names are None if all features on the server were polled.
+        """
+        check_time = datetime.datetime.now()
+        if feature_names is not None:
+            feature_names = list(feature_names)
+        if not (kwargs.get("per_feature") and feature_names):
+            output = self._lmstat("-a")
+            usages = parse_lmstat(output, check_time)
+            if feature_names is None:
+                polled_names = None
+            else:
+                polled_names = set(feature_names)
+                usages = [
+                    usage
+                    for usage in usages
+                    if usage["license_internal_name"] in polled_names
+                ]
+            return usages, polled_names
+
+        def _feature_output(name):
+            try:
+                return name, self._lmstat("-f", name)
+
+            except Exception as error:  # pylint: disable=broad-except
+                LOG.warning("lmstat for %s failed: %s.", name, error)
+                return name, None
+
+        pool = ThreadPool(min(kwargs.get("worker_count", 4), len(feature_names)))
+        try:
+            outputs = pool.map(_feature_output, feature_names)
+        finally:
+            pool.close()
+            pool.join()
+        polled_names = {name for name, output in outputs if output is not None}
+        usages = parse_lmstat(
+            "\n".join(output for _, output in outputs if output is not None),
+            check_time,
+        )
+        return [
+            usage for usage in usages if usage["license_internal_name"] in polled_names
+        ], polled_names
+
+    def changes(self, feature_names=None, **kwargs):
+        """Return usages checked out since the last poll.
+
+        Checkouts seen in the last poll are left out. For features that could not be
+        polled, the last poll's checkouts are kept for the next comparison.
+
+        The poll's checkouts are not written to the state file until `save_state` is
+        called: call it once the changes are safely loaded, so a failed load is
+        repeated on the next poll.
+
+        Args:
+            feature_names (iter): Collection of internal feature names to poll. If
+                None, all features on the server are polled.
+            **kwargs: Arbitrary keyword arguments. See `poll`.
+
+        Returns:
+            list of dict: Usage records for new checkouts.
+
+        """
+        usages, polled_names = self._poll(feature_names, **kwargs)
+        current_keys = {name: set() for name in polled_names or ()}
+        changes = []
+        for usage in usages:
+            key = _usage_key(usage)
+            feature = usage["license_internal_name"]
+            current_keys.setdefault(feature, set()).add(key)
+            if key not in self.last_keys.get(feature, ()):
+                changes.append(usage)
+        if polled_names is None:
+            self._last_keys = current_keys
+        else:
+            self.last_keys.update(current_keys)
+        LOG.info(
+            "%s new checkouts (%s unchanged).", len(changes), len(usages) - len(changes)
+        )
+        return changes
+
+    def poll(self, feature_names=None, **kwargs):
+        """Return current license usages.
+
+        Args:
+            feature_names (iter): Collection of internal feature names to poll. If
+                None, all features on the server are polled.
+            **kwargs: Arbitrary keyword arguments. See below.
+
+        Keyword Args:
+            per_feature (bool): Run an lmstat call for each feature concurrently,
+                rather than one call for all features. Default is False.
+            worker_count (int): Number of concurrent lmstat calls if per_feature is
+                True. Default is 4.
+
+        Returns:
+            list of dict: Usage records.
+
+        """
+        return self._poll(feature_names, **kwargs)[0]
+
+    def save_state(self):
+        """Save last poll's checkout keys to the state file (replacing it atomically).
+
+        Raises:
+            ValueError: If poller has no state path.
+
+        """
+        if not self.state_path:
+            raise ValueError("Poller has no state path.")
+
+        file_descriptor, temp_path = tempfile.mkstemp(
+            suffix=".tmp",
+            prefix="." + os.path.basename(self.state_path) + ".",
+            dir=os.path.dirname(os.path.abspath(self.state_path)),
+        )
+        state = {
+            feature: [list(key) for key in sorted(keys, key=repr)]
+            for feature, keys in self.last_keys.items()
+        }
+        with io.open(file_descriptor, mode="w", encoding="utf-8") as statefile:
+            statefile.write(json.dumps(state, sort_keys=True, default=str))
+        replace_file(temp_path, self.state_path)
+
+
+def _check_output(args, timeout=None):
+    """Return decoded output of command.
+
+    Timeout is ignored where subprocess does not support it (Python 2).
+    """
+    if sys.version_info.major >= 3:
+        output = subprocess.check_output(args, timeout=timeout)
+    else:
+        output = subprocess.check_output(args)
+    return output.decode("utf-8", "replace")
+
+
+def _usage_key(usage):
+    """Return key identifying a checkout across polls."""
+    return (
+        usage["user_handle"],
+        usage["user_host"],
+        usage["checkout_time"].isoformat(),
+        usage["is_borrowed"],
+        usage["flexnet_license_handle"],
+    )
+
+
+def parse_lmstat(output, check_time=None):
+    """Return license usages parsed from lmstat output.
+
+    Output can be from one or more `lmstat -a` or `lmstat -f` calls; usage lines are
+    assigned to the feature of the "Users of" header above them.
+
+    Args:
+        output (str): Text output of lmstat.
+        check_time (datetime.datetime): Time usage was checked. Default is now.
+
+    Returns:
+        list of dict: Usage records, with keys "usage_check_time", "user_handle",
+            "user_host", "license_internal_name", "checkout_time", "is_borrowed", &
+            "flexnet_license_handle".
+
+    """
+    if check_time is None:
+        check_time = datetime.datetime.now()
+    checkout_times = {}
+    feature = None
+    usages = []
+    for match in LMSTAT_TOKEN.finditer(output):
+        token = match.groupdict()
+        if token["feature"] is not None:
+            feature = token["feature"].strip()
+            continue
+
+        if feature is None:
+            LOG.warning("Usage line before any feature: %r.", match.group(0).strip())
+            continue
+
+        checkout_time = checkout_times.get(token["checkout_time"])
+        if checkout_time is None:
+            # lmstat start times have no year: use the check year, unless that puts
+            # the checkout in the future.
+            checkout_time = dateutil.parser.parse(
+                token["checkout_time"], default=check_time.replace(second=0, microsecond=0)
+            )
+            if checkout_time > check_time + datetime.timedelta(days=1):
+                checkout_time = checkout_time.replace(year=checkout_time.year - 1)
+            checkout_times[token["checkout_time"]] = checkout_time
+        is_borrowed = token["borrow_host"] is not None
+        usages.append(
+            {
+                "usage_check_time": check_time,
+                # Borrowed licenses have no user handle.
+                "user_handle": None if is_borrowed else token["user_handle"].upper(),
+                "user_host": (
+                    token["borrow_host"] if is_borrowed else token["user_host"]
+                ).upper(),
+                "license_internal_name": feature,
+                "checkout_time": checkout_time,
+                "is_borrowed": is_borrowed,
+                "flexnet_license_handle": token["flexnet_license_handle"],
+            }
+        )
+    return usages
@@ -4,6 +4,7 @@ Do not put anything here which imports from other ETLAssist submodules!
 """
 import datetime
 import logging
+import os
 import random
 import types
 
@@ -14,6 +15,7 @@ __all__ = (
     'kwargs_cmp',
     "parity",
     "randomized",
+    "replace_file",
     'timestamp',
     )
 LOG = logging.getLogger(__name__)
@@ -79,6 +81,24 @@ def randomized(iterable):
         yield item
 
 
+def replace_file(source_path, destination_path):
+    """Move file at source path to destination path, replacing any existing file.
+
+    On the same volume this is atomic, so readers never see a partial file.
+
+    Args:
+        source_path (str): Path of the file to move.
+        destination_path (str): Path to move the file to.
+    """
+    if hasattr(os, "replace"):
+        os.replace(source_path, destination_path)
+    else:
+        # Python 2 rename will not replace existing file on Windows.
+        if os.path.exists(destination_path):
+            os.remove(destination_path)
+        os.rename(source_path, destination_path)
+
+
 def timestamp(fmt="%Y_%m_%d_T%H%M"):
     """Return string with current timestamp."""
     return datetime.datetime.now().strftime(fmt)
@@ -0,0 +1,218 @@
+"""Master Street Address Guide (MSAG) objects."""
+from bisect import bisect_right
+import io
+import logging
+import os
+import pickle
+import tempfile
+
+from .misc import replace_file
+
+
+__all__ = ["RANGE_FIELD_NAMES", "RangeIndex", "street_key"]
+LOG = logging.getLogger(__name__)
+"""logging.Logger: Module-level logger."""
+
+RANGE_FIELD_NAMES = [
+    "msag_id",
+    "emergency_service_number",
+    "parity_code",
+    "parity",
+    "from_structure_number",
+    "to_structure_number",
+    "prefix_direction_code",
+    "street_name",
+    "street_type_code",
+    "suffix_direction_code",
+    "postal_community",
+]
+"""list of str: Names of range attributes kept in a range index."""
+STREET_KEY_FIELD_NAMES = [
+    "prefix_direction_code",
+    "street_name",
+    "street_type_code",
+    "suffix_direction_code",
+]
+"""list of str: Names of range attributes making up the street key, in order."""
+
+
+class RangeIndex(object):
+    """Index of MSAG ranges for finding the ranges containing a house number.
+
+    Ranges are grouped by street key & community, then by parity code ("E", "O", or
+    "M" for mixed). Each group keeps its ranges sorted by from-number, with the
+    running maximum to-number, so a lookup is a binary search plus a walk back over
+    only the ranges that could still contain the number (one or two for MSAG ranges,
+    which rarely overlap).
+
+    Attributes:
+        range_count (int): Number of ranges in the index.
+    """
+
+    def __init__(self):
+        self._groups = {}
+        self.range_count = 0
+
+    def __contains__(self, key):
+        """Return True if index has ranges for (street key, community)."""
+        return key in self._groups
+
+    def __len__(self):
+        return self.range_count
+
+    def __repr__(self):
+        return "{}(range_count={})".format(self.__class__.__name__, self.range_count)
+
+    def find(self, house_number, street, community):
+        """Return ranges containing the house number on the street in the community.
+
+        Args:
+            house_number (int): House (structure) number.
+            street (str): Street key, as returned by `street_key` (or the parts to
+                pass to it, as a tuple or list).
+            community (str): Postal community.
+
+        Returns:
+            list of dict: Mappings of range attribute name to value, ordered by
+                from-number.
+        """
+        if isinstance(street, (list, tuple)):
+            street = street_key(*street)
+        parity_ranges = self._groups.get((street, street_key(community)))
+        if not parity_ranges or house_number is None:
+            return []
+
+        found = []
+        for parity_code in ["E" if house_number % 2 == 0 else "O", "M"]:
+            if parity_code in parity_ranges:
+                found.extend(_interval_find(parity_ranges[parity_code], house_number))
+        if len(found) > 1:
+            found.sort(key=lambda item: item[0])
+        return [msag_range for _, msag_range in found]
+
+    @classmethod
+    def from_ranges(cls, ranges, field_names=None):
+        """Return index built from MSAG ranges.
+
+        Args:
+            ranges (iter of dict): Collection of range mappings, as generated by an
+                ETL's `msag_ranges`.
+            field_names (iter): Names of range attributes to keep. Default is
+                RANGE_FIELD_NAMES (those present).
+
+        Returns:
+            RangeIndex
+        """
+        if field_names is None:
+            field_names = RANGE_FIELD_NAMES
+        field_names = list(field_names)
+        index = cls()
+        unsorted = {}
+        for msag_range in ranges:
+            kept = {key: msag_range[key] for key in field_names if key in msag_range}
+            group_key = (
+                street_key(*(msag_range.get(key) for key in STREET_KEY_FIELD_NAMES)),
+                street_key(msag_range["postal_community"]),
+            )
+            parity_code = (msag_range.get("parity_code") or "M").upper()
+            unsorted.setdefault(group_key, {}).setdefault(parity_code, []).append(
+                (
+                    msag_range["from_structure_number"],
+                    msag_range["to_structure_number"],
+                    kept,
+                )
+            )
+            index.range_count += 1
+        for group_key, parity_ranges in unsorted.items():
+            index._groups[group_key] = {
+                parity_code: _interval_list(items)
+                for parity_code, items in parity_ranges.items()
+            }
+        LOG.info("Indexed %s MSAG ranges.", index.range_count)
+        return index
+
+    @classmethod
+    def load(cls, file_path):
+        """Return index loaded from file.
+
+        Args:
+            file_path (str): Path of the saved index.
+
+        Returns:
+            RangeIndex
+        """
+        with io.open(file_path, mode="rb") as indexfile:
+            index = pickle.load(indexfile)
+        if not isinstance(index, cls):
+            raise ValueError("{} is not a saved {}.".format(file_path, cls.__name__))
+
+        return index
+
+    def save(self, file_path):
+        """Save index to file (replacing any existing file atomically).
+
+        Args:
+            file_path (str): Path of file to save to.
+        """
+        file_descriptor, temp_path = tempfile.mkstemp(
+            suffix=".tmp",
+            prefix="." + os.path.basename(file_path) + ".",
+            dir=os.path.dirname(os.path.abspath(file_path)),
+        )
+        with io.open(file_descriptor, mode="wb") as indexfile:
+            pickle.dump(self, indexfile, protocol=2)
+        replace_file(temp_path, file_path)
+
+
+def _interval_find(intervals, number):
+    """Return (from-number, range) pairs for intervals containing number."""
+    starts, ends, max_ends, ranges = intervals
+    found = []
+    # Walk back from the last interval starting at or before number, stopping once
+    # no earlier interval reaches it.
+    i = bisect_right(starts, number) - 1
+    while i >= 0 and max_ends[i] >= number:
+        if ends[i] >= number:
+            found.append((starts[i], ranges[i]))
+        i -= 1
+    found.reverse()
+    return found
+
+
+def _interval_list(items):
+    """Return interval list from (from-number, to-number, range) items.
+
+    Returns:
+        tuple: Lists of from-numbers (sorted), to-numbers, running maximum
+            to-numbers, & ranges.
+    """
+    items = sorted(items, key=lambda item: (item[0], item[1]))
+    max_ends = []
+    for _, end, _ in items:
+        max_ends.append(max(end, max_ends[-1]) if max_ends else end)
+    return (
+        [start for start, _, _ in items],
+        [end for _, end, _ in items],
+        max_ends,
+        [msag_range for _, _, msag_range in items],
+    )
+
+
+def street_key(*parts):
+    """Return normalized key for street name parts.
+
+    Parts are upper-cased with whitespace collapsed; empty parts are dropped.
+
+    Args:
+        *parts (str): Street name parts (e.g. prefix direction, name, type, suffix
+            direction), or a community name.
+
+    Returns:
+        str: Street key.
+    """
+    words = []
+    for part in parts:
+        if part is not None:
+            # Format as text: str() fails on non-ASCII unicode in Py2.
+            words.extend(u"{}".format(part).upper().split())
+    return u" ".join(words)
@@ -0,0 +1,196 @@
+"""External process objects."""
+from collections import namedtuple
+import io
+import logging
+from multiprocessing.pool import ThreadPool
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+
+__all__ = ["CommandResult", "kill_process_tree", "run_commands"]
+LOG = logging.getLogger(__name__)
+"""logging.Logger: Module-level logger."""
+
+POLL_INTERVAL = 0.05
+"""float: Time in seconds between checks on a running command."""
+
+
+CommandResult = namedtuple(
+    "CommandResult",
+    ["name", "args", "return_code", "elapsed", "timed_out", "log_path"],
+)
+"""Result of a command run.
+
+Attributes:
+    name (str): Name of the command.
+    args (list, str): Command arguments (or command string).
+    return_code (int, None): Return code of the process; None if it could not start.
+    elapsed (float): Time in seconds the command ran.
+    timed_out (bool): True if the command was killed for running past its timeout.
+    log_path (str): Path of the file with the command's combined stdout & stderr.
+"""
+
+
+def _run_command(name, args, log_path, timeout=None, **kwargs):
+    """Run command to completion or timeout, writing output to log file.
+
+    Output goes straight from the process to the file (no pipes), so a chatty
+    process cannot block on a full pipe buffer.
+    """
+    popen_kwargs = {"shell": kwargs.get("shell", False), "cwd": kwargs.get("cwd")}
+    if os.name == "nt":
+        popen_kwargs["creationflags"] = subprocess.CREATE_NEW_PROCESS_GROUP
+    elif sys.version_info.major >= 3:
+        # New session, so the process tree can be killed as a group.
+        popen_kwargs["start_new_session"] = True
+    else:
+        popen_kwargs["preexec_fn"] = os.setsid
+    start_time = time.time()
+    with io.open(log_path, mode="wb") as logfile:
+        try:
+            process = subprocess.Popen(
+                args,
+                stdin=subprocess.PIPE,
+                stdout=logfile,
+                stderr=subprocess.STDOUT,
+                **popen_kwargs
+            )
+        except OSError as error:
+            logfile.write("Could not start command: {}\n".format(error).encode())
+            LOG.error("Command %s could not start: %s.", name, error)
+            return CommandResult(name, args, None, 0.0, False, log_path)
+
+        process.stdin.close()
+        timed_out = False
+        while process.poll() is None:
+            if timeout is not None and time.time() - start_time > timeout:
+                timed_out = True
+                kill_process_tree(process)
+                process.wait()
+                break
+
+            time.sleep(POLL_INTERVAL)
+        elapsed = time.time() - start_time
+        if timed_out:
+            logfile.write(
+                "\nKilled after timeout of {} seconds.\n".format(timeout).encode()
+            )
+    if timed_out:
+        LOG.error("Command %s timed out after %s seconds.", name, timeout)
+    elif process.returncode:
+        LOG.error("Command %s failed with return code %s.", name, process.returncode)
+    else:
+        LOG.info("Command %s completed in %.1f seconds.", name, elapsed)
+    return CommandResult(name, args, process.returncode, elapsed, timed_out, log_path)
+
+
+def kill_process_tree(process):
+    """Kill process & all of its descendants.
+
+    Args:
+        process (subprocess.Popen): Process to kill. On POSIX systems, the process
+            must lead its own process group (e.g. started with os.setsid).
+
+    """
+    if process.poll() is not None:
+        return
+
+    try:
+        if os.name == "nt":
+            with io.open(os.devnull, mode="wb") as devnull:
+                subprocess.call(
+                    ["taskkill", "/F", "/T", "/PID", str(process.pid)],
+                    stdout=devnull,
+                    stderr=devnull,
+                )
+        else:
+            os.killpg(process.pid, signal.SIGKILL)
+    except OSError:
+        # Process ended in the meantime.
+        pass
+
+
+def run_commands(commands, **kwargs):
+    """Run commands concurrently, logging each command's output to a file.
+
+    Args:
+        commands (iter): Collection of (name, args) pairs, or mapping of name to
+            args. Names must be unique; args are a list of arguments or, with
+            `shell=True`, a command string.
+        **kwargs: Arbitrary keyword arguments. See below.
+
+    Keyword Args:
+        worker_count (int): Maximum number of commands to run at once. Default is 4.
+        timeout (float): Time in seconds after which a command (& its child
+            processes) are killed. Default is None (no timeout).
+        log_directory (str): Path of directory to write "{name}.log" output files to.
+            Created if it does not exist. Default is None (temporary files).
+        shell (bool): Run commands through the shell. Default is False.
+        cwd (str): Path of working directory for the commands. Default is None.
+        check (bool): Raise RuntimeError after all commands finish, if any failed or
+            timed out. Default is False.
+
+    Returns:
+        list of CommandResult: Results, in the order of the commands.
+
+    Raises:
+        RuntimeError: If `check=True` & any command failed.
+
+    """
+    kwargs.setdefault("worker_count", 4)
+    kwargs.setdefault("timeout")
+    kwargs.setdefault("log_directory")
+    commands = list(commands.items() if isinstance(commands, dict) else commands)
+    if len({name for name, _ in commands}) != len(commands):
+        raise ValueError("Command names must be unique.")
+
+    if not commands:
+        return []
+
+    if kwargs["log_directory"] and not os.path.isdir(kwargs["log_directory"]):
+        os.makedirs(kwargs["log_directory"])
+
+    def _run(name_args):
+        name, args = name_args
+        if kwargs["log_directory"]:
+            log_path = os.path.join(kwargs["log_directory"], name + ".log")
+        else:
+            file_descriptor, log_path = tempfile.mkstemp(
+                suffix=".log", prefix=name + "."
+            )
+            os.close(file_descriptor)
+        LOG.info("Command %s started; output in %s.", name, log_path)
+        return _run_command(
+            name,
+            args,
+            log_path,
+            kwargs["timeout"],
+            shell=kwargs.get("shell", False),
+            cwd=kwargs.get("cwd"),
+        )
+
+    pool = ThreadPool(min(kwargs["worker_count"], len(commands)))
+    try:
+        results = pool.map(_run, commands)
+    finally:
+        pool.close()
+        pool.join()
+    failed = [result for result in results if result.return_code != 0]
+    if failed and kwargs.get("check"):
+        raise RuntimeError(
+            "Commands failed: {}.".format(
+                ", ".join(
+                    "{} ({})".format(
+                        result.name,
+                        "timed out" if result.timed_out else result.return_code,
+                    )
+                    for result in failed
+                )
+            )
+        )
+
+    return results
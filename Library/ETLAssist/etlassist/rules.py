@@ -0,0 +1,131 @@
+"""Rule-table objects.
+
+A rule table resolves a value for each row of columnar data by applying ordered rules
+in bulk: each rule's condition is evaluated over all rows still unresolved, rows
+that match take the rule's result, & the rest go on to the next rule. This is the
+columnar equivalent of an if/elif cascade run row by row.
+"""
+from collections import Counter, namedtuple
+import logging
+
+
+__all__ = ["Rule", "RuleTable", "column_value"]
+LOG = logging.getLogger(__name__)
+"""logging.Logger: Module-level logger."""
+
+
+Rule = namedtuple("Rule", ["name", "condition", "result"])
+"""Rule in a rule table.
+
+Attributes:
+    name (str): Name of the rule.
+    condition (function): Function taking the columns mapping & a list of row
+        indexes, returning a same-length iterable of booleans (the mask).
+    result: Function taking the columns mapping & a row index, returning the result
+        value for that row; or a constant (non-callable) result value.
+"""
+
+
+class RuleTable(object):
+    """Ordered rules resolving a value for each row of columnar data.
+
+    Attributes:
+        rules (list of Rule): Rules, in order of precedence.
+        default: Result for rows no rule matches. If callable, called like a rule
+            result.
+        rule_counts (collections.Counter): Count of rows resolved by each rule name
+            in the last resolve ("default" for the default).
+    """
+
+    def __init__(self, rules, default=None):
+        """Initialize instance.
+
+        Args:
+            rules (iter): Collection of Rule instances (or name, condition, result
+                tuples), in order of precedence.
+            default: Result for rows no rule matches.
+        """
+        self.rules = [Rule(*rule) for rule in rules]
+        self.default = default
+        self.rule_counts = Counter()
+
+    def __repr__(self):
+        return "{}(rules={!r})".format(
+            self.__class__.__name__, [rule.name for rule in self.rules]
+        )
+
+    def changes(self, columns, id_column_name, value_column_name):
+        """Return (ID, result) pairs for rows where the result changes the value.
+
+        Args:
+            columns (dict): Mapping of column name to list of row values.
+            id_column_name (str): Name of the row ID column.
+            value_column_name (str): Name of the column with current values.
+
+        Returns:
+            list of tuple: Row ID & new value, for changed rows only.
+
+        """
+        results = self.resolve(columns)
+        ids, values = columns[id_column_name], columns[value_column_name]
+        return [
+            (ids[i], result)
+            for i, result in enumerate(results)
+            if result != values[i]
+        ]
+
+    def resolve(self, columns):
+        """Return results for all rows.
+
+        Args:
+            columns (dict): Mapping of column name to list of row values. All columns
+                must be the same length.
+
+        Returns:
+            list: Result for each row, in row order.
+
+        """
+        row_counts = {len(values) for values in columns.values()}
+        if len(row_counts) > 1:
+            raise ValueError("Columns must all be the same length.")
+
+        row_count = row_counts.pop() if row_counts else 0
+        results = [None] * row_count
+        pending = list(range(row_count))
+        self.rule_counts = Counter()
+        for rule in self.rules + [Rule("default", None, self.default)]:
+            if not pending:
+                break
+
+            if rule.condition is None:
+                matched, pending = pending, []
+            else:
+                mask = list(rule.condition(columns, pending))
+                if len(mask) != len(pending):
+                    raise ValueError(
+                        "Rule {!r} mask length does not match rows.".format(rule.name)
+                    )
+
+                matched = [i for i, match in zip(pending, mask) if match]
+                pending = [i for i, match in zip(pending, mask) if not match]
+            if callable(rule.result):
+                for i in matched:
+                    results[i] = rule.result(columns, i)
+            else:
+                for i in matched:
+                    results[i] = rule.result
+            self.rule_counts[rule.name] = len(matched)
+        return results
+
+
+def column_value(column_name):
+    """Return rule result function giving the row's value in the column.
+
+    Args:
+        column_name (str): Name of the column.
+
+    Returns:
+        function
+
+    """
+    return lambda columns, i: columns[column_name][i]
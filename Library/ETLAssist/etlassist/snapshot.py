@@ -0,0 +1,292 @@
+"""SQLite snapshot ingestion objects.
+
+A snapshot tracker keeps a state database (itself SQLite) with a fingerprint of each
+snapshot table it has ingested, and a copy of the table's rows as last extracted.
+Tables whose snapshot file & fingerprint have not moved are skipped; for the rest,
+only rows not in the previous extract are returned, found with a SQL-side EXCEPT.
+State only moves forward when the caller commits it, once the rows are loaded.
+"""
+import hashlib
+import logging
+import os
+import sqlite3
+
+
+__all__ = ["SnapshotTracker"]
+LOG = logging.getLogger(__name__)
+"""logging.Logger: Module-level logger."""
+
+
+class SnapshotTracker(object):
+    """Tracker of SQLite snapshot tables ingested, for incremental extracts.
+
+    Attributes:
+        state_path (str): Path of the SQLite state database.
+    """
+
+    def __init__(self, state_path):
+        """Initialize instance.
+
+        Args:
+            state_path (str): Path of the SQLite state database. Created if it does
+                not exist.
+        """
+        self.state_path = state_path
+        self._pending = {}
+        conn = sqlite3.connect(self.state_path)
+        with conn:
+            conn.execute(
+                """
+                create table if not exists table_fingerprint (
+                    snapshot_path text not null,
+                    table_name text not null,
+                    file_mtime real,
+                    file_size integer,
+                    min_rowid integer,
+                    max_rowid integer,
+                    row_count integer,
+                    row_digest integer,
+                    extract_name text not null,
+                    primary key (snapshot_path, table_name)
+                );
+                """
+            )
+        conn.close()
+
+    def __repr__(self):
+        return "{}(state_path={!r})".format(self.__class__.__name__, self.state_path)
+
+    @property
+    def snapshot_paths(self):
+        """list: Paths of snapshot databases with recorded state."""
+        conn = sqlite3.connect(self.state_path)
+        paths = [
+            path
+            for path, in conn.execute(
+                "select distinct snapshot_path from table_fingerprint"
+                " order by snapshot_path;"
+            )
+        ]
+        conn.close()
+        return paths
+
+    def _connect(self, snapshot_path):
+        """Return connection to state database, with the snapshot attached.
+
+        Connection is in autocommit mode, so transactions are only those begun &
+        committed explicitly (sqlite3 before Python 3.6 commits before any DDL).
+        """
+        conn = sqlite3.connect(self.state_path, isolation_level=None)
+        conn.create_function("row_hash", -1, _row_hash)
+        conn.execute("attach database ? as snapshot;", (snapshot_path,))
+        return conn
+
+    def _recorded(self, conn, snapshot_path, table_name):
+        """Return recorded fingerprint row for snapshot table, or None."""
+        return conn.execute(
+            """
+            select file_mtime, file_size, min_rowid, max_rowid, row_count, row_digest,
+                extract_name
+            from table_fingerprint where snapshot_path = ? and table_name = ?;
+            """,
+            (os.path.abspath(snapshot_path), table_name),
+        ).fetchone()
+
+    def _record(
+        self, conn, snapshot_path, table_name, stat, fingerprint, extract_name=None
+    ):
+        """Record fingerprint for snapshot table (keeping the extract if name None)."""
+        with conn:
+            if extract_name is None:
+                extract_name = self._recorded(conn, snapshot_path, table_name)[6]
+            conn.execute(
+                """
+                insert or replace into table_fingerprint
+                values (?, ?, ?, ?, ?, ?, ?, ?, ?);
+                """,
+                (os.path.abspath(snapshot_path), table_name, stat.st_mtime, stat.st_size)
+                + tuple(fingerprint)
+                + (extract_name,),
+            )
+
+    def changed_rows(self, snapshot_path, table_name, column_names=None):
+        """Generate rows of snapshot table that are new or changed since last ingest.
+
+        No state is recorded here: once the rows are loaded, call `commit` to record
+        the ingest. Until then (e.g. if loading fails), the same rows are generated
+        again on the next call.
+
+        Args:
+            snapshot_path (str): Path of the SQLite snapshot database.
+            table_name (str): Name of the table in the snapshot.
+            column_names (iter): Names of columns to compare & return. Default is all
+                columns in the table.
+
+        Yields:
+            dict: Mapping of column name to value for each new or changed row.
+        """
+        key = (os.path.abspath(snapshot_path), table_name)
+        self._pending.pop(key, None)
+        stat = os.stat(snapshot_path)
+        conn = self._connect(snapshot_path)
+        try:
+            recorded = self._recorded(conn, snapshot_path, table_name)
+            if recorded and tuple(recorded[:2]) == (stat.st_mtime, stat.st_size):
+                LOG.info("%s in %s unchanged (file).", table_name, snapshot_path)
+                return
+
+            if column_names is None:
+                column_names = [
+                    row[1]
+                    for row in conn.execute(
+                        "pragma snapshot.table_info({});".format(_quoted(table_name))
+                    )
+                ]
+            column_names = list(column_names)
+            columns_sql = ", ".join(_quoted(name) for name in column_names)
+            extract_name = _extract_name(snapshot_path, table_name, column_names)
+            # Fingerprint & copy in one read transaction, so both see the same rows.
+            conn.execute("begin;")
+            fingerprint = conn.execute(
+                """
+                select min(rowid), max(rowid), count(*), sum(row_hash({columns}))
+                from snapshot.{table};
+                """.format(columns=columns_sql, table=_quoted(table_name))
+            ).fetchone()
+            if recorded and tuple(recorded[2:6]) == tuple(fingerprint):
+                conn.execute("commit;")
+                LOG.info("%s in %s unchanged (fingerprint).", table_name, snapshot_path)
+                self._pending[key] = (stat, fingerprint, None)
+                return
+
+            conn.execute(
+                "drop table if exists main.{};".format(
+                    _quoted(_pending_name(extract_name))
+                )
+            )
+            conn.execute(
+                "create table main.{} as select {} from snapshot.{};".format(
+                    _quoted(_pending_name(extract_name)),
+                    columns_sql,
+                    _quoted(table_name),
+                )
+            )
+            conn.execute("commit;")
+            if recorded and recorded[6] == extract_name:
+                sql = """
+                    select {columns} from main.{pending}
+                    except select {columns} from main.{extract};
+                """
+            else:
+                sql = "select {columns} from main.{pending};"
+            cursor = conn.execute(
+                sql.format(
+                    columns=columns_sql,
+                    pending=_quoted(_pending_name(extract_name)),
+                    extract=_quoted(extract_name),
+                )
+            )
+            row_count = 0
+            for row in cursor:
+                row_count += 1
+                yield dict(zip(column_names, row))
+
+            LOG.info(
+                "%s new or changed rows in %s in %s.",
+                row_count,
+                table_name,
+                snapshot_path,
+            )
+            # Only a fully-generated extract can be committed.
+            self._pending[key] = (stat, fingerprint, extract_name)
+        finally:
+            conn.close()
+
+    def commit(self, snapshot_path, table_name):
+        """Record ingest of snapshot table, as last generated by `changed_rows`.
+
+        Args:
+            snapshot_path (str): Path of the SQLite snapshot database.
+            table_name (str): Name of the table in the snapshot.
+
+        Returns:
+            bool: True if state was recorded, False if nothing was pending.
+        """
+        pending = self._pending.pop((os.path.abspath(snapshot_path), table_name), None)
+        if pending is None:
+            return False
+
+        stat, fingerprint, extract_name = pending
+        conn = sqlite3.connect(self.state_path)
+        try:
+            if extract_name is None:
+                self._record(conn, snapshot_path, table_name, stat, fingerprint)
+                return True
+
+            recorded = self._recorded(conn, snapshot_path, table_name)
+            with conn:
+                for name in {extract_name, recorded[6] if recorded else extract_name}:
+                    conn.execute("drop table if exists main.{};".format(_quoted(name)))
+                conn.execute(
+                    "alter table main.{} rename to {};".format(
+                        _quoted(_pending_name(extract_name)), _quoted(extract_name)
+                    )
+                )
+                self._record(
+                    conn, snapshot_path, table_name, stat, fingerprint, extract_name
+                )
+        finally:
+            conn.close()
+        return True
+
+    def forget(self, snapshot_path):
+        """Remove state for all tables of snapshot (e.g. once it is retired).
+
+        Args:
+            snapshot_path (str): Path of the SQLite snapshot database.
+        """
+        # Include extracts generated but never committed in this run.
+        extract_names = set()
+        for key in list(self._pending):
+            if key[0] == os.path.abspath(snapshot_path):
+                if self._pending[key][2]:
+                    extract_names.add(self._pending[key][2])
+                del self._pending[key]
+        conn = sqlite3.connect(self.state_path)
+        with conn:
+            extract_names.update(
+                name
+                for name, in conn.execute(
+                    "select extract_name from table_fingerprint where snapshot_path = ?;",
+                    (os.path.abspath(snapshot_path),),
+                )
+            )
+            for name in extract_names:
+                for _name in [name, _pending_name(name)]:
+                    conn.execute("drop table if exists {};".format(_quoted(_name)))
+            conn.execute(
+                "delete from table_fingerprint where snapshot_path = ?;",
+                (os.path.abspath(snapshot_path),),
+            )
+        conn.close()
+
+
+def _extract_name(snapshot_path, table_name, column_names):
+    """Return name of the state table holding a snapshot table's last extract."""
+    key = "|".join([os.path.abspath(snapshot_path), table_name] + list(column_names))
+    return "extract_" + hashlib.md5(key.encode("utf-8")).hexdigest()
+
+
+def _pending_name(extract_name):
+    """Return name of the state table holding an extract not yet committed."""
+    return "pending_" + extract_name[len("extract_"):]
+
+
+def _quoted(identifier):
+    """Return SQLite identifier, quoted."""
+    return '"{}"'.format(identifier.replace('"', '""'))
+
+
+def _row_hash(*values):
+    """Return 40-bit hash of row values (summed over a table for its digest)."""
+    return int(hashlib.md5(repr(values).encode("utf-8")).hexdigest()[:10], 16)
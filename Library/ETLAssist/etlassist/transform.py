@@ -69,7 +69,7 @@ def clean_whitespace(etl, field_names, **kwargs):
     import arcetl
     func = functools.partial(
         etl.transform, transformation=arcetl.attributes.update_by_function,
-        function=value.clean_whitespace, **kwargs
+        function=value.compiled_cleaner(value.clean_whitespace), **kwargs
         )
     tuple(func(field_name=name) for name in field_names)
 
@@ -79,7 +79,8 @@ def clean_whitespace_without_clear(etl, field_names, **kwargs):
     import arcetl
     func = functools.partial(
         etl.transform, transformation=arcetl.attributes.update_by_function,
-        function=value.clean_whitespace_without_clear, **kwargs
+        function=value.compiled_cleaner(value.clean_whitespace_without_clear),
+        **kwargs
         )
     tuple(func(field_name=name) for name in field_names)
 
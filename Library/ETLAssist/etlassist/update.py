@@ -45,7 +45,9 @@ def clean_whitespace(dataset_path, field_names, **kwargs):
     import arcetl
     func = functools.partial(arcetl.attributes.update_by_function,
                              dataset_path=dataset_path,
-                             function=value.clean_whitespace,
+                             function=value.compiled_cleaner(
+                                 value.clean_whitespace
+                                 ),
                              **kwargs)
     tuple(func(field_name=name) for name in field_names)
 
@@ -55,7 +57,9 @@ def clean_whitespace_without_clear(dataset_path, field_names, **kwargs):
     import arcetl
     func = functools.partial(arcetl.attributes.update_by_function,
                              dataset_path=dataset_path,
-                             function=value.clean_whitespace_without_clear,
+                             function=value.compiled_cleaner(
+                                 value.clean_whitespace_without_clear
+                                 ),
                              **kwargs)
     tuple(func(field_name=name) for name in field_names)
 
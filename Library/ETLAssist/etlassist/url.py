@@ -1,23 +1,196 @@
 """URL objects."""
 import ftplib
+import hashlib
+import io
+import json
 import logging
 import os
 import subprocess
+import tempfile
+import time
 try:
     from urllib.parse import urlparse
 except ImportError:
     from urlparse import urlparse
 
+import requests
+
 from . import path
+from .misc import replace_file
 
 
 __all__ = (
+    'fetch_to_file',
     'send_file_by_ftp',
     'send_file_by_sftp',
     )
 LOG = logging.getLogger(__name__)
 """logging.Logger: Module-level logger."""
 
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+"""set: HTTP status codes for which a fetch is retried."""
+
+
+def _file_digest(file_path, chunk_size=2**16):
+    """Return SHA-256 hex digest of file content, or None if file does not exist."""
+    if not os.path.exists(file_path):
+        return None
+    digest = hashlib.sha256()
+    with io.open(file_path, mode='rb') as file:
+        for chunk in iter(lambda: file.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _load_fetch_state(state_path):
+    """Return fetch state (URL & validators) from file, or empty dict."""
+    try:
+        with io.open(state_path, encoding='utf-8') as statefile:
+            return json.load(statefile)
+
+    except (IOError, OSError, ValueError):
+        return {}
+
+
+def _stream_to_temp(response, file_path, chunk_size):
+    """Stream response body into temp file next to file path.
+
+    Returns:
+        tuple: Temp file path & SHA-256 hex digest of the content.
+    """
+    file_descriptor, temp_path = tempfile.mkstemp(
+        suffix='.part', prefix='.' + os.path.basename(file_path) + '.',
+        dir=os.path.dirname(os.path.abspath(file_path))
+        )
+    digest = hashlib.sha256()
+    try:
+        with io.open(file_descriptor, mode='wb') as file:
+            for chunk in response.iter_content(chunk_size):
+                file.write(chunk)
+                digest.update(chunk)
+    except Exception:
+        os.remove(temp_path)
+        raise
+    return temp_path, digest.hexdigest()
+
+
+def _write_fetch_state(state_path, state):
+    """Write fetch state to file."""
+    with io.open(state_path, mode='w', encoding='utf-8') as statefile:
+        statefile.write(json.dumps(state, sort_keys=True))
+
+
+def fetch_to_file(url, file_path, session=None, **kwargs):
+    """Download URL to file, leaving the file untouched if content is unchanged.
+
+    The response is streamed into a temp file then renamed over the file, so
+    readers never see a partial download. If the server gave an ETag or
+    Last-Modified on the last fetch, a conditional request is made; otherwise
+    (or if the server ignores it) the content digest is compared to the file's.
+    Validators are kept in a small JSON state file beside the file.
+
+    Args:
+        url (str): URL to download.
+        file_path (str): Path of the file to download to.
+        session (requests.Session): Session to download with, for connection reuse
+            & shared cookies. Default is None (a new session is used & closed).
+        **kwargs: Arbitrary keyword arguments. See below.
+
+    Keyword Args:
+        params (dict): Query parameters for the request.
+        headers (dict): Extra headers for the request.
+        timeout (float, tuple): Connect (& read) timeout in seconds. Default is
+            (10, 60).
+        retry_count (int): Number of retries on connection errors, timeouts, &
+            retryable status codes. Default is 3.
+        backoff (float): Seconds to wait before the first retry; doubled for each
+            retry after. Default is 1.
+        chunk_size (int): Size in bytes of chunks to stream. Default is 65536.
+        state_path (str): Path of the fetch state file. Default is the file path
+            with ".fetch.json" appended.
+
+    Returns:
+        bool: True if the file was written, False if the content was unchanged.
+
+    Raises:
+        requests.HTTPError: If the server responds with an error status (after
+            retries).
+    """
+    kwargs.setdefault('timeout', (10, 60))
+    kwargs.setdefault('retry_count', 3)
+    kwargs.setdefault('backoff', 1.0)
+    kwargs.setdefault('chunk_size', 2**16)
+    kwargs.setdefault('state_path', file_path + '.fetch.json')
+    state = _load_fetch_state(kwargs['state_path'])
+    file_exists = os.path.exists(file_path)
+    headers = dict(kwargs.get('headers') or {})
+    if file_exists and state.get('url') == url:
+        if state.get('etag'):
+            headers['If-None-Match'] = state['etag']
+        if state.get('last_modified'):
+            headers['If-Modified-Since'] = state['last_modified']
+    _session = session if session is not None else requests.Session()
+    try:
+        for attempt in range(kwargs['retry_count'] + 1):
+            is_last_attempt = attempt == kwargs['retry_count']
+            try:
+                response = _session.get(
+                    url, params=kwargs.get('params'), headers=headers,
+                    timeout=kwargs['timeout'], stream=True
+                    )
+                try:
+                    if (response.status_code in RETRY_STATUS_CODES
+                            and not is_last_attempt):
+                        raise requests.HTTPError(
+                            "Retryable status {}.".format(response.status_code),
+                            response=response
+                            )
+                    response.raise_for_status()
+                    if response.status_code == 304:
+                        LOG.info("%s not modified; %s unchanged.", url, file_path)
+                        return False
+
+                    temp_path, digest = _stream_to_temp(
+                        response, file_path, kwargs['chunk_size']
+                        )
+                finally:
+                    response.close()
+                break
+
+            except (requests.ConnectionError, requests.Timeout,
+                    requests.exceptions.ChunkedEncodingError,
+                    requests.HTTPError) as error:
+                retryable = (
+                    not isinstance(error, requests.HTTPError)
+                    or error.response.status_code in RETRY_STATUS_CODES
+                    )
+                if is_last_attempt or not retryable:
+                    raise
+
+                wait = kwargs['backoff'] * 2**attempt
+                LOG.warning("Fetch of %s failed (%s); retrying in %s seconds.",
+                            url, error, wait)
+                time.sleep(wait)
+    finally:
+        if session is None:
+            _session.close()
+    new_state = {
+        'url': url,
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified'),
+        }
+    if file_exists:
+        if digest == _file_digest(file_path):
+            os.remove(temp_path)
+            _write_fetch_state(kwargs['state_path'], new_state)
+            LOG.info("%s content unchanged; %s left as-is.", url, file_path)
+            return False
+
+    replace_file(temp_path, file_path)
+    _write_fetch_state(kwargs['state_path'], new_state)
+    LOG.info("%s downloaded to %s.", url, file_path)
+    return True
+
 
 # TODO: Create send_file_to_remote function (parses URL for protocol).
 
@@ -1,14 +1,23 @@
 """Value-building, -deriving, and -cleaning objects."""
+import functools
 import logging
+import re
 import string
+import sys
 import unicodedata
 
 import dateutil.parser
 
+if sys.version_info.major >= 3:
+    basestring = str
+    unichr = chr
+
 
 __all__ = (
     'clean_whitespace',
     'clean_whitespace_without_clear',
+    'clear_null_string',
+    'compiled_cleaner',
     'concatenate_arguments',
     'datetime_from_string',
     'force_case',
@@ -23,6 +32,88 @@ __all__ = (
 LOG = logging.getLogger(__name__)
 """logging.Logger: Module-level logger."""
 
+NULL_STRINGS = ('', '<NULL>', 'NULL')
+"""tuple: Uppercased, stripped string values that represent a null value."""
+WHITESPACE_RUN = re.compile(
+    '([' + re.escape(string.whitespace) + r'])\1+'
+    )
+"""_sre.SRE_Pattern: Pattern matching a run of one repeated whitespace character."""
+
+
+class _DiacriticTable(dict):
+    """Translation table removing diacritics, filled lazily per character.
+
+    NFKD decomposition of a string is the concatenation of its characters'
+    decompositions, reordered only among combining characters. Since those are
+    the characters removed, translating per-character matches remove_diacritics.
+    """
+
+    def __missing__(self, key):
+        char = unichr(key)
+        result = u''.join(
+            _char for _char in unicodedata.normalize('NFKD', char)
+            if not unicodedata.combining(_char)
+            )
+        if result == char:
+            result = key
+        self[key] = result
+        return result
+
+
+_DIACRITIC_TABLE = _DiacriticTable()
+
+
+def _clean_whitespace(value, clear_empty_string=True):
+    """Return value with whitespace stripped & deduplicated (compiled version).
+
+    Matches clean_whitespace, with one regex pass in place of the replace loops.
+    """
+    if value is not None:
+        value = WHITESPACE_RUN.sub(r'\1', value.strip())
+    if clear_empty_string and not value:
+        value = None
+    return value
+
+
+def _clean_whitespace_without_clear(value):
+    """Return value with whitespace stripped & deduplicated (compiled version)."""
+    return _clean_whitespace(value, clear_empty_string=False)
+
+
+def _force_lowercase(value):
+    """Return value converted to lowercase (compiled version)."""
+    return value.lower() if value else value
+
+
+def _force_title_case(value):
+    """Return value converted to title case (compiled version)."""
+    return value.title() if value else value
+
+
+def _force_uppercase(value):
+    """Return value converted to uppercase (compiled version)."""
+    return value.upper() if value else value
+
+
+def _maptaxlot_separated(maptaxlot, separator='-'):
+    """Return map/taxlot string separated into parts (compiled version)."""
+    if not maptaxlot:
+        return None
+
+    return separator.join((maptaxlot[:2].strip(), maptaxlot[2:4].strip(),
+                           maptaxlot[4:6].strip(), maptaxlot[6:8].strip(),
+                           maptaxlot[-5:].strip()))
+
+
+def _remove_diacritics(value):
+    """Return string with diacritics removed (compiled version)."""
+    if value:
+        try:
+            value.encode('ascii')
+        except UnicodeError:
+            value = value.translate(_DIACRITIC_TABLE)
+    return value
+
 
 def clean_whitespace(value, clear_empty_string=True):
     """Return value with whitespace stripped & deduplicated.
@@ -53,6 +144,80 @@ def clean_whitespace_without_clear(value):
     return clean_whitespace(value, clear_empty_string=False)
 
 
+def clear_null_string(value):
+    """Return NoneType if value is a string representing null, else value.
+
+    Null representations are in NULL_STRINGS (compared stripped & uppercased).
+    """
+    if isinstance(value, basestring) and value.strip().upper() in NULL_STRINGS:
+        value = None
+    return value
+
+
+def compiled_cleaner(*cleaners, **kwargs):
+    """Return function applying a chain of value cleaners in one call.
+
+    Cleaners from this module (or functools.partial objects of them) are swapped
+    for compiled versions with identical results: translate tables, precompiled
+    regular expressions, and no intermediate function calls. Results for string
+    values are memoized in a bounded cache, since cleaned fields tend to repeat a
+    small set of values (street names, cities, etc.).
+
+    Args:
+        *cleaners: Cleaner functions (or names of functions in this module), in
+            the order to apply them.
+        **kwargs: Arbitrary keyword arguments. See below.
+
+    Keyword Args:
+        cache_size (int): Maximum number of results to memoize. The cache is
+            cleared when full. Default is 65536; 0 disables memoization.
+
+    Returns:
+        function: Function taking a value & returning the cleaned value.
+    """
+    kwargs.setdefault('cache_size', 65536)
+    chain = []
+    for cleaner in cleaners:
+        if isinstance(cleaner, basestring):
+            cleaner = globals()[cleaner]
+        if isinstance(cleaner, functools.partial):
+            cleaner = functools.partial(
+                _COMPILED_CLEANERS.get(cleaner.func, cleaner.func),
+                *cleaner.args, **(cleaner.keywords or {})
+                )
+        else:
+            cleaner = _COMPILED_CLEANERS.get(cleaner, cleaner)
+        chain.append(cleaner)
+    chain = tuple(chain)
+
+    def clean(value):
+        """Return value cleaned by the chain of cleaners."""
+        for cleaner in chain:
+            value = cleaner(value)
+        return value
+
+    if not kwargs['cache_size']:
+        return clean
+
+    cache = {}
+
+    def cached_clean(value):
+        """Return value cleaned by the chain of cleaners, memoized for strings."""
+        if not isinstance(value, basestring):
+            return clean(value)
+
+        try:
+            return cache[value]
+
+        except KeyError:
+            if len(cache) >= kwargs['cache_size']:
+                cache.clear()
+            result = cache[value] = clean(value)
+            return result
+
+    return cached_clean
+
+
 def concatenate_arguments(*args, **kwargs):
     """Return concatenated string from ordered arguments with separation.
 
@@ -144,3 +309,15 @@ def remove_diacritics(value):
         value = u''.join(char for char in unicodedata.normalize('NFKD', value)
                          if not unicodedata.combining(char))
     return value
+
+
+_COMPILED_CLEANERS = {
+    clean_whitespace: _clean_whitespace,
+    clean_whitespace_without_clear: _clean_whitespace_without_clear,
+    force_lowercase: _force_lowercase,
+    force_title_case: _force_title_case,
+    force_uppercase: _force_uppercase,
+    maptaxlot_separated: _maptaxlot_separated,
+    remove_diacritics: _remove_diacritics,
+    }
+"""dict: Mapping of cleaner function to its compiled equivalent."""
@@ -0,0 +1,184 @@
+"""Tests for etlassist.cache lookup caching."""
+import os
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from .context import etlassist
+from etlassist import cache
+
+
+class FakeSource(object):
+    """Change-token source whose change date advances on demand."""
+
+    def __init__(self):
+        self.change_date = 1
+        self.check_count = 0
+        self.fail = False
+
+    def __call__(self):
+        self.check_count += 1
+        if self.fail:
+            raise IOError("Source unavailable.")
+
+        return self.change_date
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    _clock = FakeClock()
+    monkeypatch.setattr(cache.time, "time", _clock)
+    return _clock
+
+
+def counting_lookup(calls, **kwargs):
+    """Return cached lookup function that records its calls."""
+
+    @cache.cached_lookup(**kwargs)
+    def lookup(prefix, include=None):
+        calls.append((prefix, include))
+        return {prefix + str(i): i for i in range(3)}
+
+    return lookup
+
+
+def test_cached_until_source_changes():
+    source, calls = FakeSource(), []
+    lookup = counting_lookup(calls, sources=[source])
+    first = lookup("a")
+    assert lookup("a") is first
+    assert len(calls) == 1
+    source.change_date = 2
+    assert lookup("a") == first
+    assert lookup("a") is not first
+    assert len(calls) == 2
+    assert source.check_count == 4
+
+
+def test_cached_per_arguments():
+    calls = []
+    lookup = counting_lookup(calls)
+    lookup("a", include=["x", "y"])
+    lookup("a", include=["x", "y"])
+    lookup("a", include=["y", "x"])
+    lookup("b")
+    lookup("a")
+    assert calls == [("a", ["x", "y"]), ("a", ["y", "x"]), ("b", None), ("a", None)]
+
+
+def test_ttl_expires(clock):
+    calls = []
+    lookup = counting_lookup(calls, ttl=60)
+    lookup("a")
+    clock.now += 59
+    lookup("a")
+    assert len(calls) == 1
+    clock.now += 2
+    lookup("a")
+    assert len(calls) == 2
+
+
+def test_source_failure_runs_uncached():
+    source, calls = FakeSource(), []
+    lookup = counting_lookup(calls, sources=[source])
+    lookup("a")
+    source.fail = True
+    lookup("a")
+    lookup("a")
+    assert len(calls) == 3
+    source.fail = False
+    lookup("a")
+    assert len(calls) == 3
+
+
+def test_generator_function_results():
+    source, calls = FakeSource(), []
+
+    @cache.cached_lookup(sources=[source])
+    def owners():
+        calls.append(1)
+        for owner_id in [3, 1, 2]:
+            yield owner_id
+
+    assert list(owners()) == [3, 1, 2]
+    assert sorted(owners()) == [1, 2, 3]
+    assert len(calls) == 1
+    source.change_date = 5
+    assert list(owners()) == [3, 1, 2]
+    assert len(calls) == 2
+
+
+def test_persisted_between_runs(tmpdir):
+    persist_path = str(tmpdir.join("lookup.pickle"))
+    source = FakeSource()
+    calls = []
+    lookup = counting_lookup(calls, sources=[source], persist_path=persist_path)
+    assert lookup("a") == {"a0": 0, "a1": 1, "a2": 2}
+    assert os.path.exists(persist_path)
+    # A new run (new decorated function) loads the persisted result.
+    next_calls = []
+    next_lookup = counting_lookup(next_calls, sources=[source], persist_path=persist_path)
+    assert next_lookup("a") == {"a0": 0, "a1": 1, "a2": 2}
+    assert next_calls == []
+    # Source change since the last run invalidates the persisted result.
+    source.change_date = 2
+    final_calls = []
+    final_lookup = counting_lookup(
+        final_calls, sources=[source], persist_path=persist_path
+    )
+    final_lookup("a")
+    assert len(final_calls) == 1
+    final_lookup.cache_clear()
+    assert not os.path.exists(persist_path)
+    assert os.listdir(str(tmpdir)) == []
+
+
+def test_corrupt_persisted_file(tmpdir):
+    persist_path = tmpdir.join("lookup.pickle")
+    persist_path.write("not a pickle")
+    calls = []
+    lookup = counting_lookup(calls, persist_path=str(persist_path))
+    lookup("a")
+    lookup("a")
+    assert len(calls) == 1
+
+
+def test_file_change_source(tmpdir):
+    gdb = tmpdir.mkdir("Data.gdb")
+    table = gdb.join("a00000001.gdbtable")
+    table.write("data")
+    os.utime(str(gdb), (100, 100))
+    os.utime(str(table), (100, 100))
+    token = cache.file_change_source(str(gdb))
+    assert token() == 100
+    os.utime(str(table), (200, 200))
+    assert token() == 200
+    assert cache.file_change_source(str(table))() == 200
+
+
+def test_sql_change_source(tmpdir):
+    engine = create_engine("sqlite:///" + str(tmpdir.join("source.sqlite")))
+    with engine.begin() as conn:
+        conn.exec_driver_sql("create table currency (load_date text);")
+        conn.exec_driver_sql("insert into currency values ('2020-01-01');")
+
+    class FakeDatabase(object):
+        def create_session(self):
+            return sessionmaker(bind=engine)()
+
+    token = cache.sql_change_source(
+        FakeDatabase(), "select max(load_date), count(*) from currency;"
+    )
+    assert token() == ("2020-01-01", 1)
+    with engine.begin() as conn:
+        conn.exec_driver_sql("insert into currency values ('2020-02-01');")
+    assert token() == ("2020-02-01", 2)
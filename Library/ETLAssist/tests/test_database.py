@@ -0,0 +1,405 @@
+"""Tests for etlassist.database connection pooling, retries, upserts, & bulk loads."""
+import sqlite3
+import threading
+
+import pytest
+from sqlalchemy import Column, Integer, String, create_engine, event, text
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import sessionmaker
+
+from .context import etlassist
+from etlassist import database
+
+
+Base = declarative_base()
+
+
+class Usage(Base):
+    """ORM model for bulk load tests."""
+
+    __tablename__ = "usage"
+    usage_id = Column(Integer, primary_key=True)
+    feature = Column(String(32), primary_key=True)
+    user_count = Column(Integer)
+    host = Column(String(32))
+
+
+class FlakyDatabase(object):
+    """SQLite DB-API stand-in that injects transient failures.
+
+    Attributes:
+        path (str): Path to the SQLite database file.
+        connect_failures (int): Count of upcoming connects that will fail.
+        execute_failures (int): Count of upcoming executes that will fail.
+        connect_count (int): Count of successful connects.
+        open_count (int): Count of connections currently open.
+        max_open_count (int): Greatest count of connections open at once.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.connect_failures = 0
+        self.execute_failures = 0
+        self.connect_count = 0
+        self.open_count = 0
+        self.max_open_count = 0
+        self.lock = threading.Lock()
+
+    def connect(self):
+        with self.lock:
+            if self.connect_failures:
+                self.connect_failures -= 1
+                raise sqlite3.OperationalError("Injected connect failure.")
+
+            self.connect_count += 1
+            self.open_count += 1
+            self.max_open_count = max(self.max_open_count, self.open_count)
+        return FlakyConnection(self)
+
+    def fail_next(self):
+        """Return True if the next execute should fail (& count it)."""
+        with self.lock:
+            if self.execute_failures:
+                self.execute_failures -= 1
+                return True
+
+        return False
+
+
+class FlakyConnection(object):
+    """Connection wrapper that fails executes as its database dictates."""
+
+    def __init__(self, flaky_database):
+        self.database = flaky_database
+        self.conn = sqlite3.connect(flaky_database.path, check_same_thread=False)
+        self.closed = False
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            with self.database.lock:
+                self.database.open_count -= 1
+        self.conn.close()
+
+    def commit(self):
+        self.conn.commit()
+
+    def cursor(self):
+        return FlakyCursor(self)
+
+    def rollback(self):
+        self.conn.rollback()
+
+
+class FlakyCursor(object):
+    """Cursor wrapper that fails executes as its database dictates."""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.cursor = connection.conn.cursor()
+
+    def __getattr__(self, name):
+        return getattr(self.cursor, name)
+
+    def _check(self):
+        if self.connection.database.fail_next():
+            raise sqlite3.OperationalError("Injected communication link failure.")
+
+    def execute(self, *args):
+        self._check()
+        return self.cursor.execute(*args)
+
+    def executemany(self, *args):
+        self._check()
+        return self.cursor.executemany(*args)
+
+
+@pytest.fixture
+def flaky(tmpdir):
+    flaky_database = FlakyDatabase(str(tmpdir.join("test.sqlite")))
+    conn = sqlite3.connect(flaky_database.path)
+    conn.execute("create table item (id integer primary key, name text, size int);")
+    conn.executemany(
+        "insert into item values (?, ?, ?);", [(1, "one", 10), (2, "two", 20)]
+    )
+    conn.commit()
+    conn.close()
+    return flaky_database
+
+
+@pytest.fixture
+def waits(monkeypatch):
+    _waits = []
+    monkeypatch.setattr(database.time, "sleep", _waits.append)
+    return _waits
+
+
+def make_pool(flaky, **kwargs):
+    kwargs.setdefault("retry_exceptions", [sqlite3.OperationalError])
+    kwargs.setdefault("retry_wait", 1)
+    return database.ConnectionPool(flaky.connect, **kwargs)
+
+
+def test_pool_reuses_connections(flaky, waits):
+    with make_pool(flaky) as pool:
+        for _ in range(50):
+            assert pool.query("select count(*) from item;") == [(2,)]
+    assert flaky.connect_count == 1
+    assert flaky.open_count == 0
+    assert waits == []
+
+
+def test_query_result_types(flaky):
+    with make_pool(flaky) as pool:
+        rows = pool.query(
+            "select id, name from item where id in (?, ?) order by id;",
+            parameters=[1, 2],
+            result_type=dict,
+        )
+        assert rows == [{"id": 1, "name": "one"}, {"id": 2, "name": "two"}]
+        assert pool.query("select id from item order by id;", result_type=list) == [
+            [1],
+            [2],
+        ]
+
+
+def test_retry_backs_off_exponentially(flaky, waits):
+    flaky.execute_failures = 3
+    with make_pool(flaky, retry_count=4, retry_wait=2, retry_wait_max=5) as pool:
+        assert pool.query("select name from item where id = ?;", [2]) == [("two",)]
+    assert waits == [2, 4, 5]
+    # Failed connections are discarded, not returned to the pool.
+    assert flaky.connect_count == 4
+    assert flaky.open_count == 0
+
+
+def test_retry_connect_failure(flaky, waits):
+    flaky.connect_failures = 2
+    with make_pool(flaky) as pool:
+        assert pool.execute("update item set size = 0;") == 2
+    assert len(waits) == 2
+
+
+def test_retry_exhausted(flaky, waits):
+    flaky.execute_failures = 10
+    pool = make_pool(flaky, retry_count=3)
+    with pytest.raises(sqlite3.OperationalError):
+        pool.query("select * from item;")
+    assert len(waits) == 3
+    assert flaky.execute_failures == 6
+    assert flaky.open_count == 0
+
+
+def test_no_retry_for_other_errors(flaky, waits):
+    with make_pool(flaky) as pool:
+        with pytest.raises(sqlite3.ProgrammingError):
+            pool.query("select * from item where id = ?;", [1, 2])
+        assert waits == []
+        # Connection survives non-transient errors.
+        assert pool.query("select count(*) from item;") == [(2,)]
+    assert flaky.connect_count == 1
+
+
+def test_retry_predicate(flaky, waits):
+    def is_link_failure(error):
+        return "communication link" in str(error)
+
+    flaky.execute_failures = 2
+    with make_pool(flaky, retry_exceptions=[], retry_predicate=is_link_failure) as pool:
+        assert pool.query("select count(*) from item;") == [(2,)]
+        assert len(waits) == 2
+        # Errors the predicate rejects are not retried.
+        with pytest.raises(sqlite3.ProgrammingError):
+            pool.query("select * from item where id = ?;", [1, 2])
+        assert len(waits) == 2
+
+
+def test_execute_many_retry_applies_chunk_once(flaky, waits):
+    rows = [(i, "name{}".format(i), i) for i in range(3, 103)]
+    with make_pool(flaky) as pool:
+        # First chunk goes through, failure on second chunk rolls back & retries.
+        assert pool.execute_many("insert into item values (?, ?, ?);", rows[:40]) == 40
+        flaky.execute_failures = 1
+        count = pool.execute_many(
+            "insert into item values (?, ?, ?);", rows[40:], chunk_size=25
+        )
+        assert count == 60
+        assert pool.query("select count(*) from item;") == [(102,)]
+    assert len(waits) == 1
+
+
+def test_upsert(flaky, waits):
+    rows = [(2, "TWO", 22), (3, "three", 30), (4, "four", 40)]
+    with make_pool(flaky) as pool:
+        flaky.execute_failures = 1
+        assert pool.upsert("item", ["id", "name", "size"], rows, ["id"]) == 3
+        assert pool.query("select * from item order by id;") == [
+            (1, "one", 10),
+            (2, "TWO", 22),
+            (3, "three", 30),
+            (4, "four", 40),
+        ]
+        # Key-only upsert inserts missing rows & leaves existing ones alone.
+        assert pool.upsert("item", ["id"], [(1,), (5,)], ["id"]) == 2
+        assert pool.query("select id, name from item where id in (1, 5);") == [
+            (1, "one"),
+            (5, None),
+        ]
+    assert len(waits) == 1
+
+
+def test_upsert_large_batch(flaky):
+    rows = [(i, "name{}".format(i), i % 7) for i in range(1, 10001)]
+    with make_pool(flaky) as pool:
+        assert pool.upsert("item", ["id", "name", "size"], rows, ["id"]) == 10000
+        assert pool.query("select count(*), sum(size) from item;") == [
+            (10000, sum(row[2] for row in rows))
+        ]
+
+
+def test_pool_size_bounds_open_connections(flaky):
+    pool = make_pool(flaky, size=3)
+
+    def work():
+        for _ in range(20):
+            pool.query("select count(*) from item;")
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    pool.close()
+    assert flaky.max_open_count <= 3
+    assert flaky.open_count == 0
+
+
+@pytest.fixture
+def engine(tmpdir):
+    """Return engine for a SQLite database with the usage table, counting executes."""
+    _engine = create_engine("sqlite:///" + str(tmpdir.join("usage.sqlite")))
+    Base.metadata.create_all(_engine)
+    _engine.execute_counts = {"single": 0, "many": 0}
+
+    @event.listens_for(_engine, "before_cursor_execute")
+    def count(conn, cursor, statement, parameters, context, executemany):
+        _engine.execute_counts["many" if executemany else "single"] += 1
+
+    return _engine
+
+
+def usage_rows(count, start=0, host="host"):
+    return [
+        {
+            "usage_id": i,
+            "feature": "ARC/INFO" if i % 2 else "Viewer",
+            "user_count": i % 13,
+            "host": host,
+        }
+        for i in range(start, start + count)
+    ]
+
+
+def table_rows(engine):
+    with engine.connect() as conn:
+        return conn.execute(
+            text(
+                "select usage_id, feature, user_count, host from usage"
+                " order by usage_id, feature;"
+            )
+        ).fetchall()
+
+
+def test_bulk_insert_session(engine):
+    rows = usage_rows(100000)
+    session = sessionmaker(bind=engine)()
+    assert database.bulk_insert(session, Usage, iter(rows), chunk_size=25000) == 100000
+    # Caller owns the transaction.
+    session.rollback()
+    assert table_rows(engine) == []
+    assert database.bulk_insert(session, Usage, iter(rows), chunk_size=25000) == 100000
+    session.commit()
+    session.close()
+    assert engine.execute_counts["many"] == 8
+    assert table_rows(engine) == [
+        (row["usage_id"], row["feature"], row["user_count"], row["host"])
+        for row in rows
+    ]
+
+
+def test_bulk_insert_engine_commits_chunks(engine):
+    rows = usage_rows(10)
+    rows[7]["usage_id"] = 0
+    rows[7]["feature"] = "Viewer"
+    with pytest.raises(Exception):
+        database.bulk_insert(engine, Usage.__table__, rows, chunk_size=5)
+    # First chunk committed, failed chunk rolled back.
+    assert [row[0] for row in table_rows(engine)] == [0, 1, 2, 3, 4]
+    assert database.bulk_insert(engine, Usage, []) == 0
+
+
+def test_bulk_insert_fast_executemany_scoped(engine, monkeypatch):
+    monkeypatch.setattr(engine.dialect, "driver", "pyodbc")
+    listener = ("before_cursor_execute", database._fast_executemany)
+    attached = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def check(conn, cursor, statement, parameters, context, executemany):
+        if executemany:
+            attached.append(event.contains(engine, *listener))
+
+    session = sessionmaker(bind=engine)()
+    database.bulk_insert(session, Usage, usage_rows(10))
+    session.commit()
+    session.close()
+    with engine.begin() as conn:
+        database.bulk_insert(conn, Usage, usage_rows(10, start=10))
+    assert attached == [True, True]
+    assert not event.contains(engine, *listener)
+    # Later executemany calls outside the bulk helpers keep the driver default.
+    with engine.begin() as conn:
+        conn.execute(Usage.__table__.insert(), usage_rows(2, start=20))
+    assert attached == [True, True, False]
+    assert len(table_rows(engine)) == 22
+
+
+def test_bulk_upsert(engine):
+    database.bulk_insert(engine, Usage, usage_rows(60000))
+    rows = usage_rows(100000, start=20000, host="new")
+    session = sessionmaker(bind=engine)()
+    count = database.bulk_upsert(session, Usage, rows, chunk_size=5000)
+    session.commit()
+    session.close()
+    assert count == {"inserted": 60000, "updated": 40000}
+    result = table_rows(engine)
+    assert len(result) == 120000
+    assert sum(1 for row in result if row[3] == "new") == 100000
+    # Composite key matched in full, not only on the first key column.
+    rows = [{"usage_id": 1, "feature": "Viewer", "user_count": 99, "host": "x"}]
+    assert database.bulk_upsert(engine, Usage, rows) == {"inserted": 1, "updated": 0}
+    rows[0]["user_count"] = 100
+    assert database.bulk_upsert(engine, Usage, rows) == {"inserted": 0, "updated": 1}
+    with engine.connect() as conn:
+        assert conn.execute(
+            text(
+                "select feature, user_count from usage where usage_id = 1"
+                " order by feature;"
+            )
+        ).fetchall() == [("ARC/INFO", 1), ("Viewer", 100)]
+
+
+def test_bulk_upsert_custom_key(engine):
+    database.bulk_insert(engine, Usage, usage_rows(4))
+    rows = [
+        {"usage_id": 2, "feature": "Viewer", "host": "moved"},
+        {"usage_id": 9, "feature": "Viewer", "host": "added"},
+    ]
+    count = database.bulk_upsert(engine, Usage, rows, key_names=["usage_id"])
+    assert count == {"inserted": 1, "updated": 1}
+    assert [(row[0], row[3]) for row in table_rows(engine)] == [
+        (0, "host"),
+        (1, "host"),
+        (2, "moved"),
+        (3, "host"),
+        (9, "added"),
+    ]
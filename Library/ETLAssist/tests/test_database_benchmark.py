@@ -0,0 +1,48 @@
+"""Benchmarks for etlassist.database bulk loads against the ORM unit of work.
+
+Run with pytest-benchmark installed; skipped otherwise.
+"""
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from .context import etlassist
+from etlassist import database
+from .test_database import Base, Usage, usage_rows
+
+pytest.importorskip("pytest_benchmark")
+
+
+ROWS = usage_rows(100000)
+
+
+def load(tmpdir, function):
+    """Load rows into a new SQLite database with function, return row count."""
+    engine = create_engine("sqlite:///" + str(tmpdir.join("usage.sqlite")))
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    function(session)
+    session.commit()
+    count = session.query(Usage).count()
+    session.close()
+    engine.dispose()
+    return count
+
+
+def orm_add_all(session):
+    session.add_all(Usage(**row) for row in ROWS)
+
+
+def bulk_insert(session):
+    database.bulk_insert(session, Usage, ROWS)
+
+
+def test_orm_add_all(benchmark, tmpdir):
+    count = benchmark.pedantic(load, args=(tmpdir, orm_add_all), rounds=3)
+    assert count == len(ROWS)
+
+
+def test_bulk_insert(benchmark, tmpdir):
+    count = benchmark.pedantic(load, args=(tmpdir, bulk_insert), rounds=3)
+    assert count == len(ROWS)
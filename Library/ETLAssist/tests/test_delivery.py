@@ -0,0 +1,131 @@
+"""Tests for etlassist.delivery packaging."""
+from collections import Counter
+import hashlib
+import io
+import os
+import time
+import zipfile
+
+import pytest
+
+from .context import etlassist
+from etlassist import delivery
+
+
+def fake_shapefile_export(output_path, rows, delay=0.0, fail=False):
+    """Write fake shapefile parts (& a lock file), like a real export would."""
+    time.sleep(delay)
+    if fail:
+        raise ValueError("Source dataset missing.")
+
+    stem = os.path.splitext(output_path)[0]
+    for extension in [".shp", ".shx", ".dbf", ".prj"]:
+        with io.open(stem + extension, mode="wb") as file:
+            file.write("{}{}".format(os.path.basename(stem), extension).encode() * rows)
+    io.open(output_path + ".host.1234.lock", mode="wb").close()
+    return Counter(inserted=rows)
+
+
+def fake_table_export(output_path, rows):
+    """Write fake table row file inside a container directory."""
+    with io.open(output_path, mode="wb") as file:
+        file.write(b"row\n" * rows)
+    return rows
+
+
+@pytest.fixture
+def deliverables(tmpdir):
+    return tmpdir.mkdir("Deliverables")
+
+
+def test_package_deliverables(deliverables, tmpdir):
+    exports = {
+        "AddressPts": {
+            "output_path": str(deliverables.join("AddressPts.shp")),
+            "rows": 3,
+            "delay": 1.5,
+        },
+        "Centerlines": {"output_path": str(deliverables.join("Centerlines.shp")), "rows": 2},
+        "CityLimits": {"output_path": str(deliverables.join("CityLimits.shp")), "rows": 1},
+    }
+    # Stale file from an earlier delivery is not packaged.
+    deliverables.join("Old.shp").write("old")
+    archive_path = str(tmpdir.join("LCSO_CAD.zip"))
+    manifest = delivery.package_deliverables(
+        exports, archive_path, exporter=fake_shapefile_export, worker_count=3
+    )
+    # Slow export finished last, so was archived last (rest streamed in before it).
+    assert [entry["name"] for entry in manifest][-1] == "AddressPts"
+    assert {entry["name"]: entry["row_count"] for entry in manifest} == {
+        "AddressPts": 3,
+        "Centerlines": 2,
+        "CityLimits": 1,
+    }
+    with zipfile.ZipFile(archive_path) as archive:
+        names = sorted(archive.namelist())
+        assert names == sorted(
+            "{}.{}".format(stem, extension)
+            for stem in ["AddressPts", "Centerlines", "CityLimits"]
+            for extension in ["dbf", "prj", "shp", "shx"]
+        )
+        for entry in manifest:
+            for file_entry in entry["files"]:
+                content = archive.read(file_entry["name"])
+                assert file_entry["size"] == len(content)
+                assert file_entry["sha256"] == hashlib.sha256(content).hexdigest()
+    assert sorted(os.listdir(str(tmpdir))) == ["Deliverables", "LCSO_CAD.zip"]
+
+
+def test_package_deliverables_trailing_container(deliverables, tmpdir):
+    gdb = deliverables.mkdir("Tillamook.gdb")
+    exports = {
+        name: {"output_path": str(gdb.join(name)), "rows": rows}
+        for name, rows in [("EMS", 4), ("Fire", 5)]
+    }
+    gdb.join("timestamps").write("x")
+    gdb.join("_gdb.host.lock").write("x")
+    archive_path = str(tmpdir.join("Tillamook.zip"))
+    manifest = delivery.package_deliverables(
+        exports,
+        archive_path,
+        exporter=fake_table_export,
+        trailing_paths=[str(gdb)],
+    )
+    assert manifest[-1] == {
+        "name": "Tillamook.gdb",
+        "row_count": None,
+        "files": [
+            {
+                "name": "Tillamook.gdb/timestamps",
+                "size": 1,
+                "sha256": hashlib.sha256(b"x").hexdigest(),
+            }
+        ],
+    }
+    with zipfile.ZipFile(archive_path) as archive:
+        assert sorted(archive.namelist()) == [
+            "Tillamook.gdb/EMS",
+            "Tillamook.gdb/Fire",
+            "Tillamook.gdb/timestamps",
+        ]
+    # Exports are files themselves here, so are streamed in as they finish too.
+    assert sorted(
+        (entry["row_count"], entry["files"][0]["name"]) for entry in manifest[:2]
+    ) == [(4, "Tillamook.gdb/EMS"), (5, "Tillamook.gdb/Fire")]
+    html = delivery.manifest_html(manifest)
+    assert "<td>Tillamook.gdb/timestamps</td>" in html
+
+
+def test_package_deliverables_failure(deliverables, tmpdir):
+    exports = {
+        "Good": {"output_path": str(deliverables.join("Good.shp")), "rows": 1},
+        "Bad": {"output_path": str(deliverables.join("Bad.shp")), "rows": 1, "fail": True},
+    }
+    archive_path = str(tmpdir.join("delivery.zip"))
+    with pytest.raises(RuntimeError) as error:
+        delivery.package_deliverables(
+            exports, archive_path, exporter=fake_shapefile_export
+        )
+    assert "Bad" in str(error.value)
+    # No archive (or temp archive) left behind.
+    assert os.listdir(str(tmpdir)) == ["Deliverables"]
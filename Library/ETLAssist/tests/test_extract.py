@@ -0,0 +1,169 @@
+"""Tests for etlassist.extract query exports."""
+import csv
+import io
+import os
+import sqlite3
+import threading
+
+import pytest
+
+from .context import etlassist
+from etlassist import database
+from etlassist import extract
+
+
+@pytest.fixture
+def source(tmpdir):
+    """Return path of a SQLite source database with two tables."""
+    path = str(tmpdir.join("source.sqlite"))
+    conn = sqlite3.connect(path)
+    conn.execute("create table lot (id integer primary key, owner text, value real);")
+    conn.executemany(
+        "insert into lot values (?, ?, ?);",
+        [(i, "owner|{}".format(i) if i % 3 else None, i * 1.5) for i in range(1, 12001)],
+    )
+    conn.execute("create table code (code text, description text);")
+    conn.executemany(
+        "insert into code values (?, ?);",
+        [("A", 'Quoted "value"'), ("B", "Café, ñ"), ("C", "Line\nbreak")],
+    )
+    conn.commit()
+    conn.close()
+    return path
+
+
+def make_pool(path, **kwargs):
+    return database.ConnectionPool(
+        lambda: sqlite3.connect(path, check_same_thread=False),
+        retry_exceptions=[sqlite3.OperationalError],
+        retry_wait=0,
+        **kwargs
+    )
+
+
+def read_rows(file_path, **kwargs):
+    with io.open(file_path, encoding="utf-8", newline="") as csvfile:
+        return list(csv.reader(csvfile, **kwargs))
+
+
+def test_query_to_csvfile(source, tmpdir):
+    file_path = str(tmpdir.join("code.txt"))
+    with make_pool(source) as pool:
+        count = extract.query_to_csvfile(
+            pool,
+            "select code, description from code order by code;",
+            file_path,
+            delimiter="|",
+            include_header=True,
+        )
+    assert count == 3
+    assert read_rows(file_path, delimiter="|") == [
+        ["code", "description"],
+        ["A", 'Quoted "value"'],
+        ["B", "Café, ñ"],
+        ["C", "Line\nbreak"],
+    ]
+    assert sorted(os.listdir(str(tmpdir))) == ["code.txt", "source.sqlite"]
+
+
+def test_query_to_csvfile_batches_and_quoting(source, tmpdir):
+    file_path = str(tmpdir.join("lot.txt"))
+    with make_pool(source) as pool:
+        count = extract.query_to_csvfile(
+            pool,
+            "select id, owner, value from lot where id > ? order by id;",
+            file_path,
+            parameters=[100],
+            fetch_size=7,
+            delimiter="|",
+            quoting=csv.QUOTE_NONNUMERIC,
+        )
+    assert count == 11900
+    with io.open(file_path, encoding="utf-8", newline="") as csvfile:
+        lines = csvfile.read().split("\r\n")
+    assert lines[:3] == ['101|"owner|101"|151.5', '102|""|153.0', '103|"owner|103"|154.5']
+    assert lines[-1] == ""
+
+
+def test_failed_query_keeps_existing_file(source, tmpdir):
+    file_path = str(tmpdir.join("lot.txt"))
+    tmpdir.join("lot.txt").write("previous")
+    with make_pool(source) as pool:
+        with pytest.raises(sqlite3.OperationalError):
+            extract.query_to_csvfile(pool, "select * from missing;", file_path)
+    assert tmpdir.join("lot.txt").read() == "previous"
+    assert sorted(os.listdir(str(tmpdir))) == ["lot.txt", "source.sqlite"]
+
+
+def test_retry_starts_file_over(source, tmpdir, monkeypatch):
+    """Failure partway through a fetch restarts the export from the first row."""
+    file_path = str(tmpdir.join("lot.txt"))
+    failures = [1]
+
+    class FlakyCursor(object):
+        def __init__(self, cursor):
+            self.cursor = cursor
+            self.fetch_count = 0
+
+        def __getattr__(self, name):
+            return getattr(self.cursor, name)
+
+        def fetchmany(self, size):
+            self.fetch_count += 1
+            if failures and self.fetch_count == 3:
+                failures.pop()
+                raise sqlite3.OperationalError("Injected link failure.")
+
+            return self.cursor.fetchmany(size)
+
+    class FlakyConnection(object):
+        def __init__(self):
+            self.conn = sqlite3.connect(source, check_same_thread=False)
+
+        def __getattr__(self, name):
+            return getattr(self.conn, name)
+
+        def cursor(self):
+            return FlakyCursor(self.conn.cursor())
+
+    monkeypatch.setattr(database.time, "sleep", lambda seconds: None)
+    pool = database.ConnectionPool(
+        FlakyConnection, retry_exceptions=[sqlite3.OperationalError]
+    )
+    with pool:
+        count = extract.query_to_csvfile(
+            pool, "select id from lot order by id;", file_path, fetch_size=1000
+        )
+    assert not failures
+    assert count == 12000
+    assert [int(row[0]) for row in read_rows(file_path)] == list(range(1, 12001))
+
+
+def test_export_queries_parallel(source, tmpdir):
+    connect_threads = set()
+    lock = threading.Lock()
+
+    def connect():
+        with lock:
+            connect_threads.add(threading.current_thread().name)
+        return sqlite3.connect(source, check_same_thread=False)
+
+    file_queries = {
+        str(tmpdir.join("lot_{}.txt".format(i))): (
+            "select id, owner from lot where id % 4 = {};".format(i)
+        )
+        for i in range(4)
+    }
+    file_queries[str(tmpdir.join("code.txt"))] = "select * from code;"
+    pool = database.ConnectionPool(connect, size=3)
+    with pool:
+        row_counts = extract.export_queries(pool, file_queries, delimiter="|")
+    assert row_counts == {
+        str(tmpdir.join("lot_0.txt")): 3000,
+        str(tmpdir.join("lot_1.txt")): 3000,
+        str(tmpdir.join("lot_2.txt")): 3000,
+        str(tmpdir.join("lot_3.txt")): 3000,
+        str(tmpdir.join("code.txt")): 3,
+    }
+    assert 1 <= len(connect_threads) <= 3
+    assert len(read_rows(str(tmpdir.join("lot_2.txt")), delimiter="|")) == 3000
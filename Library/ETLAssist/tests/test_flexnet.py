@@ -0,0 +1,187 @@
+"""Tests for etlassist.flexnet license polling."""
+import datetime
+
+import pytest
+
+from .context import etlassist
+from etlassist import flexnet
+
+
+LMSTAT_ALL = """lmutil - Copyright (c) 1989-2017 Flexera Software LLC. All Rights Reserved.\r
+Flexible License Manager status on Mon 10/19/2020 10:05\r
+\r
+License server status: 27000@gisrv100\r
+    License file(s) on gisrv100: C:\\Program Files (x86)\\ArcGIS\\service.txt:\r
+\r
+  gisrv100: license server UP (MASTER) v11.14.1\r
+\r
+Users of ARC/INFO:  (Total of 5 licenses issued;  Total of 3 licenses in use)\r
+\r
+  "ARC/INFO" v10.1, vendor: ARCGIS, expiry: permanent(no expiration date)\r
+  floating license\r
+\r
+    jdoe PC123 PC123 (v10.1) (gisrv100/27000 201), start Mon 10/19 8:01\r
+    asmith PC77 Alice's PC (v10.1) (gisrv100/27000 305), start Fri 10/16 15:33, 2 licenses\r
+    ACTIVATED LICENSE(S) LAPTOP7 ACTIVATION (v10.1) (gisrv100/27000 1402), start Wed 9/30 7:00\r
+\r
+Users of Viewer:  (Total of 10 licenses issued;  Total of 0 licenses in use)\r
+\r
+Users of 3DAnalyst:  (Total of 2 licenses issued;  Total of 1 license in use)\r
+\r
+  "3DAnalyst" v10.1, vendor: ARCGIS, expiry: permanent(no expiration date)\r
+  floating license\r
+\r
+    bwong GIS4 GIS4 (v10.1) (gisrv100/27000 77), start Mon 10/19 9:45\r
+"""
+
+CHECK_TIME = datetime.datetime(2020, 10, 19, 10, 5, 12)
+
+
+class FakeRunner(object):
+    """Fake lmstat runner returning captured output.
+
+    Attributes:
+        outputs (dict): Mapping of argument tuple (after "-c server") to output, or
+            to an exception to raise.
+        calls (list): Argument lists called with.
+    """
+
+    def __init__(self, outputs):
+        self.outputs = outputs
+        self.calls = []
+
+    def __call__(self, args, timeout):
+        self.calls.append(args)
+        assert args[:4] == ["lmutil", "lmstat", "-c", "@gisrv100"]
+        assert timeout == 30
+        output = self.outputs[tuple(args[4:])]
+        if isinstance(output, Exception):
+            raise output
+
+        return output
+
+
+def feature_output(name):
+    """Return lmstat -f style output for feature, cut from the -a fixture."""
+    start = LMSTAT_ALL.index("Users of {}:".format(name))
+    end = LMSTAT_ALL.find("Users of", start + 1)
+    return LMSTAT_ALL[start:end if end != -1 else None]
+
+
+def make_poller(outputs, **kwargs):
+    runner = FakeRunner(outputs)
+    return (
+        flexnet.LicensePoller(
+            "@gisrv100", "lmutil", runner=runner, timeout=30, **kwargs
+        ),
+        runner,
+    )
+
+
+def test_parse_lmstat():
+    usages = flexnet.parse_lmstat(LMSTAT_ALL, CHECK_TIME)
+    assert [
+        (
+            usage["license_internal_name"],
+            usage["user_handle"],
+            usage["user_host"],
+            usage["checkout_time"],
+            usage["is_borrowed"],
+        )
+        for usage in usages
+    ] == [
+        ("ARC/INFO", "JDOE", "PC123", datetime.datetime(2020, 10, 19, 8, 1), False),
+        ("ARC/INFO", "ASMITH", "PC77", datetime.datetime(2020, 10, 16, 15, 33), False),
+        ("ARC/INFO", None, "LAPTOP7", datetime.datetime(2020, 9, 30, 7, 0), True),
+        ("3DAnalyst", "BWONG", "GIS4", datetime.datetime(2020, 10, 19, 9, 45), False),
+    ]
+    assert all(usage["usage_check_time"] == CHECK_TIME for usage in usages)
+
+
+def test_parse_lmstat_year_rollover():
+    output = (
+        "Users of Viewer:  (Total of 1 license issued)\n"
+        "    jdoe PC1 PC1 (v10.1) (gisrv100/27000 9), start Thu 12/31 23:50\n"
+    )
+    usages = flexnet.parse_lmstat(output, datetime.datetime(2021, 1, 1, 0, 5))
+    assert usages[0]["checkout_time"] == datetime.datetime(2020, 12, 31, 23, 50)
+
+
+def test_poll_single_call():
+    poller, runner = make_poller({("-a",): LMSTAT_ALL})
+    usages = poller.poll(["3DAnalyst", "Viewer"])
+    assert runner.calls == [["lmutil", "lmstat", "-c", "@gisrv100", "-a"]]
+    assert [usage["user_handle"] for usage in usages] == ["BWONG"]
+
+
+def test_poll_per_feature():
+    outputs = {
+        ("-f", name): feature_output(name) for name in ["ARC/INFO", "Viewer", "3DAnalyst"]
+    }
+    poller, runner = make_poller(outputs)
+    usages = poller.poll(["ARC/INFO", "Viewer", "3DAnalyst"], per_feature=True)
+    assert len(runner.calls) == 3
+    assert sorted(usage["user_host"] for usage in usages) == [
+        "GIS4",
+        "LAPTOP7",
+        "PC123",
+        "PC77",
+    ]
+
+
+def test_changes_only_new_checkouts(tmpdir):
+    state_path = str(tmpdir.join("state.json"))
+    poller, _ = make_poller({("-a",): LMSTAT_ALL}, state_path=state_path)
+    assert len(poller.changes()) == 4
+    assert poller.changes() == []
+    poller.save_state()
+    # New process picks up saved state.
+    next_output = LMSTAT_ALL.replace(
+        "    jdoe PC123 PC123 (v10.1) (gisrv100/27000 201), start Mon 10/19 8:01\r\n",
+        "    jdoe PC123 PC123 (v10.1) (gisrv100/27000 210), start Mon 10/19 10:02\r\n",
+    )
+    next_poller, _ = make_poller({("-a",): next_output}, state_path=state_path)
+    changes = next_poller.changes()
+    assert [(usage["user_handle"], usage["checkout_time"].hour) for usage in changes] == [
+        ("JDOE", 10)
+    ]
+    next_poller.save_state()
+    # Released checkout counts as new if checked out again later.
+    final_poller, _ = make_poller({("-a",): LMSTAT_ALL}, state_path=state_path)
+    assert [usage["user_handle"] for usage in final_poller.changes()] == ["JDOE"]
+
+
+def test_changes_keep_state_for_failed_features():
+    outputs = {
+        ("-f", "ARC/INFO"): feature_output("ARC/INFO"),
+        ("-f", "3DAnalyst"): feature_output("3DAnalyst"),
+    }
+    poller, _ = make_poller(outputs)
+    names = ["ARC/INFO", "3DAnalyst"]
+    assert len(poller.changes(names, per_feature=True)) == 4
+    outputs[("-f", "3DAnalyst")] = OSError("lmstat timed out.")
+    outputs[("-f", "ARC/INFO")] = feature_output("Viewer")
+    assert poller.changes(names, per_feature=True) == []
+    outputs[("-f", "3DAnalyst")] = feature_output("3DAnalyst")
+    outputs[("-f", "ARC/INFO")] = feature_output("ARC/INFO")
+    # ARC/INFO checkouts were released in between; 3DAnalyst's were never lost.
+    changes = poller.changes(names, per_feature=True)
+    assert {usage["license_internal_name"] for usage in changes} == {"ARC/INFO"}
+
+
+def test_corrupt_state_file(tmpdir):
+    state_path = tmpdir.join("state.json")
+    state_path.write("{not json")
+    poller, _ = make_poller({("-a",): LMSTAT_ALL}, state_path=str(state_path))
+    assert len(poller.changes()) == 4
+
+
+def test_changes_state_saved_only_on_request(tmpdir):
+    state_path = str(tmpdir.join("state.json"))
+    poller, _ = make_poller({("-a",): LMSTAT_ALL}, state_path=state_path)
+    assert len(poller.changes()) == 4
+    # Load failed before state saved: next process sees the checkouts again.
+    next_poller, _ = make_poller({("-a",): LMSTAT_ALL}, state_path=state_path)
+    assert len(next_poller.changes()) == 4
+    with pytest.raises(ValueError):
+        make_poller({("-a",): LMSTAT_ALL})[0].save_state()
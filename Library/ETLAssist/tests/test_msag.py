@@ -0,0 +1,187 @@
+"""Tests for etlassist.msag range index."""
+import random
+
+import pytest
+
+from .context import etlassist
+from etlassist import msag
+
+
+STREETS = [
+    (None, "MAIN", "ST", None),
+    ("N", "MAIN", "ST", None),
+    (None, "OCEAN VIEW", "DR", None),
+    (None, "3RD", "ST", "E"),
+]
+COMMUNITIES = ["TILLAMOOK", "BAY CITY", "MANZANITA"]
+RANGE_KEYS = ["predir", "name", "type", "sufdir", "postcomm", "esn"]
+
+
+def address_matches_range(address, msag_range):
+    """Range-key predicate, as in the Tillamook MSAG ETL."""
+    return all(address[key] == msag_range[key] for key in RANGE_KEYS)
+
+
+def random_addresses(seed, count=3000):
+    rand = random.Random(seed)
+    addresses = []
+    for _ in range(count):
+        predir, name, type_, sufdir = rand.choice(STREETS)
+        number = rand.randint(1, 5000)
+        addresses.append(
+            {
+                "predir": predir,
+                "name": name,
+                "type": type_,
+                "sufdir": sufdir,
+                "postcomm": rand.choice(COMMUNITIES),
+                "stnum": number,
+                # ESN changes along the street, with some straddling.
+                "esn": 100 + number // 700 + rand.choice([0, 0, 0, 0, 1]),
+            }
+        )
+    return addresses
+
+
+def msag_ranges(addresses):
+    """Generate ranges from addresses, grouped as the MSAG ETLs do."""
+    sort_keys = ["predir", "name", "type", "sufdir", "postcomm", "stnum", "esn"]
+    rows = sorted(
+        addresses, key=lambda a: tuple((a[key] is not None, a[key]) for key in sort_keys)
+    )
+    current = None
+    for address in rows:
+        if current and address_matches_range(address, current):
+            current["numbers"].append(address["stnum"])
+            continue
+
+        if current:
+            yield finish(current)
+
+        current = dict(address, numbers=[address["stnum"]])
+    if current:
+        yield finish(current)
+
+
+def finish(current):
+    parities = {number % 2 for number in current["numbers"]}
+    parity = {(0,): "even", (1,): "odd"}.get(tuple(parities), "mixed")
+    return {
+        "emergency_service_number": current["esn"],
+        "parity": parity,
+        "parity_code": parity[0].upper(),
+        "from_structure_number": min(current["numbers"]),
+        "to_structure_number": max(current["numbers"]),
+        "prefix_direction_code": current["predir"],
+        "street_name": current["name"],
+        "street_type_code": current["type"],
+        "suffix_direction_code": current["sufdir"],
+        "postal_community": current["postcomm"],
+        "points": ["not kept"],
+    }
+
+
+def brute_force(ranges, address):
+    """Return ranges containing address, by linear scan."""
+    found = []
+    for msag_range in ranges:
+        as_address = {
+            "predir": msag_range["prefix_direction_code"],
+            "name": msag_range["street_name"],
+            "type": msag_range["street_type_code"],
+            "sufdir": msag_range["suffix_direction_code"],
+            "postcomm": msag_range["postal_community"],
+            "esn": msag_range["emergency_service_number"],
+        }
+        parity_ok = msag_range["parity_code"] == "M" or (
+            msag_range["parity_code"] == ("E" if address["stnum"] % 2 == 0 else "O")
+        )
+        if (
+            address_matches_range(dict(address, esn=as_address["esn"]), as_address)
+            and parity_ok
+            and msag_range["from_structure_number"]
+            <= address["stnum"]
+            <= msag_range["to_structure_number"]
+        ):
+            found.append(msag_range)
+    return found
+
+
+def comparable(ranges):
+    return sorted(
+        (
+            msag_range["from_structure_number"],
+            msag_range["to_structure_number"],
+            msag_range["emergency_service_number"],
+            msag_range["parity_code"],
+        )
+        for msag_range in ranges
+    )
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_find_matches_brute_force(seed):
+    ranges = list(msag_ranges(random_addresses(seed)))
+    index = msag.RangeIndex.from_ranges(ranges)
+    assert len(index) == len(ranges)
+    queries = random_addresses(seed + 100, count=2000)
+    hits = 0
+    for address in queries:
+        street = [address[key] for key in ["predir", "name", "type", "sufdir"]]
+        found = index.find(address["stnum"], street, address["postcomm"])
+        assert comparable(found) == comparable(brute_force(ranges, address))
+        hits += bool(found)
+    assert hits > 100
+
+
+def test_find_normalizes_keys():
+    index = msag.RangeIndex.from_ranges(msag_ranges(random_addresses(5, count=200)))
+    found = index.find(10, [None, "main", "st ", ""], " tillamook")
+    assert found == index.find(10, msag.street_key("MAIN", "ST"), "TILLAMOOK")
+    assert index.find(10, "NO SUCH RD", "TILLAMOOK") == []
+    assert index.find(None, "MAIN ST", "TILLAMOOK") == []
+    # Only kept fields are in results.
+    assert all("points" not in msag_range for msag_range in found)
+
+
+def test_street_key_non_ascii():
+    assert msag.street_key(None, u"ca\u00f1on ", u"rd") == u"CA\u00d1ON RD"
+    assert msag.street_key(u"ne", 12, "") == u"NE 12"
+
+
+def test_find_overlapping_ranges():
+    ranges = [
+        {
+            "emergency_service_number": esn,
+            "parity_code": "M",
+            "from_structure_number": start,
+            "to_structure_number": end,
+            "street_name": "MAIN",
+            "postal_community": "TILLAMOOK",
+        }
+        for esn, start, end in [(1, 100, 900), (2, 200, 300), (3, 400, 500), (4, 950, 990)]
+    ]
+    index = msag.RangeIndex.from_ranges(ranges)
+    assert [r["emergency_service_number"] for r in index.find(450, "MAIN", "Tillamook")] == [
+        1,
+        3,
+    ]
+    assert [r["emergency_service_number"] for r in index.find(920, "MAIN", "Tillamook")] == []
+    assert [r["emergency_service_number"] for r in index.find(300, "MAIN", "Tillamook")] == [
+        1,
+        2,
+    ]
+
+
+def test_save_load(tmpdir):
+    ranges = list(msag_ranges(random_addresses(7, count=500)))
+    index = msag.RangeIndex.from_ranges(ranges)
+    file_path = str(tmpdir.join("msag_range_index.pickle"))
+    index.save(file_path)
+    loaded = msag.RangeIndex.load(file_path)
+    assert len(loaded) == len(index)
+    for address in random_addresses(8, count=300):
+        street = [address[key] for key in ["predir", "name", "type", "sufdir"]]
+        assert loaded.find(address["stnum"], street, address["postcomm"]) == index.find(
+            address["stnum"], street, address["postcomm"]
+        )
@@ -0,0 +1,129 @@
+"""Tests for etlassist.process command runs."""
+import io
+import os
+import sys
+import time
+
+import pytest
+
+from .context import etlassist
+from etlassist import process
+
+
+CHATTY = """
+import sys
+for i in range(20000):
+    sys.stdout.write("out line {} {}\\n".format(i, "x" * 40))
+    sys.stderr.write("err line {}\\n".format(i))
+sys.exit(int(sys.argv[1]))
+"""
+
+SLEEPER = """
+import subprocess, sys, time
+open(sys.argv[1], "w").close()
+if len(sys.argv) > 2:
+    # Grandchild that would outlive a plain kill of its parent.
+    subprocess.Popen([sys.executable, __file__, sys.argv[2]])
+time.sleep(float(sys.argv[3]) if len(sys.argv) > 3 else 60)
+open(sys.argv[1] + ".done", "w").close()
+"""
+
+
+@pytest.fixture
+def scripts(tmpdir):
+    paths = {}
+    for name, code in [("chatty", CHATTY), ("sleeper", SLEEPER)]:
+        paths[name] = str(tmpdir.join(name + ".py"))
+        with io.open(paths[name], "w") as script:
+            script.write(code)
+    return paths
+
+
+def read_log(result):
+    with io.open(result.log_path, encoding="utf-8") as logfile:
+        return logfile.read()
+
+
+def test_output_to_logs_no_deadlock(scripts, tmpdir):
+    # Log directory is created if missing.
+    logs = tmpdir.join("logs")
+    results = process.run_commands(
+        [
+            ("ok", [sys.executable, scripts["chatty"], "0"]),
+            ("fail", [sys.executable, scripts["chatty"], "3"]),
+        ],
+        log_directory=str(logs),
+        timeout=60,
+    )
+    assert [(result.name, result.return_code, result.timed_out) for result in results] == [
+        ("ok", 0, False),
+        ("fail", 3, False),
+    ]
+    assert sorted(os.listdir(str(logs))) == ["fail.log", "ok.log"]
+    output = read_log(results[0])
+    assert output.count("out line") == 20000
+    assert output.count("err line") == 20000
+
+
+def test_concurrent_with_worker_cap(scripts, tmpdir):
+    commands = {
+        "sleep{}".format(i): [
+            sys.executable,
+            scripts["sleeper"],
+            str(tmpdir.join("started{}".format(i))),
+            "",
+            "0.5",
+        ]
+        for i in range(4)
+    }
+    start_time = time.time()
+    results = process.run_commands(commands, worker_count=2)
+    elapsed = time.time() - start_time
+    assert all(result.return_code == 0 for result in results)
+    # Two at a time: about twice one sleep, well short of four.
+    assert 1.0 <= elapsed < 1.9
+    for result in results:
+        os.remove(result.log_path)
+
+
+def test_timeout_kills_process_tree(scripts, tmpdir):
+    parent_flag = str(tmpdir.join("parent"))
+    child_flag = str(tmpdir.join("child"))
+    start_time = time.time()
+    results = process.run_commands(
+        {"slow": [sys.executable, scripts["sleeper"], parent_flag, child_flag, "3"]},
+        timeout=1.5,
+        log_directory=str(tmpdir),
+    )
+    assert time.time() - start_time < 3
+    assert results[0].timed_out
+    assert results[0].return_code != 0
+    assert "Killed after timeout" in read_log(results[0])
+    assert os.path.exists(parent_flag) and os.path.exists(child_flag)
+    # Neither parent nor grandchild lives to finish its sleep.
+    time.sleep(2.5)
+    assert not os.path.exists(parent_flag + ".done")
+    assert not os.path.exists(child_flag + ".done")
+
+
+def test_check_raises_after_all_finish(scripts, tmpdir):
+    with pytest.raises(RuntimeError) as excinfo:
+        process.run_commands(
+            {
+                "fail": [sys.executable, scripts["chatty"], "2"],
+                "missing": [str(tmpdir.join("no-such-program"))],
+                "ok": [sys.executable, "-c", "print('done')"],
+            },
+            log_directory=str(tmpdir),
+            check=True,
+        )
+    assert "fail (2)" in str(excinfo.value)
+    assert "missing (None)" in str(excinfo.value)
+    assert "ok" not in str(excinfo.value).split(":", 1)[1]
+    assert tmpdir.join("ok.log").read().strip() == "done"
+
+
+def test_duplicate_names():
+    with pytest.raises(ValueError):
+        process.run_commands([("a", ["x"]), ("a", ["y"])])
+    assert process.run_commands([]) == []
@@ -0,0 +1,225 @@
+"""Tests for etlassist.rules rule tables."""
+import random
+
+import pytest
+
+from .context import etlassist
+from etlassist.rules import Rule, RuleTable, column_value
+
+
+def reference_accounts(rows, taxlot_accounts, taxlot_code_accounts):
+    """Return accounts from the row-by-row address account cascade."""
+    accounts = []
+    for addr in rows:
+        addr = dict(addr, maptaxlot_code=(addr["maptaxlot"], addr["tax_code"]))
+        if addr["account"] == "NO ACCT":
+            pass
+
+        elif addr["archived"] == "Y" or addr["valid"] == "N":
+            addr["account"] = "NO ACCT"
+        elif not addr["maptaxlot"]:
+            addr["account"] = None
+        elif int(addr["maptaxlot"][-5:]) < 100:
+            addr["account"] = "ROAD"
+        elif addr["maptaxlot"] not in taxlot_accounts:
+            pass
+
+        elif len(taxlot_accounts[addr["maptaxlot"]]) == 1:
+            addr["account"] = min(taxlot_accounts[addr["maptaxlot"]])
+        elif addr["maptaxlot_code"] not in taxlot_code_accounts:
+            pass
+
+        elif len(taxlot_code_accounts[addr["maptaxlot_code"]]) == 1:
+            addr["account"] = min(taxlot_code_accounts[addr["maptaxlot_code"]])
+        elif addr["account"] and addr["account"] in taxlot_accounts[addr["maptaxlot"]]:
+            pass
+
+        else:
+            addr["account"] = None
+        accounts.append(addr["account"])
+    return accounts
+
+
+def account_rule_table(taxlot_accounts, taxlot_code_accounts):
+    """Return rule table equivalent to the address account cascade."""
+    taxlot_single = {
+        key: min(accounts) if len(accounts) == 1 else None
+        for key, accounts in taxlot_accounts.items()
+    }
+    taxlot_code_single = {
+        key: min(accounts) if len(accounts) == 1 else None
+        for key, accounts in taxlot_code_accounts.items()
+    }
+    preserve = column_value("account")
+    return RuleTable(
+        [
+            Rule(
+                "no-account flag",
+                lambda cols, idx: [cols["account"][i] == "NO ACCT" for i in idx],
+                preserve,
+            ),
+            Rule(
+                "archived or invalid",
+                lambda cols, idx: [
+                    cols["archived"][i] == "Y" or cols["valid"][i] == "N" for i in idx
+                ],
+                "NO ACCT",
+            ),
+            Rule(
+                "missing taxlot",
+                lambda cols, idx: [not cols["maptaxlot"][i] for i in idx],
+                None,
+            ),
+            Rule(
+                "right-of-way",
+                lambda cols, idx: [int(cols["maptaxlot"][i][-5:]) < 100 for i in idx],
+                "ROAD",
+            ),
+            Rule(
+                "taxlot not in A&T",
+                lambda cols, idx: [
+                    cols["maptaxlot"][i] not in taxlot_single for i in idx
+                ],
+                preserve,
+            ),
+            Rule(
+                "single taxlot account",
+                lambda cols, idx: [
+                    taxlot_single[cols["maptaxlot"][i]] is not None for i in idx
+                ],
+                lambda cols, i: taxlot_single[cols["maptaxlot"][i]],
+            ),
+            Rule(
+                "taxlot-code not in A&T",
+                lambda cols, idx: [
+                    cols["maptaxlot_code"][i] not in taxlot_code_single for i in idx
+                ],
+                preserve,
+            ),
+            Rule(
+                "single taxlot-code account",
+                lambda cols, idx: [
+                    taxlot_code_single[cols["maptaxlot_code"][i]] is not None
+                    for i in idx
+                ],
+                lambda cols, i: taxlot_code_single[cols["maptaxlot_code"][i]],
+            ),
+            Rule(
+                "valid current account",
+                lambda cols, idx: [
+                    bool(cols["account"][i])
+                    and cols["account"][i] in taxlot_accounts[cols["maptaxlot"][i]]
+                    for i in idx
+                ],
+                preserve,
+            ),
+        ],
+        default=None,
+    )
+
+
+def random_fixture(row_count, seed):
+    """Return random address rows, taxlot accounts, & taxlot-code accounts."""
+    rand = random.Random(seed)
+    maptaxlots = [
+        "1703{:02d}{:05d}".format(
+            rand.randint(0, 99), rand.choice([rand.randint(0, 99), rand.randint(100, 9999)])
+        )
+        for _ in range(max(row_count // 3, 1))
+    ]
+    codes = ["00100", "00200", "00300", None]
+    taxlot_accounts, taxlot_code_accounts = {}, {}
+    for maptaxlot in maptaxlots:
+        if rand.random() < 0.2:
+            continue
+
+        accounts = {
+            str(rand.randint(1000000, 1999999)) for _ in range(rand.choice([1, 1, 2, 3]))
+        }
+        taxlot_accounts[maptaxlot] = accounts
+        for account in accounts:
+            code = rand.choice(codes)
+            taxlot_code_accounts.setdefault((maptaxlot, code), set()).add(account)
+    rows = []
+    for i in range(row_count):
+        maptaxlot = rand.choice(maptaxlots + [None, ""])
+        known = sorted(taxlot_accounts.get(maptaxlot, {"1000000"}))
+        rows.append(
+            {
+                "geofeat_id": i,
+                "maptaxlot": maptaxlot,
+                "account": rand.choice(known + [None, "NO ACCT", "ROAD", "1999999"]),
+                "valid": rand.choice(["Y", "Y", "Y", "N"]),
+                "archived": rand.choice(["N", "N", "N", "Y"]),
+                "tax_code": rand.choice(codes),
+            }
+        )
+    return rows, taxlot_accounts, taxlot_code_accounts
+
+
+def as_columns(rows):
+    columns = {name: [row[name] for row in rows] for name in rows[0]}
+    columns["maptaxlot_code"] = list(zip(columns["maptaxlot"], columns["tax_code"]))
+    return columns
+
+
+def test_rules_apply_in_order():
+    table = RuleTable(
+        [
+            ("negative", lambda cols, idx: [cols["n"][i] < 0 for i in idx], "neg"),
+            ("even", lambda cols, idx: [cols["n"][i] % 2 == 0 for i in idx], "even"),
+            (
+                "big",
+                lambda cols, idx: [cols["n"][i] > 5 for i in idx],
+                column_value("n"),
+            ),
+        ],
+        default=lambda cols, i: "odd {}".format(cols["n"][i]),
+    )
+    columns = {"n": [-2, 4, 7, 3, -1]}
+    assert table.resolve(columns) == ["neg", "even", 7, "odd 3", "neg"]
+    assert table.rule_counts == {"negative": 2, "even": 1, "big": 1, "default": 1}
+
+
+def test_later_rules_see_only_pending_rows():
+    seen = []
+
+    def condition(cols, idx):
+        seen.extend(idx)
+        return [True] * len(idx)
+
+    table = RuleTable([("first", lambda cols, idx: [i < 2 for i in idx], 1)])
+    table.rules.append(Rule("second", condition, 2))
+    assert table.resolve({"x": [0, 0, 0, 0]}) == [1, 1, 2, 2]
+    assert seen == [2, 3]
+
+
+def test_changes():
+    table = RuleTable([], default=lambda cols, i: cols["name"][i].upper())
+    columns = {"id": [1, 2, 3], "name": ["A", "b", "C"]}
+    assert table.changes(columns, "id", "name") == [(2, "B")]
+
+
+def test_bad_columns_and_masks():
+    table = RuleTable([("short", lambda cols, idx: [True], 1)])
+    with pytest.raises(ValueError):
+        table.resolve({"a": [1, 2], "b": [1]})
+    with pytest.raises(ValueError):
+        table.resolve({"a": [1, 2]})
+    assert table.resolve({}) == []
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_account_rules_match_cascade(seed):
+    rows, taxlot_accounts, taxlot_code_accounts = random_fixture(5000, seed)
+    expected = reference_accounts(rows, taxlot_accounts, taxlot_code_accounts)
+    table = account_rule_table(taxlot_accounts, taxlot_code_accounts)
+    columns = as_columns(rows)
+    assert table.resolve(columns) == expected
+    # Every rule is exercised by the fixture.
+    assert all(table.rule_counts[rule.name] for rule in table.rules)
+    assert table.changes(columns, "geofeat_id", "account") == [
+        (row["geofeat_id"], account)
+        for row, account in zip(rows, expected)
+        if account != row["account"]
+    ]
@@ -0,0 +1,39 @@
+"""Throughput benchmarks for etlassist.rules, against a row-by-row cascade.
+
+Run with pytest-benchmark installed; skipped otherwise.
+"""
+import pytest
+
+from .context import etlassist
+from .test_rules import (
+    account_rule_table,
+    as_columns,
+    random_fixture,
+    reference_accounts,
+)
+
+pytest.importorskip('pytest_benchmark')
+
+
+ROWS, TAXLOT_ACCOUNTS, TAXLOT_CODE_ACCOUNTS = random_fixture(100000, seed=1)
+COLUMNS = as_columns(ROWS)
+
+
+def test_reference_cascade(benchmark):
+    benchmark(reference_accounts, ROWS, TAXLOT_ACCOUNTS, TAXLOT_CODE_ACCOUNTS)
+
+
+def test_rule_table(benchmark):
+    def resolve():
+        table = account_rule_table(TAXLOT_ACCOUNTS, TAXLOT_CODE_ACCOUNTS)
+        return table.resolve(COLUMNS)
+
+    benchmark(resolve)
+
+
+def test_rule_table_changes(benchmark):
+    def changes():
+        table = account_rule_table(TAXLOT_ACCOUNTS, TAXLOT_CODE_ACCOUNTS)
+        return table.changes(COLUMNS, "geofeat_id", "account")
+
+    benchmark(changes)
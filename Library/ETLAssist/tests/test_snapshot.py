@@ -0,0 +1,186 @@
+"""Tests for etlassist.snapshot incremental ingestion."""
+import os
+import sqlite3
+
+import pytest
+
+from .context import etlassist
+from etlassist import snapshot
+
+
+def write_snapshot(path, stations, alerts=()):
+    """Write (or rewrite) snapshot database with station & alert tables."""
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.execute(
+            "create table if not exists station_status"
+            " (station_id text, last_reported integer, num_bikes integer);"
+        )
+        conn.execute("create table if not exists system_alerts (alert_id text, summary text);")
+        conn.execute("delete from station_status;")
+        conn.executemany("insert into station_status values (?, ?, ?);", stations)
+        conn.execute("delete from system_alerts;")
+        conn.executemany("insert into system_alerts values (?, ?);", alerts)
+    conn.close()
+
+
+def touch(path, offset):
+    """Move file modification time, as a snapshot writer would."""
+    stat = os.stat(path)
+    os.utime(path, (stat.st_atime, stat.st_mtime + offset))
+
+
+@pytest.fixture
+def paths(tmpdir):
+    return str(tmpdir.join("feed_2020_10.sqlite3")), str(tmpdir.join("state.sqlite3"))
+
+
+def ingest(tracker, *args):
+    """Return changed rows of snapshot table, committing the ingest."""
+    rows = list(tracker.changed_rows(*args))
+    tracker.commit(*args[:2])
+    return rows
+
+
+def stations(count, reported=100):
+    return [("s{}".format(i), reported + i, i % 5) for i in range(count)]
+
+
+def test_first_ingest_returns_all_rows(paths):
+    snapshot_path, state_path = paths
+    write_snapshot(snapshot_path, stations(1000), [("a1", "Closed")])
+    tracker = snapshot.SnapshotTracker(state_path)
+    rows = ingest(tracker, snapshot_path, "station_status")
+    assert len(rows) == 1000
+    assert rows[0] == {"station_id": "s0", "last_reported": 100, "num_bikes": 0}
+    assert ingest(tracker, snapshot_path, "system_alerts") == [
+        {"alert_id": "a1", "summary": "Closed"}
+    ]
+
+
+def test_unchanged_file_skipped_without_reading(paths, monkeypatch):
+    snapshot_path, state_path = paths
+    write_snapshot(snapshot_path, stations(10))
+    tracker = snapshot.SnapshotTracker(state_path)
+    ingest(tracker, snapshot_path, "station_status")
+    monkeypatch.setattr(
+        snapshot, "_row_hash", lambda *values: pytest.fail("Table was read.")
+    )
+    assert ingest(tracker, snapshot_path, "station_status") == []
+
+
+def test_touched_file_with_same_rows_skipped(paths):
+    snapshot_path, state_path = paths
+    write_snapshot(snapshot_path, stations(10))
+    tracker = snapshot.SnapshotTracker(state_path)
+    ingest(tracker, snapshot_path, "station_status")
+    touch(snapshot_path, 60)
+    assert ingest(tracker, snapshot_path, "station_status") == []
+
+
+def test_only_differing_rows(paths):
+    snapshot_path, state_path = paths
+    rows = stations(500)
+    write_snapshot(snapshot_path, rows, [("a1", "Closed")])
+    tracker = snapshot.SnapshotTracker(state_path)
+    ingest(tracker, snapshot_path, "station_status")
+    ingest(tracker, snapshot_path, "system_alerts")
+    rows[7] = ("s7", 999, 4)
+    rows.append(("s500", 1000, 1))
+    del rows[3]
+    write_snapshot(snapshot_path, rows, [("a1", "Closed")])
+    touch(snapshot_path, 60)
+    changed = ingest(
+        tracker,
+        snapshot_path,
+        "station_status",
+        ["station_id", "num_bikes", "last_reported"],
+    )
+    # First ingest with these columns: everything is new for this column set.
+    assert len(changed) == 500
+    rows[8] = ("s8", 555, 2)
+    write_snapshot(snapshot_path, rows, [("a1", "Closed")])
+    touch(snapshot_path, 120)
+    changed = ingest(
+        tracker,
+        snapshot_path,
+        "station_status",
+        ["station_id", "num_bikes", "last_reported"],
+    )
+    assert changed == [{"station_id": "s8", "num_bikes": 2, "last_reported": 555}]
+    # Alert table unchanged though the file moved.
+    assert ingest(tracker, snapshot_path, "system_alerts") == []
+
+
+def test_changes_between_runs(paths):
+    snapshot_path, state_path = paths
+    rows = stations(200)
+    write_snapshot(snapshot_path, rows)
+    ingest(snapshot.SnapshotTracker(state_path), snapshot_path, "station_status")
+    rows[10] = ("s10", 5000, 3)
+    write_snapshot(snapshot_path, rows)
+    touch(snapshot_path, 60)
+    # New tracker (new run) on the same state database.
+    tracker = snapshot.SnapshotTracker(state_path)
+    assert ingest(tracker, snapshot_path, "station_status") == [
+        {"station_id": "s10", "last_reported": 5000, "num_bikes": 3}
+    ]
+
+
+def test_changed_rows_twice_same_state(paths):
+    snapshot_path, state_path = paths
+    write_snapshot(snapshot_path, stations(30))
+    tracker = snapshot.SnapshotTracker(state_path)
+    assert len(list(tracker.changed_rows(snapshot_path, "station_status"))) == 30
+    # Second run replaces the pending extract in the same state database.
+    assert len(list(tracker.changed_rows(snapshot_path, "station_status"))) == 30
+    assert tracker.commit(snapshot_path, "station_status") is True
+    tracker = snapshot.SnapshotTracker(state_path)
+    assert list(tracker.changed_rows(snapshot_path, "station_status")) == []
+
+
+def test_failed_ingest_repeats(paths):
+    snapshot_path, state_path = paths
+    write_snapshot(snapshot_path, stations(50))
+    tracker = snapshot.SnapshotTracker(state_path)
+    rows = tracker.changed_rows(snapshot_path, "station_status")
+    next(rows)
+    rows.close()
+    assert len(ingest(tracker, snapshot_path, "station_status")) == 50
+    assert ingest(tracker, snapshot_path, "station_status") == []
+
+
+def test_forget(paths):
+    snapshot_path, state_path = paths
+    write_snapshot(snapshot_path, stations(5), [("a1", "x")])
+    tracker = snapshot.SnapshotTracker(state_path)
+    ingest(tracker, snapshot_path, "station_status")
+    ingest(tracker, snapshot_path, "system_alerts")
+    assert tracker.snapshot_paths == [os.path.abspath(snapshot_path)]
+    tracker.forget(snapshot_path)
+    assert tracker.snapshot_paths == []
+    conn = sqlite3.connect(state_path)
+    assert conn.execute(
+        "select name from sqlite_master where type = 'table';"
+    ).fetchall() == [("table_fingerprint",)]
+    conn.close()
+    assert len(ingest(tracker, snapshot_path, "station_status")) == 5
+
+
+def test_uncommitted_ingest_repeats(paths):
+    snapshot_path, state_path = paths
+    rows = stations(20)
+    write_snapshot(snapshot_path, rows)
+    tracker = snapshot.SnapshotTracker(state_path)
+    assert len(ingest(tracker, snapshot_path, "station_status")) == 20
+    rows[2] = ("s2", 700, 1)
+    write_snapshot(snapshot_path, rows)
+    touch(snapshot_path, 60)
+    # Rows generated, but load failed: nothing committed.
+    assert len(list(tracker.changed_rows(snapshot_path, "station_status"))) == 1
+    next_tracker = snapshot.SnapshotTracker(state_path)
+    assert next_tracker.commit(snapshot_path, "station_status") is False
+    assert ingest(next_tracker, snapshot_path, "station_status") == [
+        {"station_id": "s2", "last_reported": 700, "num_bikes": 1}
+    ]
+    assert ingest(next_tracker, snapshot_path, "station_status") == []
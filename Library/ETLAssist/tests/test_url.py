@@ -0,0 +1,154 @@
+"""Tests for etlassist.url fetches."""
+import io
+import os
+import threading
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+
+import pytest
+import requests
+
+from .context import etlassist
+from etlassist import url
+
+
+class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class Resource(object):
+    """Served resource & server-side request log.
+
+    Attributes:
+        content (bytes): Body to serve.
+        etag (str, None): ETag to serve & honor; None for no validator support.
+        fail_count (int): Number of upcoming requests to answer with 503.
+        requests (list): (path, headers, client port, status) of requests received.
+    """
+
+    def __init__(self):
+        self.content = b"id,name\n1,Alpha\n"
+        self.etag = None
+        self.fail_count = 0
+        self.requests = []
+
+    @property
+    def statuses(self):
+        return [request[3] for request in self.requests]
+
+
+def handler_class(resource):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            if resource.fail_count:
+                resource.fail_count -= 1
+                status = 503
+            elif resource.etag and self.headers.get("If-None-Match") == resource.etag:
+                status = 304
+            else:
+                status = 200
+            resource.requests.append(
+                (self.path, dict(self.headers), self.client_address[1], status)
+            )
+            self.send_response(status)
+            if resource.etag:
+                self.send_header("ETag", resource.etag)
+            body = resource.content if status == 200 else b""
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+@pytest.fixture
+def server():
+    resource = Resource()
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler_class(resource))
+    thread = threading.Thread(target=httpd.serve_forever)
+    thread.daemon = True
+    thread.start()
+    resource.url = "http://127.0.0.1:{}/deq.csv".format(httpd.server_address[1])
+    yield resource
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def read(file_path):
+    with io.open(file_path, mode="rb") as file:
+        return file.read()
+
+
+def test_fetch_new_file(server, tmpdir):
+    file_path = str(tmpdir.join("DEQ.csv"))
+    assert url.fetch_to_file(server.url, file_path, chunk_size=4) is True
+    assert read(file_path) == server.content
+    # No leftover temp files.
+    assert sorted(os.listdir(str(tmpdir))) == ["DEQ.csv", "DEQ.csv.fetch.json"]
+
+
+def test_fetch_unchanged_by_digest(server, tmpdir):
+    file_path = str(tmpdir.join("DEQ.csv"))
+    url.fetch_to_file(server.url, file_path)
+    os.utime(file_path, (1000000000, 1000000000))
+    assert url.fetch_to_file(server.url, file_path) is False
+    assert os.stat(file_path).st_mtime == 1000000000
+    server.content += b"2,Beta\n"
+    assert url.fetch_to_file(server.url, file_path) is True
+    assert read(file_path) == server.content
+
+
+def test_fetch_conditional(server, tmpdir):
+    server.etag = '"v1"'
+    file_path = str(tmpdir.join("DEQ.csv"))
+    assert url.fetch_to_file(server.url, file_path) is True
+    assert "If-None-Match" not in server.requests[0][1]
+    assert url.fetch_to_file(server.url, file_path) is False
+    assert server.requests[1][1]["If-None-Match"] == '"v1"'
+    assert server.statuses == [200, 304]
+    server.etag = '"v2"'
+    server.content = b"id,name\n"
+    assert url.fetch_to_file(server.url, file_path) is True
+    assert read(file_path) == b"id,name\n"
+    # Validators not sent if the file is gone.
+    os.remove(file_path)
+    assert url.fetch_to_file(server.url, file_path) is True
+    assert "If-None-Match" not in server.requests[-1][1]
+
+
+def test_fetch_retry(server, tmpdir):
+    file_path = str(tmpdir.join("DEQ.csv"))
+    server.fail_count = 2
+    assert url.fetch_to_file(server.url, file_path, backoff=0.01) is True
+    assert server.statuses == [503, 503, 200]
+    server.fail_count = 5
+    with pytest.raises(requests.HTTPError):
+        url.fetch_to_file(server.url, file_path, retry_count=1, backoff=0.01)
+    assert read(file_path) == server.content
+
+
+def test_fetch_session_reuse(server, tmpdir):
+    with requests.Session() as session:
+        for name in ["a.csv", "b.csv", "a.csv"]:
+            url.fetch_to_file(server.url, str(tmpdir.join(name)), session=session)
+    # Same client port: one connection for all fetches.
+    assert len({request[2] for request in server.requests}) == 1
+
+
+def test_fetch_connection_error(tmpdir):
+    file_path = str(tmpdir.join("DEQ.csv"))
+    with pytest.raises(requests.ConnectionError):
+        url.fetch_to_file(
+            "http://127.0.0.1:9/deq.csv", file_path, retry_count=1, backoff=0.01
+        )
+    assert os.listdir(str(tmpdir)) == []
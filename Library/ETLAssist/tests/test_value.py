@@ -0,0 +1,90 @@
+"""Tests for etlassist.value cleaners & the compiled cleaner engine."""
+import functools
+import random
+
+from .context import etlassist
+from etlassist import value
+
+
+ALPHABET = (
+    u' \t\n\r\x0b\x0c' + u'abcXYZ019-.#' + u'\xe9\xd1\xfc\xe7\xc5'
+    + u'\u0301\u0308\u0327' + u'\xbd\ufb01\u2460\u1e9b\u0323\uac00'
+    )
+"""str: Characters for generating values: whitespace, ASCII, accented, combining
+marks, & compatibility characters.
+"""
+
+
+def random_values(count, seed=0):
+    """Generate random values drawn from the test alphabet, with repeats."""
+    rand = random.Random(seed)
+    values = [u''.join(rand.choice(ALPHABET) for _ in range(rand.randint(0, 16)))
+              for _ in range(count // 4)]
+    values.extend([u'NULL', u' <null> ', u'Null', None])
+    for _ in range(count):
+        yield rand.choice(values)
+
+
+def chained(*functions):
+    """Return function applying functions in order, reference-style."""
+    def apply(_value):
+        for function in functions:
+            _value = function(_value)
+        return _value
+    return apply
+
+
+def test_clear_null_string():
+    assert value.clear_null_string(u'NULL') is None
+    assert value.clear_null_string(u' <Null> ') is None
+    assert value.clear_null_string(u'') is None
+    assert value.clear_null_string(u'NULLS') == u'NULLS'
+    assert value.clear_null_string(0) == 0
+
+
+def test_compiled_cleaner_matches_single_cleaners():
+    cleaners = (
+        value.clean_whitespace,
+        value.clean_whitespace_without_clear,
+        value.clear_null_string,
+        value.force_lowercase,
+        value.force_title_case,
+        value.force_uppercase,
+        value.maptaxlot_separated,
+        value.remove_diacritics,
+        )
+    for cleaner in cleaners:
+        compiled = value.compiled_cleaner(cleaner)
+        for _value in random_values(2000, seed=hash(cleaner.__name__) % 997):
+            assert compiled(_value) == cleaner(_value), (cleaner, _value)
+
+
+def test_compiled_cleaner_matches_chain():
+    functions = (value.clean_whitespace, value.remove_diacritics,
+                 value.force_uppercase, value.clear_null_string)
+    compiled = value.compiled_cleaner(*functions)
+    reference = chained(*functions)
+    for _value in random_values(20000):
+        assert compiled(_value) == reference(_value), _value
+
+
+def test_compiled_cleaner_names_partials_and_cache_bound():
+    compiled = value.compiled_cleaner(
+        'clean_whitespace',
+        functools.partial(value.maptaxlot_separated, separator='.'),
+        cache_size=8,
+        )
+    reference = chained(
+        value.clean_whitespace,
+        functools.partial(value.maptaxlot_separated, separator='.'),
+        )
+    for _value in random_values(500, seed=7):
+        assert compiled(_value) == reference(_value), _value
+    assert compiled(u'  1803203300400 ') == u'18.03.20.33.00400'
+
+
+def test_compiled_cleaner_without_cache():
+    compiled = value.compiled_cleaner(value.clean_whitespace, cache_size=0)
+    assert compiled(u'  a\t\t b  ') == u'a\t b'
+    assert compiled(u'   ') is None
+    assert compiled(None) is None
@@ -0,0 +1,33 @@
+"""Micro-benchmarks for etlassist.value cleaners.
+
+Run with pytest-benchmark installed; skipped otherwise.
+"""
+import pytest
+
+from .context import etlassist
+from etlassist import value
+from .test_value import chained, random_values
+
+pytest.importorskip('pytest_benchmark')
+
+
+CHAIN = (value.clean_whitespace, value.remove_diacritics, value.force_uppercase,
+         value.clear_null_string)
+VALUES = list(random_values(100000))
+
+
+def clean_all(function):
+    """Return list of values cleaned by function."""
+    return [function(_value) for _value in VALUES]
+
+
+def test_reference_chain(benchmark):
+    benchmark(clean_all, chained(*CHAIN))
+
+
+def test_compiled_chain(benchmark):
+    benchmark(clean_all, value.compiled_cleaner(*CHAIN))
+
+
+def test_compiled_chain_uncached(benchmark):
+    benchmark(clean_all, value.compiled_cleaner(*CHAIN, cache_size=0))
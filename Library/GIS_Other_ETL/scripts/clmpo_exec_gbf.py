@@ -3,10 +3,10 @@ import argparse
 import datetime
 import logging
 import os
-import sqlite3
 
 import arcetl
 from etlassist.pipeline import Job, execute_pipeline
+from etlassist.snapshot import SnapshotTracker
 
 from helper import dataset
 from helper import path
@@ -34,20 +34,10 @@ SNAPSHOT_DB_PATH = os.path.join(
     path.REGIONAL_FILE_SHARE,
      "staging\\Bikeshare_Feed\\PeaceHealth_Rides_Feed_{}.sqlite3",
 )
-
-
-# Helpers.
-
-
-def source_rows(gbf_database_path, dataset_name):
-    """Generate row-dictionaries from GBF dataset source."""
-    conn = sqlite3.connect(gbf_database_path)
-    cursor = conn.cursor()
-    sql = "select * from {}".format(dataset_name)
-    cursor.execute(sql)
-    column_names = [column[0] for column in cursor.description]
-    for row in cursor:
-        yield dict(zip(column_names, row))
+SNAPSHOT_STATE_PATH = os.path.join(
+    path.REGIONAL_FILE_SHARE, "staging\\Bikeshare_Feed\\Snapshot_Ingest_State.sqlite3"
+)
+"""str: Path of state database for incremental snapshot ingests."""
 
 
 # ETLs.
@@ -63,8 +53,16 @@ def gbf_pub_update():
             - datetime.timedelta(days=1)
         ).strftime("%Y_%m"),
     ]
-    for month_stamp in month_stamps:
-        snapshot_db_path = SNAPSHOT_DB_PATH.format(month_stamp)
+    tracker = SnapshotTracker(SNAPSHOT_STATE_PATH)
+    snapshot_db_paths = [
+        os.path.abspath(SNAPSHOT_DB_PATH.format(month_stamp))
+        for month_stamp in month_stamps
+    ]
+    # Drop state (& extract copies) for snapshots of past months.
+    for snapshot_db_path in tracker.snapshot_paths:
+        if snapshot_db_path not in snapshot_db_paths:
+            tracker.forget(snapshot_db_path)
+    for snapshot_db_path in snapshot_db_paths:
         if not os.path.exists(snapshot_db_path):
             LOG.warning("Snapshot database %s does not exist.", snapshot_db_path)
             continue
@@ -72,12 +70,17 @@ def gbf_pub_update():
         for _dataset in DATASETS:
             arcetl.features.update_from_dicts(
                 dataset_path=_dataset.path("pub"),
-                update_features=source_rows(snapshot_db_path, _dataset.path("source")),
+                # Only rows new or changed since the last ingest of the table.
+                update_features=tracker.changed_rows(
+                    snapshot_db_path, _dataset.path("source")
+                ),
                 id_field_names=_dataset.id_field_names,
                 field_names=_dataset.field_names,
                 delete_missing_features=False,
                 use_edit_session=False,
             )
+            # Record ingest only once the update succeeded.
+            tracker.commit(snapshot_db_path, _dataset.path("source"))
     LOG.info("End: Update.")
 
 
@@ -5,6 +5,7 @@ import argparse
 import copy
 import csv
 import datetime
+import functools
 import io
 import logging
 import os
@@ -12,7 +13,6 @@ import re
 import shutil
 from collections import defaultdict
 from tempfile import NamedTemporaryFile, gettempdir
-import time
 import xml.etree.ElementTree as ET
 
 import pyodbc
@@ -85,24 +85,61 @@ XML_DECLARATION_PATTERN_ERRORS = {
 class Geoportal(object):
     """Interface for a given Geoportal.
 
+    Queries & updates run on a pool of reused connections, retrying with backoff
+    after connection failures. Record changes are staged & written in bulk.
+
     Attributes:
         database (etlassist.database.Database): Object instance for Geoportal's
             database.
         base_url (str): Geoportal base URL.
+        pool (etlassist.database.ConnectionPool): Pool of connections to the
+            Geoportal's database.
+        update_batch_size (int): Number of staged records that triggers writing
+            updates.
+        failed_updates (dict): Mapping of metadata record to message describing
+            why its staged update failed to write.
 
     """
 
-    def __init__(self, database_instance, base_url):
+    def __init__(self, database_instance, base_url, **kwargs):
         """Initialize instance.
 
         Args:
             database_instance (etlassist.database.Database): Object instance for
                 Geoportal's database.
             base_url (str): Geoportal base URL.
+            **kwargs: Arbitrary keyword arguments. See below.
+
+        Keyword Args:
+            pool_size (int): Maximum number of open database connections. Default is
+                2.
+            retry_count (int): Number of times to retry on connection failure.
+                Default is 4.
+            retry_wait (int): Seconds to wait before first retry; doubles for each
+                retry after. Default is 4.
+            update_batch_size (int): Number of staged records that triggers writing
+                updates. Default is 50.
 
         """
         self.database = database_instance
         self.base_url = base_url
+        self.pool = database.ConnectionPool(
+            connect=functools.partial(
+                pyodbc.connect,
+                self.database.odbc_string
+                + "App=CPA_ETL.exec_metatadata.Geoportal.exec_sql;",
+            ),
+            size=kwargs.get("pool_size", 2),
+            retry_count=kwargs.get("retry_count", 4),
+            # [08S01] Communication link failure.
+            retry_exceptions=[pyodbc.OperationalError],
+            retry_predicate=is_tds_protocol_error,
+            retry_wait=kwargs.get("retry_wait", 4),
+            retry_wait_max=64,
+        )
+        self.update_batch_size = kwargs.get("update_batch_size", 50)
+        self.failed_updates = {}
+        self._staged_records = {}
 
     def __gt__(self, other):
         return self.database.name > other.database.name
@@ -157,9 +194,28 @@ class Geoportal(object):
         Returns:
             MetadataRecord: Object instance for metadata record.
 
+        """
+        return self.records_by_titles([title]).get(title)
+
+    def records_by_titles(self, titles, chunk_size=1000):
+        """Return mapping of title to first approved metadata record with that title.
+
+        Queries records for many titles at once, passing titles as parameters.
+        Titles match case-insensitively & ignoring trailing spaces, as with the
+        database collation.
+
+        Args:
+            titles (iter): Collection of metadata record titles.
+            chunk_size (int): Number of titles to query per statement. SQL Server
+                allows up to 2100 parameters per statement.
+
+        Returns:
+            dict: Mapping of requested title to MetadataRecord. Titles without an
+                approved record are omitted.
+
         """
         sql = """
-            select top 1
+            select
                 doc_uuid = resource.docuuid,
                 id = resource.id,
                 title = resource.title,
@@ -173,113 +229,163 @@ class Geoportal(object):
                 left join {database}.dbo.GPT_Resource_Data as data
                     on resource.docuuid = data.docuuid
             where
-                resource.title = '{title}'
+                resource.title in ({markers})
                 and resource.approvalstatus = 'approved'
             order by resource.updatedate desc, resource.inputdate desc;
-        """.format(
-            database=self.database.name, title=title.replace("'", "''")
-        )
-        try:
-            row = next(self.sql_query(sql, result_type=dict))
-        except StopIteration:
-            record = None
-        else:
-            record = MetadataRecord(geoportal=self, record=row)
-        return record
-
-    def sql_exec(self, statement, retry_count=4, retry_wait=32):
+        """
+        key_titles = defaultdict(set)
+        for title in titles:
+            key_titles[title.rstrip().lower()].add(title)
+        # Query one title per key; the database matches the rest the same.
+        query_titles = sorted(min(_titles) for _titles in key_titles.values())
+        title_record = {}
+        for i in range(0, len(query_titles), chunk_size):
+            chunk = query_titles[i : i + chunk_size]
+            rows = self.sql_query(
+                sql.format(
+                    database=self.database.name,
+                    markers=", ".join("?" for _ in chunk),
+                ),
+                parameters=chunk,
+                result_type=dict,
+            )
+            for row in rows:
+                # Rows are newest-first: Keep first per title.
+                for title in key_titles.get(row["title"].rstrip().lower(), []):
+                    if title not in title_record:
+                        title_record[title] = MetadataRecord(
+                            geoportal=self, record=row
+                        )
+        return title_record
+
+    def sql_exec(self, statement, parameters=None):
         """Execute SQL statement in geoportal database.
 
         Args:
             statement (str): SQL statement to execute.
-            retry_count (int): Number of times to retry on connection failure.
-            retry_wait (int): Seconds to wait before next try.
+            parameters (iter): Values for the statement parameter markers.
 
         """
-        conn = pyodbc.connect(
-            self.database.odbc_string
-            + "App=CPA_ETL.exec_metatadata.Geoportal.exec_sql;"
-        )
-        cursor = conn.cursor()
-        try:
-            cursor.execute(statement)
-        except pyodbc.OperationalError:
-            # [08S01] Communication link failure.
-            if retry_count <= 0:
-                raise
-
-            LOG.warning("Connection failure: trying again in %s seconds.", retry_wait)
-            conn.close()
-            time.sleep(retry_wait)
-            self.sql_exec(statement, (retry_count - 1), retry_wait)
-        else:
-            conn.close()
+        self.pool.execute(statement, parameters)
 
-    def sql_query(self, statement, result_type=tuple, retry_count=4, retry_wait=32):
+    def sql_query(self, statement, parameters=None, result_type=tuple):
         """Generate SQL query results from geoportal database.
 
+        All rows are fetched before the first is yielded, so the query session
+        does not block write sessions.
+
         Args:
             statement (str): SQL statement to query.
+            parameters (iter): Values for the statement parameter markers.
             result_type: Type of container result should be yielded as.
-            retry_count (int): Number of times to retry on connection failure.
-            retry_wait (int): Seconds to wait before next try.
 
         Yields:
             Representation of query result row in the chosen result_type.
 
         """
-        conn = pyodbc.connect(
-            self.database.odbc_string
-            + "App=CPA_ETL.exec_metatadata.Geoportal.exec_sql;"
-        )
-        with conn:
-            cursor = conn.cursor()
-            try:
-                cursor.execute(statement)
-            except pyodbc.OperationalError as error:
-                # [08S01] Communication link failure.
-                if retry_count <= 0:
-                    raise
-
-                LOG.warning(
-                    "%s - trying again in %s seconds.", error.message, retry_wait
-                )
-                time.sleep(retry_wait)
-                for result in self.sql_query(
-                    statement, result_type, (retry_count - 1), retry_wait  # pylint: disable=bad-continuation
-                ):
-                    yield result
+        for result in self.pool.query(statement, parameters, result_type):
+            yield result
+
+    def stage_update(self, record):
+        """Stage changed record for the next bulk update.
+
+        Writes updates once the number of staged records reaches the batch size.
+        Records that fail to write are added to `failed_updates`.
 
+        Args:
+            record (MetadataRecord): Metadata record with changes.
+
+        """
+        self._staged_records[record.id] = record
+        if len(self._staged_records) >= self.update_batch_size:
+            self.failed_updates.update(self.update_records())
+
+    def update_records(self, records=None):
+        """Write changes on metadata records to geoportal database in bulk.
+
+        If the bulk write fails, writes the records one at a time, so one bad record
+        does not block the rest. XML for each failed record is written to a file in
+        the temp directory for diagnosis.
+
+        Args:
+            records (iter): Collection of metadata records to update. If None, will
+                update staged records.
+
+        Returns:
+            dict: Mapping of metadata record to message describing why it failed to
+                update. Empty if all records updated.
+
+        """
+        if records is None:
+            records, self._staged_records = list(self._staged_records.values()), {}
+        else:
+            records = list(records)
+            for record in records:
+                self._staged_records.pop(record.id, None)
+        records = [record for record in records if record.changed_attributes]
+        failed_records = {}
+        try:
+            self._write_updates(records)
+        except pyodbc.Error as error:
+            if len(records) == 1:
+                failed_records[records[0]] = _update_failure_message(records[0], error)
             else:
-                column_names = [column[0] for column in cursor.description]
-                try:
-                    for row in cursor:
-                        if result_type == dict:
-                            result = dict(zip(column_names, row))
-                        else:
-                            result = result_type(row)
-                        yield result
-
-                except pyodbc.Error as error:
-                    # [HY000] Protocol error in TDS stream.
-                    if retry_count <= 0:
-                        raise
-
-                    LOG.warning(
-                        "%s - trying again in %s seconds.", error.message, retry_wait
-                    )
-                    time.sleep(retry_wait)
-                    for result in self.sql_query(
-                        statement, result_type, (retry_count - 1), retry_wait  # pylint: disable=bad-continuation
-                    ):
-                        yield result
+                LOG.warning("Bulk update failed (%s): Updating records singly.", error)
+                for record in records:
+                    try:
+                        self._write_updates([record])
+                    except pyodbc.Error as record_error:
+                        failed_records[record] = _update_failure_message(
+                            record, record_error
+                        )
+
+        updated_count = 0
+        for record in records:
+            if record not in failed_records:
+                record.changed_attributes.clear()
+                self.failed_updates.pop(record, None)
+                updated_count += 1
+        if updated_count:
+            LOG.info("Updated %s records in %s.", updated_count, self.database.name)
+        return failed_records
+
+    def _write_updates(self, records):
+        """Write changes on metadata records to geoportal database.
+
+        Args:
+            records (list): Collection of metadata records to update.
+
+        """
+        self.pool.upsert(
+            table_name="{}.dbo.GPT_Resource_Data".format(self.database.name),
+            field_names=["id", "docuuid", "xml"],
+            rows=[
+                (record.id, record.doc_uuid, record.xml)
+                for record in records
+                if "xml" in record.changed_attributes
+            ],
+            key_field_names=["id"],
+        )
+        self.pool.execute_many(
+            "update {}.dbo.GPT_Resource set approvalstatus = ? where id = ?;".format(
+                self.database.name
+            ),
+            [
+                (record.approval_status, record.id)
+                for record in records
+                if "approval_status" in record.changed_attributes
+            ],
+        )
 
 
 class MetadataRecord(object):
     """Representation of a metadata record.
 
+    Changes to the record are staged on its geoportal for bulk update.
+
     Attributes:
         geoportal (Geoportal): Object instance for metadata record's origin geoportal.
+        changed_attributes (set): Names of attributes changed since last update.
 
     """
 
@@ -293,6 +399,7 @@ class MetadataRecord(object):
 
         """
         self.geoportal = geoportal
+        self.changed_attributes = set()
         self._record = record
 
     def __gt__(self, other):
@@ -319,17 +426,9 @@ class MetadataRecord(object):
     @approval_status.setter
     def approval_status(self, value):
         if value != self.approval_status:
-            sql = (
-                "update {database}.dbo.GPT_Resource"
-                + " set approvalstatus = '{status}' where id = {id};"
-            )
-            with pyodbc.connect(self.geoportal.database.odbc_string) as conn:
-                conn.execute(
-                    sql.format(
-                        database=self.geoportal.database.name, status=value, id=self.id
-                    )
-                )
             self._record["approval_status"] = value
+            self.changed_attributes.add("approval_status")
+            self.geoportal.stage_update(self)
 
     @property
     def dataset_path(self):
@@ -391,17 +490,32 @@ class MetadataRecord(object):
         if value == self.xml:
             return
 
-        sql = """
-            update {database}.dbo.GPT_Resource_Data
-            set xml = '{xml}'
-            where id = {_id};
-        """.format(
-            database=self.geoportal.database.name,
-            _id=self.id,
-            xml=value.replace("'", "''")
-        )
-        self.geoportal.sql_exec(sql)
         self._record["xml"] = value
+        self.changed_attributes.add("xml")
+        self.geoportal.stage_update(self)
+
+
+def _update_failure_message(record, error):
+    """Return message describing failure to update record, writing XML to file.
+
+    Args:
+        record (MetadataRecord): Metadata record that failed to update.
+        error (pyodbc.Error): Error raised on update.
+
+    Returns:
+        str: Message describing the failure.
+
+    """
+    message = "ODBC error: {}".format(error)
+    LOG.warning("%s.", message)
+    if "xml" in record.changed_attributes:
+        xml_path = os.path.join(
+            gettempdir(), "metadata_pyodbc_error_{}.xml".format(record.id)
+        )
+        with io.open(xml_path, mode="w", encoding="utf-8-sig") as xmlfile:
+            xmlfile.write(record.xml)
+        LOG.error("PyODBC error: XML file at %s.", xml_path)
+    return message
 
 
 def adjust_record_xml(record):
@@ -427,15 +541,7 @@ def adjust_record_xml(record):
         message = "Bad XML: {}".format(error.message)
         LOG.warning("%s.", message)
     if message is None:
-        try:
-            record.xml = out_xml
-        except pyodbc.Error:
-            xml_path = os.path.join(gettempdir(), "metadata_pyodbc_error.xml")
-            with io.open(xml_path, mode="w", encoding="utf-8-sig") as xmlfile:
-                xmlfile.write(out_xml)
-            LOG.error("PyODBC error: XML file at %s.", xml_path)
-            raise
-
+        record.xml = out_xml
     return message
 
 
@@ -456,13 +562,14 @@ def apply_character_entities(xml):
     return out_xml
 
 
-def assign_record_parent(record, parent_info, parent_geoportal):
+def assign_record_parent(record, parent_info, parent_records):
     """Assign record a parent via the dataset path.
 
     Args:
         record (MetadataRecord): Metadata record to adjust.
         parent_info (dict): Mapping of record parent's details.
-        parent_geoportal (Geoportal): Geoportal instance parent record resides in.
+        parent_records (dict): Mapping of title to parent record, from the geoportal
+            the parent record resides in.
 
     Returns:
         str: Message describing any problems that arose. NoneType if no problems.
@@ -470,7 +577,7 @@ def assign_record_parent(record, parent_info, parent_geoportal):
     """
     message = None
     parent = parent_info[record.title]
-    parent["record"] = parent_geoportal.record_by_title(parent["parent_geo_title"])
+    parent["record"] = parent_records.get(parent["parent_geo_title"])
     if not parent["record"]:
         message = "Parent record title does not exist in geoportal."
         LOG.warning("%s.", message)
@@ -530,6 +637,23 @@ def fix_secinfo(xml):
     return out_xml.decode("utf-8")
 
 
+def is_tds_protocol_error(error):
+    """Return True if error is a transient TDS protocol error, False otherwise.
+
+    Args:
+        error (Exception): Error raised by a database operation.
+
+    Returns:
+        bool: True if error is a pyodbc TDS protocol error.
+
+    """
+    if not isinstance(error, pyodbc.Error):
+        return False
+
+    # [HY000] Protocol error in TDS stream.
+    return "Protocol error in TDS stream" in str(error)
+
+
 def parent_tag_record_info_map(parent_csv_path):
     """Mapping of parent info tags to the parent record information.
 
@@ -580,12 +704,10 @@ def return_metadata_to_geoportal(record):
         xmlfile.write(post_xml)
     LOG.info("Created staging-return XML file.")
     # Post to record on Geoportal.
-    try:
-        record.xml = post_xml
-    except pyodbc.OperationalError as error:
-        message = "ODBC operational error: {}".format(error.message)
-        LOG.warning("%s.", message)
-    LOG.info("Metadata record synced back to %s.", record.geoportal.database.name)
+    record.xml = post_xml
+    message = record.geoportal.update_records([record]).get(record)
+    if message is None:
+        LOG.info("Metadata record synced back to %s.", record.geoportal.database.name)
     return message
 
 
@@ -744,8 +866,14 @@ def eug_metadata_sync():
     for file_name in os.listdir(os.getcwd()):
         if os.path.isfile(file_name) and file_name.lower().endswith(".xml"):
             os.remove(file_name)
-    # Must run generator through, or hanging session will block write sessions.
     records = list(geoportal["eug"].records(descending_date=True))
+    # Query all parent records up-front, rather than one query per record.
+    parent_records = {
+        key: geoportal[key].records_by_titles(
+            info["parent_geo_title"] for info in parent_info[key].values()
+        )
+        for key in ["cpa", "eug"]
+    }
     for i, record in enumerate(records, start=1):
         LOG.info("\n\nRecord %s:", i)
         LOG.info("Metadata record: %s (id=%s).", record.title, record.id)
@@ -774,11 +902,11 @@ def eug_metadata_sync():
             message = None
             if record.title in parent_info["cpa"]:
                 message = assign_record_parent(
-                    record, parent_info["cpa"], geoportal["cpa"]
+                    record, parent_info["cpa"], parent_records["cpa"]
                 )
             elif record.title in parent_info["eug"]:
                 message = assign_record_parent(
-                    record, parent_info["eug"], geoportal["eug"]
+                    record, parent_info["eug"], parent_records["eug"]
                 )
             if message:
                 problem_message_records[message].append(record)
@@ -820,6 +948,11 @@ def eug_metadata_sync():
 
         else:
             datasets_synced.add(record.dataset_path.lower())
+    for _geoportal in geoportal.values():
+        _geoportal.failed_updates.update(_geoportal.update_records())
+        _geoportal.pool.close()
+        for record, message in _geoportal.failed_updates.items():
+            problem_message_records[message].append(record)
     if any(records for records in problem_message_records.values()):
         send_problems_report(problem_message_records)
 
@@ -3,6 +3,7 @@ import argparse
 import logging
 import os
 
+from etlassist.delivery import manifest_html, package_deliverables
 from etlassist.pipeline import Job, execute_pipeline
 
 from helper.communicate import send_links_email
@@ -70,14 +71,8 @@ MESSAGE_KWARGS = {
         <p>A new EIS CAD GIS data deliverable is available for download. Download a
         zipped copy from the link below.<p>
     """,
-    "body_post_links": """
-        <h3>Datasets:</h3>
-        <ul>
-            <li>AddressPts.shp</li>
-            <li>Centerlines.shp</li>
-            <li>CityLimits.shp</li>
-        </ul>
-    """,
+    # Will be added in-function.
+    "body_post_links": None,
 }
 """dict: Keyword arguments for sending message."""
 
@@ -89,21 +84,23 @@ def lcso_cad_datasets_etl():
     """Run ETL for LSCO CAD delivery datasets."""
     for dataset_name, kwargs in DATASET_KWARGS.items():
         kwargs["output_path"] = os.path.join(DELIVERABLES_PATH, dataset_name + ".shp")
-        transform.etl_dataset(**kwargs)
     zip_name = "LCSO_CAD_{}.zip".format(datestamp())
     zip_path = os.path.join(path.RLID_MAPS_WWW_SHARE, "Download", zip_name)
     conn = credential.UNCPathCredential(
         path.RLID_MAPS_WWW_SHARE, **credential.CPA_MAP_SERVER
     )
     with conn:
-        path.archive_directory(
-            directory_path=DELIVERABLES_PATH,
+        manifest = package_deliverables(
+            DATASET_KWARGS,
             archive_path=zip_path,
-            directory_as_base=False,
-            archive_exclude_patterns=[".lock", ".zip"],
+            exporter=transform.etl_dataset,
+            base_path=DELIVERABLES_PATH,
         )
     zip_url = url.RLID_MAPS + "Download/" + zip_name
-    send_links_email(urls=[zip_url], **MESSAGE_KWARGS)
+    message_kwargs = dict(
+        MESSAGE_KWARGS, body_post_links="<h3>Datasets:</h3>" + manifest_html(manifest)
+    )
+    send_links_email(urls=[zip_url], **message_kwargs)
 
 
 # Jobs.
@@ -6,6 +6,7 @@ import os
 
 import arcetl
 
+from etlassist.delivery import manifest_html, package_deliverables
 from etlassist.pipeline import Job, execute_pipeline
 
 from helper.communicate import send_links_email
@@ -298,14 +299,44 @@ TILLAMOOK_MESSAGE_KWARGS = {
 # Helpers.
 
 
+def package_gdb_delivery(gdb_path, dataset_kwargs, archive_path):
+    """Run dataset ETLs into delivery geodatabase concurrently & archive it.
+
+    Each ETL loads a different dataset in the geodatabase, so they can run in
+    separate processes.
+
+    Args:
+        gdb_path (str): Path of the delivery geodatabase.
+        dataset_kwargs (iter): Collection of (dataset name, ETL keyword arguments).
+        archive_path (str): Path of the archive to create.
+
+    Returns:
+        list of dict: Manifest of the delivery.
+    """
+    exports = {
+        dataset_name: dict(kwargs, output_path=os.path.join(gdb_path, dataset_name))
+        for dataset_name, kwargs in dataset_kwargs
+    }
+    return package_deliverables(
+        exports,
+        archive_path,
+        exporter=transform.etl_dataset,
+        base_path=os.path.dirname(gdb_path),
+        trailing_paths=[gdb_path],
+    )
+
+
 ##TODO: Jinja template?
-def send_message_tillamook(deliverable_url, metadata_where_sql, **kwargs):
+def send_message_tillamook(
+    deliverable_url, metadata_where_sql, manifest=None, **kwargs
+):
     """Send message of available deliverable download for Tillamook.
 
     Args:
         deliverable_url (str): URL for deliverable.
         metadata_where_sql (str): SQL where-clause for getting info from metadata
             table.
+        manifest (list of dict): Manifest of the delivery, to list in the message.
         **kwargs (dict): Keyword arguments. See below.
 
     Keyword Args:
@@ -333,6 +364,8 @@ def send_message_tillamook(deliverable_url, metadata_where_sql, **kwargs):
      """.format(
         "".join(html_table_rows)
     )
+    if manifest:
+        kwargs["body_post_links"] += "<h3>Files</h3>" + manifest_html(manifest)
     send_links_email(urls=[deliverable_url], **kwargs)
 
 
@@ -343,63 +376,50 @@ def oem_lane_delivery_etl():
     """Run ETL for OEM-Lane delivery."""
     name = "OEM_Lane"
     gdb_path = os.path.join(PATH["lane_deliverables"], name + ".gdb")
-    for dataset_name, kwargs in OEM_LANE_DATASET_KWARGS.items():
-        kwargs["output_path"] = os.path.join(gdb_path, dataset_name)
-        transform.etl_dataset(**kwargs)
     zip_name = "{}_{}.zip".format(name, datestamp())
     zip_path = os.path.join(PATH["lane_deliverables"], zip_name)
-    path.archive_directory(
-        directory_path=gdb_path,
-        archive_path=zip_path,
-        directory_as_base=True,
-        archive_exclude_patterns=[".lock"],
+    manifest = package_gdb_delivery(
+        gdb_path, OEM_LANE_DATASET_KWARGS.items(), archive_path=zip_path
     )
-    send_links_email(urls=[zip_path], **OEM_LANE_MESSAGE_KWARGS)
+    message_kwargs = dict(OEM_LANE_MESSAGE_KWARGS)
+    message_kwargs["body_post_links"] += manifest_html(manifest)
+    send_links_email(urls=[zip_path], **message_kwargs)
 
 
 def oem_tillamook_delivery_etl():
     """Run ETL for OEM-Tillamook delivery."""
     name = "OEM_Tillamook"
     gdb_path = os.path.join(PATH["tillamook_deliverables"], name + ".gdb")
-    for dataset_name, kwargs in OEM_TILLAMOOK_DATASET_KWARGS.items():
-        kwargs["output_path"] = os.path.join(gdb_path, dataset_name)
-        transform.etl_dataset(**kwargs)
     zip_name = "{}_{}.zip".format(name, datestamp())
     zip_path = os.path.join(PATH["tillamook_deliverables"], zip_name)
-    path.archive_directory(
-        directory_path=gdb_path,
-        archive_path=zip_path,
-        directory_as_base=True,
-        archive_exclude_patterns=[".lock"],
+    manifest = package_gdb_delivery(
+        gdb_path, OEM_TILLAMOOK_DATASET_KWARGS.items(), archive_path=zip_path
     )
-    send_links_email(urls=[zip_path], **OEM_TILLAMOOK_MESSAGE_KWARGS)
+    message_kwargs = dict(OEM_TILLAMOOK_MESSAGE_KWARGS)
+    message_kwargs["body_post_links"] += manifest_html(manifest)
+    send_links_email(urls=[zip_path], **message_kwargs)
 
 
 def tillamook_911_delivery_etl():
     """Run ETL for Tillamook 911 CAD delivery."""
     name = "Tillamook_911"
     gdb_path = os.path.join(PATH["tillamook_deliverables"], name + ".gdb")
-    for dataset_name, kwargs in chain(
-        TILLAMOOK_911_DATASET_KWARGS.items(), TILLAMOOK_GIS_DATASET_KWARGS.items()
-    ):
-        kwargs["output_path"] = os.path.join(gdb_path, dataset_name)
-        transform.etl_dataset(**kwargs)
     zip_name = "{}_{}.zip".format(name, datestamp())
     zip_path = os.path.join(path.RLID_MAPS_WWW_SHARE, "Download", zip_name)
     conn = credential.UNCPathCredential(
         path.RLID_MAPS_WWW_SHARE, **credential.CPA_MAP_SERVER
     )
     with conn:
-        path.archive_directory(
-            directory_path=gdb_path,
+        manifest = package_gdb_delivery(
+            gdb_path,
+            chain(TILLAMOOK_911_DATASET_KWARGS.items(), TILLAMOOK_GIS_DATASET_KWARGS.items()),
             archive_path=zip_path,
-            directory_as_base=True,
-            archive_exclude_patterns=[".lock"],
         )
     zip_url = url.RLID_MAPS + "Download/" + zip_name
     send_message_tillamook(
         zip_url,
         metadata_where_sql="in_tillamook_911 = 1",
+        manifest=manifest,
         **TILLAMOOK_911_MESSAGE_KWARGS
     )
 
@@ -408,26 +428,23 @@ def tillamook_delivery_etl():
     """Run ETL for Tillamook delivery."""
     name = "Tillamook"
     gdb_path = os.path.join(PATH["tillamook_deliverables"], name + ".gdb")
-    for dataset_name, kwargs in chain(
-        TILLAMOOK_DATASET_KWARGS.items(), TILLAMOOK_GIS_DATASET_KWARGS.items()
-    ):
-        kwargs["output_path"] = os.path.join(gdb_path, dataset_name)
-        transform.etl_dataset(**kwargs)
     zip_name = "{}_{}.zip".format(name, datestamp())
     zip_path = os.path.join(path.RLID_MAPS_WWW_SHARE, "Download", zip_name)
     conn = credential.UNCPathCredential(
         path.RLID_MAPS_WWW_SHARE, **credential.CPA_MAP_SERVER
     )
     with conn:
-        path.archive_directory(
-            directory_path=gdb_path,
+        manifest = package_gdb_delivery(
+            gdb_path,
+            chain(TILLAMOOK_DATASET_KWARGS.items(), TILLAMOOK_GIS_DATASET_KWARGS.items()),
             archive_path=zip_path,
-            directory_as_base=True,
-            archive_exclude_patterns=[".lock"],
         )
     zip_url = url.RLID_MAPS + "Download/" + zip_name
     send_message_tillamook(
-        zip_url, metadata_where_sql="in_tillamook = 1", **TILLAMOOK_MESSAGE_KWARGS
+        zip_url,
+        metadata_where_sql="in_tillamook = 1",
+        manifest=manifest,
+        **TILLAMOOK_MESSAGE_KWARGS
     )
 
 
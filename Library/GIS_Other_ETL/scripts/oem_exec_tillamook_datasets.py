@@ -303,14 +303,14 @@ def address_point_etl():
         transform.force_yn(etl, field_names=["valid"], default="Y")
         transform.add_missing_fields(etl, dataset.TILLAMOOK_ADDRESS_POINT, tags=["pub"])
         # Assign geometry attributes.
-        for x_name, y_name, srid in [("lon", "lat", 4326)]:
-            for name, axis in [(x_name, "x"), (y_name, "y")]:
-                etl.transform(
-                    arcetl.attributes.update_by_geometry,
-                    field_name=name,
-                    spatial_reference_item=srid,
-                    geometry_properties=["centroid", axis],
-                )
+        etl.transform(
+            arcetl.attributes.update_by_geometry_properties,
+            field_geometry_properties={
+                "lon": (["centroid", "x"], 4326),
+                "lat": (["centroid", "y"], 4326),
+            },
+            use_projection_math=True,
+        )
         # Assign joined values.
         etl.transform(
             arcetl.attributes.update_by_joined_value,
@@ -498,71 +498,19 @@ def msag_ranges_current_etl():
 
 def msag_update():
     """Run toggle for the Master Street Address Guide."""
-    unretired_where_sql = "expiration_date is null"
     # Do not update MSAG if there will be a significant change.
-    count = {
-        "current": arcetl.features.count(dataset.TILLAMOOK_MSAG_RANGE.path("current")),
-        "previous": arcetl.features.count(
-            dataset.TILLAMOOK_MSAG_RANGE.path("master"),
-            dataset_where_sql=unretired_where_sql,
-        ),
-    }
-    if abs(count["current"] - count["previous"]) > count["previous"] * 0.01:
-        ##TODO: This should probably trigger an email as well.
-        raise ValueError("Significant change in row counts.")
-
-    LOG.info("Gather information about current MSAG ranges.")
-    current_ranges = list(
-        arcetl.attributes.as_dicts(
+    ##TODO: This should probably trigger an email as well.
+    arcetl.features.update_versioned(
+        dataset.TILLAMOOK_MSAG_RANGE.path("master"),
+        update_features=arcetl.attributes.as_iters(
             dataset.TILLAMOOK_MSAG_RANGE.path("current"),
             field_names=MSAG_KEYS["master"],
-        )
-    )
-    current_id_geoms = {rng["msag_id"]: rng["shape@"] for rng in current_ranges}
-    current_ids = set(rng["msag_id"] for rng in current_ranges)
-    most_recent_date = max(rng["effective_date"] for rng in current_ranges)
-    LOG.info(
-        "Start: Retire ranges no longer in current MSAG;"
-        " update geometry for present ranges."
-    )
-    master_cursor = arcpy.da.UpdateCursor(
-        dataset.TILLAMOOK_MSAG_RANGE.path("master"),
-        field_names=["msag_id", "expiration_date", "shape@"],
-        where_clause=unretired_where_sql,
-    )
-    with master_cursor:
-        for msag_id, expiration_date, geom in master_cursor:
-            if msag_id not in current_ids:
-                LOG.info("Range (ID=%s) not in current: retiring.", msag_id)
-                expiration_date = most_recent_date
-                master_cursor.updateRow((msag_id, expiration_date, geom))
-            elif geom is None or not geom.equals(current_id_geoms[msag_id]):
-                LOG.info("Range (ID=%s) changed geometry.", msag_id)
-                geom = current_id_geoms[msag_id]
-                master_cursor.updateRow((msag_id, expiration_date, geom))
-    LOG.info("End: Retire & update ranges.")
-    LOG.info("Start: Add new ranges from current MSAG.")
-    master_ids = set(
-        msag_id
-        for msag_id, in arcetl.attributes.as_iters(
-            dataset.TILLAMOOK_MSAG_RANGE.path("master"),
-            field_names=["msag_id"],
-            dataset_where_sql=unretired_where_sql,
-        )
-    )
-    current_cursor = arcpy.da.SearchCursor(
-        dataset.TILLAMOOK_MSAG_RANGE.path("current"), field_names=MSAG_KEYS["master"]
-    )
-    master_cursor = arcpy.da.InsertCursor(
-        dataset.TILLAMOOK_MSAG_RANGE.path("master"), field_names=MSAG_KEYS["master"]
+        ),
+        id_field_names=["msag_id"],
+        field_names=MSAG_KEYS["master"],
+        max_change_ratio=0.01,
+        use_edit_session=False,
     )
-    with current_cursor, master_cursor:
-        for row in current_cursor:
-            msag_id = row[0]
-            if msag_id not in master_ids:
-                LOG.info("Range (ID=%s) new in current: adding.", msag_id)
-                master_cursor.insertRow(row)
-    LOG.info("End: Add ranges.")
 
 
 def metadata_tillamook_ecd_etl():
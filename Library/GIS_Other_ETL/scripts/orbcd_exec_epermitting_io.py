@@ -39,10 +39,12 @@ def lp_deq_etl():
         csv_relpath = re.search(CSV_HREF_PATTERN,
                                 result_response.text).group(0).split('"')[1]
         csv_url = requests.compat.urljoin(url.DEQ_WEB, csv_relpath)
-        csv_response = session.get(url=csv_url,
-                                   headers={'Referer': result_response.url})
-    with open(LP_DEQ_CSV_PATH, 'wb') as csvfile:
-        csvfile.write(csv_response.content)
+        # Streams to file; leaves file (& its timestamp) alone if unchanged.
+        updated = url.fetch_to_file(csv_url, LP_DEQ_CSV_PATH, session=session,
+                                    headers={'Referer': result_response.url},
+                                    timeout=(10, 300))
+    if not updated:
+        LOG.info("DEQ CSV unchanged; nothing to update.")
 
 
 # Jobs.